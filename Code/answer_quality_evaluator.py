@@ -10,12 +10,13 @@ from pathlib import Path
 
 # Semantic similarity using sentence-transformers
 try:
-    from sentence_transformers import SentenceTransformer
     from sklearn.metrics.pairwise import cosine_similarity
+    from core.embedding_service import embeddings_available, get_embedding_service
     import numpy as np
-    SEMANTIC_AVAILABLE = True
+    SEMANTIC_AVAILABLE = embeddings_available()
 except ImportError:
     SEMANTIC_AVAILABLE = False
+if not SEMANTIC_AVAILABLE:
     print("⚠️  Warning: sentence-transformers not available. Install with: pip install sentence-transformers")
 
 
@@ -43,7 +44,7 @@ class AnswerQualityEvaluator:
         # Load semantic similarity model if available
         if SEMANTIC_AVAILABLE:
             try:
-                self.semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
+                self.semantic_model = get_embedding_service('all-MiniLM-L6-v2').load()
                 print("✅ Semantic similarity model loaded: all-MiniLM-L6-v2")
             except Exception as e:
                 print(f"⚠️  Failed to load semantic model: {e}")
@@ -178,7 +179,7 @@ class AnswerQualityEvaluator:
         # Use semantic similarity if available
         if self.semantic_model:
             try:
-                query_embedding = self.semantic_model.encode([query])
+                query_embedding = self.semantic_model.encode_query(query)[None, :]
                 answer_embedding = self.semantic_model.encode([answer])
                 base_similarity = cosine_similarity(query_embedding, answer_embedding)[0][0]
                 
@@ -0,0 +1,108 @@
+"""
+Benchmark: ANN index types for retrieve_context (recall@k vs latency)
+Builds Flat / IVF-Flat / IVF-PQ / HNSW over the full RAG corpus and
+replays every question from eval/questions.csv and MASTER_QUESTION_DATABASE.md.
+Recall@k is measured against the exact Flat results.
+
+Usage:
+    python benchmark_ann_index.py [--k 12] [--repeat 5]
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.ann_index import build_index
+from core.embedding_store import EmbeddingStore
+from benchmark_source_index import BASE_DIR, QUESTIONS_CSV, MODEL_NAME, build_corpus
+
+MASTER_DB = os.path.join(BASE_DIR, "MASTER_QUESTION_DATABASE.md")
+
+# (label, kind, params) — a few search-time settings per ANN family
+CONFIGS = [
+    ("Flat (exact)", "flat", {}),
+    ("IVF-Flat nprobe=8", "ivf", {"nprobe": 8}),
+    ("IVF-Flat nprobe=32", "ivf", {"nprobe": 32}),
+    ("IVF-PQ m=48 nprobe=16", "ivfpq", {"nprobe": 16}),
+    ("IVF-PQ m=48 nprobe=64", "ivfpq", {"nprobe": 64}),
+    ("HNSW M=32 ef=64", "hnsw", {"ef_search": 64}),
+    ("HNSW M=32 ef=128", "hnsw", {"ef_search": 128}),
+]
+
+
+def load_queries():
+    """Unique question texts from eval/questions.csv + MASTER_QUESTION_DATABASE.md."""
+    queries = []
+    with open(QUESTIONS_CSV, encoding="utf-8") as f:
+        queries += [row["question"] for row in csv.DictReader(f) if row["question"].strip()]
+    with open(MASTER_DB, encoding="utf-8") as f:
+        text = f.read()
+    queries += re.findall(r'"(?:question|q)":\s*"([^"]+)"', text)
+    return list(dict.fromkeys(q.strip() for q in queries))
+
+
+def recall_at_k(approx_ids: np.ndarray, exact_ids: np.ndarray) -> float:
+    """Mean |approx ∩ exact| / k over all queries."""
+    k = exact_ids.shape[1]
+    hits = [len(set(a) & set(e)) for a, e in zip(approx_ids.tolist(), exact_ids.tolist())]
+    return sum(hits) / (k * len(hits))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN index recall/latency benchmark")
+    parser.add_argument("--k", type=int, default=12, help="Neighbours per query (retrieve_context k)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes over all queries")
+    args = parser.parse_args()
+
+    print("=" * 88)
+    print("🧭 ANN INDEX BENCHMARK (recall@k vs latency)")
+    print("=" * 88)
+
+    summaries = build_corpus()
+    embedder = SentenceTransformer(MODEL_NAME)
+    store = EmbeddingStore(os.path.join(BASE_DIR, "storage", "cache", "embeddings"), MODEL_NAME)
+    emb = store.sync(summaries, lambda b: embedder.encode(b, convert_to_numpy=True, batch_size=128))
+
+    queries = load_queries()
+    q_emb = embedder.encode(queries, convert_to_numpy=True)
+    faiss.normalize_L2(q_emb)
+    print(f"Corpus: {len(summaries):,} vectors x {emb.shape[1]} | Queries: {len(queries)} | k={args.k}")
+    print()
+
+    print(f"{'Index':<26}{'Build (ms)':>12}{'Size (MB)':>11}{'Query (ms)':>12}{'Recall@k':>10}")
+    print("-" * 88)
+    exact_ids = None
+    for label, kind, params in CONFIGS:
+        start = time.perf_counter()
+        index = build_index(emb, kind, **params)
+        build_ms = (time.perf_counter() - start) * 1000
+        size_mb = faiss.serialize_index(index).nbytes / (1024 * 1024)
+
+        _, ids = index.search(q_emb, args.k)
+        if exact_ids is None:
+            exact_ids = ids
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for i in range(len(queries)):
+                index.search(q_emb[i:i + 1], args.k)
+        query_ms = (time.perf_counter() - start) * 1000 / (args.repeat * len(queries))
+
+        print(f"{label:<26}{build_ms:>12.0f}{size_mb:>11.1f}{query_ms:>12.3f}"
+              f"{recall_at_k(ids, exact_ids):>10.3f}")
+
+    print("-" * 88)
+    print("Query = single-query search latency (what retrieve_context does per request).")
+    print("Set RAG_INDEX_TYPE in the launcher to the best recall/latency trade-off.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
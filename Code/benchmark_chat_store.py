@@ -0,0 +1,135 @@
+"""
+Benchmark: chat persistence, one JSON file per chat vs SQLite ChatStore
+Uses the threads in storage/chats/ (copied into a temp dir / temp DB):
+  - sidebar listing: json.load every file vs one indexed page query
+  - search: substring scan over every message vs FTS5
+  - save after one new turn: re-read + rewrite the thread (indent=2)
+    vs inserting only the new messages
+and checks both stores list the same chats and find the same results.
+
+Usage:
+    python benchmark_chat_store.py [--repeat 20]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.chat_store import ChatStore
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHATS_DIR = os.path.join(BASE_DIR, "storage", "chats")
+SEARCHES = ["annual leave", "selangor", "revenue", "headcount", "burger", "attrition"]
+
+
+# =========================
+# Legacy JSON store (copied from the v9 launcher)
+# =========================
+def legacy_load_chat_list(chats_dir):
+    chats = []
+    for fname in os.listdir(chats_dir):
+        if fname.endswith(".json"):
+            with open(os.path.join(chats_dir, fname), "r", encoding="utf-8") as f:
+                chats.append(json.load(f))
+    chats.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+    return chats
+
+
+def legacy_search(chats_dir, query):
+    query_lower = query.lower()
+    results = []
+    for chat in legacy_load_chat_list(chats_dir):
+        if query_lower in chat.get("title", "").lower():
+            results.append(chat)
+            continue
+        for msg in chat.get("messages", []):
+            if query_lower in msg.get("content", "").lower():
+                results.append(chat)
+                break
+    return results
+
+
+def legacy_save(chats_dir, chat_id, title, messages, traces):
+    path = os.path.join(chats_dir, f"{chat_id}.json")
+    with open(path, "r", encoding="utf-8") as f:
+        existing = json.load(f)
+    data = {"chat_id": chat_id, "title": title, "created_at": existing.get("created_at"),
+            "updated_at": existing.get("updated_at"), "messages": messages, "tool_traces": traces}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def time_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat store benchmark")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🗄️  CHAT STORE BENCHMARK")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as d:
+        json_dir = os.path.join(d, "chats")
+        shutil.copytree(CHATS_DIR, json_dir)
+        store = ChatStore(os.path.join(d, "chats.db"))
+        store.import_json_dir(json_dir)
+        n = store.count_chats()
+        print(f"Chats: {n} ({sum(os.path.getsize(os.path.join(json_dir, f)) for f in os.listdir(json_dir)) / 1024:.0f} KB of JSON)")
+
+        # Equivalence
+        legacy_ids = [c["chat_id"] for c in legacy_load_chat_list(json_dir)]
+        list_same = [c["chat_id"] for c in store.list_chats()] == legacy_ids
+        search_same = all(
+            {c["chat_id"] for c in legacy_search(json_dir, q)} <= {c["chat_id"] for c in store.search(q, limit=n)}
+            for q in SEARCHES)
+
+        # One new turn appended to the longest chat
+        longest = max(legacy_load_chat_list(json_dir), key=lambda c: len(c["messages"]))
+        cid, msgs, traces = longest["chat_id"], list(longest["messages"]), list(longest["tool_traces"])
+        turn = [{"role": "user", "content": "and last month?", "timestamp": "t"},
+                {"role": "assistant", "content": "RM 101,203.10", "timestamp": "t"}]
+
+        def save_new_turn(save):
+            def run():
+                msgs.extend(turn)
+                save(cid, longest["title"], msgs, traces)
+            return run
+
+        rows = [
+            ("Sidebar list (10 chats)", lambda: legacy_load_chat_list(json_dir)[:10], lambda: store.list_chats(limit=10)),
+            (f"Search ({len(SEARCHES)} queries)", lambda: [legacy_search(json_dir, q) for q in SEARCHES],
+             lambda: [store.search(q) for q in SEARCHES]),
+            ("Save after a new turn", save_new_turn(lambda *a: legacy_save(json_dir, *a)), save_new_turn(store.save_chat)),
+        ]
+        print(f"{'Operation':<28}{'JSON files (ms)':>18}{'SQLite (ms)':>14}{'Speedup':>10}")
+        print("-" * 80)
+        for label, old, new in rows:
+            t_old = time_ms(old, args.repeat)
+            t_new = time_ms(new, args.repeat)
+            print(f"{label:<28}{t_old:>18.2f}{t_new:>14.2f}{t_old / t_new:>9.1f}x")
+        saved_same = store.load_chat(cid)["messages"] == msgs
+        store.close()
+
+    print()
+    print(f"{'✅' if list_same else '❌'} Sidebar order identical")
+    print(f"{'✅' if search_same else '❌'} Every substring hit also found by FTS search")
+    print(f"{'✅' if saved_same else '❌'} Incremental saves reload the full thread")
+    ok = list_same and search_same and saved_same
+    print("✅ PASS" if ok else "❌ FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark: DataValidator fuzzy matching, brute-force SequenceMatcher vs FuzzyIndex
+Replays the question bank through QueryRouter.route() (normalize_query +
+up to three contains_fuzzy_keyword calls) with the original
+word x keyword SequenceMatcher loops and with the indexed versions,
+and checks every route and normalised query is identical.
+
+Usage:
+    python benchmark_fuzzy_index.py [--repeat 20]
+"""
+import argparse
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from query import validator
+from query.router import QueryRouter
+from query.validator import DataValidator
+from benchmark_keyword_routing import load_questions
+
+
+# =========================
+# Legacy matchers (copied from query/validator.py before indexing)
+# =========================
+def legacy_contains(query, keywords, threshold=0.7):
+    query_words = query.lower().split()
+    for keyword in keywords:
+        if keyword.lower() in query.lower():
+            return True
+        for word in query_words:
+            if SequenceMatcher(None, word.lower(), keyword.lower()).ratio() >= threshold:
+                return True
+    return False
+
+
+def legacy_normalize(query):
+    corrected = []
+    for word in query.split():
+        w = word.lower()
+        if w in DataValidator.TYPO_MAP:
+            corrected.append(DataValidator.TYPO_MAP[w])
+        elif w in DataValidator.MALAY_MAP:
+            corrected.append(DataValidator.MALAY_MAP[w])
+        else:
+            for typo, correction in DataValidator.TYPO_MAP.items():
+                if SequenceMatcher(None, w, typo).ratio() >= 0.85:
+                    corrected.append(correction)
+                    break
+            else:
+                corrected.append(word)
+    return " ".join(corrected)
+
+
+def route_all(questions):
+    return [QueryRouter.route(q) for q in questions]
+
+
+def time_ms(fn, repeat: int, cold: bool = False) -> float:
+    total = 0.0
+    for _ in range(repeat):
+        if cold:
+            validator._keyword_index.cache_clear()
+            DataValidator.TYPO_INDEX._cache.clear()
+        start = time.perf_counter()
+        fn()
+        total += time.perf_counter() - start
+    return total * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy keyword index benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the question bank")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🔤 FUZZY KEYWORD MATCHING BENCHMARK")
+    print("=" * 80)
+
+    questions = load_questions()
+    print(f"Questions: {len(questions)}")
+
+    indexed = route_all(questions)
+    t_cold = time_ms(lambda: route_all(questions), args.repeat, cold=True)
+    t_warm = time_ms(lambda: route_all(questions), args.repeat)
+    index_stats = DataValidator.TYPO_INDEX
+
+    # Swap in the original brute-force loops
+    contains, normalize = DataValidator.contains_fuzzy_keyword, DataValidator.normalize_query
+    DataValidator.contains_fuzzy_keyword = staticmethod(legacy_contains)
+    DataValidator.normalize_query = staticmethod(legacy_normalize)
+    try:
+        legacy = route_all(questions)
+        t_legacy = time_ms(lambda: route_all(questions), args.repeat)
+    finally:
+        DataValidator.contains_fuzzy_keyword = staticmethod(contains)
+        DataValidator.normalize_query = staticmethod(normalize)
+
+    n = len(questions)
+    print(f"{'Matcher':<34}{'Total (ms)':>12}{'Per query (µs)':>18}{'Speedup':>10}")
+    print("-" * 80)
+    for label, t in [("SequenceMatcher (word x keyword)", t_legacy),
+                     ("FuzzyIndex (cold cache)", t_cold),
+                     ("FuzzyIndex (warm cache)", t_warm)]:
+        print(f"{label:<34}{t:>12.1f}{t * 1000 / n:>18.1f}{t_legacy / t:>9.1f}x")
+
+    print()
+    print(f"Typo index: {len(index_stats.keywords)} keywords, "
+          f"{index_stats.scored / max(index_stats.lookups, 1):.2f} full ratio() calls per uncached word")
+
+    same = indexed == legacy
+    print("✅ PASS: routes, normalised queries and metadata identical" if same
+          else "❌ FAIL: results differ from SequenceMatcher loops")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark: interaction logging on the request path, CSV append vs InteractionLog
+Replays the rows of logs/chat_logs.csv (real answers, full text) through
+  - legacy: log_interaction() as it was (open file, csv.writer, one row)
+  - queued: InteractionLog.log() (queue put; a background thread writes
+    batched, rotated, gzip-compressed JSONL segments)
+and reports the time the caller spends per record, then checks the
+reader streams back exactly the records that were logged.
+
+Usage:
+    python benchmark_interaction_log.py [--records 2000]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.interaction_log import InteractionLog, LOG_FIELDS, iter_records, segment_paths
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHAT_LOG = os.path.join(BASE_DIR, "logs", "chat_logs.csv")
+
+
+def legacy_log_interaction(log_file, model, route, question, answer, latency_ms,
+                           chat_id="", message_id="", tool_trace_summary=""):
+    new_file = not os.path.exists(log_file)
+    with open(log_file, "a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if new_file:
+            w.writerow(LOG_FIELDS)
+        w.writerow([time.strftime("%Y-%m-%d %H:%M:%S"), model, route, latency_ms, question, answer,
+                    chat_id, message_id, tool_trace_summary])
+
+
+def load_rows(n: int) -> list:
+    with open(CHAT_LOG, newline="", encoding="utf-8", errors="replace") as f:
+        rows = [r for r in csv.DictReader(f)]
+    return [rows[i % len(rows)] for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interaction log benchmark")
+    parser.add_argument("--records", type=int, default=2000, help="Records to log")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📝 INTERACTION LOG BENCHMARK")
+    print("=" * 80)
+
+    rows = load_rows(args.records)
+    n = len(rows)
+    print(f"Records: {n} (answers from {os.path.relpath(CHAT_LOG, BASE_DIR)}, "
+          f"avg {sum(len(r['answer'] or '') for r in rows) / n:.0f} chars)")
+
+    with tempfile.TemporaryDirectory() as d:
+        log_file = os.path.join(d, "chat_logs.csv")
+        start = time.perf_counter()
+        for r in rows:
+            legacy_log_interaction(log_file, r["model"], r["route"], r["question"], r["answer"], r["latency_ms"])
+        t_legacy = time.perf_counter() - start
+        csv_bytes = os.path.getsize(log_file)
+
+        log = InteractionLog(d, max_bytes=1024 * 1024)
+        start = time.perf_counter()
+        for r in rows:
+            log.log({"model": r["model"], "route": r["route"], "latency_ms": r["latency_ms"],
+                     "question": r["question"], "answer": r["answer"]})
+        t_queued = time.perf_counter() - start
+        start = time.perf_counter()
+        log.close()
+        t_drain = time.perf_counter() - start
+
+        segments = segment_paths(d)
+        seg_bytes = sum(os.path.getsize(p) for p in segments)
+        start = time.perf_counter()
+        read_back = [(r["question"], r["answer"]) for r in iter_records(d)]
+        t_read = time.perf_counter() - start
+        same = read_back == [(r["question"], r["answer"]) for r in rows]
+        stats = log.get_stats()
+
+    print(f"{'Logger':<36}{'Caller (µs/rec)':>18}{'Speedup':>10}")
+    print("-" * 80)
+    print(f"{'CSV open+append per query':<36}{t_legacy * 1e6 / n:>18.1f}{1.0:>9.1f}x")
+    print(f"{'InteractionLog.log() (queued)':<36}{t_queued * 1e6 / n:>18.1f}{t_legacy / t_queued:>9.1f}x")
+    print()
+    print(f"Background drain on close: {t_drain * 1000:.0f} ms | segments: {len(segments)} | dropped: {stats['dropped']}")
+    print(f"On disk: CSV {csv_bytes / 1024:.0f} KB vs gzip JSONL {seg_bytes / 1024:.0f} KB "
+          f"({csv_bytes / max(seg_bytes, 1):.1f}x smaller)")
+    print(f"Reader: {n} records streamed in {t_read * 1000:.0f} ms")
+
+    ok = same and stats["dropped"] == 0
+    print("✅ PASS: every record streamed back intact" if ok else "❌ FAIL: records lost or changed")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Benchmark: keyword routing, per-keyword regex vs compiled automaton
+Replays the full question bank (eval/questions.csv, the test result CSVs
+and MASTER_QUESTION_DATABASE.md) through detect_intent() from the v8.2
+launcher twice:
+  - legacy: re.search(rf'\\b{k}\\b') per keyword + one re.search per
+    ANALYTICAL_PATTERNS regex (the original keyword_match/detect_query_type)
+  - compiled: ROUTING_KEYWORDS.scan() + ANALYTICAL_REGEX (built at import)
+and checks every route and matched-keyword list is identical.
+
+The routing code is taken from the launcher source (ast), so the
+benchmark runs without gradio/ollama/faiss.
+
+Usage:
+    python benchmark_keyword_routing.py [--repeat 50]
+"""
+import argparse
+import ast
+import csv
+import glob
+import os
+import re
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.keyword_automaton import KeywordAutomaton, compile_patterns, match_keywords
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+LAUNCHER = os.path.join(BASE_DIR, "oneclick_my_retailchain_v8.2_models_logging copy.py")
+MASTER_DB = os.path.join(BASE_DIR, "MASTER_QUESTION_DATABASE.md")
+
+ROUTING_NAMES = {
+    "HR_KEYWORDS", "SALES_KEYWORDS", "DOC_KEYWORDS", "HR_POLICY_KEYWORDS",
+    "ANALYTICAL_PATTERNS", "ROUTING_KEYWORDS", "ANALYTICAL_REGEX",
+    "detect_query_type", "keyword_match", "detect_intent",
+}
+
+
+def load_routing(path: str = LAUNCHER) -> dict:
+    """Execute only the routing definitions of the launcher; returns its namespace."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    keep = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in ROUTING_NAMES:
+            keep.append(node)
+        elif isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id in ROUTING_NAMES for t in node.targets):
+            keep.append(node)
+    namespace = {
+        "re": re, "ACTIVE_ROUTER": None, "KeywordAutomaton": KeywordAutomaton,
+        "compile_patterns": compile_patterns, "match_keywords": match_keywords,
+    }
+    exec(compile(ast.Module(body=keep, type_ignores=[]), path, "exec"), namespace)
+    return namespace
+
+
+def load_questions() -> list:
+    """Unique questions from eval/questions.csv, test result CSVs and MASTER_QUESTION_DATABASE.md."""
+    files = [os.path.join(ROOT_DIR, "eval", "questions.csv")]
+    files += sorted(glob.glob(os.path.join(ROOT_DIR, "*.csv")) + glob.glob(os.path.join(BASE_DIR, "*.csv")))
+    queries = []
+    for path in files:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            queries += [row.get("question") or "" for row in csv.DictReader(f)]
+    with open(MASTER_DB, encoding="utf-8") as f:
+        queries += re.findall(r'"(?:question|q)":\s*"([^"]+)"', f.read())
+    return list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+
+
+# =========================
+# Legacy matcher (copied from the v8.2 launcher before compilation)
+# =========================
+def legacy_keyword_match(keywords: list, text: str) -> tuple:
+    matched_keywords = []
+    for k in keywords:
+        if ' ' in k:
+            if k in text:
+                matched_keywords.append(k)
+        else:
+            if re.search(rf'\b{re.escape(k)}\b', text):
+                matched_keywords.append(k)
+    return (len(matched_keywords) > 0, matched_keywords)
+
+
+def legacy_query_type(patterns: dict):
+    def detect_query_type(text: str) -> str:
+        text_lower = (text or "").lower().strip()
+        for name, query_type in (('strategic', 'STRATEGIC'), ('trend', 'ANALYTICAL_TREND'),
+                                 ('distribution', 'ANALYTICAL_DIST'), ('ambiguous', 'AMBIGUOUS')):
+            for pattern in patterns[name]:
+                if re.search(pattern, text_lower):
+                    return query_type
+        return 'FACTUAL'
+    return detect_query_type
+
+
+class LegacyScanner:
+    """ROUTING_KEYWORDS stand-in: each class matched lazily with the legacy loop."""
+
+    def __init__(self, classes: dict):
+        self.classes = classes
+
+    def scan(self, text: str) -> dict:
+        classes = self.classes
+
+        class Lazy(dict):
+            def __missing__(self, name):
+                self[name] = legacy_keyword_match(classes[name], text)[1]
+                return self[name]
+        return Lazy()
+
+
+def route_all(detect_intent, questions, history=None) -> list:
+    with redirect_stdout(StringIO()):
+        return [detect_intent(q, False, history) for q in questions]
+
+
+def time_us(fn, repeat: int, n: int) -> float:
+    with redirect_stdout(StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = time.perf_counter() - start
+    return elapsed * 1e6 / (repeat * n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword routing benchmark")
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the question bank")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🔀 KEYWORD ROUTING BENCHMARK")
+    print("=" * 80)
+
+    compiled = load_routing()
+    legacy = load_routing()
+    legacy["ROUTING_KEYWORDS"] = LegacyScanner(compiled["ROUTING_KEYWORDS"].classes)
+    legacy["detect_query_type"] = legacy_query_type(compiled["ANALYTICAL_PATTERNS"])
+
+    questions = load_questions()
+    history = [{"role": "user", "content": "headcount by department"}]
+    texts = [q.lower().strip() for q in questions]
+    print(f"Questions: {len(questions)}")
+
+    # Equivalence: keyword lists, query types and routes (with and without history)
+    automaton = compiled["ROUTING_KEYWORDS"]
+    kw_same = all(
+        automaton.scan(t)[name] == legacy_keyword_match(kws, t)[1]
+        for t in texts for name, kws in automaton.classes.items()
+    )
+    qt_same = all(compiled["detect_query_type"](t) == legacy["detect_query_type"](t) for t in texts)
+    routes_same = (route_all(compiled["detect_intent"], questions) == route_all(legacy["detect_intent"], questions)
+                   and route_all(compiled["detect_intent"], questions, history)
+                   == route_all(legacy["detect_intent"], questions, history))
+
+    n = len(questions)
+    rows = [
+        ("Keyword classes (3)",
+         lambda: [legacy_keyword_match(kws, t) for t in texts for kws in automaton.classes.values()],
+         lambda: [automaton.scan(t) for t in texts]),
+        ("Query type",
+         lambda: [legacy["detect_query_type"](t) for t in texts],
+         lambda: [compiled["detect_query_type"](t) for t in texts]),
+        ("detect_intent",
+         lambda: [legacy["detect_intent"](q, False) for q in questions],
+         lambda: [compiled["detect_intent"](q, False) for q in questions]),
+    ]
+
+    print(f"{'Step':<22}{'Legacy (µs/q)':>16}{'Compiled (µs/q)':>18}{'Speedup':>10}")
+    print("-" * 80)
+    for label, old, new in rows:
+        t_old = time_us(old, args.repeat, n)
+        t_new = time_us(new, args.repeat, n)
+        print(f"{label:<22}{t_old:>16.1f}{t_new:>18.1f}{t_old / t_new:>9.1f}x")
+
+    print()
+    print(f"{'✅' if kw_same else '❌'} Matched keywords identical per class")
+    print(f"{'✅' if qt_same else '❌'} Query types identical")
+    print(f"{'✅' if routes_same else '❌'} Routes identical ({n} questions, with and without history)")
+    ok = kw_same and qt_same and routes_same
+    print("✅ PASS" if ok else "❌ FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
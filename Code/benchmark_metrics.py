@@ -0,0 +1,100 @@
+"""
+Benchmark: usage statistics, JSON load/save per query vs MetricsRegistry
+  - legacy: update_stats() as in the v9 launcher (json.load +
+    json.dump of usage_stats.json on every query)
+  - registry: MetricsRegistry.record_query() (memory only; snapshot
+    written in the background)
+Both are also run from 8 concurrent workers to show how many queries
+the read-modify-write file version loses.
+
+Usage:
+    python benchmark_metrics.py [--queries 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.metrics import MetricsRegistry
+
+ROUTES = ["sales_kpi", "hr_kpi", "rag_docs", "visual"]
+MODELS = ["N/A", "qwen2.5:7b", "llama3:latest"]
+
+
+def legacy_update_stats(path, route, model, latency_ms):
+    stats = {"total_queries": 0, "route_counts": {}, "model_counts": {}, "avg_latency_ms": 0, "total_latency_ms": 0}
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stats = json.load(f)
+        except ValueError:
+            pass  # torn read while another worker writes
+    stats["total_queries"] += 1
+    stats["route_counts"][route] = stats["route_counts"].get(route, 0) + 1
+    stats["model_counts"][model] = stats["model_counts"].get(model, 0) + 1
+    stats["total_latency_ms"] += latency_ms
+    stats["avg_latency_ms"] = stats["total_latency_ms"] / stats["total_queries"]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+
+
+def run(record, n, workers=1):
+    def work(offset):
+        for i in range(offset, n, workers):
+            record(ROUTES[i % 4], MODELS[i % 3], 50 + (i * 37) % 5000)
+    threads = [threading.Thread(target=work, args=(w,)) for w in range(workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Usage statistics benchmark")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    n = args.queries
+
+    print("=" * 80)
+    print("📊 USAGE STATISTICS BENCHMARK")
+    print("=" * 80)
+    print(f"Queries: {n}")
+
+    with tempfile.TemporaryDirectory() as d:
+        legacy_path = os.path.join(d, "legacy.json")
+        t_legacy = run(lambda *a: legacy_update_stats(legacy_path, *a), n)
+        os.remove(legacy_path)
+        run(lambda *a: legacy_update_stats(legacy_path, *a), n, workers=8)
+        with open(legacy_path, encoding="utf-8") as f:
+            legacy_counted = json.load(f)["total_queries"]
+
+        metrics = MetricsRegistry(os.path.join(d, "usage_stats.json"), snapshot_interval=0.5)
+        t_metrics = run(metrics.record_query, n)
+        concurrent = MetricsRegistry()
+        run(concurrent.record_query, n, workers=8)
+        metrics.close()
+        registry_counted = concurrent.snapshot()["total_queries"]
+        overall = metrics.get_stats()
+
+    print(f"{'Recorder':<34}{'Per query (µs)':>18}{'Speedup':>10}")
+    print("-" * 80)
+    print(f"{'JSON load + save per query':<34}{t_legacy * 1e6 / n:>18.1f}{1.0:>9.1f}x")
+    print(f"{'MetricsRegistry.record_query':<34}{t_metrics * 1e6 / n:>18.1f}{t_legacy / t_metrics:>9.1f}x")
+    print()
+    print(f"8 concurrent workers: JSON file counted {legacy_counted}/{n}, registry counted {registry_counted}/{n}")
+    print(f"Latency: p50 {overall['p50_ms']:.0f}ms | p95 {overall['p95_ms']:.0f}ms | p99 {overall['p99_ms']:.0f}ms")
+
+    ok = registry_counted == n
+    print("✅ PASS: no queries lost" if ok else "❌ FAIL: registry lost counts")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
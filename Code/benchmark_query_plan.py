@@ -0,0 +1,124 @@
+"""
+Benchmark: per-executor filtering vs compiled query plans
+Replays the question bank as the four QueryIntent executors would see it.
+Each question's filters (gazetteer entities + resolve_month) become a
+total, a percentage (part = filters, whole = month), a state comparison
+and a top-5 Product breakdown:
+  - legacy: the executors' data access before plans (one df.copy() +
+    filter per total, per compared value and per part/whole side)
+  - plans: the same intents compiled to Plans and run on a QueryEngine
+    over the bitmap index, uncached and then from the plan cache
+and checks every number matches.
+
+Usage:
+    python benchmark_query_plan.py [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.bitmap_index import BitmapIndex
+from core.cache_engine import CacheEngine
+from core.columnar_store import SALES_DIMENSIONS
+from core.data_snapshot import prepare_sales_frame
+from core.query_plan import QueryEngine, breakdown_plan, comparison_plan, percentage_plan, total_plan
+from benchmark_row_filter import SALES_CSV, build_workload, legacy_apply_filters
+
+VALUE = 'Total Sale'
+
+
+def intents(workload, states):
+    """(kind, args) per question: total, percentage, comparison, breakdown."""
+    out = []
+    for f in workload:
+        whole = {'month': f['month']} if f.get('month') else {}
+        out += [("total", (f,)), ("percentage", (f, whole)),
+                ("comparison", (f, states)), ("breakdown", (f,))]
+    return out
+
+
+# =========================
+# Legacy executors' data access (before plans)
+# =========================
+def legacy_sum(df, filters):
+    sub = legacy_apply_filters(df, filters)
+    return round(float(sub[VALUE].sum()), 6), len(sub)
+
+
+def run_legacy(df, kind, args):
+    if kind == "total":
+        return legacy_sum(df, args[0])
+    if kind == "percentage":
+        return legacy_sum(df, args[0]), legacy_sum(df, args[1])
+    if kind == "comparison":
+        return [legacy_sum(df, {**args[0], 'state': s}) for s in args[1]]
+    sub = legacy_apply_filters(df, args[0])
+    grp = sub.groupby('Product', observed=True)[VALUE].sum().sort_values(ascending=False).head(5)
+    return [(k, round(float(v), 6)) for k, v in grp.items()]
+
+
+def run_plan(engine, kind, args):
+    if kind == "total":
+        res = engine.run(total_plan(args[0], VALUE))
+        return round(res['total'], 6), res['rows']
+    if kind == "percentage":
+        res = engine.run(percentage_plan(args[0], args[1], VALUE))
+        return (round(res['part'][0], 6), res['part'][1]), (round(res['whole'][0], 6), res['whole'][1])
+    if kind == "comparison":
+        res = engine.run(comparison_plan(args[0], 'state', args[1], VALUE))
+        return [(round(v, 6), n) for _, v, n in res['picked']]
+    res = engine.run(breakdown_plan(args[0], 'Product', VALUE, 5))
+    return [(k, round(float(v), 6)) for k, v in res['top'].items()]
+
+
+def timed(fn, work, repeat):
+    best, results = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(kind, args) for kind, args in work]
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query plan benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the question bank")
+    args = parser.parse_args()
+
+    df = prepare_sales_frame(pd.read_csv(SALES_CSV))
+    work = intents(build_workload(df), df['State'].cat.categories[:2].tolist())
+    index = BitmapIndex(df, SALES_DIMENSIONS + ["YearMonth", "DateStr"])
+
+    print("=" * 80)
+    print("🗺️ QUERY PLAN BENCHMARK (question bank)")
+    print("=" * 80)
+    print(f"Intents: {len(work)} (total / percentage / comparison / breakdown per question)")
+
+    legacy_ms, legacy_res = timed(lambda k, a: run_legacy(df, k, a), work, args.repeat)
+    plain = QueryEngine(index)
+    plan_ms, plan_res = timed(lambda k, a: run_plan(plain, k, a), work, args.repeat)
+    cached = QueryEngine(index, cache=CacheEngine(sweep_interval=0))
+    cached_ms, cached_res = timed(lambda k, a: run_plan(cached, k, a), work, args.repeat)
+    stats = cached.get_stats()['cached_plans']
+
+    n = max(len(work), 1)
+    print(f"{'Path':<32}{'Pass (ms)':>12}{'Per intent (ms)':>18}")
+    print("-" * 80)
+    for name, ms in [("legacy: copy per side/value", legacy_ms), ("plans: bitmap index", plan_ms),
+                     ("plans: + plan cache", cached_ms)]:
+        print(f"{name:<32}{ms:>12.1f}{ms / n:>18.3f}")
+    print(f"\nPlan cache: {stats['entries']} plans, hit rate {stats['hit_rate_percent']}%")
+
+    same = legacy_res == plan_res == cached_res
+    print(f"Speedup {legacy_ms / plan_ms:.1f}x uncached, {legacy_ms / cached_ms:.1f}x cached")
+    ok = same and plan_ms < legacy_ms
+    print("✅ PASS: identical results, faster" if ok else "❌ FAIL: results differ or no gain")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
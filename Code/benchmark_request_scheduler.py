@@ -0,0 +1,86 @@
+"""
+Benchmark: KPI wait time with one shared queue vs separate KPI/LLM pools
+Simulated mixed traffic: a few long LLM generations (sleep) and many
+short deterministic KPI answers arriving over the same window.
+  - shared: every request goes through one queue sized for what Ollama
+    can serve (2 slots), as with a single Gradio queue
+  - pools: RequestScheduler({'kpi': 8, 'llm': 2}), KPI routes use the
+    kpi pool
+Reports KPI and LLM queue wait (p50 / p95 / max) from the tickets.
+
+Usage:
+    python benchmark_request_scheduler.py [--llm-seconds 0.5] [--kpi 40] [--llm 6]
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.request_scheduler import RequestScheduler
+
+
+def simulate(sched, pool_of, n_kpi, n_llm, llm_seconds, kpi_seconds=0.005):
+    """Run the mixed workload; returns {'kpi': [wait_ms], 'llm': [wait_ms]}."""
+    waits = {'kpi': [], 'llm': []}
+    lock = threading.Lock()
+
+    def request(kind, delay):
+        time.sleep(delay)
+        with sched.slot(pool_of(kind)) as ticket:
+            time.sleep(llm_seconds if kind == 'llm' else kpi_seconds)
+        with lock:
+            waits[kind].append(ticket.wait_ms)
+
+    # LLM requests arrive first, KPI requests spread over the generation window
+    jobs = [('llm', i * 0.01) for i in range(n_llm)]
+    jobs += [('kpi', 0.05 + i * llm_seconds / max(1, n_kpi)) for i in range(n_kpi)]
+    threads = [threading.Thread(target=request, args=job) for job in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return waits
+
+
+def p95(values):
+    return sorted(values)[max(0, int(len(values) * 0.95) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request scheduler benchmark")
+    parser.add_argument("--llm-seconds", type=float, default=0.5, help="Simulated generation time")
+    parser.add_argument("--kpi", type=int, default=40, help="KPI requests")
+    parser.add_argument("--llm", type=int, default=6, help="LLM requests")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🚦 REQUEST SCHEDULER BENCHMARK")
+    print("=" * 80)
+    print(f"Workload: {args.llm} LLM requests x {args.llm_seconds}s, {args.kpi} KPI requests x 5ms")
+
+    limits = {'kpi': 8, 'llm': 2}
+    shared = simulate(RequestScheduler({'all': limits['llm']}), lambda kind: 'all',
+                      args.kpi, args.llm, args.llm_seconds)
+    pools = simulate(RequestScheduler(limits), lambda kind: kind,
+                     args.kpi, args.llm, args.llm_seconds)
+
+    print(f"{'Setup':<26}{'Route':<8}{'p50 wait (ms)':>15}{'p95 wait (ms)':>15}{'max (ms)':>10}")
+    print("-" * 80)
+    for name, waits in ((f"shared queue ({limits['llm']} slots)", shared), ("kpi 8 + llm 2 pools", pools)):
+        for kind in ('kpi', 'llm'):
+            w = waits[kind]
+            print(f"{name:<26}{kind:<8}{statistics.median(w):>15.0f}{p95(w):>15.0f}{max(w):>10}")
+
+    # Shared slots fill with LLM work, so KPI answers wait; with pools they don't
+    ok = p95(pools['kpi']) < 50 and p95(pools['kpi']) < p95(shared['kpi'])
+    print()
+    print("✅ PASS: KPI answers no longer wait behind LLM generations" if ok
+          else "❌ FAIL: KPI wait not reduced")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
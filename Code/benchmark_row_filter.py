@@ -0,0 +1,173 @@
+"""
+Benchmark: filtered DataFrame copies vs cached row positions
+Replays the question bank through the structured executors' data access.
+Each question's filters (gazetteer entities + resolve_month) run a total
+(sum + row count) and a Product breakdown:
+  - legacy: apply_filters_to_dataframe as it was (df.copy() + chained
+    code_mask filters, copied below), then sum / groupby on the frame
+  - rows: RowFilter over the same frame (cached per-dimension bitmaps,
+    AND-ed into cached row positions; total() sums the column directly,
+    the breakdown materialises only the two columns it needs)
+  - index: BitmapIndex built at load (packed bitmaps for every value),
+    uncached: each question ANDs bitmaps and aggregates with NumPy
+and checks all paths give the same totals, row counts and rankings.
+Peak memory is the largest tracemalloc peak of a single question.
+
+Usage:
+    python benchmark_row_filter.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.bitmap_index import BitmapIndex, FILTER_COLUMNS
+from core.cache_engine import CacheEngine
+from core.columnar_store import SALES_DIMENSIONS, code_mask
+from core.data_snapshot import prepare_sales_frame
+from core.entity_gazetteer import EntityGazetteer
+from core.row_filter import RowFilter
+from query.time_parser import resolve_month
+from benchmark_keyword_routing import load_questions
+
+SALES_CSV = os.path.join(Path(__file__).parent.parent, "data", "MY_Retail_Sales_2024H1.csv")
+
+
+# =========================
+# Legacy access path (copied from the v8.2 copy launcher)
+# =========================
+def legacy_apply_filters(df, filters):
+    result = df.copy()
+    for key, value in filters.items():
+        if not value:
+            continue
+        if key in FILTER_COLUMNS and FILTER_COLUMNS[key] in result.columns:
+            result = result[code_mask(result[FILTER_COLUMNS[key]], value)]
+        elif key == 'month':
+            result = result[result['YearMonth'] == pd.Period(str(value), freq='M')]
+    return result
+
+
+def legacy_total(df, filters):
+    sub = legacy_apply_filters(df, filters)
+    return float(sub['Total Sale'].sum()), len(sub)
+
+
+def legacy_breakdown(df, filters):
+    sub = legacy_apply_filters(df, filters)
+    return sub.groupby('Product', observed=True)['Total Sale'].sum().sort_values(ascending=False).head(5)
+
+
+def rows_breakdown(rows, filters):
+    sub = rows.view(filters, ['Product', 'Total Sale'])
+    return sub.groupby('Product', observed=True)['Total Sale'].sum().sort_values(ascending=False).head(5)
+
+
+def build_workload(df_sales):
+    """Filter dicts for every question that names a sales entity or month."""
+    entities = EntityGazetteer.from_frames(df_sales, None)
+    latest = df_sales["YearMonth"].max()
+    workload = []
+    for q in load_questions():
+        mentions = entities.find(q)
+        filters = {k: entities.first(mentions, k)
+                   for k, col in FILTER_COLUMNS.items() if col in df_sales.columns}
+        filters['month'] = resolve_month(q, latest)
+        filters = {k: v for k, v in filters.items() if v}
+        if filters:
+            workload.append(filters)
+    return workload
+
+
+def run(workload, total_fn, breakdown_fn, repeat):
+    """Best pass time (ms), peak bytes of one question, results of the last pass."""
+    best, results = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [(total_fn(f), breakdown_fn(f)) for f in workload]
+        best = min(best, time.perf_counter() - start)
+    peak = 0
+    for f in workload:
+        tracemalloc.start()
+        total_fn(f)
+        breakdown_fn(f)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best * 1000, peak, results
+
+
+def same_results(a, b) -> bool:
+    for (total_a, grp_a), (total_b, grp_b) in zip(a, b):
+        if total_a[1] != total_b[1] or abs(total_a[0] - total_b[0]) > 1e-6:
+            return False
+        if list(grp_a.index) != list(grp_b.index) or any(abs(x - y) > 1e-6 for x, y in zip(grp_a, grp_b)):
+            return False
+    return len(a) == len(b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row filter benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the question bank")
+    args = parser.parse_args()
+
+    df_sales = prepare_sales_frame(pd.read_csv(SALES_CSV))
+    workload = build_workload(df_sales)
+
+    print("=" * 80)
+    print("🧮 ROW FILTER BENCHMARK (question bank)")
+    print("=" * 80)
+    print(f"Sales rows: {len(df_sales):,} | questions with filters: {len(workload)}")
+
+    legacy_ms, legacy_peak, legacy_res = run(
+        workload, lambda f: legacy_total(df_sales, f), lambda f: legacy_breakdown(df_sales, f), args.repeat)
+
+    cold = RowFilter(df_sales, cache=CacheEngine(sweep_interval=0), namespace="sales")
+    start = time.perf_counter()
+    [(cold.total(f, 'Total Sale'), rows_breakdown(cold, f)) for f in workload]
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    rows = RowFilter(df_sales, cache=CacheEngine(sweep_interval=0), namespace="sales")
+    rows_ms, rows_peak, rows_res = run(
+        workload, lambda f: rows.total(f, 'Total Sale'), lambda f: rows_breakdown(rows, f), args.repeat)
+    cache_mb = rows.cache.get_stats()['bytes'] / 1e6
+
+    index = BitmapIndex(df_sales, SALES_DIMENSIONS + ["YearMonth", "DateStr"])
+    indexed = RowFilter(df_sales, index=index)
+    index_ms, index_peak, index_res = run(
+        workload, lambda f: indexed.total(f, 'Total Sale'),
+        lambda f: indexed.group_sum(f, 'Product', 'Total Sale').head(5), args.repeat)
+
+    print(f"{'Path':<30}{'Pass (ms)':>12}{'Per question (ms)':>20}{'Peak (MB)':>12}")
+    print("-" * 80)
+    n = max(len(workload), 1)
+    for name, ms, peak in [("legacy: copy + filter", legacy_ms, legacy_peak),
+                           ("rows: first pass (cold)", cold_ms, None),
+                           ("rows: cached bitmaps", rows_ms, rows_peak),
+                           ("index: bitmap ops, no cache", index_ms, index_peak)]:
+        peak_txt = f"{peak / 1e6:>12.2f}" if peak is not None else f"{'-':>12}"
+        print(f"{name:<30}{ms:>12.1f}{ms / n:>20.3f}{peak_txt}")
+    print(f"\nBitmap + position cache: {cache_mb:.2f} MB for all questions")
+    stats = index.get_stats()
+    print(f"Bitmap index: {stats['bitmaps']} values, {stats['bytes'] / 1e6:.2f} MB, built in {stats['build_ms']:.0f} ms")
+
+    same = same_results(legacy_res, rows_res) and same_results(legacy_res, index_res)
+    speedup = legacy_ms / rows_ms if rows_ms else float("inf")
+    print(f"Speedup {speedup:.1f}x | peak memory {legacy_peak / max(rows_peak, 1):.1f}x lower")
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for f in workload:
+            index.sum(index.where(f), 'Total Sale')
+    filter_ms = (time.perf_counter() - start) * 1000 / args.repeat / n
+    print(f"Bitmap index: {filter_ms:.3f} ms per multi-filter sum, {index_ms / n:.3f} ms with breakdown")
+    ok = same and rows_ms < legacy_ms and rows_peak < legacy_peak and index_ms < legacy_ms
+    print("✅ PASS: same answers, faster, less memory" if ok else "❌ FAIL: results differ or no gain")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark: RAG corpus row texts, iterrows vs column-wise serializer
+Times the original per-row f-string loop over df.iterrows() against
+sales_row_texts()/hr_row_texts() and checks the output is byte-identical.
+
+Usage:
+    python benchmark_row_serializer.py [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.data_snapshot import prepare_sales_frame, prepare_hr_frame
+from core.row_serializer import sales_row_texts, hr_row_texts
+
+DATA_DIR = os.path.join(Path(__file__).parent.parent, "data")
+SALES_CSV = os.path.join(DATA_DIR, "MY_Retail_Sales_2024H1.csv")
+HR_CSV = os.path.join(DATA_DIR, "MY_Retail_HR_Employees.csv")
+
+
+# =========================
+# Legacy serializer (copied from the v8.2 launchers)
+# =========================
+def legacy_sales_texts(df_sales):
+    sales_summaries = []
+    for _, r in df_sales.iterrows():
+        sales_summaries.append(
+            "[SALES] "
+            f"Date={r.get('DateStr','')}; State={r.get('State','')}; Branch={r.get('Branch','')}; "
+            f"Product={r.get('Product','')}; Qty={r.get('Quantity','')}; UnitPrice={r.get('Unit Price','')}; "
+            f"TotalSale={r.get('Total Sale','')}; Channel={r.get('Channel','')}; Payment={r.get('PaymentMethod','')}; "
+            f"Employee={r.get('Employee','')}"
+        )
+    return sales_summaries
+
+
+def legacy_hr_texts(df_hr):
+    hr_summaries = []
+    for _, r in df_hr.iterrows():
+        hr_summaries.append(
+            "[HR] "
+            f"EmpID={r.get('EmpID','')}; State={r.get('State','')}; Branch={r.get('Branch','')}; "
+            f"Department={r.get('Department','')}; JobRole={r.get('JobRole','')}; Age={r.get('Age','')}; "
+            f"AgeGroup={r.get('AgeGroup','')}; MonthlyIncome={r.get('MonthlyIncome','')}; "
+            f"OverTime={r.get('OverTime','')}; Attrition={r.get('Attrition','')}; YearsAtCompany={r.get('YearsAtCompany','')}"
+        )
+    return hr_summaries
+
+
+def time_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG row serializer benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Iterations per serializer")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📚 RAG CORPUS ROW SERIALIZER BENCHMARK")
+    print("=" * 80)
+
+    with redirect_stdout(StringIO()):
+        df_sales = prepare_sales_frame(pd.read_csv(SALES_CSV))
+        df_hr = prepare_hr_frame(pd.read_csv(HR_CSV))
+
+    cases = [
+        ("Sales", df_sales, legacy_sales_texts, sales_row_texts),
+        ("HR", df_hr, legacy_hr_texts, hr_row_texts),
+    ]
+    print(f"{'Source':<10}{'Rows':>8}{'iterrows (ms)':>16}{'Column-wise (ms)':>18}{'Speedup':>10}  Identical")
+    print("-" * 80)
+
+    all_match = True
+    for label, df, legacy, fast in cases:
+        same = legacy(df) == fast(df)
+        all_match &= same
+        t_legacy = time_ms(lambda: legacy(df), args.repeat)
+        t_fast = time_ms(lambda: fast(df), args.repeat)
+        print(f"{label:<10}{len(df):>8,}{t_legacy:>16.1f}{t_fast:>18.1f}{t_legacy / t_fast:>9.1f}x  "
+              f"{'✅' if same else '❌'}")
+
+    print()
+    print("✅ PASS: row texts byte-identical to iterrows" if all_match
+          else "❌ FAIL: row texts differ from iterrows")
+    return 0 if all_match else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
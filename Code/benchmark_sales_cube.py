@@ -0,0 +1,193 @@
+"""
+Benchmark: Sales KPI cube vs per-query pandas filtering
+Measures per-query latency of the legacy answer_sales_ceo_kpi data access
+(df_sales[YearMonth == month].copy() + chained masks) against SalesCube,
+and checks that both return the same totals, row counts and top-N rankings.
+
+Usage:
+    python benchmark_sales_cube.py [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.sales_cube import SalesCube
+from core.columnar_store import SALES_DIMENSIONS, encode_dimensions
+
+SALES_CSV = os.path.join(Path(__file__).parent.parent, "data", "MY_Retail_Sales_2024H1.csv")
+
+
+def load_sales(path: str) -> pd.DataFrame:
+    """Load sales exactly like the launchers do."""
+    df = pd.read_csv(path)
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["DateStr"] = df["Date"].dt.strftime("%Y-%m-%d")
+    df["YearMonth"] = df["Date"].dt.to_period("M")
+    for c in ["Quantity", "Unit Price", "Total Sale"]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+# =========================
+# Legacy access path (copied from answer_sales_ceo_kpi)
+# =========================
+def legacy_slice(df_sales, month=None, start=None, end=None, state=None, branch=None,
+                 product=None, employee=None, channel=None):
+    if month is not None:
+        sub = df_sales[df_sales["YearMonth"] == month].copy()
+    else:
+        mask = (df_sales["YearMonth"] >= start) & (df_sales["YearMonth"] <= end)
+        sub = df_sales[mask].copy()
+    if state:
+        sub = sub[sub["State"] == state]
+    if branch:
+        sub = sub[sub["Branch"] == branch]
+    if product:
+        sub = sub[sub["Product"] == product]
+    if employee:
+        sub = sub[sub["Employee"] == employee]
+    if channel and "Channel" in sub.columns:
+        sub = sub[sub["Channel"] == channel]
+    return sub
+
+
+def legacy_total(df_sales, value_col, **kw):
+    sub = legacy_slice(df_sales, **kw)
+    return float(sub[value_col].sum()), len(sub)
+
+
+def legacy_mom(df_sales, value_col, month, **filters):
+    cur = legacy_total(df_sales, value_col, month=month, **filters)
+    prev = legacy_total(df_sales, value_col, month=month - 1, **filters)
+    return cur, prev
+
+
+def legacy_top(df_sales, dim, value_col, **kw):
+    sub = legacy_slice(df_sales, **kw)
+    return sub.groupby(dim, observed=True)[value_col].sum().sort_values(ascending=False).head(5), len(sub)
+
+
+# =========================
+# Cube access path (as used by the launchers)
+# =========================
+def cube_mom(cube, value_col, month, **filters):
+    cur = cube.total(value_col, month=month, **filters)
+    prev = cube.total(value_col, month=month - 1, **filters)
+    return cur, prev
+
+
+def cube_top(cube, dim, value_col, **kw):
+    grp, rows = cube.group_sum(dim, value_col, **kw)
+    return grp.head(5), rows
+
+
+def build_workload(df_sales):
+    """Representative mix of KPI questions (totals, MoM, ranges, top-N)."""
+    months = sorted(df_sales["YearMonth"].dropna().unique().tolist())
+    latest = months[-1]
+    state = df_sales["State"].iloc[0]
+    branch = df_sales["Branch"].iloc[0]
+    product = df_sales["Product"].iloc[0]
+    channel = df_sales["Channel"].iloc[0]
+
+    return [
+        ("total | latest month", "total", dict(value_col="Total Sale", month=latest)),
+        ("total | month + state", "total", dict(value_col="Total Sale", month=latest, state=state)),
+        ("total | month + branch + product", "total",
+         dict(value_col="Quantity", month=months[0], branch=branch, product=product)),
+        ("total | month + channel", "total", dict(value_col="Total Sale", month=months[2], channel=channel)),
+        ("mom | latest vs previous", "mom", dict(value_col="Total Sale", month=latest)),
+        ("mom | state filter", "mom", dict(value_col="Total Sale", month=latest, state=state)),
+        ("top | products latest month", "top", dict(dim="Product", value_col="Total Sale", month=latest)),
+        ("top | branches in state", "top", dict(dim="Branch", value_col="Quantity", month=latest, state=state)),
+        ("range | top products H1", "top",
+         dict(dim="Product", value_col="Total Sale", start=months[0], end=latest)),
+        ("range | top states Q1 + channel", "top",
+         dict(dim="State", value_col="Total Sale", start=months[0], end=months[2], channel=channel)),
+    ]
+
+
+def run_legacy(df_sales, kind, kw):
+    if kind == "total":
+        return legacy_total(df_sales, **kw)
+    if kind == "mom":
+        return legacy_mom(df_sales, **kw)
+    return legacy_top(df_sales, **kw)
+
+
+def run_cube(cube, kind, kw):
+    if kind == "total":
+        return cube.total(**kw)
+    if kind == "mom":
+        return cube_mom(cube, **kw)
+    return cube_top(cube, **kw)
+
+
+def results_match(a, b, kind) -> bool:
+    if kind == "total":
+        return abs(a[0] - b[0]) < 1e-6 and a[1] == b[1]
+    if kind == "mom":
+        return results_match(a[0], b[0], "total") and results_match(a[1], b[1], "total")
+    grp_a, rows_a = a
+    grp_b, rows_b = b
+    return (rows_a == rows_b and list(grp_a.index) == list(grp_b.index)
+            and all(abs(x - y) < 1e-6 for x, y in zip(grp_a.values, grp_b.values)))
+
+
+def time_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sales KPI cube benchmark")
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations per query")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📊 SALES KPI CUBE BENCHMARK")
+    print("=" * 80)
+
+    df_sales = load_sales(SALES_CSV)
+    encode_dimensions(df_sales, SALES_DIMENSIONS, "Sales")
+    cube = SalesCube(df_sales)
+    stats = cube.get_stats()
+    print(f"Rows: {stats['source_rows']:,} | Cube cells: {stats['cells']:,} | "
+          f"Months: {stats['months']} | Build: {stats['build_ms']:.1f} ms")
+    print()
+
+    workload = build_workload(df_sales)
+    print(f"{'Query':<38}{'Legacy (ms)':>12}{'Cube (ms)':>12}{'Speedup':>10}  Match")
+    print("-" * 80)
+
+    total_legacy = total_cube = 0.0
+    all_match = True
+    for label, kind, kw in workload:
+        same = results_match(run_legacy(df_sales, kind, kw), run_cube(cube, kind, kw), kind)
+        all_match &= same
+        t_legacy = time_ms(lambda: run_legacy(df_sales, kind, kw), args.repeat)
+        t_cube = time_ms(lambda: run_cube(cube, kind, kw), args.repeat)
+        total_legacy += t_legacy
+        total_cube += t_cube
+        print(f"{label:<38}{t_legacy:>12.3f}{t_cube:>12.3f}{t_legacy / t_cube:>9.1f}x  "
+              f"{'✅' if same else '❌'}")
+
+    n = len(workload)
+    print("-" * 80)
+    print(f"{'Average per query':<38}{total_legacy / n:>12.3f}{total_cube / n:>12.3f}"
+          f"{total_legacy / total_cube:>9.1f}x")
+    print()
+    print("✅ PASS: cube results identical to legacy filtering" if all_match
+          else "❌ FAIL: cube results differ from legacy filtering")
+    return 0 if all_match else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Benchmark: single flat FAISS index vs per-source sub-indexes (docs mode)
+Replays the rag_docs questions from eval/questions.csv through
+  - legacy: one IndexFlatIP over Sales+HR+Docs, k0 = max(k*5, 60), filter [DOC:
+  - SourceIndex: search only the docs sub-index
+and reports latency plus how many doc chunks each path returns.
+Embeddings come from the shared EmbeddingStore cache (storage/cache/embeddings).
+
+Usage:
+    python benchmark_source_index.py [--k 18] [--repeat 20]
+"""
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+import faiss
+from sentence_transformers import SentenceTransformer
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.data_snapshot import load_csv_snapshot, prepare_sales_frame, prepare_hr_frame
+from core.embedding_store import EmbeddingStore
+from core.row_serializer import sales_row_texts, hr_row_texts
+from core.source_index import SourceIndex
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+DOCS_DIR = os.path.join(ROOT_DIR, "docs")
+QUESTIONS_CSV = os.path.join(ROOT_DIR, "eval", "questions.csv")
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def build_corpus():
+    """Sales + HR rows + doc paragraphs, same order as the v8.2 launchers."""
+    snapshot_dir = os.path.join(BASE_DIR, "storage", "snapshots")
+    with redirect_stdout(StringIO()):
+        df_sales = load_csv_snapshot(os.path.join(DATA_DIR, "MY_Retail_Sales_2024H1.csv"),
+                                     prepare_sales_frame, snapshot_dir)
+        df_hr = load_csv_snapshot(os.path.join(DATA_DIR, "MY_Retail_HR_Employees.csv"),
+                                  prepare_hr_frame, snapshot_dir)
+    doc_chunks = []
+    for fp in sorted(glob.glob(os.path.join(DOCS_DIR, "*.txt"))):
+        with open(fp, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read().strip()
+        parts = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+        doc_chunks += [f"[DOC:{os.path.basename(fp)}] {p}" for p in parts]
+    return sales_row_texts(df_sales) + hr_row_texts(df_hr) + doc_chunks
+
+
+def load_questions(category: str = "rag_docs"):
+    with open(QUESTIONS_CSV, encoding="utf-8") as f:
+        return [row["question"] for row in csv.DictReader(f) if row["category"] == category]
+
+
+def legacy_docs_search(index, summaries, q_emb, k):
+    """retrieve_context(mode="docs") before the per-source split."""
+    k0 = min(max(k * 5, 60), int(index.ntotal))
+    scores, idx = index.search(q_emb, k=k0)
+    candidates = [summaries[i] for i in idx[0] if i != -1]
+    return [c for c in candidates if c.startswith("[DOC:")][:k]
+
+
+def time_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-source FAISS index benchmark")
+    parser.add_argument("--k", type=int, default=18, help="Doc chunks per question (v8.2 docs mode)")
+    parser.add_argument("--repeat", type=int, default=20, help="Searches per question")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🔎 PER-SOURCE FAISS INDEX BENCHMARK (docs mode)")
+    print("=" * 80)
+
+    summaries = build_corpus()
+    embedder = SentenceTransformer(MODEL_NAME)
+    store = EmbeddingStore(os.path.join(BASE_DIR, "storage", "cache", "embeddings"), MODEL_NAME)
+    emb = store.sync(summaries, lambda b: embedder.encode(b, convert_to_numpy=True, batch_size=128))
+
+    flat = faiss.IndexFlatIP(emb.shape[1])
+    flat.add(emb)
+    split = SourceIndex(summaries, emb)
+    print(f"Corpus: {len(summaries):,} chunks | sub-indexes: {split.sizes()}")
+    print()
+
+    questions = load_questions()
+    print(f"{'Question':<44}{'Legacy ms':>10}{'Split ms':>10}{'Legacy docs':>13}{'Split docs':>12}")
+    print("-" * 89)
+
+    total_legacy = total_split = 0.0
+    short_legacy = 0
+    all_exact_k = True
+    for q in questions:
+        q_emb = embedder.encode([q], convert_to_numpy=True)
+        faiss.normalize_L2(q_emb)
+        legacy = legacy_docs_search(flat, summaries, q_emb, args.k)
+        split_hits = split.search(q_emb, args.k, mode="docs")
+
+        expected = min(args.k, split.sizes().get("docs", 0))
+        all_exact_k &= len(split_hits) == expected
+        short_legacy += len(legacy) < expected
+
+        t_legacy = time_ms(lambda: legacy_docs_search(flat, summaries, q_emb, args.k), args.repeat)
+        t_split = time_ms(lambda: split.search(q_emb, args.k, mode="docs"), args.repeat)
+        total_legacy += t_legacy
+        total_split += t_split
+        print(f"{q[:42]:<44}{t_legacy:>10.3f}{t_split:>10.3f}{len(legacy):>13}{len(split_hits):>12}")
+
+    n = max(len(questions), 1)
+    print("-" * 89)
+    print(f"{'Average per question':<44}{total_legacy / n:>10.3f}{total_split / n:>10.3f}")
+    print(f"Legacy returned fewer than k doc chunks for {short_legacy}/{len(questions)} questions")
+    print()
+    print("✅ PASS: docs sub-index always returns k doc chunks" if all_exact_k
+          else "❌ FAIL: docs sub-index returned fewer than k chunks")
+    return 0 if all_exact_k else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
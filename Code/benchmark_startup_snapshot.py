@@ -0,0 +1,94 @@
+"""
+Benchmark: startup data load from CSV vs column snapshot
+Compares the legacy path (pd.read_csv + derived columns + dimension encoding)
+with load_csv_snapshot() on a warm snapshot, prints a per-stage breakdown and
+checks that both produce identical DataFrames.
+
+Usage:
+    python benchmark_startup_snapshot.py [--repeat 5]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.data_snapshot import StartupTimer, load_csv_snapshot, prepare_sales_frame, prepare_hr_frame
+
+DATA_DIR = os.path.join(Path(__file__).parent.parent, "data")
+SOURCES = [
+    ("Sales", os.path.join(DATA_DIR, "MY_Retail_Sales_2024H1.csv"), prepare_sales_frame),
+    ("HR", os.path.join(DATA_DIR, "MY_Retail_HR_Employees.csv"), prepare_hr_frame),
+]
+
+
+def quiet(fn, *args, **kwargs):
+    """Run fn without its console messages."""
+    with redirect_stdout(StringIO()):
+        return fn(*args, **kwargs)
+
+
+def time_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup snapshot benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Iterations per load")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("⚡ STARTUP SNAPSHOT BENCHMARK")
+    print("=" * 80)
+
+    snapshot_dir = tempfile.mkdtemp(prefix="snapshots_")
+    all_match = True
+    try:
+        # Cold start: parse CSV + build snapshot
+        timer = StartupTimer()
+        for label, path, prepare in SOURCES:
+            quiet(load_csv_snapshot, path, prepare, snapshot_dir)
+            timer.lap(f"{label} cold (CSV + snapshot write)")
+        # Warm start: snapshot only
+        for label, path, prepare in SOURCES:
+            quiet(load_csv_snapshot, path, prepare, snapshot_dir)
+            timer.lap(f"{label} warm (snapshot)")
+        timer.report("Single cold vs warm start")
+
+        print(f"{'Source':<10}{'CSV + prepare (ms)':>20}{'Snapshot (ms)':>16}{'Speedup':>10}  Match")
+        print("-" * 80)
+        for label, path, prepare in SOURCES:
+            legacy = quiet(prepare, pd.read_csv(path))
+            snap = quiet(load_csv_snapshot, path, prepare, snapshot_dir)
+            try:
+                pd.testing.assert_frame_equal(legacy, snap)
+                same = True
+            except AssertionError:
+                same = False
+            all_match &= same
+
+            t_csv = time_ms(lambda: quiet(prepare, pd.read_csv(path)), args.repeat)
+            t_snap = time_ms(lambda: quiet(load_csv_snapshot, path, prepare, snapshot_dir), args.repeat)
+            print(f"{label:<10}{t_csv:>20.1f}{t_snap:>16.1f}{t_csv / t_snap:>9.1f}x  "
+                  f"{'✅' if same else '❌'}")
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    print()
+    print("✅ PASS: snapshot frames identical to CSV load" if all_match
+          else "❌ FAIL: snapshot frames differ from CSV load")
+    return 0 if all_match else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Benchmark: streaming an answer token by token, text snapshots vs typed events
+Two consumers from the launchers, before and after:
+  - throttled (v8.2 copy): the generator yields out.strip() after every
+    token and heartbeats as "_HEARTBEAT_n|elapsed_" strings; the UI keeps
+    the latest snapshot and repaints once per tick
+  - per-chunk (v9): the UI does accumulated += chunk and yields the whole
+    answer plus trace.to_display_html() for every chunk
+After: the generator yields delta / heartbeat events, the UI feeds an
+AnswerBuffer and repaints once per tick (trace HTML rendered once).
+A tick is simulated as --tick-tokens tokens (~0.2s of CPU generation).
+"Sent to UI" counts the characters handed to Gradio, which serializes
+and pushes every yield to the browser.
+
+Usage:
+    python benchmark_streaming.py [--tokens 2000] [--tick-tokens 4]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core import stream_events as ev
+
+PREFIX = "### 📄 Answer\n\n"
+SOURCES = [f"docs/policy_{i}.md" for i in range(5)]
+
+
+def tokens(n):
+    words = ["Revenue ", "in ", "Selangor ", "rose ", "12.4% ", "month-on-month, ", "led ", "by ", "Nasi Lemak. "]
+    return [words[i % len(words)] for i in range(n)]
+
+
+def trace_html():
+    """Same shape as ToolTrace.to_display_html() in the v9 launcher."""
+    lines = ['<div class="tool-trace">', '<h4>🔍 Tool Transparency</h4>',
+             '<p><strong>Route:</strong> <code>rag_docs</code></p>',
+             '<p><strong>Model:</strong> <code>qwen2.5:7b</code></p>',
+             f'<p><strong>Sources Retrieved:</strong> {len(SOURCES)}</p><ul>']
+    lines += [f'<li>{src}</li>' for src in SOURCES[:3]]
+    lines += ['</ul>', '<p><strong>Latency:</strong> 0ms</p>', '</div>']
+    return "\n".join(lines)
+
+
+# ---- before ----
+def snapshot_generator(toks, heartbeats=10):
+    for i in range(heartbeats):
+        yield f"_HEARTBEAT_{i + 1}|{i * 0.3:.1f}_"
+    out = ""
+    for t in toks:
+        out += t
+        yield out.strip()
+
+
+def chunk_generator(toks):
+    for t in toks:
+        yield t
+
+
+def throttled_snapshots(stream, tick_tokens):
+    out, seen, sent = "", 0, 0
+    for partial in stream:
+        if partial.startswith("_HEARTBEAT_") and partial.endswith("_"):
+            sent += len(PREFIX)
+            continue
+        out = partial
+        seen += 1
+        if seen % tick_tokens == 0:
+            sent += len(PREFIX + out)
+    final = (PREFIX + out).strip()
+    return final, sent + len(final)
+
+
+def per_chunk_accumulate(stream, tick_tokens):
+    accumulated, sent = "", 0
+    for chunk in stream:
+        accumulated += chunk
+        sent += len(accumulated) + len(trace_html())
+    final = (PREFIX + accumulated.strip()).strip()
+    return final, sent + len(final) + len(trace_html())
+
+
+# ---- after ----
+def event_generator(toks, heartbeats=10):
+    for i in range(heartbeats):
+        yield ev.heartbeat("retrieval", i + 1, i * 0.3)
+    answer = ev.AnswerBuffer()
+    for t in toks:
+        event = ev.delta(t)
+        answer.feed(event)
+        yield event
+    yield ev.final(answer.text().strip())
+
+
+def buffered_events(stream, tick_tokens, with_trace=False):
+    answer, seen, sent, html = ev.AnswerBuffer(), 0, 0, None
+    for event in stream:
+        if event.kind == ev.HEARTBEAT:
+            sent += len(PREFIX)
+            continue
+        if answer.feed(event):
+            seen += 1
+            if seen % tick_tokens == 0:
+                if with_trace and html is None:
+                    html = trace_html()
+                sent += len(PREFIX + answer.text().strip()) + (len(html) if html else 0)
+    final = (PREFIX + answer.text().strip()).strip()
+    return final, sent + len(final) + (len(trace_html()) if with_trace else 0)
+
+
+def timed(fn, runs):
+    best, result = float("inf"), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming pipeline benchmark")
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--tick-tokens", type=int, default=4, help="Tokens per 0.2s UI tick")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    toks, tick = tokens(args.tokens), args.tick_tokens
+
+    print("=" * 80)
+    print("🌊 STREAMING PIPELINE BENCHMARK")
+    print("=" * 80)
+    print(f"Answer: {args.tokens} tokens, {len(''.join(toks)):,} chars | UI tick every {tick} tokens")
+
+    rows = [
+        ("v8.2 copy: snapshots + markers", timed(lambda: throttled_snapshots(snapshot_generator(toks), tick), args.runs)),
+        ("v8.2 copy: events + buffer", timed(lambda: buffered_events(event_generator(toks), tick), args.runs)),
+        ("v9: accumulate + trace per chunk", timed(lambda: per_chunk_accumulate(chunk_generator(toks), tick), args.runs)),
+        ("v9: events + buffer per tick", timed(lambda: buffered_events(event_generator(toks, 0), tick, True), args.runs)),
+    ]
+    print(f"{'Pipeline':<36}{'Time (ms)':>12}{'Sent to UI (chars)':>22}")
+    print("-" * 80)
+    for name, (t, (_, sent)) in rows:
+        print(f"{name:<36}{t * 1000:>12.2f}{sent:>22,}")
+
+    # Generator-side copying: out += token; out.strip() per token vs one join
+    snapshot_copy = sum(len("".join(toks[:i + 1])) for i in range(len(toks))) * 2
+    print(f"\nGenerator copies: snapshots {snapshot_copy:,} chars | events {len(''.join(toks)):,} chars")
+
+    same = rows[0][1][1][0] == rows[1][1][1][0] == rows[2][1][1][0] == rows[3][1][1][0]
+    v9_cut = rows[2][1][1][1] / rows[3][1][1][1]
+    print(f"v9 UI payload reduced {v9_cut:.1f}x")
+    ok = same and v9_cut > 1
+    print("✅ PASS: same markdown, less copied and sent" if ok else "❌ FAIL: output differs or no reduction")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Benchmark: time-expression extraction, per-extractor regex scans vs parse_time()
+Replays the question bank through the five time extractors a sales
+question hits (extract_month_from_query, extract_two_months_from_query,
+extract_month_range_from_query, extract_named_month_range and
+TimeClassifier._extract_timeframe):
+  - legacy: the original regex code of each extractor (copied below)
+  - parsed: the time_parser views over one cached parse_time() result
+and checks every extractor returns the same value for every question.
+
+Usage:
+    python benchmark_time_parser.py [--repeat 50]
+"""
+import argparse
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from query import time_parser
+from query.time_classifier import TimeClassifier
+from query.time_parser import (MONTH_ALIASES, month_pair, month_range,
+                               named_month_range, resolve_month, timeframe_text)
+from benchmark_keyword_routing import load_questions
+
+LATEST = pd.Period("2024-06", freq="M")
+
+# Time-heavy probes on top of the question bank (edge cases of each regex)
+PROBES = [
+    "sales bulan lepas", "revenue this month vs last month", "MTD sales Selangor",
+    "sales 2024-03 vs 2024-05", "2024/3 until 2024/6", "2024-03 and 2024-03 again",
+    "2024-13 sales", "1999-05 sales", "2024-00", "2024-123", "2024/2025 revenue",
+    "Q1 vs Q2", "q3 2023 revenue", "compare Q4 and Q1 2024", "Q12 sales", "h1 vs h2 2024",
+    "sales from jan until jun 2024", "Mac 2024 revenue", "september vs sep", "jan2024 sales",
+    "sept and oktober", "mei sampai julai", "market share in may", "december 2023 to feb 2024",
+    "H1 performance", "top products in june", "2024-06 q2 june", "_jan sales", "separate", "",
+]
+
+
+# =========================
+# Legacy extractors (copied from the v8.2 copy launcher before parse_time)
+# =========================
+def legacy_named_month_range(q, latest=LATEST):
+    s = (q or "").lower()
+    m_year = re.search(r"\b(20\d{2})\b", s)
+    year = int(m_year.group(1)) if m_year else int(str(latest)[:4])
+    words = re.findall(r"[a-zA-Z]+", s)
+    months = []
+    for w in words:
+        w = w.lower()
+        if w in MONTH_ALIASES:
+            months.append(MONTH_ALIASES[w])
+    if len(months) >= 2:
+        p1 = pd.Period(f"{year:04d}-{months[0]:02d}", freq="M")
+        p2 = pd.Period(f"{year:04d}-{months[1]:02d}", freq="M")
+        return (p1, p2) if p1 <= p2 else (p2, p1)
+    return None
+
+
+def legacy_month(q, latest=LATEST):
+    """extract_month_from_query up to the previous-context/latest fallback (None there)."""
+    s = (q or "").lower()
+    if any(k in s for k in ["bulan ni", "bulan ini", "this month", "current month", "mtd"]):
+        return latest
+    if any(k in s for k in ["bulan lepas", "last month", "previous month"]):
+        return latest - 1
+    m = re.search(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
+    if m:
+        return pd.Period(f"{int(m.group(1)):04d}-{int(m.group(2)):02d}", freq="M")
+    quarter_match = re.search(r'\bq([1-4])\b', s)
+    if quarter_match:
+        year_match = re.search(r'\b(20\d{2})\b', s)
+        year = int(year_match.group(1)) if year_match else int(str(latest)[:4])
+        month_num = {1: 2, 2: 5, 3: 8, 4: 11}[int(quarter_match.group(1))]
+        return pd.Period(f"{year}-{month_num:02d}", freq="M")
+    year_match = re.search(r"\b(20\d{2})\b", s)
+    year = int(year_match.group(1)) if year_match else int(str(latest)[:4])
+    for month_name, num in sorted(MONTH_ALIASES.items(), key=lambda x: len(x[0]), reverse=True):
+        if re.search(r"\b" + re.escape(month_name) + r"\b", s):
+            return pd.Period(f"{year:04d}-{num:02d}", freq="M")
+    return None
+
+
+def legacy_two_months(q):
+    s = (q or "").lower()
+    months = [pd.Period(f"{int(y):04d}-{int(m):02d}", freq="M")
+              for y, m in re.findall(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)]
+    uniq = []
+    for x in months:
+        if x not in uniq:
+            uniq.append(x)
+    return uniq[:2]
+
+
+def legacy_month_range(q, latest=LATEST):
+    s = (q or "").lower()
+    quarter_matches = re.findall(r'\bq([1-4])\b', s)
+    if len(quarter_matches) >= 2:
+        year_match = re.search(r'\b(20\d{2})\b', s)
+        if year_match:
+            year = int(year_match.group(1))
+        else:
+            year = int(str(latest)[:4]) if latest else datetime.now().year
+        ranges = {1: (1, 3), 2: (4, 6), 3: (7, 9), 4: (10, 12)}
+        p1 = pd.Period(f"{year}-{ranges[int(quarter_matches[0])][0]:02d}", freq="M")
+        p2 = pd.Period(f"{year}-{ranges[int(quarter_matches[1])][1]:02d}", freq="M")
+        return (p1, p2) if p1 <= p2 else (p2, p1)
+    matches = re.findall(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
+    if len(matches) >= 2:
+        p1 = pd.Period(f"{int(matches[0][0]):04d}-{int(matches[0][1]):02d}", freq="M")
+        p2 = pd.Period(f"{int(matches[1][0]):04d}-{int(matches[1][1]):02d}", freq="M")
+        return (p1, p2) if p1 <= p2 else (p2, p1)
+    return None
+
+
+def legacy_timeframe(q):
+    query = (q or "").lower()
+    for pattern in TimeClassifier.MONTH_PATTERNS:
+        match = re.search(pattern, query, re.IGNORECASE)
+        if match:
+            return match.group(0)
+    return None
+
+
+def legacy_all(q):
+    return (legacy_month(q), legacy_two_months(q), legacy_month_range(q),
+            legacy_named_month_range(q), legacy_timeframe(q))
+
+
+def parsed_all(q):
+    return (resolve_month(q, LATEST), month_pair(q), month_range(q, LATEST),
+            named_month_range(q, LATEST), timeframe_text(q.lower()))
+
+
+def time_us(fn, questions, repeat: int, cold: bool = False) -> float:
+    total = 0.0
+    for _ in range(repeat):
+        if cold:
+            time_parser._parse.cache_clear()
+        start = time.perf_counter()
+        for q in questions:
+            fn(q)
+        total += time.perf_counter() - start
+    return total * 1e6 / (repeat * len(questions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-expression parser benchmark")
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the question bank")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🗓️  TIME EXPRESSION PARSER BENCHMARK")
+    print("=" * 80)
+
+    questions = load_questions()
+    print(f"Questions: {len(questions)} (+{len(PROBES)} edge-case probes for equivalence)")
+
+    mismatches = [q for q in questions + PROBES if legacy_all(q) != parsed_all(q)]
+    with_time = sum(1 for q in questions if time_parser.parse_time(q).expressions())
+
+    t_legacy = time_us(legacy_all, questions, args.repeat)
+    t_cold = time_us(parsed_all, questions, args.repeat, cold=True)
+    t_warm = time_us(parsed_all, questions, args.repeat)
+
+    print(f"{'Extractors (5 per question)':<34}{'Per query (µs)':>18}{'Speedup':>10}")
+    print("-" * 80)
+    for label, t in [("Regex per extractor", t_legacy),
+                     ("parse_time (cold cache)", t_cold),
+                     ("parse_time (warm cache)", t_warm)]:
+        print(f"{label:<34}{t:>18.1f}{t_legacy / t:>9.1f}x")
+
+    print()
+    print(f"Questions with a time expression: {with_time}/{len(questions)}")
+    for q in mismatches[:10]:
+        print(f"   ❌ {q!r}: {legacy_all(q)} != {parsed_all(q)}")
+    ok = not mismatches
+    print("✅ PASS: all five extractors identical" if ok
+          else f"❌ FAIL: {len(mismatches)} queries differ")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
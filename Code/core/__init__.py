@@ -2,5 +2,40 @@
 Core module initialization.
 """
 from .simple_cache import SimpleCache
+from .cache_engine import CacheEngine, estimate_size
+from .sales_cube import SalesCube
+from .columnar_store import encode_dimensions, code_mask, code_contains
+from .bitmap_index import Bitmap, BitmapIndex
+from .row_filter import RowFilter
+from .query_plan import Plan, QueryEngine
+from .ground_truth_store import GroundTruthStore
+from .data_snapshot import StartupTimer, load_csv_snapshot, prepare_sales_frame, prepare_hr_frame
+from .row_serializer import sales_row_texts, hr_row_texts
+from .embedding_store import EmbeddingStore
+from .source_index import SourceIndex
+from .ann_index import index_factory
+from .embedding_service import EmbeddingService, embeddings_available, get_embedding_service
+from .model_registry import MODELS, ModelRegistry
+from .semantic_cache import SemanticAnswerCache
+from .keyword_automaton import KeywordAutomaton, match_keywords
+from .entity_gazetteer import EntityGazetteer
+from .interaction_log import InteractionLog, iter_records, iter_frames
+from .chat_store import ChatStore
+from .metrics import MetricsRegistry, LatencyHistogram
+from .request_scheduler import RequestScheduler, CancelToken, RequestCancelled
+from .llm_client import LLMClient, llm_client
+from .stream_events import StreamEvent, AnswerBuffer, collect_text
 
-__all__ = ['SimpleCache']
+__all__ = [
+    'SimpleCache', 'CacheEngine', 'estimate_size', 'SalesCube',
+    'encode_dimensions', 'code_mask', 'code_contains', 'Bitmap', 'BitmapIndex', 'RowFilter',
+    'Plan', 'QueryEngine', 'GroundTruthStore',
+    'StartupTimer', 'load_csv_snapshot', 'prepare_sales_frame', 'prepare_hr_frame',
+    'sales_row_texts', 'hr_row_texts', 'EmbeddingStore', 'SourceIndex', 'index_factory',
+    'EmbeddingService', 'embeddings_available', 'get_embedding_service', 'MODELS', 'ModelRegistry',
+    'SemanticAnswerCache', 'KeywordAutomaton', 'match_keywords',
+    'EntityGazetteer', 'InteractionLog', 'iter_records', 'iter_frames',
+    'ChatStore', 'MetricsRegistry', 'LatencyHistogram',
+    'RequestScheduler', 'CancelToken', 'RequestCancelled', 'LLMClient', 'llm_client',
+    'StreamEvent', 'AnswerBuffer', 'collect_text',
+]
@@ -0,0 +1,165 @@
+"""
+ANN Index Factory - FYP Version
+Builds the RAG vector index as Flat (exact), IVF-Flat, IVF-PQ or HNSW,
+all on inner product (cosine for normalised vectors).
+Trained indexes are persisted next to a small JSON sidecar holding the
+vector fingerprint, so a restart reloads instead of retraining.
+"""
+from typing import Callable, Dict, Optional
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+INDEX_TYPES = ('flat', 'ivf', 'ivfpq', 'hnsw')
+
+DEFAULT_PARAMS = {
+    'flat': {},
+    'ivf': {'nlist': None, 'nprobe': 16},
+    'ivfpq': {'nlist': None, 'nprobe': 16, 'pq_m': 48, 'pq_bits': 8},
+    'hnsw': {'hnsw_m': 32, 'ef_construction': 80, 'ef_search': 64},
+}
+
+# Below this many vectors IVF training is pointless: use exact search
+MIN_TRAIN_POINTS = {'ivf': 1000, 'ivfpq': 5000}
+
+
+def vectors_fingerprint(vectors: np.ndarray) -> str:
+    """Content hash of an embedding matrix (shape + bytes)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(vectors.shape).encode())
+    h.update(np.ascontiguousarray(vectors).tobytes())
+    return h.hexdigest()
+
+
+def _default_nlist(n: int) -> int:
+    """~4*sqrt(n) lists, keeping >= 39 training points per list (FAISS guideline)."""
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def _pq_m(dim: int, wanted: int) -> int:
+    """Largest sub-quantizer count <= wanted that divides dim."""
+    for m in range(min(wanted, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def build_index(vectors: np.ndarray, kind: str = "flat", **params):
+    """
+    Build (and train) a FAISS inner-product index.
+
+    Args:
+        vectors: float32 embeddings (normalised)
+        kind: "flat" | "ivf" | "ivfpq" | "hnsw"
+        **params: Overrides for DEFAULT_PARAMS[kind]
+
+    Returns:
+        FAISS index with vectors added
+    """
+    import faiss
+
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{kind}' (expected one of {INDEX_TYPES})")
+    n, dim = vectors.shape
+    p = {**DEFAULT_PARAMS[kind], **params}
+    if n < MIN_TRAIN_POINTS.get(kind, 0):
+        kind = 'flat'
+
+    if kind == 'flat':
+        index = faiss.IndexFlatIP(dim)
+    elif kind == 'hnsw':
+        index = faiss.IndexHNSWFlat(dim, p['hnsw_m'], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = p['ef_construction']
+        index.hnsw.efSearch = p['ef_search']
+    else:
+        nlist = p['nlist'] or _default_nlist(n)
+        quantizer = faiss.IndexFlatIP(dim)
+        if kind == 'ivf':
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, _pq_m(dim, p['pq_m']), p['pq_bits'],
+                                     faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.nprobe = min(p['nprobe'], nlist)
+
+    index.add(vectors)
+    return index
+
+
+def load_or_build_index(vectors: np.ndarray, kind: str, cache_dir: Optional[str],
+                        name: str, **params):
+    """
+    Reuse a persisted trained index when the vectors are unchanged.
+
+    Files: <cache_dir>/<name>.<kind>.faiss + <name>.<kind>.json (fingerprint, params).
+
+    Args:
+        vectors: float32 embeddings (normalised)
+        kind: Index type (see INDEX_TYPES)
+        cache_dir: Folder for persisted indexes (None = never persist)
+        name: Index name, e.g. the corpus source ("docs", "sales", "hr")
+        **params: Overrides for DEFAULT_PARAMS[kind]
+    """
+    import faiss
+
+    if not cache_dir or kind == 'flat':
+        return build_index(vectors, kind, **params)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(cache_dir, f"{name}.{kind}.faiss")
+    meta_path = os.path.join(cache_dir, f"{name}.{kind}.json")
+    meta = {
+        'kind': kind,
+        'params': {**DEFAULT_PARAMS[kind], **params},
+        'fingerprint': vectors_fingerprint(vectors),
+        'count': int(vectors.shape[0]),
+        'dim': int(vectors.shape[1]),
+    }
+
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if all(saved.get(k) == meta[k] for k in ('kind', 'params', 'fingerprint')):
+            index = faiss.read_index(index_path)
+            _apply_search_params(index, meta['params'])
+            return index
+    except (OSError, ValueError, RuntimeError):
+        pass
+
+    start = time.perf_counter()
+    index = build_index(vectors, kind, **params)
+    meta['build_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    try:
+        faiss.write_index(index, index_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+    except (OSError, RuntimeError) as e:
+        print(f"⚠️ Could not persist {name} {kind} index: {e}")
+    return index
+
+
+def _apply_search_params(index, params: Dict):
+    """Search-time knobs are not always restored by read_index."""
+    import faiss
+
+    if hasattr(index, 'nprobe') and params.get('nprobe'):
+        index.nprobe = min(params['nprobe'], index.nlist)
+    if isinstance(index, faiss.IndexHNSW) and params.get('ef_search'):
+        index.hnsw.efSearch = params['ef_search']
+
+
+def index_factory(kind: str = "flat", cache_dir: Optional[str] = None,
+                  **params) -> Callable[[np.ndarray, str], object]:
+    """
+    make_index callable for SourceIndex.
+
+    Example:
+        index = SourceIndex(summaries, emb, make_index=index_factory("hnsw", INDEX_CACHE_DIR))
+    """
+    def make_index(vectors: np.ndarray, name: str = "rag"):
+        return load_or_build_index(vectors, kind, cache_dir, name, **params)
+    return make_index
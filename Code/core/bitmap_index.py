@@ -0,0 +1,277 @@
+"""
+Bitmap Index - FYP Version
+Inverted index from every dimension value to the rows holding it, stored
+as NumPy packed bitmaps (1 bit per row, 3.7 KB per value for 30k rows).
+Built once at load for the sales and HR dimensions (including YearMonth).
+Filters are bitmap ops instead of boolean-mask scans:
+    idx.eq('State', 'Selangor') & ~idx.eq('Channel', 'Delivery')
+    idx.where({'state': 'Selangor', 'month': '2024-06'})
+and aggregations run with NumPy over the selected positions.
+"""
+from typing import Dict, Iterable, Optional, Union
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+# Filter keyword -> column (extract_sales_filters / QueryIntent / ground-truth context names)
+FILTER_COLUMNS = {
+    'state': 'State',
+    'branch': 'Branch',
+    'product': 'Product',
+    'employee': 'Employee',
+    'channel': 'Channel',
+    'department': 'Department',
+    'job_role': 'JobRole',
+}
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def as_period(value) -> pd.Period:
+    """pd.Period, int 202406 or "2024-06" -> monthly Period."""
+    if isinstance(value, pd.Period):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return pd.Period(f"{value // 100:04d}-{value % 100:02d}", freq='M')
+    return pd.Period(str(value), freq='M')
+
+
+class Bitmap:
+    """Packed row set supporting & | ^ ~ (all operands must cover the same rows)."""
+
+    __slots__ = ("bits", "size")
+
+    def __init__(self, bits: np.ndarray, size: int):
+        self.bits = bits
+        self.size = size
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> "Bitmap":
+        return cls(np.packbits(mask), len(mask))
+
+    @classmethod
+    def full(cls, size: int) -> "Bitmap":
+        return ~cls.empty(size)
+
+    @classmethod
+    def empty(cls, size: int) -> "Bitmap":
+        return cls(np.zeros((size + 7) // 8, dtype=np.uint8), size)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits & other.bits, self.size)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits | other.bits, self.size)
+
+    def __xor__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits ^ other.bits, self.size)
+
+    def __invert__(self) -> "Bitmap":
+        bits = ~self.bits
+        if self.size % 8:
+            bits[-1] &= (0xFF << (8 - self.size % 8)) & 0xFF  # keep padding bits clear
+        return Bitmap(bits, self.size)
+
+    def count(self) -> int:
+        return int(_POPCOUNT[self.bits].sum(dtype=np.int64))
+
+    def mask(self) -> np.ndarray:
+        return np.unpackbits(self.bits, count=self.size).view(bool)
+
+    def positions(self) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.size)).astype(np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+Selection = Union[Bitmap, np.ndarray]
+
+
+class BitmapIndex:
+    """Per-value bitmaps over the dimension columns of one DataFrame."""
+
+    def __init__(self, df: pd.DataFrame, columns: Iterable[str], label: str = ""):
+        """
+        Args:
+            df: Loaded frame (categorical or plain dimension columns)
+            columns: Columns to index (missing ones are skipped)
+            label: Name used in the printed build report
+        """
+        start = time.perf_counter()
+        self.size = len(df)
+        self._df = df
+        self._codes: Dict[str, np.ndarray] = {}   # column -> int codes (-1 = NaN)
+        self._values: Dict[str, pd.Index] = {}    # column -> distinct values, code order
+        self._bitmaps: Dict[str, list] = {}       # column -> Bitmap per code
+        self._measures: Dict[str, np.ndarray] = {}
+        for col in columns:
+            if col in df.columns:
+                self._add(col, df[col])
+        self.build_ms = (time.perf_counter() - start) * 1000
+        if label:
+            stats = self.get_stats()
+            print(f"✅ {label} bitmap index: {stats['bitmaps']} values over {stats['columns']} cols, "
+                  f"{stats['bytes'] / 1024:.0f} KB ({self.build_ms:.0f} ms)")
+
+    def _add(self, col: str, series: pd.Series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, values = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, values = pd.factorize(series, sort=True)
+        self._codes[col] = codes
+        self._values[col] = pd.Index(values)
+        self._bitmaps[col] = [Bitmap.from_mask(codes == i) for i in range(len(values))]
+
+    def __contains__(self, col: str) -> bool:
+        return col in self._bitmaps
+
+    def codes(self, col: str) -> np.ndarray:
+        """Per-row value codes of an indexed column (-1 = NaN)."""
+        return self._codes[col]
+
+    def values(self, col: str) -> pd.Index:
+        """Distinct values of an indexed column, in code order."""
+        return self._values[col]
+
+    def code_of(self, col: str, value) -> int:
+        """Code of value in col (-1 if it never occurs)."""
+        values = self._values[col]
+        if isinstance(values, pd.PeriodIndex):
+            value = as_period(value)
+        return int(values.get_indexer([value])[0])
+
+    # ---- leaf bitmaps ----
+    def all(self) -> Bitmap:
+        return Bitmap.full(self.size)
+
+    def none(self) -> Bitmap:
+        return Bitmap.empty(self.size)
+
+    def _union(self, col: str, codes: Iterable[int]) -> Bitmap:
+        result = None
+        for code in codes:
+            bm = self._bitmaps[col][code]
+            result = bm if result is None else result | bm
+        return result if result is not None else self.none()
+
+    def eq(self, col: str, value, ignore_case: bool = False) -> Bitmap:
+        """Rows where col == value (empty if the value never occurs)."""
+        if ignore_case:
+            target = str(value).lower()
+            return self._union(col, [i for i, v in enumerate(self._values[col]) if str(v).lower() == target])
+        code = self.code_of(col, value)
+        return self._bitmaps[col][code] if code >= 0 else self.none()
+
+    def isin(self, col: str, values: Iterable) -> Bitmap:
+        """Rows where col is any of values (OR of their bitmaps)."""
+        result = self.none()
+        for value in values:
+            result = result | self.eq(col, value)
+        return result
+
+    def contains(self, col: str, pattern: str, case: bool = False) -> Bitmap:
+        """Rows where col matches regex pattern (str.contains on the dictionary only)."""
+        regex = re.compile(pattern, 0 if case else re.IGNORECASE)
+        return self._union(col, [i for i, v in enumerate(self._values[col]) if regex.search(str(v))])
+
+    def between(self, col: str, lo=None, hi=None) -> Bitmap:
+        """Rows where lo <= col <= hi (either side may be open)."""
+        values = self._values[col]
+        if isinstance(values, pd.PeriodIndex):
+            lo = as_period(lo) if lo is not None else None
+            hi = as_period(hi) if hi is not None else None
+        return self._union(col, [i for i, v in enumerate(values)
+                                 if (lo is None or v >= lo) and (hi is None or v <= hi)])
+
+    # ---- filter dicts ----
+    def where(self, filters: Dict) -> Bitmap:
+        """
+        AND of the filters in an executor-style dict.
+
+        Keys: state / branch / product / employee / channel / department /
+        job_role (list values = OR), month (Period, 202406 or "2024-06"),
+        month_range ((start, end)). Empty values and keys whose column is
+        not indexed are ignored.
+        """
+        result = None
+        for key, value in (filters or {}).items():
+            bm = self._filter_bitmap(key, value)
+            if bm is not None:
+                result = bm if result is None else result & bm
+        return result if result is not None else self.all()
+
+    def _filter_bitmap(self, key: str, value) -> Optional[Bitmap]:
+        if not value:
+            return None
+        if key == 'month_range':
+            return self.between('YearMonth', *value) if 'YearMonth' in self else None
+        if key == 'month':
+            if 'YearMonth' in self:
+                try:
+                    return self.eq('YearMonth', value)
+                except Exception:
+                    date_str = str(value).replace('-', '')
+                    if len(date_str) == 6:  # 202406
+                        date_str = f"{date_str[:4]}-{date_str[4:]}"  # 2024-06
+            else:
+                date_str = value.strftime('%Y-%m') if hasattr(value, 'to_timestamp') else str(value)
+            return self.contains('DateStr', date_str, case=True) if 'DateStr' in self else None
+        col = FILTER_COLUMNS.get(key)
+        if col not in self:
+            return None
+        if isinstance(value, (list, tuple, set)):
+            return self.isin(col, value)
+        return self.eq(col, value)
+
+    # ---- aggregations ----
+    @staticmethod
+    def _positions(sel: Selection) -> np.ndarray:
+        return sel.positions() if isinstance(sel, Bitmap) else sel
+
+    def measure(self, col: str) -> np.ndarray:
+        """Numeric column as float64, converted once."""
+        values = self._measures.get(col)
+        if values is None:
+            values = pd.to_numeric(self._df[col], errors='coerce').to_numpy(dtype=float)
+            self._measures[col] = values
+        return values
+
+    def count(self, sel: Selection) -> int:
+        return sel.count() if isinstance(sel, Bitmap) else len(sel)
+
+    def sum(self, sel: Selection, col: str) -> float:
+        """NaN skipped, like pandas .sum()."""
+        return float(np.nansum(self.measure(col)[self._positions(sel)]))
+
+    def mean(self, sel: Selection, col: str) -> float:
+        """NaN skipped, like pandas .mean(); 0 for an empty selection."""
+        values = self.measure(col)[self._positions(sel)]
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if len(values) else 0.0
+
+    def group_sum(self, sel: Selection, by: str, col: str) -> pd.Series:
+        """SUM(col) GROUP BY by over the selection, largest first (groups with rows only)."""
+        pos = self._positions(sel)
+        codes = self._codes[by][pos]
+        keep = codes >= 0
+        codes = codes[keep]
+        n = len(self._values[by])
+        sums = np.bincount(codes, weights=np.nan_to_num(self.measure(col)[pos][keep]), minlength=n)
+        present = np.bincount(codes, minlength=n) > 0
+        grp = pd.Series(sums[present], index=self._values[by][present], name=col).rename_axis(by)
+        return grp.sort_values(ascending=False)
+
+    def get_stats(self) -> Dict:
+        """Index size statistics for thesis metrics."""
+        bitmaps = sum(len(b) for b in self._bitmaps.values())
+        return {
+            'rows': self.size,
+            'columns': len(self._bitmaps),
+            'bitmaps': bitmaps,
+            'bytes': bitmaps * ((self.size + 7) // 8),
+            'build_ms': round(self.build_ms, 2),
+        }
@@ -0,0 +1,246 @@
+"""
+Cache Engine - FYP Version
+Bounded, size-aware replacement for SimpleCache.
+SimpleCache is an unbounded dict that only expires entries on get(), so
+get_cached_sales_subset() (one DataFrame per filter combination) grows
+without limit in a long-running bot. CacheEngine adds:
+  - LRU or LFU eviction
+  - a memory budget (DataFrame sizes via memory_usage(deep=True))
+    and an optional entry limit
+  - TTL expiry on get() plus a background sweep
+  - one lock around every operation (Gradio workers share the cache)
+  - namespaces with their own hit / miss / eviction counters
+get / set / get_stats / invalidate / clear keep SimpleCache's signatures
+and stats keys, so it is a drop-in.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_NAMESPACE = "default"
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "created", "hits")
+
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.size = size
+        self.created = time.time()
+        self.hits = 0
+
+
+class _NamespaceStats:
+    __slots__ = ("hits", "misses", "entries", "bytes", "evictions", "expirations")
+
+    def __init__(self):
+        self.hits = self.misses = self.entries = self.bytes = 0
+        self.evictions = self.expirations = 0
+
+
+class CacheEngine:
+    """Thread-safe LRU/LFU cache with TTL, byte budget and namespaces."""
+
+    def __init__(self, ttl_seconds: int = 3600, max_bytes: Optional[int] = 256 * 1024 * 1024,
+                 max_entries: Optional[int] = None, policy: str = "lru",
+                 sweep_interval: float = 60.0):
+        """
+        Args:
+            ttl_seconds: Time-to-live for cache entries (default: 1 hour)
+            max_bytes: Memory budget across all namespaces (None = unbounded)
+            max_entries: Entry limit across all namespaces (None = unbounded)
+            policy: "lru" (least recently used) or "lfu" (least frequently used)
+            sweep_interval: Seconds between background TTL sweeps (0 = only on get)
+        """
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown cache policy: {policy} (use 'lru' or 'lfu')")
+        self._ttl = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.policy = policy
+        # (namespace, key) -> entry, least recently used first
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._ns: Dict[str, _NamespaceStats] = {}
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+        self.sweeps = 0
+
+        self._stop = threading.Event()
+        if sweep_interval and sweep_interval > 0:
+            self.sweep_interval = sweep_interval
+            threading.Thread(target=self._sweep_loop, name="cache-sweep", daemon=True).start()
+
+    def _stats(self, namespace: str) -> _NamespaceStats:
+        stats = self._ns.get(namespace)
+        if stats is None:
+            stats = self._ns[namespace] = _NamespaceStats()
+        return stats
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self._ttl is not None and now - entry.created > self._ttl
+
+    def _remove(self, k: tuple) -> _Entry:
+        entry = self._entries.pop(k)
+        self._bytes -= entry.size
+        stats = self._stats(k[0])
+        stats.entries -= 1
+        stats.bytes -= entry.size
+        return entry
+
+    # ---- SimpleCache API ----
+    def get(self, key: str, namespace: str = DEFAULT_NAMESPACE) -> Optional[Any]:
+        """Get value from cache if exists and not expired."""
+        k = (namespace, key)
+        with self._lock:
+            stats = self._stats(namespace)
+            entry = self._entries.get(k)
+            if entry is not None and self._expired(entry, time.time()):
+                self._remove(k)
+                self.expirations += 1
+                stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                stats.misses += 1
+                return None
+            entry.hits += 1
+            self._entries.move_to_end(k)
+            self._hits += 1
+            stats.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, namespace: str = DEFAULT_NAMESPACE) -> bool:
+        """Store value, evicting by policy until it fits. False if it exceeds the whole budget."""
+        size = estimate_size(value)
+        k = (namespace, key)
+        with self._lock:
+            if k in self._entries:
+                self._remove(k)  # a rejected value must not leave the stale one readable
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejected += 1
+                return False
+            self._make_room(size)
+            self._entries[k] = _Entry(value, size)
+            self._bytes += size
+            stats = self._stats(namespace)
+            stats.entries += 1
+            stats.bytes += size
+        return True
+
+    def invalidate(self, key: str, namespace: str = DEFAULT_NAMESPACE):
+        """Invalidate specific cache entry."""
+        with self._lock:
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key))
+                print(f"🔄 Cache invalidated: {key}")
+
+    def clear(self, namespace: Optional[str] = None):
+        """Clear all cache entries (or only one namespace)."""
+        with self._lock:
+            for k in [k for k in self._entries if namespace is None or k[0] == namespace]:
+                self._remove(k)
+        print(f"🗑️ Cache cleared. Stats: {self._hits} hits, {self._misses} misses")
+
+    # ---- eviction ----
+    def _over_budget(self, incoming: int) -> bool:
+        if self.max_bytes is not None and self._bytes + incoming > self.max_bytes:
+            return True
+        return self.max_entries is not None and len(self._entries) + 1 > self.max_entries
+
+    def _victim(self) -> tuple:
+        if self.policy == "lru":
+            return next(iter(self._entries))
+        # LFU: fewest hits, ties broken by least recent use (iteration order)
+        return min(self._entries, key=lambda k: self._entries[k].hits)
+
+    def _make_room(self, incoming: int):
+        while self._entries and self._over_budget(incoming):
+            k = self._victim()
+            self._remove(k)
+            self.evictions += 1
+            self._stats(k[0]).evictions += 1
+
+    # ---- TTL sweep ----
+    def sweep(self) -> int:
+        """Drop every expired entry now. Returns how many were removed."""
+        if self._ttl is None:
+            return 0
+        now = time.time()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if self._expired(e, now)]
+            for k in expired:
+                self._remove(k)
+                self._stats(k[0]).expirations += 1
+            self.expirations += len(expired)
+            self.sweeps += 1
+        return len(expired)
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.sweep_interval):
+            self.sweep()
+
+    def close(self):
+        """Stop the background sweeper."""
+        self._stop.set()
+
+    # ---- metrics ----
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for thesis metrics (SimpleCache keys + budget / eviction / namespaces)."""
+        with self._lock:
+            total = self._hits + self._misses
+            hit_rate = (self._hits / total * 100) if total > 0 else 0
+            namespaces = {}
+            for name, s in self._ns.items():
+                ns_total = s.hits + s.misses
+                namespaces[name] = {
+                    'hits': s.hits,
+                    'misses': s.misses,
+                    'hit_rate_percent': round(s.hits / ns_total * 100, 2) if ns_total else 0,
+                    'entries': s.entries,
+                    'bytes': s.bytes,
+                    'evictions': s.evictions,
+                    'expirations': s.expirations,
+                }
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'total_requests': total,
+                'hit_rate_percent': round(hit_rate, 2),
+                'cache_size': len(self._entries),
+                'ttl_seconds': self._ttl,
+                'policy': self.policy,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'rejected': self.rejected,
+                'namespaces': namespaces,
+            }
@@ -0,0 +1,291 @@
+"""
+Chat Store - FYP Version
+Single-file SQLite store for chat threads (replaces storage/chats/*.json).
+  - chats: one row per thread (title, starred, timestamps, message count),
+    so the sidebar lists a page of chats without reading any messages
+  - messages / traces: one row per message / tool trace; save_chat()
+    only inserts what is new instead of rewriting the whole thread
+  - messages_fts: FTS5 index over message content for search
+    (falls back to LIKE if this SQLite build has no FTS5)
+load_chat() returns the same dict as the old JSON files, and
+import_json_dir() migrates the existing files.
+"""
+from typing import Dict, List, Optional
+import glob
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chats (
+    chat_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    starred INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    trace_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS chats_updated ON chats(updated_at DESC);
+CREATE TABLE IF NOT EXISTS messages (
+    chat_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT,
+    content TEXT,
+    timestamp TEXT,
+    extra TEXT,
+    PRIMARY KEY (chat_id, seq)
+);
+CREATE TABLE IF NOT EXISTS traces (
+    chat_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp TEXT,
+    trace_html TEXT,
+    extra TEXT,
+    PRIMARY KEY (chat_id, seq)
+);
+"""
+
+_MESSAGE_KEYS = ("role", "content", "timestamp")
+_TRACE_KEYS = ("timestamp", "trace_html")
+
+
+def _split(item: Dict, keys) -> tuple:
+    """Known keys as columns, anything else as a JSON blob."""
+    extra = {k: v for k, v in item.items() if k not in keys}
+    return tuple(item.get(k) for k in keys) + (json.dumps(extra, ensure_ascii=False) if extra else None,)
+
+
+def _join(row, keys) -> Dict:
+    item = {k: v for k, v in zip(keys, row) if v is not None}
+    if row[-1]:
+        item.update(json.loads(row[-1]))
+    return item
+
+
+def fts_query(text: str) -> str:
+    """User text -> FTS5 query: every word as a quoted prefix term."""
+    words = [w.replace('"', '') for w in (text or "").split()]
+    return " ".join(f'"{w}"*' for w in words if w)
+
+
+class ChatStore:
+    """Chat threads in one SQLite file, with incremental saves and FTS search."""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite file (created with its schema if missing)
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # One connection shared by the UI worker threads (guarded by _lock)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+                "content, chat_id UNINDEXED, seq UNINDEXED, tokenize='unicode61')")
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self._conn.commit()
+
+    # ---- listing ----
+    def list_chats(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Chat summaries, most recently updated first (no messages are read)."""
+        sql = ("SELECT chat_id, title, created_at, updated_at, starred, message_count "
+               "FROM chats ORDER BY updated_at DESC")
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = (limit, offset)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._summary(r) for r in rows]
+
+    @staticmethod
+    def _summary(row) -> Dict:
+        return {"chat_id": row[0], "title": row[1], "created_at": row[2], "updated_at": row[3],
+                "starred": bool(row[4]), "message_count": row[5]}
+
+    def count_chats(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chats").fetchone()[0]
+
+    # ---- one chat ----
+    def load_chat(self, chat_id: str) -> Optional[Dict]:
+        """Full thread in the old JSON layout, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chat_id, title, created_at, updated_at, starred FROM chats WHERE chat_id = ?",
+                (chat_id,)).fetchone()
+            if row is None:
+                return None
+            messages = self._conn.execute(
+                "SELECT role, content, timestamp, extra FROM messages WHERE chat_id = ? ORDER BY seq",
+                (chat_id,)).fetchall()
+            traces = self._conn.execute(
+                "SELECT timestamp, trace_html, extra FROM traces WHERE chat_id = ? ORDER BY seq",
+                (chat_id,)).fetchall()
+        return {
+            "chat_id": row[0], "title": row[1], "starred": bool(row[4]),
+            "created_at": row[2], "updated_at": row[3],
+            "messages": [_join(m, _MESSAGE_KEYS) for m in messages],
+            "tool_traces": [_join(t, _TRACE_KEYS) for t in traces],
+        }
+
+    def get_title(self, chat_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT title FROM chats WHERE chat_id = ?", (chat_id,)).fetchone()
+        return row[0] if row else None
+
+    def save_chat(self, chat_id: str, title: str, messages: list, tool_traces: list,
+                  starred: Optional[bool] = None, created_at: Optional[str] = None,
+                  updated_at: Optional[str] = None):
+        """
+        Upsert a thread. Messages/traces already stored are kept and only
+        the new tail is inserted; if the stored tail no longer matches
+        (e.g. a regenerated answer) the list is rewritten from there.
+
+        Args:
+            starred: None keeps the stored flag
+            created_at / updated_at: Override timestamps (migration)
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT created_at, starred, message_count, trace_count FROM chats WHERE chat_id = ?",
+                (chat_id,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO chats (chat_id, title, starred, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (chat_id, title, int(bool(starred)), created_at or now, updated_at or now))
+                stored_messages = stored_traces = 0
+            else:
+                stored_messages, stored_traces = row[2], row[3]
+                self._conn.execute(
+                    "UPDATE chats SET title = ?, starred = ?, updated_at = ? WHERE chat_id = ?",
+                    (title, row[1] if starred is None else int(bool(starred)), updated_at or now, chat_id))
+
+            start = self._common_prefix("messages", chat_id, messages, stored_messages, _MESSAGE_KEYS)
+            self._truncate("messages", chat_id, start, stored_messages)
+            rows = [(chat_id, seq) + _split(m, _MESSAGE_KEYS) for seq, m in enumerate(messages[start:], start)]
+            self._conn.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if self.fts:
+                self._conn.executemany("INSERT INTO messages_fts (content, chat_id, seq) VALUES (?, ?, ?)",
+                                       [(r[3] or "", chat_id, r[1]) for r in rows])
+
+            tstart = self._common_prefix("traces", chat_id, tool_traces, stored_traces, _TRACE_KEYS)
+            self._truncate("traces", chat_id, tstart, stored_traces)
+            self._conn.executemany("INSERT INTO traces VALUES (?, ?, ?, ?, ?)",
+                                   [(chat_id, seq) + _split(t, _TRACE_KEYS)
+                                    for seq, t in enumerate(tool_traces[tstart:], tstart)])
+
+            self._conn.execute("UPDATE chats SET message_count = ?, trace_count = ? WHERE chat_id = ?",
+                               (len(messages), len(tool_traces), chat_id))
+
+    def _common_prefix(self, table: str, chat_id: str, items: list, stored: int, keys) -> int:
+        """Number of stored rows that can be kept (checks the last kept row only)."""
+        keep = min(stored, len(items))
+        while keep:
+            row = self._conn.execute(
+                f"SELECT {', '.join(keys)}, extra FROM {table} WHERE chat_id = ? AND seq = ?",
+                (chat_id, keep - 1)).fetchone()
+            if row is not None and _join(row, keys) == items[keep - 1]:
+                return keep
+            keep -= 1
+        return 0
+
+    def _truncate(self, table: str, chat_id: str, start: int, stored: int):
+        if start >= stored:
+            return
+        self._conn.execute(f"DELETE FROM {table} WHERE chat_id = ? AND seq >= ?", (chat_id, start))
+        if table == "messages" and self.fts:
+            self._conn.execute("DELETE FROM messages_fts WHERE chat_id = ? AND seq >= ?", (chat_id, start))
+
+    def rename_chat(self, chat_id: str, title: str):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE chats SET title = ?, updated_at = ? WHERE chat_id = ?",
+                               (title, datetime.now().isoformat(), chat_id))
+
+    def set_starred(self, chat_id: str, starred: bool):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE chats SET starred = ? WHERE chat_id = ?", (int(starred), chat_id))
+
+    def toggle_star(self, chat_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE chats SET starred = 1 - starred WHERE chat_id = ?", (chat_id,))
+
+    def delete_chat(self, chat_id: str):
+        with self._lock, self._conn:
+            for table in ("messages", "traces", "chats"):
+                self._conn.execute(f"DELETE FROM {table} WHERE chat_id = ?", (chat_id,))
+            if self.fts:
+                self._conn.execute("DELETE FROM messages_fts WHERE chat_id = ?", (chat_id,))
+
+    # ---- search ----
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Chats whose title contains the query or whose messages match it
+        (FTS: every word as a prefix term), most recently updated first.
+        Message matches start at word boundaries: "sal" finds "sales",
+        "ales" does not (the LIKE fallback without FTS5 is substring).
+        """
+        query = (query or "").strip()
+        if not query:
+            return []
+        like = f"%{query.lower()}%"
+        with self._lock:
+            ids = {r[0] for r in self._conn.execute(
+                "SELECT chat_id FROM chats WHERE lower(title) LIKE ?", (like,))}
+            match = fts_query(query)
+            if self.fts and match:
+                ids |= {r[0] for r in self._conn.execute(
+                    "SELECT DISTINCT chat_id FROM messages_fts WHERE messages_fts MATCH ?", (match,))}
+            else:
+                ids |= {r[0] for r in self._conn.execute(
+                    "SELECT DISTINCT chat_id FROM messages WHERE lower(content) LIKE ?", (like,))}
+            if not ids:
+                return []
+            marks = ",".join("?" * len(ids))
+            rows = self._conn.execute(
+                "SELECT chat_id, title, created_at, updated_at, starred, message_count FROM chats "
+                f"WHERE chat_id IN ({marks}) ORDER BY updated_at DESC LIMIT ?", (*ids, limit)).fetchall()
+        return [self._summary(r) for r in rows]
+
+    # ---- migration ----
+    def import_json_dir(self, chats_dir: str, overwrite: bool = False) -> Dict:
+        """
+        Import storage/chats/*.json (one file per chat).
+
+        Returns:
+            {'imported': n, 'skipped': n, 'failed': [file names]}
+        """
+        stats = {"imported": 0, "skipped": 0, "failed": []}
+        for path in sorted(glob.glob(os.path.join(chats_dir, "*.json"))):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                chat_id = data.get("chat_id") or os.path.basename(path)[:-5]
+                if not overwrite and self.get_title(chat_id) is not None:
+                    stats["skipped"] += 1
+                    continue
+                if overwrite:
+                    self.delete_chat(chat_id)
+                self.save_chat(chat_id, data.get("title", "Untitled"), data.get("messages", []),
+                               data.get("tool_traces", []), starred=data.get("starred", False),
+                               created_at=data.get("created_at"), updated_at=data.get("updated_at"))
+                stats["imported"] += 1
+            except (OSError, ValueError, TypeError, AttributeError, sqlite3.Error):
+                stats["failed"].append(os.path.basename(path))
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,128 @@
+"""
+Columnar Store - FYP Version
+Dictionary-encodes the dimension columns of df_sales / df_hr as pandas
+categoricals (int codes + one shared dictionary per column).
+Equality filters then compare small integer codes instead of strings.
+"""
+from typing import Dict, Iterable, List, Tuple
+import re
+
+import numpy as np
+import pandas as pd
+
+# Dimension columns (everything that is filtered or grouped on, never summed)
+SALES_DIMENSIONS = [
+    'State', 'City', 'Branch', 'Region', 'Product',
+    'Employee', 'Channel', 'PaymentMethod',
+]
+HR_DIMENSIONS = [
+    'State', 'City', 'Branch', 'Department', 'JobRole', 'AgeGroup',
+    'Gender', 'MaritalStatus', 'OverTime', 'BusinessTravel', 'Attrition',
+]
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    """Deep memory usage of a DataFrame in MB."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def encode_dimensions(df: pd.DataFrame, columns: Iterable[str], label: str = "") -> Dict[str, float]:
+    """
+    Convert dimension columns to categoricals in place.
+
+    Args:
+        df: DataFrame loaded from CSV
+        columns: Candidate dimension columns (missing ones are skipped)
+        label: Name used in the printed memory report
+
+    Returns:
+        Memory report with before_mb, after_mb, saved_percent and columns
+    """
+    before = memory_mb(df)
+    encoded = []
+    for col in columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+            encoded.append(col)
+    after = memory_mb(df)
+
+    report = {
+        'before_mb': round(float(before), 2),
+        'after_mb': round(float(after), 2),
+        'saved_percent': round(float(1 - after / before) * 100, 1) if before > 0 else 0.0,
+        'columns': encoded,
+    }
+    if label:
+        print(f"✅ {label} dimensions encoded ({len(encoded)} cols): "
+              f"{report['before_mb']:.2f} MB → {report['after_mb']:.2f} MB "
+              f"(-{report['saved_percent']}%)")
+    return report
+
+
+def code_of(series: pd.Series, value) -> int:
+    """Integer code of value in a categorical column (-1 if absent)."""
+    return int(series.cat.categories.get_indexer([value])[0])
+
+
+def code_mask(series: pd.Series, value, ignore_case: bool = False) -> np.ndarray:
+    """
+    Boolean mask for series == value.
+
+    Categorical columns compare int codes; the string compare is done once
+    against the (tiny) dictionary. Plain columns fall back to ==.
+
+    Args:
+        series: Column to filter
+        value: Value to match
+        ignore_case: Match value case-insensitively (e.g. Attrition 'yes')
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        if ignore_case:
+            return (series.astype(str).str.lower() == str(value).lower()).to_numpy()
+        return series.to_numpy() == value
+
+    codes = series.cat.codes.to_numpy()
+    if not ignore_case:
+        code = code_of(series, value)
+        if code < 0:
+            return np.zeros(len(series), dtype=bool)
+        return codes == code
+
+    target = str(value).lower()
+    matching = [i for i, c in enumerate(series.cat.categories) if str(c).lower() == target]
+    return np.isin(codes, matching)
+
+
+def code_contains(series: pd.Series, pattern: str, case: bool = False) -> np.ndarray:
+    """
+    Boolean mask for series.str.contains(pattern) (regex, NaN -> False).
+
+    Categorical columns evaluate the regex on the dictionary only.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(str).str.contains(pattern, case=case, na=False).to_numpy()
+
+    regex = re.compile(pattern, 0 if case else re.IGNORECASE)
+    matching = [i for i, c in enumerate(series.cat.categories) if regex.search(str(c))]
+    return np.isin(series.cat.codes.to_numpy(), matching)
+
+
+def dimension_vocabulary(series: pd.Series, longest_first: bool = False) -> List[Tuple[str, str]]:
+    """
+    (lowercase, value) pairs for matching dimension values in query text.
+
+    Built once from the column dictionary so extract_sales_filters does not
+    re-sort or re-lowercase entity lists on every call.
+
+    Args:
+        series: Dimension column
+        longest_first: Order by length (longest match wins, e.g. branches)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = [v for v in series.cat.categories.tolist() if pd.notna(v)]
+    else:
+        values = series.dropna().unique().tolist()
+    values = sorted(values)
+    if longest_first:
+        values = sorted(values, key=len, reverse=True)
+    return [(str(v).lower(), v) for v in values]
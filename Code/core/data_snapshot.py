@@ -0,0 +1,268 @@
+"""
+Data Snapshot - FYP Version
+Typed, column-oriented snapshot of the prepared sales/HR DataFrames.
+One .npy file per column (memory-mapped on load) plus a manifest.json.
+Derived columns (Date, DateStr, YearMonth, numeric coercion, encoded
+dimensions) are stored already computed, so startup skips CSV parsing.
+The snapshot is rebuilt automatically when the source CSV changes
+(mtime/size fast check, SHA-256 to confirm).
+"""
+from typing import Callable, Dict, List, Optional
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .columnar_store import SALES_DIMENSIONS, HR_DIMENSIONS, encode_dimensions
+
+# Bump when the on-disk layout or prepare_*_frame logic changes
+SNAPSHOT_VERSION = 1
+PREPARE_VERSION = 1
+
+MANIFEST = "manifest.json"
+
+
+# =========================
+# Frame preparation (shared by all launchers)
+# =========================
+def prepare_sales_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Derived columns + dimension encoding for MY_Retail_Sales CSV."""
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["DateStr"] = df["Date"].dt.strftime("%Y-%m-%d")
+    df["YearMonth"] = df["Date"].dt.to_period("M")
+
+    for c in ["Quantity", "Unit Price", "Total Sale"]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    # Dictionary-encode dimension columns: filters compare int codes, not strings
+    encode_dimensions(df, SALES_DIMENSIONS, "Sales")
+    return df
+
+
+def prepare_hr_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Dimension encoding for MY_Retail_HR CSV."""
+    encode_dimensions(df, HR_DIMENSIONS, "HR")
+    return df
+
+
+# =========================
+# Startup timing
+# =========================
+class StartupTimer:
+    """Collects per-stage startup timings for the console breakdown."""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._last = self._start
+        self.stages: List[Dict] = []
+
+    def lap(self, name: str) -> float:
+        """Record time since the previous lap as stage `name` (ms)."""
+        now = time.perf_counter()
+        ms = (now - self._last) * 1000
+        self.stages.append({'stage': name, 'ms': ms})
+        self._last = now
+        return ms
+
+    def report(self, title: str = "Startup timing") -> Dict[str, float]:
+        """Print stage breakdown and return {stage: ms, 'total': ms}."""
+        total = (time.perf_counter() - self._start) * 1000
+        print("\n" + "=" * 60)
+        print(f"⏱️ {title}")
+        print("=" * 60)
+        for s in self.stages:
+            print(f"  {s['stage']:<34}{s['ms']:>10.1f} ms")
+        print("-" * 60)
+        print(f"  {'Total (since timer start)':<34}{total:>10.1f} ms")
+        print("=" * 60 + "\n")
+
+        result = {s['stage']: round(s['ms'], 1) for s in self.stages}
+        result['total'] = round(total, 1)
+        return result
+
+
+# =========================
+# Source fingerprint
+# =========================
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file (streamed)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_stat(path: str) -> Dict:
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime': st.st_mtime}
+
+
+# =========================
+# Column (de)serialisation
+# =========================
+def _save_column(series: pd.Series, snap_dir: str, idx: int) -> Dict:
+    """Write one column; returns its manifest entry."""
+    meta = {'name': series.name, 'dtype': str(series.dtype), 'file': f"c{idx}.npy"}
+    path = os.path.join(snap_dir, meta['file'])
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        meta['kind'] = 'category'
+        meta['categories'] = series.cat.categories.tolist()
+        np.save(path, series.cat.codes.to_numpy())
+    elif isinstance(series.dtype, pd.PeriodDtype):
+        meta['kind'] = 'period'
+        np.save(path, series.array.asi8)
+    elif series.dtype.kind in "biufcmM":
+        meta['kind'] = 'numpy'
+        np.save(path, series.to_numpy())
+    else:
+        # Strings / objects: dictionary-encode so the column stays numeric on disk
+        meta['kind'] = 'dict'
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        meta['dict_file'] = f"c{idx}.dict.json"
+        with open(os.path.join(snap_dir, meta['dict_file']), "w", encoding="utf-8") as f:
+            json.dump([str(u) for u in uniques], f, ensure_ascii=False)
+        np.save(path, codes.astype(np.int32))
+    return meta
+
+
+def _load_column(meta: Dict, snap_dir: str, mmap: bool):
+    arr = np.load(os.path.join(snap_dir, meta['file']), mmap_mode="c" if mmap else None)
+    arr = arr.view(np.ndarray)  # plain ndarray view over the mapped file (no copy)
+    kind = meta['kind']
+
+    if kind == 'category':
+        return pd.Categorical.from_codes(arr, categories=meta['categories'])
+    if kind == 'period':
+        return pd.arrays.PeriodArray(arr, dtype=pd.api.types.pandas_dtype(meta['dtype']))
+    if kind == 'numpy':
+        return arr
+
+    with open(os.path.join(snap_dir, meta['dict_file']), encoding="utf-8") as f:
+        uniques = np.array(json.load(f), dtype=object)
+    values = np.empty(len(arr), dtype=object)
+    valid = arr >= 0
+    values[valid] = uniques[arr[valid]]
+    values[~valid] = np.nan
+    return pd.array(values, dtype=meta['dtype']) if meta['dtype'] != 'object' else values
+
+
+def save_snapshot(df: pd.DataFrame, snap_dir: str, source: Dict):
+    """Write df as a column snapshot (manifest written last = commit)."""
+    if os.path.isdir(snap_dir):
+        shutil.rmtree(snap_dir)
+    os.makedirs(snap_dir, exist_ok=True)
+
+    columns = [_save_column(df[col], snap_dir, i) for i, col in enumerate(df.columns)]
+    manifest = {
+        'snapshot_version': SNAPSHOT_VERSION,
+        'prepare_version': PREPARE_VERSION,
+        'pandas_version': pd.__version__,
+        'rows': len(df),
+        'source': source,
+        'columns': columns,
+        'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(snap_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def load_snapshot(snap_dir: str, mmap: bool = True) -> pd.DataFrame:
+    """Load a snapshot written by save_snapshot()."""
+    with open(os.path.join(snap_dir, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    data = {c['name']: _load_column(c, snap_dir, mmap) for c in manifest['columns']}
+    return pd.DataFrame(data, copy=False)
+
+
+def _read_manifest(snap_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(snap_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_is_fresh(snap_dir: str, csv_path: str) -> bool:
+    """
+    Check snapshot against the source CSV.
+
+    mtime + size unchanged -> fresh without hashing. Otherwise the CSV is
+    hashed; an identical hash (e.g. file copied/touched) refreshes the
+    recorded mtime and keeps the snapshot.
+    """
+    manifest = _read_manifest(snap_dir)
+    if not manifest:
+        return False
+    if (manifest.get('snapshot_version') != SNAPSHOT_VERSION
+            or manifest.get('prepare_version') != PREPARE_VERSION
+            or manifest.get('pandas_version') != pd.__version__):
+        return False
+
+    recorded = manifest.get('source')
+    if not isinstance(recorded, dict) or not {'size', 'mtime', 'sha256'} <= recorded.keys():
+        return False
+    current = _source_stat(csv_path)
+    if recorded['size'] == current['size'] and recorded['mtime'] == current['mtime']:
+        return True
+    if recorded['size'] != current['size'] or recorded['sha256'] != file_sha256(csv_path):
+        return False
+
+    manifest['source'].update(current)
+    with open(os.path.join(snap_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return True
+
+
+def snapshot_fingerprint(csv_path: str, snapshot_dir: str) -> Optional[str]:
+    """
+    Version string of the current snapshot of csv_path (source SHA-256 +
+    prepare version), or None if there is no snapshot. Derived structures
+    (entity gazetteer, ground truth) compare it to know when to rebuild.
+    """
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    manifest = _read_manifest(os.path.join(snapshot_dir, name))
+    if not manifest or 'sha256' not in manifest.get('source', {}):
+        return None
+    return f"{manifest['source']['sha256'][:16]}-p{manifest.get('prepare_version')}"
+
+
+def load_csv_snapshot(csv_path: str, prepare: Callable[[pd.DataFrame], pd.DataFrame],
+                      snapshot_dir: str, mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a prepared DataFrame from its snapshot, rebuilding from CSV if stale.
+
+    Args:
+        csv_path: Source CSV (sales or HR)
+        prepare: Function adding derived columns / encodings (e.g. prepare_sales_frame)
+        snapshot_dir: Root folder for snapshots (one sub-folder per CSV)
+        mmap: Memory-map column files on load
+
+    Returns:
+        Prepared DataFrame
+    """
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    snap_dir = os.path.join(snapshot_dir, name)
+
+    if snapshot_is_fresh(snap_dir, csv_path):
+        try:
+            df = load_snapshot(snap_dir, mmap=mmap)
+            print(f"⚡ Snapshot loaded: {name} ({len(df):,} rows)")
+            return df
+        except Exception as e:
+            print(f"⚠️ Snapshot unreadable ({e}), rebuilding from CSV")
+
+    df = prepare(pd.read_csv(csv_path))
+    source = _source_stat(csv_path)
+    source['sha256'] = file_sha256(csv_path)
+    try:
+        save_snapshot(df, snap_dir, source)
+        print(f"💾 Snapshot saved: {name} ({len(df):,} rows)")
+    except Exception as e:
+        print(f"⚠️ Could not save snapshot for {name}: {e}")
+    return df
@@ -0,0 +1,131 @@
+"""
+Embedding Service - FYP Version
+One shared SentenceTransformer per model name for the whole process
+(retriever, routers, answer evaluator; weights come from the model
+registry), with a bounded LRU cache of normalised query vectors keyed
+by text.
+A query is embedded at most once however many components look at it.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+import importlib.util
+import threading
+
+import numpy as np
+
+from .model_registry import sentence_transformer
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+
+class EmbeddingService:
+    """Shared embedder with an LRU query-vector cache and hit/miss metrics."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, device: Optional[str] = None,
+                 cache_size: int = 2048):
+        """
+        Args:
+            model_name: SentenceTransformer model
+            device: "cuda" / "cpu" (None = cuda when available)
+            cache_size: Max query vectors kept (least recently used evicted)
+        """
+        self.model_name = model_name
+        self.device = device
+        self.cache_size = cache_size
+        self._model = None
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def model(self):
+        """The underlying SentenceTransformer (registry handle, loaded on first use)."""
+        if self._model is None:
+            self._model = sentence_transformer(self.model_name, self.device)
+        return self._model
+
+    def load(self) -> "EmbeddingService":
+        """Load the model now (startup) instead of on the first encode."""
+        _ = self.model
+        return self
+
+    def encode(self, texts, **kwargs) -> np.ndarray:
+        """
+        Uncached batch encoding (corpus chunks, domain examples).
+        Same arguments as SentenceTransformer.encode; returns numpy.
+        """
+        kwargs.setdefault('convert_to_numpy', True)
+        return self.model.encode(texts, **kwargs)
+
+    def encode_query(self, text: str) -> np.ndarray:
+        """
+        L2-normalised float32 vector for one query (LRU cached by text).
+
+        Returns a copy, so callers may modify it in place.
+        """
+        with self._lock:
+            vec = self._cache.get(text)
+            if vec is not None:
+                self._cache.move_to_end(text)
+                self._hits += 1
+                return vec.copy()
+            self._misses += 1
+
+        vec = np.asarray(self.encode([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec = vec / norm
+
+        with self._lock:
+            self._cache[text] = vec
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._evictions += 1
+        return vec.copy()
+
+    def encode_queries(self, texts: Sequence[str]) -> np.ndarray:
+        """(n, dim) matrix of normalised query vectors (each cached)."""
+        return np.vstack([self.encode_query(t) for t in texts])
+
+    def clear(self):
+        """Drop cached query vectors (metrics are kept)."""
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics for thesis metrics."""
+        total = self._hits + self._misses
+        hit_rate = (self._hits / total * 100) if total > 0 else 0
+
+        return {
+            'model_name': self.model_name,
+            'hits': self._hits,
+            'misses': self._misses,
+            'total_requests': total,
+            'hit_rate_percent': round(hit_rate, 2),
+            'cache_size': len(self._cache),
+            'max_size': self.cache_size,
+            'evictions': self._evictions,
+        }
+
+
+def embeddings_available() -> bool:
+    """True if sentence-transformers is installed (checked without importing it)."""
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str = DEFAULT_MODEL, device: Optional[str] = None) -> EmbeddingService:
+    """Process-wide EmbeddingService for model_name (created on first call)."""
+    model_name = model_name.replace("sentence-transformers/", "", 1)
+    with _services_lock:
+        if model_name not in _services:
+            _services[model_name] = EmbeddingService(model_name, device=device)
+        return _services[model_name]
+
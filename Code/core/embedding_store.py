@@ -0,0 +1,173 @@
+"""
+Embedding Store - FYP Version
+Content-addressed cache of RAG chunk embeddings.
+Each chunk is keyed by a hash of its text, so on startup only new or
+edited chunks are encoded; chunks that disappeared are dropped.
+A manifest records model name, dimension and normalisation so a model
+change never mixes incompatible vectors.
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+STORE_VERSION = 1
+
+MANIFEST = "manifest.json"
+VECTORS = "vectors.npy"
+KEYS = "keys.json"
+
+
+def chunk_key(text: str) -> str:
+    """Content address of a chunk (128-bit BLAKE2b of its UTF-8 text)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Row-wise L2 normalisation (same result as faiss.normalize_L2)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class EmbeddingStore:
+    """On-disk chunk-hash -> vector store with incremental sync."""
+
+    def __init__(self, store_dir: str, model_name: str, normalize: bool = True):
+        """
+        Open (or create) an embedding store.
+
+        Args:
+            store_dir: Folder holding manifest.json, vectors.npy and keys.json
+            model_name: Embedding model (e.g. "all-MiniLM-L6-v2")
+            normalize: Store L2-normalised vectors (cosine / IndexFlatIP)
+        """
+        self.store_dir = store_dir
+        self.model_name = model_name
+        self.normalize = normalize
+        self.dim: Optional[int] = None
+
+        self._keys: List[str] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self.last_sync: Dict = {}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _manifest(self) -> Dict:
+        return {
+            'store_version': STORE_VERSION,
+            'model_name': self.model_name,
+            'dim': self.dim,
+            'normalize': self.normalize,
+            'dtype': 'float32',
+            'count': len(self._keys),
+            'updated_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def _load(self):
+        """Load vectors if the manifest matches the current model settings."""
+        try:
+            with open(os.path.join(self.store_dir, MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if (manifest.get('store_version') != STORE_VERSION
+                    or manifest.get('model_name') != self.model_name
+                    or manifest.get('normalize') != self.normalize):
+                print(f"⚠️ Embedding store built for {manifest.get('model_name')} "
+                      f"(normalize={manifest.get('normalize')}), re-encoding all chunks")
+                return
+            with open(os.path.join(self.store_dir, KEYS), encoding="utf-8") as f:
+                keys = json.load(f)
+            vectors = np.load(os.path.join(self.store_dir, VECTORS))
+        except (OSError, ValueError):
+            return
+
+        if len(keys) != len(vectors) or vectors.ndim != 2 or vectors.shape[1] != manifest.get('dim'):
+            print("⚠️ Embedding store is inconsistent, re-encoding all chunks")
+            return
+        self._keys, self._vectors, self.dim = keys, vectors, manifest['dim']
+
+    def _save(self):
+        """Write vectors + keys, then the manifest (manifest last = commit)."""
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp = os.path.join(self.store_dir, "vectors.tmp.npy")
+        np.save(tmp, self._vectors)
+        os.replace(tmp, os.path.join(self.store_dir, VECTORS))
+        with open(os.path.join(self.store_dir, KEYS), "w", encoding="utf-8") as f:
+            json.dump(self._keys, f)
+        with open(os.path.join(self.store_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(self._manifest(), f, indent=2)
+
+    def sync(self, texts: Sequence[str],
+             encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Bring the store in line with the current corpus.
+
+        Args:
+            texts: Current RAG chunks (summaries list)
+            encode: Embeds a list of texts, e.g.
+                lambda b: embedder.encode(b, convert_to_numpy=True)
+
+        Returns:
+            float32 matrix with one row per text, in texts order
+        """
+        start = time.perf_counter()
+        keys = [chunk_key(t) for t in texts]
+        positions = {k: i for i, k in enumerate(self._keys)}
+
+        missing: Dict[str, str] = {}
+        for k, t in zip(keys, texts):
+            if k not in positions and k not in missing:
+                missing[k] = t
+
+        new_vectors = None
+        if missing:
+            new_vectors = np.asarray(encode(list(missing.values())), dtype=np.float32)
+            if self.normalize:
+                new_vectors = l2_normalize(new_vectors)
+            if self.dim is not None and new_vectors.shape[1] != self.dim:
+                # Model output changed shape: nothing cached is usable
+                print(f"⚠️ Embedding dim changed ({self.dim} -> {new_vectors.shape[1]}), re-encoding all chunks")
+                self._keys, self._vectors, self.dim = [], np.zeros((0, 0), dtype=np.float32), None
+                return self.sync(texts, encode)
+            self.dim = new_vectors.shape[1]
+
+        # Keep exactly the live chunks, in corpus order (deleted chunks are dropped)
+        live = list(dict.fromkeys(keys))
+        dropped = len(set(positions) - set(live))
+        if missing or dropped or live != self._keys:
+            n_old = len(self._keys)
+            new_positions = {k: n_old + i for i, k in enumerate(missing)}
+            combined = self._vectors
+            if new_vectors is not None:
+                combined = np.vstack([self._vectors, new_vectors]) if n_old else new_vectors
+            rows = [positions[k] if k in positions else new_positions[k] for k in live]
+            self._keys = live
+            self._vectors = combined[rows] if rows else np.zeros((0, self.dim or 0), dtype=np.float32)
+            self._save()
+
+        if len(live) == len(keys):
+            aligned = self._vectors
+        else:
+            row = {k: i for i, k in enumerate(self._keys)}
+            aligned = self._vectors[[row[k] for k in keys]]
+
+        self.last_sync = {
+            'chunks': len(texts),
+            'reused': len(live) - len(missing),
+            'encoded': len(missing),
+            'dropped': dropped,
+            'ms': round((time.perf_counter() - start) * 1000, 1),
+        }
+        print(f"✅ Embedding store: {len(texts):,} chunks "
+              f"(reused {self.last_sync['reused']:,}, encoded {len(missing):,}, dropped {dropped:,})")
+        return aligned
+
+    def get_stats(self) -> Dict:
+        """Store statistics for thesis metrics."""
+        return {'model_name': self.model_name, 'dim': self.dim, 'normalize': self.normalize,
+                'vectors': len(self._keys), **self.last_sync}
@@ -0,0 +1,170 @@
+"""
+Entity Gazetteer - FYP Version
+Dictionary-backed entity extractor for query text.
+One Aho-Corasick automaton over every State / Branch / Product /
+Employee / Channel / Department / JobRole value (plus Malay aliases),
+compiled at data-load time. One pass over the query returns every
+mention with its type and span, so "Selangor vs Penang" yields both.
+
+Matching rules:
+  - dataset values match as substrings (as the old `x.lower() in s`)
+  - aliases and values of 3 chars or fewer ("HR", "IT", "KL") need word
+    boundaries
+  - longest match wins within a type; different types may overlap
+    ("Johor" state inside "Johor Bahru Branch 1")
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import hashlib
+
+import pandas as pd
+
+from .columnar_store import dimension_vocabulary
+from .keyword_automaton import AhoCorasick, word_boundary
+
+# Entity type -> (frame, column, longest_first). The order inside a type
+# decides first(): alphabetical, or longest first where names nest
+ENTITY_COLUMNS = {
+    'state': ('sales', 'State', False),
+    'branch': ('sales', 'Branch', True),
+    'product': ('sales', 'Product', True),
+    'employee': ('sales', 'Employee', False),
+    'channel': ('sales', 'Channel', False),
+    'department': ('hr', 'Department', False),
+    'job_role': ('hr', 'JobRole', True),
+}
+
+# Malay / informal surface forms -> dataset value
+MALAY_ALIASES = {
+    'state': {
+        'pulau pinang': 'Penang', 'pinang': 'Penang', 'kl': 'Kuala Lumpur',
+        'wilayah persekutuan': 'Kuala Lumpur',
+    },
+    'product': {
+        'burger daging': 'Beef Burger', 'burger keju': 'Cheese Burger',
+        'burger ayam': 'Chicken Burger', 'burger pedas': 'Spicy Burger',
+        'burger sayur': 'Veggie Burger', 'kentang goreng': 'Fries',
+        'minuman ringan': 'Soft Drink', 'air tin': 'Soft Drink',
+    },
+    'channel': {
+        'penghantaran': 'Delivery',
+        'makan di kedai': 'Dine-in', 'dine in': 'Dine-in',
+        'bungkus': 'Takeaway', 'bawa pulang': 'Takeaway', 'take away': 'Takeaway',
+    },
+    'department': {
+        'sumber manusia': 'HR', 'kewangan': 'Finance', 'operasi': 'Operations',
+    },
+    'job_role': {
+        'juruwang': 'Cashier', 'pengurus cawangan': 'Branch Manager',
+        'penolong pengurus': 'Assistant Manager', 'penghantar': 'Delivery Rider',
+        'kru dapur': 'Kitchen Crew',
+    },
+}
+
+SHORT_VALUE_LEN = 3
+
+
+class Mention(NamedTuple):
+    """One entity mention in a query (start/end index the lowercased text)."""
+    type: str
+    value: str
+    start: int
+    end: int
+    surface: str
+
+
+class EntityGazetteer:
+    """Entity-type vocabularies compiled into one automaton."""
+
+    def __init__(self, vocab: Dict[str, Sequence[str]],
+                 aliases: Optional[Dict[str, Dict[str, str]]] = None,
+                 version: Optional[str] = None):
+        """
+        Args:
+            vocab: Entity type -> dataset values (order = first() priority)
+            aliases: Entity type -> {alias: dataset value}
+            version: Data snapshot version the vocabularies came from
+        """
+        self.vocab = {etype: [str(v) for v in values] for etype, values in vocab.items()}
+        self.version = version or self._vocab_hash()
+        self._rank = {etype: {v: i for i, v in enumerate(values)} for etype, values in self.vocab.items()}
+
+        # Surface forms: (type, value, needs word boundaries)
+        self._entries = []
+        surfaces = []
+        for etype, values in self.vocab.items():
+            for v in values:
+                surfaces.append(v.lower())
+                self._entries.append((etype, v, len(v) <= SHORT_VALUE_LEN))
+        for etype, table in (aliases or {}).items():
+            for alias, v in table.items():
+                if v in self._rank.get(etype, {}):
+                    surfaces.append(alias.lower())
+                    self._entries.append((etype, v, True))
+        self._automaton = AhoCorasick(surfaces)
+
+    @classmethod
+    def from_frames(cls, df_sales: pd.DataFrame, df_hr: pd.DataFrame,
+                    version: Optional[str] = None,
+                    aliases: Optional[Dict[str, Dict[str, str]]] = MALAY_ALIASES) -> "EntityGazetteer":
+        """Build from the loaded sales/HR frames (missing columns are skipped)."""
+        frames = {'sales': df_sales, 'hr': df_hr}
+        vocab = {}
+        for etype, (frame, column, longest_first) in ENTITY_COLUMNS.items():
+            df = frames[frame]
+            if df is not None and column in df.columns:
+                vocab[etype] = [v for _, v in dimension_vocabulary(df[column], longest_first=longest_first)]
+        return cls(vocab, aliases, version)
+
+    def _vocab_hash(self) -> str:
+        h = hashlib.blake2b(digest_size=8)
+        for etype, values in sorted(self.vocab.items()):
+            h.update(etype.encode())
+            for v in values:
+                h.update(b"\0" + v.encode("utf-8"))
+        return h.hexdigest()
+
+    def find(self, text: str) -> List[Mention]:
+        """
+        All entity mentions in text, ordered by position.
+
+        Within a type, a mention inside a longer mention of the same type
+        is dropped (longest match). Repeated mentions are all returned.
+        """
+        s = (text or "").lower()
+        hits = []
+        for start, end, sid in self._automaton.iter_matches(s):
+            etype, value, bounded = self._entries[sid]
+            if bounded and not (word_boundary(s, start) and word_boundary(s, end)):
+                continue
+            hits.append(Mention(etype, value, start, end, s[start:end]))
+
+        # Longest first, so a contained same-type hit always meets its container
+        hits.sort(key=lambda m: (m.start - m.end, m.start))
+        kept: List[Mention] = []
+        for m in hits:
+            if not any(k.type == m.type and k.start <= m.start and m.end <= k.end for k in kept):
+                kept.append(m)
+        kept.sort(key=lambda m: (m.start, -m.end))
+        return kept
+
+    def values(self, mentions: Sequence[Mention], etype: str) -> List[str]:
+        """Distinct values of one type, in order of first mention."""
+        return list(dict.fromkeys(m.value for m in mentions if m.type == etype))
+
+    def first(self, mentions: Sequence[Mention], etype: str) -> Optional[str]:
+        """
+        Single value of one type for a filter: the mentioned value that
+        comes first in the vocabulary order (what the old
+        `next(x for x in VALUES if x.lower() in s)` returned).
+        """
+        rank = self._rank.get(etype, {})
+        found = [m.value for m in mentions if m.type == etype]
+        return min(found, key=rank.__getitem__) if found else None
+
+    def get_stats(self) -> Dict:
+        """Vocabulary sizes for the startup log."""
+        return {
+            'version': self.version,
+            'surfaces': len(self._entries),
+            'types': {etype: len(values) for etype, values in self.vocab.items()},
+        }
@@ -0,0 +1,285 @@
+"""
+Ground Truth Store - FYP Version
+Materialised KPI ground truth for answer verification.
+verify_answer_against_ground_truth() recomputed the ground truth after
+every KPI answer (filter scans on the request path). The store computes,
+once per data snapshot:
+  - sales: total_sales / total_quantity / avg_price for every
+    (state, month, product) combination, each optionally "all"
+  - hr: total_employees / avg_income / attrition_rate for every
+    (state, department) combination, each optionally "all"
+from one bincount pass per measure over the bitmap index codes, so a
+verification is a dict lookup. Context values resolve to dataset values
+as compute_ground_truth matched them (case-insensitive substring, month
+as "YYYY-MM"); a context matching several values is computed from the
+index once and memoised.
+The table is saved as JSON tagged with the snapshot fingerprint and
+rebuilt when the fingerprint changes. CALCULATED_GROUND_TRUTH.json seeds
+the reference figures (H1 / monthly / product / state revenue), which are
+checked against the table at build.
+"""
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from .bitmap_index import BitmapIndex
+
+STORE_VERSION = 1
+
+# Route -> (context key, column) per dimension, in key order
+DIMENSIONS = {
+    'sales_kpi': (('state', 'State'), ('month', 'YearMonth'), ('product', 'Product')),
+    'hr_kpi': (('state', 'State'), ('department', 'Department')),
+}
+ALL = ""  # key part for "no filter on this dimension"
+_MONTH = re.compile(r"\d{4}-\d{2}")
+
+
+def _cube(codes: List[np.ndarray], sizes: List[int], weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    SUM(weights) (or COUNT) per code combination, with an extra trailing
+    slot per dimension holding the total over that dimension ("all").
+    Rows with a NaN code only count towards "all".
+    """
+    slots = [n + 2 for n in sizes]  # values, NaN, all
+    flat = np.zeros(len(codes[0]), dtype=np.int64)
+    for c, n, width in zip(codes, sizes, slots):
+        flat = flat * width + np.where(c >= 0, c, n)
+    cube = np.bincount(flat, weights=weights, minlength=int(np.prod(slots))).reshape(slots)
+    for axis, n in enumerate(sizes):
+        total = cube.take(range(n + 1), axis=axis).sum(axis=axis, keepdims=True)
+        index = [slice(None)] * cube.ndim
+        index[axis] = slice(n + 1, n + 2)
+        cube[tuple(index)] = total
+    return cube
+
+
+class GroundTruthStore:
+    """Precomputed KPI ground truth per filter combination, keyed by snapshot version."""
+
+    def __init__(self, sales_index: BitmapIndex, hr_index: BitmapIndex,
+                 version: Optional[str] = None, table: Optional[Dict] = None):
+        """
+        Args:
+            sales_index: Bitmap index over df_sales (State / YearMonth / Product / DateStr)
+            hr_index: Bitmap index over df_hr (State / Department / Attrition)
+            version: Data snapshot version the table belongs to
+            table: Previously saved table (None = build from the indexes)
+        """
+        self.indexes = {'sales_kpi': sales_index, 'hr_kpi': hr_index}
+        self.version = version
+        self.build_ms = 0.0
+        self.loaded = table is not None
+        self.table = table if table is not None else self._build()
+        self._extra: Dict[tuple, Dict] = {}
+        self.lookups = 0
+        self.computed = 0
+        self.seed_checked = 0
+        self.seed_mismatches: List[Tuple[str, float, float]] = []
+
+    # ---- build ----
+    def _build(self) -> Dict[str, Dict[str, Dict]]:
+        start = time.perf_counter()
+        table = {'sales_kpi': self._build_sales(), 'hr_kpi': self._build_hr()}
+        self.build_ms = (time.perf_counter() - start) * 1000
+        return table
+
+    def _axes(self, route: str):
+        """Codes, sizes and key labels (values + ALL) per dimension of a route."""
+        idx = self.indexes[route]
+        codes, sizes, labels = [], [], []
+        for _, col in DIMENSIONS[route]:
+            values = idx.values(col)
+            codes.append(idx.codes(col))
+            sizes.append(len(values))
+            labels.append([(i, str(v)) for i, v in enumerate(values)] + [(len(values) + 1, ALL)])
+        return codes, sizes, labels
+
+    @staticmethod
+    def _cells(labels):
+        """Every (cube index, key) combination of the dimension labels."""
+        cells = [((), ())]
+        for axis in labels:
+            cells = [(pos + (i,), key + (label,)) for pos, key in cells for i, label in axis]
+        return [(pos, "|".join(key)) for pos, key in cells]
+
+    def _build_sales(self) -> Dict[str, Dict]:
+        idx = self.indexes['sales_kpi']
+        codes, sizes, labels = self._axes('sales_kpi')
+        rows = _cube(codes, sizes)
+        sales = _cube(codes, sizes, np.nan_to_num(idx.measure('Total Sale')))
+        quantity = _cube(codes, sizes, np.nan_to_num(idx.measure('Quantity')))
+        out = {}
+        for pos, key in self._cells(labels):
+            truth = {"total_sales": float(sales[pos]), "total_quantity": float(quantity[pos])}
+            if rows[pos] > 0 and truth["total_quantity"]:
+                truth["avg_price"] = truth["total_sales"] / truth["total_quantity"]
+            out[key] = truth
+        return out
+
+    def _build_hr(self) -> Dict[str, Dict]:
+        idx = self.indexes['hr_kpi']
+        codes, sizes, labels = self._axes('hr_kpi')
+        income = idx.measure('MonthlyIncome')
+        valid = ~np.isnan(income)
+        rows = _cube(codes, sizes)
+        income_sum = _cube(codes, sizes, np.where(valid, income, 0.0))
+        income_rows = _cube(codes, sizes, valid.astype(float))
+        left = _cube(codes, sizes, idx.eq('Attrition', 'Yes').mask().astype(float))
+        out = {}
+        for pos, key in self._cells(labels):
+            employees = int(rows[pos])
+            out[key] = {
+                "total_employees": employees,
+                "avg_income": float(income_sum[pos] / income_rows[pos]) if income_rows[pos] else 0,
+                "attrition_rate": float(left[pos] / employees * 100) if employees > 0 else 0,
+            }
+        return out
+
+    # ---- persistence ----
+    @classmethod
+    def load_or_build(cls, sales_index: BitmapIndex, hr_index: BitmapIndex, path: str,
+                      version: Optional[str], seed_path: Optional[str] = None) -> "GroundTruthStore":
+        """
+        Load the saved table if it belongs to this snapshot version, else
+        build it from the indexes and save it.
+
+        Args:
+            path: JSON file for the materialised table
+            version: Current data snapshot version (e.g. snapshot_fingerprint)
+            seed_path: CALCULATED_GROUND_TRUTH.json to check the table against
+        """
+        table = None
+        if version and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get("store_version") == STORE_VERSION and saved.get("version") == version:
+                    table = saved["table"]
+            except (OSError, ValueError, KeyError):
+                table = None
+        store = cls(sales_index, hr_index, version, table)
+        if table is None and version:
+            store.save(path)
+        if seed_path:
+            store.check_seed(seed_path)
+        return store
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"store_version": STORE_VERSION, "version": self.version, "table": self.table}, f)
+        os.replace(tmp, path)
+
+    # ---- seed (ground_truth/CALCULATED_GROUND_TRUTH.json) ----
+    def check_seed(self, seed_path: str, tolerance: float = 0.01) -> int:
+        """
+        Compare the seed file's revenue figures with the table.
+        Returns the number of figures checked; differences go to seed_mismatches.
+        """
+        try:
+            with open(seed_path, "r", encoding="utf-8") as f:
+                seed = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        expected = []
+        if 'total_revenue' in seed.get('h1_2024', {}):
+            expected.append((("", "", ""), seed['h1_2024']['total_revenue']))
+        for month, figures in seed.get('monthly', {}).items():
+            expected.append((("", month, ""), figures.get('total')))
+        for section, month in (('h1_products', ""), ('june_products', "2024-06")):
+            for product, total in seed.get(section, {}).items():
+                expected.append((("", month, product), total))
+        for section, month in (('h1_states', ""), ('june_states', "2024-06")):
+            for state, total in seed.get(section, {}).items():
+                expected.append(((state, month, ""), total))
+
+        sales = self.table['sales_kpi']
+        self.seed_mismatches = []
+        self.seed_checked = 0
+        for parts, total in expected:
+            key = "|".join(parts)
+            if total is None or key not in sales:
+                continue
+            self.seed_checked += 1
+            actual = sales[key]["total_sales"]
+            if abs(actual - total) > tolerance:
+                self.seed_mismatches.append((key, total, actual))
+        return self.seed_checked
+
+    # ---- lookup ----
+    def _resolve(self, route: str, key: str, col: str, value) -> Optional[str]:
+        """Dataset value a context value selects (ALL if unset), None if not exactly one."""
+        if not value:
+            return ALL
+        value = str(value)
+        if key == 'month':
+            return value if _MONTH.fullmatch(value) else None
+        regex = re.compile(value, re.IGNORECASE)
+        found = [str(v) for v in self.indexes[route].values(col) if regex.search(str(v))]
+        return found[0] if len(found) == 1 else None
+
+    def lookup(self, route: str, context: Optional[Dict] = None) -> Dict:
+        """Ground truth for a KPI route under the context filters ({} for other routes)."""
+        if route not in DIMENSIONS:
+            return {}
+        self.lookups += 1
+        context = context or {}
+        parts = [self._resolve(route, key, col, context.get(key)) for key, col in DIMENSIONS[route]]
+        if None not in parts:
+            truth = self.table[route].get("|".join(parts))
+            if truth is not None:
+                return dict(truth)
+        memo = (route,) + tuple(str(context.get(key) or "") for key, _ in DIMENSIONS[route])
+        truth = self._extra.get(memo)
+        if truth is None:
+            truth = self._extra[memo] = self.compute(route, context)
+        return dict(truth)
+
+    def compute(self, route: str, context: Optional[Dict] = None) -> Dict:
+        """Ground truth straight from the bitmap index (substring filters, as str.contains)."""
+        self.computed += 1
+        context = context or {}
+        idx = self.indexes[route]
+        sel = idx.all()
+        ground_truth = {}
+        if route == "sales_kpi":
+            if context.get('state'):
+                sel = sel & idx.contains('State', context['state'])
+            if context.get('month'):
+                sel = sel & idx.contains('DateStr', context['month'], case=True)
+            if context.get('product'):
+                sel = sel & idx.contains('Product', context['product'])
+            pos = sel.positions()
+            ground_truth["total_sales"] = idx.sum(pos, 'Total Sale')
+            ground_truth["total_quantity"] = idx.sum(pos, 'Quantity')
+            if len(pos) > 0 and ground_truth["total_quantity"]:
+                ground_truth["avg_price"] = ground_truth["total_sales"] / ground_truth["total_quantity"]
+        elif route == "hr_kpi":
+            if context.get('state'):
+                sel = sel & idx.contains('State', context['state'])
+            if context.get('department'):
+                sel = sel & idx.contains('Department', context['department'])
+            employees = sel.count()
+            ground_truth["total_employees"] = employees
+            ground_truth["avg_income"] = idx.mean(sel, 'MonthlyIncome') if employees > 0 else 0
+            ground_truth["attrition_rate"] = (sel & idx.eq('Attrition', 'Yes')).count() / employees * 100 if employees > 0 else 0
+        return ground_truth
+
+    def get_stats(self) -> Dict:
+        """Store size and lookup statistics for thesis metrics."""
+        return {
+            'version': self.version,
+            'loaded': self.loaded,
+            'build_ms': round(self.build_ms, 2),
+            'entries': {route: len(rows) for route, rows in self.table.items()},
+            'lookups': self.lookups,
+            'computed': self.computed,
+            'seed_checked': self.seed_checked,
+            'seed_mismatches': len(self.seed_mismatches),
+        }
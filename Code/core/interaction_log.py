@@ -0,0 +1,261 @@
+"""
+Interaction Log - FYP Version
+Append-only chat interaction log written off the request path.
+log_interaction() used to open logs/chat_logs.csv, build a csv.writer
+and append one row (full answer text) synchronously on every query.
+InteractionLog.log() only puts the record on a queue; a background
+thread batches records into JSONL segments:
+  - rotation by size (max_bytes) and age (max_age_seconds)
+  - closed segments gzip-compressed (chat_logs-<time>-<seq>.jsonl.gz)
+  - flushed on close() / interpreter exit
+iter_records() / iter_frames() stream the segments back one at a time,
+so analysis scripts never load the whole log.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence
+import atexit
+import csv
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+LOG_FIELDS = ["timestamp", "model", "route", "latency_ms", "question", "answer",
+              "chat_id", "message_id", "tool_trace_summary"]
+
+_STOP = object()
+
+
+def segment_paths(log_dir: str, prefix: str = "chat_logs") -> List[str]:
+    """Segments in write order (a compressed copy wins over a leftover plain file)."""
+    paths = {}
+    for path in glob.glob(os.path.join(log_dir, f"{prefix}-*.jsonl*")):
+        stem = path[:-3] if path.endswith(".gz") else path
+        if stem.endswith(".jsonl") and (stem not in paths or path.endswith(".gz")):
+            paths[stem] = path
+    return [paths[stem] for stem in sorted(paths)]
+
+
+class InteractionLog:
+    """Queue-backed JSONL writer with rotated, compressed segments."""
+
+    def __init__(self, log_dir: str, prefix: str = "chat_logs",
+                 max_bytes: int = 8 * 1024 * 1024, max_age_seconds: float = 86400,
+                 compress: bool = True, batch_size: int = 64,
+                 flush_interval: float = 1.0, max_queue: int = 10000):
+        """
+        Args:
+            log_dir: Directory for the segments
+            prefix: Segment file name prefix
+            max_bytes: Rotate once a segment reaches this size
+            max_age_seconds: Rotate once a segment is this old
+            compress: gzip segments when they are rotated out
+            batch_size: Max records per write
+            flush_interval: Max seconds a record waits in the queue
+            max_queue: Pending records before log() starts dropping
+        """
+        os.makedirs(log_dir, exist_ok=True)
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._path = None
+        self._opened_at = 0.0
+        self._seq = 0
+        self.written = 0
+        self.dropped = 0
+        self.segments = 0
+        self.closed = False
+
+        self._thread = threading.Thread(target=self._run, name="interaction-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---- request path ----
+    def log(self, record: Dict) -> bool:
+        """Queue one record (never blocks). Returns False if it was dropped."""
+        if self.closed:
+            return False
+        record.setdefault("timestamp", time.strftime("%Y-%m-%d %H:%M:%S"))
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is on disk."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0):
+        """Write what is queued, compress the open segment and stop the writer."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ---- writer thread ----
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+
+            batch, events, stop = [], [], False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    print(f"⚠️ Interaction log write failed: {e}")
+            for event in events:
+                event.set()
+            if stop:
+                self._rotate()
+                return
+
+    def _open(self):
+        self._seq += 1
+        name = f"{self.prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._seq:04d}.jsonl"
+        self._path = os.path.join(self.log_dir, name)
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._opened_at = time.time()
+        self.segments += 1
+
+    def _write(self, batch: Sequence[Dict]):
+        if self._file is None:
+            self._open()
+        self._file.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch))
+        self._file.flush()
+        self.written += len(batch)
+        self._maybe_rotate()
+
+    def _maybe_rotate(self):
+        if self._file is None:
+            return
+        if self._file.tell() >= self.max_bytes or time.time() - self._opened_at >= self.max_age_seconds:
+            self._rotate()
+
+    def _rotate(self):
+        """Close the open segment (compressing it) so the next write starts a new one."""
+        if self._file is None:
+            return
+        self._file.close()
+        path, self._file, self._path = self._path, None, None
+        if self.compress:
+            try:
+                tmp = path + ".gz.tmp"
+                with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.replace(tmp, path + ".gz")
+                os.remove(path)
+            except OSError as e:
+                print(f"⚠️ Interaction log compression failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """Writer counters for the Stats panel."""
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'queued': self._queue.qsize(),
+            'segments': self.segments,
+            'current_segment': os.path.basename(self._path) if self._path else None,
+        }
+
+
+# =========================
+# Reader
+# =========================
+def _open_segment(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_records(log_dir: str, prefix: str = "chat_logs",
+                 since: Optional[str] = None, until: Optional[str] = None,
+                 fields: Optional[Sequence[str]] = None,
+                 legacy_csv: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Stream logged interactions, oldest segment first.
+
+    Args:
+        since / until: Inclusive "YYYY-MM-DD[ HH:MM:SS]" bounds on timestamp
+        fields: Keep only these keys
+        legacy_csv: Also stream an old chat_logs.csv first
+    """
+    def keep(record):
+        ts = str(record.get("timestamp", ""))
+        if since and ts < since:
+            return None
+        if until and ts[:len(until)] > until:
+            return None
+        return {f: record.get(f) for f in fields} if fields else record
+
+    if legacy_csv and os.path.exists(legacy_csv):
+        with open(legacy_csv, newline="", encoding="utf-8", errors="replace") as f:
+            for row in csv.DictReader(f):
+                out = keep(row)
+                if out is not None:
+                    yield out
+
+    for path in segment_paths(log_dir, prefix):
+        try:
+            with _open_segment(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        out = keep(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # torn last line of a crashed writer
+                    if out is not None:
+                        yield out
+        except (OSError, EOFError):
+            continue  # segment removed or still being compressed
+
+
+def iter_frames(log_dir: str, prefix: str = "chat_logs", chunk_rows: int = 5000,
+                **filters) -> Iterator[pd.DataFrame]:
+    """iter_records() in DataFrame chunks of at most chunk_rows rows."""
+    chunk = []
+    for record in iter_records(log_dir, prefix, **filters):
+        chunk.append(record)
+        if len(chunk) >= chunk_rows:
+            yield pd.DataFrame.from_records(chunk)
+            chunk = []
+    if chunk:
+        yield pd.DataFrame.from_records(chunk)
@@ -0,0 +1,150 @@
+"""
+Keyword Automaton - FYP Version
+Compiled keyword matcher for intent routing (HR / sales / docs / policy).
+One Aho-Corasick automaton over every keyword class, built once at
+import. A single pass over the query returns all matched keywords per
+class, with the same rule as keyword_match():
+  - single words need word boundaries ("age" does not hit "average")
+  - multi-word phrases match as plain substrings
+"""
+from functools import lru_cache
+from typing import Dict, Iterator, List, Sequence, Tuple
+import re
+
+
+def _is_word(ch: str) -> bool:
+    """Same character class as regex \\w."""
+    return ch.isalnum() or ch == '_'
+
+
+def word_boundary(text: str, pos: int) -> bool:
+    """True where regex \\b matches (word-ness differs either side of pos)."""
+    left = pos > 0 and _is_word(text[pos - 1])
+    right = pos < len(text) and _is_word(text[pos])
+    return left != right
+
+
+class AhoCorasick:
+    """Plain Aho-Corasick automaton: every (overlapping) occurrence in one pass."""
+
+    def __init__(self, patterns: Sequence[str]):
+        """
+        Args:
+            patterns: Strings to find (case-sensitive; callers lowercase)
+        """
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[int]] = [[]]
+        for pid, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pid)
+
+        # Failure links (BFS), merging outputs along the fail chain
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, pattern_id) for every occurrence, in end order."""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pid in out[state]:
+                yield (i + 1 - len(patterns[pid]), i + 1, pid)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over named keyword classes."""
+
+    def __init__(self, classes: Dict[str, Sequence[str]]):
+        """
+        Args:
+            classes: Class name -> keyword list (lowercase). A list may
+                repeat a keyword; scan() then reports it twice, as
+                keyword_match() does for concatenated lists.
+        """
+        self.classes = {name: list(kws) for name, kws in classes.items()}
+
+        # Unique keywords; each knows its (class, position) slots
+        keywords: List[str] = []
+        self._bounded: List[bool] = []
+        self._slots: List[List[Tuple[str, int]]] = []
+        ids: Dict[str, int] = {}
+        for name, kws in self.classes.items():
+            for pos, kw in enumerate(kws):
+                if kw not in ids:
+                    ids[kw] = len(keywords)
+                    keywords.append(kw)
+                    self._bounded.append(' ' not in kw)
+                    self._slots.append([])
+                self._slots[ids[kw]].append((name, pos))
+        self._automaton = AhoCorasick(keywords)
+
+    def _hits(self, text: str) -> set:
+        """Ids of keywords present in text (one pass)."""
+        bounded = self._bounded
+        found = set()
+        for start, end, kid in self._automaton.iter_matches(text):
+            if kid in found:
+                continue
+            if bounded[kid] and not (word_boundary(text, start) and word_boundary(text, end)):
+                continue
+            found.add(kid)
+        return found
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """
+        All matched keywords per class, in each class's list order.
+
+        Args:
+            text: Query (already lowercased)
+        """
+        positions: Dict[str, List[int]] = {name: [] for name in self.classes}
+        for kid in self._hits(text):
+            for name, pos in self._slots[kid]:
+                positions[name].append(pos)
+        return {
+            name: [self.classes[name][p] for p in sorted(positions[name])]
+            for name in self.classes
+        }
+
+    def match(self, text: str, name: str) -> Tuple[bool, List[str]]:
+        """keyword_match()-style (matched, matched_keywords) for one class."""
+        matched = self.scan(text)[name]
+        return (len(matched) > 0, matched)
+
+
+def compile_patterns(patterns: Sequence[str]) -> "re.Pattern":
+    """One alternation regex that matches wherever any of patterns matches."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+
+@lru_cache(maxsize=64)
+def _automaton_for(keywords: Tuple[str, ...]) -> KeywordAutomaton:
+    return KeywordAutomaton({'keywords': keywords})
+
+
+def match_keywords(keywords: Sequence[str], text: str) -> Tuple[bool, List[str]]:
+    """
+    Drop-in for keyword_match(keywords, text): the automaton for each
+    distinct keyword list is compiled once and reused.
+    """
+    return _automaton_for(tuple(keywords)).match(text, 'keywords')
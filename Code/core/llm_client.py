@@ -0,0 +1,259 @@
+"""
+LLM Client - FYP Version
+One async Ollama client for every LLM call (generation, LLM router, preload).
+  - ollama.AsyncClient (httpx) with a bounded keep-alive connection pool,
+    so calls reuse connections to the Ollama endpoint
+  - per-call timeouts (first token / between tokens / whole call) with
+    asyncio.wait_for, instead of socket.setdefaulttimeout(), which is
+    process-wide and raced between request threads
+  - streaming as async iterators (astream_chat); the sync wrappers used by
+    the Gradio handlers run them on one shared event-loop thread instead of
+    one new thread per request
+  - closing a stream (Stop / GeneratorExit) cancels the HTTP request
+"""
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import asyncio
+import queue
+import threading
+import time
+
+from .model_registry import MODELS
+
+_DONE = object()
+
+
+class _LoopThread:
+    """A daemon thread running one asyncio loop for all sync callers."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="llm-client-loop", daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+class LLMClient:
+    """Pooled async Ollama client with sync bridges."""
+
+    def __init__(self, host: Optional[str] = None, max_connections: int = 8,
+                 connect_timeout: float = 5.0, keepalive_expiry: float = 300.0):
+        """
+        Args:
+            host: Ollama URL (None = OLLAMA_HOST / localhost default)
+            max_connections: Connection pool size (kept alive between calls)
+            connect_timeout: Seconds to open a connection
+            keepalive_expiry: Seconds an idle pooled connection is kept
+        """
+        self.host = host
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._runner: Optional[_LoopThread] = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.streams = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.preloads = 0
+        self._first_token_ms = 0.0
+
+    # ---- connection pool ----
+    def _client(self):
+        """AsyncClient for the running loop (httpx pools are bound to one loop)."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            import httpx
+            import ollama
+            client = ollama.AsyncClient(
+                host=self.host,
+                # read=None: slow generations are bounded per call below, not per socket
+                timeout=httpx.Timeout(None, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=self.keepalive_expiry),
+            )
+            self._clients[loop] = client
+        return client
+
+    def _submit(self, coro):
+        """Schedule a coroutine on the shared loop thread (started on first use)."""
+        if self._runner is None:
+            with self._lock:
+                if self._runner is None:
+                    self._runner = _LoopThread()
+        return self._runner.submit(coro)
+
+    def _run(self, coro, timeout: Optional[float] = None):
+        return self._submit(coro).result(timeout)
+
+    # ---- async API ----
+    async def _timed(self, awaitable, timeout: Optional[float], what: str):
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TimeoutError(f"⏱️ LLM {what} timeout after {timeout:g}s - Ollama may be overloaded") from None
+
+    async def achat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+                    keep_alive: Optional[str] = None, timeout: Optional[float] = 120.0) -> str:
+        """Non-streaming chat; returns the reply text."""
+        self.calls += 1
+        try:
+            resp = await self._timed(
+                self._client().chat(model=model, messages=messages, options=options, keep_alive=keep_alive),
+                timeout, "response")
+        except Exception:
+            self.errors += 1
+            raise
+        return (resp["message"]["content"] or "").strip()
+
+    async def astream_chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+                           keep_alive: Optional[str] = None, first_token_timeout: Optional[float] = 60.0,
+                           idle_timeout: Optional[float] = 60.0) -> AsyncIterator[str]:
+        """
+        Stream reply tokens.
+
+        Args:
+            first_token_timeout: Max seconds until the first token (model load + prompt)
+            idle_timeout: Max seconds between later tokens
+        """
+        self.streams += 1
+        start = time.perf_counter()
+        first = True
+        try:
+            stream = await self._timed(
+                self._client().chat(model=model, messages=messages, options=options,
+                                    keep_alive=keep_alive, stream=True),
+                first_token_timeout, "connect")
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await self._timed(chunks.__anext__(),
+                                              first_token_timeout if first else idle_timeout,
+                                              "first token" if first else "stream")
+                except StopAsyncIteration:
+                    return
+                token = chunk["message"]["content"] or ""
+                if token:
+                    if first:
+                        first = False
+                        self._first_token_ms += (time.perf_counter() - start) * 1000
+                    yield token
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def agenerate(self, model: str, prompt: str, options: Optional[Dict] = None,
+                        keep_alive: Optional[str] = None, timeout: Optional[float] = 30.0) -> str:
+        """Non-streaming /api/generate (used by the LLM router)."""
+        self.calls += 1
+        try:
+            resp = await self._timed(
+                self._client().generate(model=model, prompt=prompt, options=options, keep_alive=keep_alive),
+                timeout, "response")
+        except Exception:
+            self.errors += 1
+            raise
+        return (resp["response"] or "").strip()
+
+    async def apreload(self, model: str, keep_alive: str = "5m", timeout: Optional[float] = 120.0) -> bool:
+        """Load a model into Ollama memory (empty prompt: no tokens generated)."""
+        self.preloads += 1
+        await self._timed(self._client().generate(model=model, prompt="", keep_alive=keep_alive),
+                          timeout, "model load")
+        return True
+
+    async def alist_models(self, timeout: Optional[float] = 2.0) -> List[str]:
+        resp = await self._timed(self._client().list(), timeout, "list")
+        return [m.get("model") or m.get("name") for m in resp["models"]]
+
+    # ---- sync bridges (Gradio handlers run in worker threads) ----
+    def chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+             keep_alive: Optional[str] = None, timeout: Optional[float] = 120.0) -> str:
+        return self._run(self.achat(model, messages, options, keep_alive, timeout))
+
+    def generate(self, model: str, prompt: str, options: Optional[Dict] = None,
+                 keep_alive: Optional[str] = None, timeout: Optional[float] = 30.0) -> str:
+        return self._run(self.agenerate(model, prompt, options, keep_alive, timeout))
+
+    def preload(self, model: str, keep_alive: str = "5m", timeout: Optional[float] = 120.0) -> bool:
+        return self._run(self.apreload(model, keep_alive, timeout))
+
+    def list_models(self, timeout: Optional[float] = 2.0) -> List[str]:
+        return self._run(self.alist_models(timeout))
+
+    def stream_chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+                    keep_alive: Optional[str] = None, first_token_timeout: Optional[float] = 60.0,
+                    idle_timeout: Optional[float] = 60.0, heartbeat: Optional[float] = None,
+                    cancel=None) -> Iterator[Optional[str]]:
+        """
+        Sync view of astream_chat() for generator handlers.
+
+        Args:
+            heartbeat: If set, yield None whenever no token arrived for this
+                many seconds (lets the caller refresh the UI while waiting)
+            cancel: Object with is_set() (CancelToken); checked per token
+
+        Closing the iterator early cancels the HTTP request.
+        """
+        tokens: "queue.Queue" = queue.Queue()
+
+        async def pump():
+            stream = self.astream_chat(model, messages, options, keep_alive,
+                                       first_token_timeout, idle_timeout)
+            try:
+                async for token in stream:
+                    if cancel is not None and cancel.is_set():
+                        break
+                    tokens.put(token)
+                tokens.put(_DONE)
+            except BaseException as e:  # includes CancelledError when the caller closes
+                tokens.put(e)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+            finally:
+                await stream.aclose()  # closes the HTTP response now, not at GC
+
+        future = self._submit(pump())
+        try:
+            while True:
+                try:
+                    item = tokens.get(timeout=heartbeat)
+                except queue.Empty:
+                    if cancel is not None and cancel.is_set():
+                        return
+                    yield None
+                    continue
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def get_stats(self) -> Dict:
+        """Call counters (SimpleCache-style stats dict)."""
+        return {
+            'calls': self.calls,
+            'streams': self.streams,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'cancelled': self.cancelled,
+            'preloads': self.preloads,
+            'avg_first_token_ms': round(self._first_token_ms / self.streams, 1) if self.streams else 0,
+            'pool_size': self.max_connections,
+        }
+
+
+def llm_client(host: Optional[str] = None) -> LLMClient:
+    """Shared LLMClient per Ollama host (registered in MODELS)."""
+    return MODELS.get(f"llm:{host or 'default'}", lambda: LLMClient(host))
@@ -0,0 +1,217 @@
+"""
+Metrics Registry - FYP Version
+In-process usage statistics for the Stats panel.
+update_stats() used to json.load usage_stats.json, bump the counters
+and json.dump it back on every query (two file operations on the hot
+path, and concurrent Gradio workers could overwrite each other).
+MetricsRegistry keeps everything in memory:
+  - query / route / model counters
+  - latency histograms (log-spaced buckets) per route and per model,
+    giving p50 / p95 / p99 without storing every sample
+  - a snapshot written to usage_stats.json every few seconds (only when
+    something changed) and at exit, in the same layout as before
+"""
+from typing import Dict, List, Optional
+import atexit
+import json
+import math
+import os
+import threading
+import time
+
+# Buckets grow by 2^(1/8) (~9%): percentile error stays under 9%
+BUCKET_RATIO = 2 ** (1 / 8)
+MAX_BUCKET = int(math.log(10 * 60 * 1000, BUCKET_RATIO)) + 1  # up to 10 min
+
+
+def _bucket(ms: float) -> int:
+    if ms <= 1:
+        return 0
+    return min(int(math.ceil(math.log(ms, BUCKET_RATIO))), MAX_BUCKET)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency distribution (ms)."""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        b = _bucket(ms)
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (capped at the max seen)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= rank:
+                return min(BUCKET_RATIO ** b, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count, 1) if self.count else 0,
+            'p50_ms': round(self.percentile(50), 1),
+            'p95_ms': round(self.percentile(95), 1),
+            'p99_ms': round(self.percentile(99), 1),
+            'max_ms': round(self.max, 1),
+        }
+
+    def to_dict(self) -> Dict:
+        return {'buckets': {str(b): n for b, n in sorted(self.buckets.items())},
+                'count': self.count, 'total_ms': self.total, 'max_ms': self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        h = cls()
+        h.buckets = {int(b): int(n) for b, n in data.get('buckets', {}).items()}
+        h.count = int(data.get('count', sum(h.buckets.values())))
+        h.total = float(data.get('total_ms', 0.0))
+        h.max = float(data.get('max_ms', 0.0))
+        return h
+
+
+class MetricsRegistry:
+    """Counters + per-route/per-model latency histograms, snapshotted to JSON."""
+
+    def __init__(self, snapshot_path: Optional[str] = None, snapshot_interval: float = 10.0):
+        """
+        Args:
+            snapshot_path: usage_stats.json (loaded on start if present)
+            snapshot_interval: Seconds between snapshots (0 = only on flush/exit)
+        """
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        # One lock, held only for a few dict updates (never during I/O)
+        self._lock = threading.Lock()
+        self.total_queries = 0
+        self.total_latency_ms = 0.0
+        self.route_counts: Dict[str, int] = {}
+        self.model_counts: Dict[str, int] = {}
+        self.route_latency: Dict[str, LatencyHistogram] = {}
+        self.model_latency: Dict[str, LatencyHistogram] = {}
+        self.all_latency = LatencyHistogram()
+        self._version = 0
+        self._saved_version = 0
+        self.snapshots = 0
+
+        if snapshot_path and os.path.exists(snapshot_path):
+            self._load(snapshot_path)
+        if snapshot_path:
+            atexit.register(self.flush)
+            if snapshot_interval > 0:
+                self._stop = threading.Event()
+                threading.Thread(target=self._snapshot_loop, name="metrics-snapshot", daemon=True).start()
+
+    def record_query(self, route: str, model: str, latency_ms: float):
+        """Count one answered query (hot path: memory only)."""
+        with self._lock:
+            self.total_queries += 1
+            self.total_latency_ms += latency_ms
+            self.route_counts[route] = self.route_counts.get(route, 0) + 1
+            self.model_counts[model] = self.model_counts.get(model, 0) + 1
+            for table, key in ((self.route_latency, route), (self.model_latency, model)):
+                hist = table.get(key)
+                if hist is None:
+                    hist = table[key] = LatencyHistogram()
+                hist.observe(latency_ms)
+            self.all_latency.observe(latency_ms)
+            self._version += 1
+
+    # ---- reading ----
+    def snapshot(self) -> Dict:
+        """usage_stats.json layout (old keys kept) plus latency histograms."""
+        with self._lock:
+            return {
+                "total_queries": self.total_queries,
+                "route_counts": dict(self.route_counts),
+                "model_counts": dict(self.model_counts),
+                "avg_latency_ms": self.total_latency_ms / self.total_queries if self.total_queries else 0,
+                "total_latency_ms": self.total_latency_ms,
+                "latency": {
+                    "all": self.all_latency.to_dict(),
+                    "route": {k: h.to_dict() for k, h in self.route_latency.items()},
+                    "model": {k: h.to_dict() for k, h in self.model_latency.items()},
+                },
+                "snapshot_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+
+    def latency_table(self, by: str = "route") -> List[Dict]:
+        """[{name, count, avg_ms, p50_ms, p95_ms, p99_ms, max_ms}] by route or model, busiest first."""
+        table = self.route_latency if by == "route" else self.model_latency
+        with self._lock:
+            rows = [{'name': k, **h.summary()} for k, h in table.items()]
+        return sorted(rows, key=lambda r: r['count'], reverse=True)
+
+    def get_stats(self) -> Dict:
+        """Headline numbers (SimpleCache-style stats dict)."""
+        with self._lock:
+            overall = self.all_latency.summary()
+            total = self.total_queries
+            # from the running totals: a pre-histogram usage_stats.json has no latency buckets
+            avg = self.total_latency_ms / total if total else 0
+            snapshots = self.snapshots
+        return {
+            'total_queries': total,
+            'avg_latency_ms': round(avg, 1),
+            'p50_ms': overall['p50_ms'],
+            'p95_ms': overall['p95_ms'],
+            'p99_ms': overall['p99_ms'],
+            'snapshots': snapshots,
+        }
+
+    # ---- persistence ----
+    def _load(self, path: str):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.total_queries = int(data.get("total_queries", 0))
+        self.total_latency_ms = float(data.get("total_latency_ms", 0))
+        self.route_counts = dict(data.get("route_counts", {}))
+        self.model_counts = dict(data.get("model_counts", {}))
+        latency = data.get("latency", {})
+        if "all" in latency:
+            self.all_latency = LatencyHistogram.from_dict(latency["all"])
+        self.route_latency = {k: LatencyHistogram.from_dict(v) for k, v in latency.get("route", {}).items()}
+        self.model_latency = {k: LatencyHistogram.from_dict(v) for k, v in latency.get("model", {}).items()}
+
+    def flush(self) -> bool:
+        """Write a snapshot now if anything changed since the last one."""
+        if not self.snapshot_path or self._version == self._saved_version:
+            return False
+        version = self._version
+        data = self.snapshot()
+        tmp = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.snapshot_path)
+        except OSError as e:
+            print(f"⚠️ Stats snapshot failed: {e}")
+            return False
+        self._saved_version = version
+        self.snapshots += 1
+        return True
+
+    def _snapshot_loop(self):
+        while not self._stop.wait(self.snapshot_interval):
+            self.flush()
+
+    def close(self):
+        if hasattr(self, "_stop"):
+            self._stop.set()
+        self.flush()
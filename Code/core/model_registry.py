@@ -0,0 +1,154 @@
+"""
+Model Registry - FYP Version
+Process-wide registry of heavy model handles (SentenceTransformer
+embedder, Tesseract OCR engine).
+Each handle is loaded lazily, exactly once, behind its own lock, and
+records load time and resident memory for the thesis metrics.
+"""
+from typing import Any, Callable, Dict, Optional
+import os
+import threading
+import time
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB (None if it cannot be measured)."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def param_mb(model: Any) -> Optional[float]:
+    """Weight size of a torch model in MB (None for non-torch handles)."""
+    params = getattr(model, "parameters", None)
+    if not callable(params):
+        return None
+    try:
+        return sum(p.numel() * p.element_size() for p in params()) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class ModelHandle:
+    """One lazily loaded model shared by every caller."""
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self._loader = loader
+        self._value = None
+        self._lock = threading.Lock()
+        self.load_ms: Optional[float] = None
+        self.rss_delta_mb: Optional[float] = None
+        self.weights_mb: Optional[float] = None
+        self.requests = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
+
+    def get(self) -> Any:
+        """Return the model, loading it on first use (thread-safe)."""
+        with self._lock:
+            self.requests += 1
+            if self._value is None:
+                before = rss_mb()
+                start = time.perf_counter()
+                value = self._loader()
+                self.load_ms = (time.perf_counter() - start) * 1000
+                after = rss_mb()
+                if before is not None and after is not None:
+                    self.rss_delta_mb = after - before
+                self.weights_mb = param_mb(value)
+                self._value = value
+                print(f"✅ Model loaded: {self.name} ({self.load_ms:.0f} ms)")
+            return self._value
+
+
+class ModelRegistry:
+    """Name -> ModelHandle map; register() is idempotent."""
+
+    def __init__(self):
+        self._handles: Dict[str, ModelHandle] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> ModelHandle:
+        """Register a loader under name (first registration wins)."""
+        with self._lock:
+            if name not in self._handles:
+                self._handles[name] = ModelHandle(name, loader)
+            return self._handles[name]
+
+    def get(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """Shared model for name, registering loader first if given."""
+        if loader is not None:
+            return self.register(name, loader).get()
+        if name not in self._handles:
+            raise KeyError(f"Model '{name}' is not registered")
+        return self._handles[name].get()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-model load time, memory and request counts."""
+        return {
+            name: {
+                'loaded': h.loaded,
+                'load_ms': round(h.load_ms, 1) if h.load_ms is not None else None,
+                'rss_delta_mb': round(h.rss_delta_mb, 1) if h.rss_delta_mb is not None else None,
+                'weights_mb': round(h.weights_mb, 1) if h.weights_mb is not None else None,
+                'requests': h.requests,
+            }
+            for name, h in self._handles.items()
+        }
+
+    def report(self):
+        """Print the model table (startup console)."""
+        def fmt(v, unit):
+            return f"{v:.1f} {unit}" if v is not None else "-"
+
+        print("=" * 60)
+        print("🧠 Models")
+        print("=" * 60)
+        for name, s in self.get_stats().items():
+            state = fmt(s['load_ms'], "ms") if s['loaded'] else "not loaded"
+            print(f"  {name:<30}{state:>12}  RSS +{fmt(s['rss_delta_mb'], 'MB'):>9}")
+        total = rss_mb()
+        if total is not None:
+            print(f"  {'Process RSS':<30}{total:>9.1f} MB")
+        print("=" * 60 + "\n")
+
+
+MODELS = ModelRegistry()
+
+
+# =========================
+# Shared handles
+# =========================
+def sentence_transformer(model_name: str, device: Optional[str] = None):
+    """Shared SentenceTransformer (cuda when available unless device is given)."""
+    def load():
+        from sentence_transformers import SentenceTransformer
+        dev = device
+        if dev is None:
+            import torch
+            dev = "cuda" if torch.cuda.is_available() else "cpu"
+        return SentenceTransformer(model_name, device=dev)
+    return MODELS.get(f"embedder:{model_name}", load)
+
+
+def ocr_engine(tesseract_cmd: Optional[str] = None):
+    """Shared pytesseract module, pointed at tesseract_cmd when that file exists."""
+    def load():
+        import pytesseract
+        if tesseract_cmd and os.path.exists(tesseract_cmd):
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        return pytesseract
+    return MODELS.get("ocr:tesseract", load)
@@ -0,0 +1,175 @@
+"""
+Query Plan - FYP Version
+Logical plans for the QueryIntent executors, run over a BitmapIndex.
+The four executors (percentage / comparison / breakdown / total) each
+re-applied their filters, once per compared value or part/whole side,
+re-parsing month strings on every call. A QueryIntent now compiles into
+one normalised Plan:
+    filter -> group -> aggregate -> rank -> ratio
+  - filter: the base filter shared by every output (evaluated once)
+  - group / pick: one grouped pass yields every compared value
+  - ratio: part and whole are masks over the base rows, summed in the
+    same pass (a percentage no longer filters twice)
+Months are normalised to pd.Period at compile time, so equal questions
+give equal plans and results are cached by the plan itself.
+"""
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .bitmap_index import BitmapIndex, FILTER_COLUMNS, as_period
+
+Items = Tuple[Tuple[str, Any], ...]
+
+# Filter keyword -> column for group / pick (comparison types use the same keys)
+GROUP_COLUMNS = {**FILTER_COLUMNS, 'month': 'YearMonth', 'time': 'YearMonth'}
+
+
+class Plan(NamedTuple):
+    """Normalised logical plan (hashable: used as its own cache key)."""
+    filter: Items                   # base filter, AND of (key, value)
+    measure: str                    # column summed by the aggregate
+    group: Optional[str] = None     # group-by column (None = one total)
+    rank: int = 0                   # top-N groups, largest first (0 = all)
+    pick: Tuple = ()                # group values to read out (comparisons)
+    part: Optional[Items] = None    # ratio numerator filter over the base rows
+    whole: Items = ()               # ratio denominator filter over the base rows
+
+
+def normalise_value(key: str, value):
+    """Month -> Period, month range -> (Period, Period), lists -> tuple."""
+    if key == 'month':
+        try:
+            return as_period(value)
+        except Exception:
+            return str(value)  # left for the DateStr fallback in BitmapIndex.where
+    if key == 'month_range':
+        return tuple(as_period(v) if v is not None else None for v in value)
+    if isinstance(value, (list, set)):
+        return tuple(sorted(value))
+    return value
+
+
+def normalise(filters: Optional[Dict]) -> Items:
+    """Filter dict -> sorted (key, value) items, empty values dropped."""
+    return tuple(sorted((k, normalise_value(k, v)) for k, v in (filters or {}).items() if v))
+
+
+# =========================
+# Compilers (one per intent type)
+# =========================
+def total_plan(filters: Dict, measure: str) -> Plan:
+    return Plan(normalise(filters), measure)
+
+
+def breakdown_plan(filters: Dict, group: str, measure: str, rank: int = 0) -> Plan:
+    return Plan(normalise(filters), measure, group=group, rank=rank)
+
+
+def comparison_plan(filters: Dict, key: str, values: Iterable, measure: str) -> Plan:
+    """Compare values of one dimension: group by it under the other filters."""
+    base = {k: v for k, v in (filters or {}).items() if k != key and not (key == 'time' and k == 'month')}
+    pick_key = 'month' if key == 'time' else key
+    return Plan(normalise(base), measure, group=GROUP_COLUMNS[key],
+                pick=tuple(normalise_value(pick_key, v) for v in values))
+
+
+def percentage_plan(part: Dict, whole: Dict, measure: str) -> Plan:
+    """part / whole over their common filter (usually whole is a subset of part)."""
+    part_items, whole_items = set(normalise(part)), set(normalise(whole))
+    common = part_items & whole_items
+    return Plan(tuple(sorted(common)), measure,
+                part=tuple(sorted(part_items - common)), whole=tuple(sorted(whole_items - common)))
+
+
+# =========================
+# Engine
+# =========================
+class QueryEngine:
+    """Executes Plans over a BitmapIndex, caching results by plan."""
+
+    def __init__(self, index: BitmapIndex, cache=None, namespace: str = "plans"):
+        """
+        Args:
+            index: Bitmap index over the frame being queried
+            cache: CacheEngine / SimpleCache-like store (None = no caching)
+            namespace: Cache namespace for plan results
+        """
+        self.index = index
+        self.cache = cache
+        self.namespace = namespace
+        self.executed = 0
+
+    def run(self, plan: Plan) -> Dict:
+        """
+        Result dict (treat as read-only, it may be shared from the cache):
+            total, rows             - aggregate over the base filter
+            groups, top, group_rows - SUM per group largest first, top-N, rows per group
+            picked                  - [(value, total, rows)] in pick order
+            part, whole             - (total, rows) for ratio plans
+        """
+        if self.cache is None:
+            return self._execute(plan)
+        result = self.cache.get(plan, namespace=self.namespace)
+        if result is None:
+            result = self._execute(plan)
+            self.cache.set(plan, result, namespace=self.namespace)
+        return result
+
+    def _execute(self, plan: Plan) -> Dict:
+        self.executed += 1
+        idx = self.index
+        pos = idx.where(dict(plan.filter)).positions()
+        values = idx.measure(plan.measure)[pos]
+        result = {'total': float(np.nansum(values)), 'rows': len(pos)}
+
+        if plan.group is not None:
+            codes = idx.codes(plan.group)[pos]
+            labels = idx.values(plan.group)
+            keep = codes >= 0
+            sums = np.bincount(codes[keep], weights=np.nan_to_num(values[keep]), minlength=len(labels))
+            counts = np.bincount(codes[keep], minlength=len(labels))
+            present = counts > 0
+            groups = pd.Series(sums[present], index=labels[present], name=plan.measure)
+            groups = groups.rename_axis(plan.group).sort_values(ascending=False)
+            result['groups'] = groups
+            result['group_rows'] = pd.Series(counts[present], index=labels[present])
+            result['top'] = groups.head(plan.rank) if plan.rank else groups
+            picked = []
+            for value in plan.pick:
+                try:
+                    code = idx.code_of(plan.group, value)
+                except Exception:
+                    code = -1
+                picked.append((value, float(sums[code]) if code >= 0 else 0.0,
+                               int(counts[code]) if code >= 0 else 0))
+            result['picked'] = picked
+
+        if plan.part is not None:
+            for side in ('part', 'whole'):
+                mask = self._mask_over(pos, getattr(plan, side))
+                result[side] = (float(np.nansum(values[mask])), int(mask.sum()))
+        return result
+
+    def _mask_over(self, pos: np.ndarray, items: Items) -> np.ndarray:
+        """AND of filter items as a mask over the base rows (code compares, no rescan)."""
+        idx = self.index
+        mask = np.ones(len(pos), dtype=bool)
+        for key, value in items:
+            col = GROUP_COLUMNS.get(key)
+            simple = col in idx and not isinstance(value, tuple) and not (key == 'month' and isinstance(value, str))
+            if simple:
+                code = idx.code_of(col, value)
+                if code < 0:  # value never occurs (-1 is also the NaN code): no rows
+                    return np.zeros(len(pos), dtype=bool)
+                mask &= idx.codes(col)[pos] == code
+            else:
+                mask &= idx.where({key: value}).mask()[pos]
+        return mask
+
+    def get_stats(self) -> Dict:
+        stats = {'executed': self.executed}
+        if self.cache is not None:
+            stats['cached_plans'] = self.cache.get_stats().get('namespaces', {}).get(self.namespace, {})
+        return stats
@@ -0,0 +1,249 @@
+"""
+Request Scheduler - FYP Version
+Per-request cancellation and separate concurrency pools for the Gradio app.
+  - CancelToken per request (keyed by Gradio session), replacing the
+    process-wide GLOBAL_STOP_REQUESTED event: Stop only cancels the
+    caller's own answer
+  - "kpi" pool (deterministic pandas answers, many slots) and "llm" pool
+    (retrieval + Ollama generation, few slots), so a KPI question never
+    waits behind 40-second generations
+  - FIFO queue per pool; every ticket records the queue depth it saw
+    and how long it waited (shown in ToolTrace)
+"""
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+import threading
+import time
+
+DEFAULT_LIMITS = {'kpi': 8, 'llm': 2}
+
+# Routes answered without an LLM call
+KPI_ROUTES = {'sales_kpi', 'hr_kpi', 'ceo_strategic', 'validation'}
+
+
+class RequestCancelled(Exception):
+    """Raised when a request's CancelToken is set while it waits for a slot."""
+
+
+class CancelToken:
+    """Per-request stop flag (threading.Event API: is_set / set / wait)."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def set(self, reason: str = "stop"):
+        if self.reason is None:
+            self.reason = reason
+        self._event.set()
+
+    cancel = set
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._event.wait(timeout)
+
+    def check(self):
+        if self._event.is_set():
+            raise RequestCancelled(self.reason or "stop")
+
+
+class Ticket:
+    """One request's place in a pool queue."""
+
+    def __init__(self, pool: str, token: Optional[CancelToken], depth: int):
+        self.pool = pool
+        self.token = token
+        self.depth = depth          # requests ahead (running + queued) on arrival
+        self.queued_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self.released = False
+
+    @property
+    def wait_ms(self) -> int:
+        end = self.started_at if self.started_at is not None else time.perf_counter()
+        return int((end - self.queued_at) * 1000)
+
+    def to_trace(self) -> Dict:
+        return {'pool': self.pool, 'queue_depth': self.depth, 'wait_ms': self.wait_ms}
+
+
+class _Pool:
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, int(limit))
+        self.active = 0
+        self.queue: deque = deque()
+        self.cond = threading.Condition()
+        self.completed = 0
+        self.cancelled = 0
+        self.total_wait_ms = 0
+        self.max_wait_ms = 0
+
+
+class RequestScheduler:
+    """Bounded FIFO pools + per-session cancellation tokens."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, poll_interval: float = 0.1):
+        """
+        Args:
+            limits: Pool name -> max concurrent requests
+            poll_interval: How often a queued request re-checks its token
+        """
+        self.pools = {name: _Pool(name, n) for name, n in (limits or DEFAULT_LIMITS).items()}
+        self.poll_interval = poll_interval
+        self._tokens: Dict[str, CancelToken] = {}
+        self._tokens_lock = threading.Lock()
+
+    @property
+    def max_concurrency(self) -> int:
+        """Worker threads needed so every pool can fill (Gradio queue limit)."""
+        return sum(p.limit for p in self.pools.values())
+
+    @staticmethod
+    def pool_for(route: str) -> str:
+        return 'kpi' if route in KPI_ROUTES else 'llm'
+
+    # ---- cancellation ----
+    def start_request(self, session_id: str) -> CancelToken:
+        """Fresh token for a session's new request (its older token is left alone)."""
+        token = CancelToken()
+        with self._tokens_lock:
+            self._tokens[session_id] = token
+        return token
+
+    def token(self, session_id: str) -> CancelToken:
+        """The session's current token (created if the session has none)."""
+        with self._tokens_lock:
+            token = self._tokens.get(session_id)
+            if token is None:
+                token = self._tokens[session_id] = CancelToken()
+            return token
+
+    def finish_request(self, session_id: str, token: Optional[CancelToken] = None):
+        """
+        Forget a session's token once its request is done, so idle sessions
+        don't keep one each. A newer token (the session's next request) is kept.
+        """
+        with self._tokens_lock:
+            if token is None or self._tokens.get(session_id) is token:
+                self._tokens.pop(session_id, None)
+
+    def cancel(self, session_id: str, reason: str = "stop") -> bool:
+        """Cancel one session's in-flight request. Returns False if it had none."""
+        with self._tokens_lock:
+            token = self._tokens.get(session_id)
+        if token is None:
+            return False
+        token.set(reason)
+        for pool in self.pools.values():
+            with pool.cond:
+                pool.cond.notify_all()
+        return True
+
+    # ---- slots ----
+    def enqueue(self, pool: str, token: Optional[CancelToken] = None) -> Ticket:
+        p = self.pools[pool]
+        with p.cond:
+            ticket = Ticket(pool, token, p.active + len(p.queue))
+            p.queue.append(ticket)
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        """Requests still ahead of a queued ticket (0 once it runs)."""
+        p = self.pools[ticket.pool]
+        with p.cond:
+            if ticket.started_at is not None or ticket not in p.queue:
+                return 0
+            return p.active + p.queue.index(ticket)
+
+    def acquire(self, ticket: Ticket, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the ticket's turn (FIFO) and a free slot.
+
+        Returns:
+            True once running, False if timeout passed first (still queued)
+
+        Raises:
+            RequestCancelled: the ticket's token was set while waiting
+        """
+        p = self.pools[ticket.pool]
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with p.cond:
+            while True:
+                if ticket.token is not None and ticket.token.is_set():
+                    self._drop(p, ticket)
+                    p.cancelled += 1
+                    raise RequestCancelled(ticket.token.reason or "stop")
+                if p.active < p.limit and p.queue and p.queue[0] is ticket:
+                    p.queue.popleft()
+                    p.active += 1
+                    ticket.started_at = time.perf_counter()
+                    p.total_wait_ms += ticket.wait_ms
+                    p.max_wait_ms = max(p.max_wait_ms, ticket.wait_ms)
+                    p.cond.notify_all()
+                    return True
+                wait = self.poll_interval
+                if deadline is not None:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                p.cond.wait(wait)
+
+    def release(self, ticket: Ticket):
+        """Free the slot (or leave the queue if it never ran). Safe to call twice."""
+        p = self.pools[ticket.pool]
+        with p.cond:
+            if ticket.released:
+                return
+            ticket.released = True
+            if ticket.started_at is None:
+                self._drop(p, ticket)
+            else:
+                p.active -= 1
+                p.completed += 1
+            p.cond.notify_all()
+
+    @staticmethod
+    def _drop(p: _Pool, ticket: Ticket):
+        try:
+            p.queue.remove(ticket)
+        except ValueError:
+            pass
+        ticket.released = True
+
+    @contextmanager
+    def slot(self, pool: str, token: Optional[CancelToken] = None, trace=None):
+        """
+        Run a block inside a pool slot (blocks while queued).
+        trace.queue is set to {pool, queue_depth, wait_ms} once it starts.
+        """
+        ticket = self.enqueue(pool, token)
+        try:
+            self.acquire(ticket)
+            if trace is not None:
+                trace.queue = ticket.to_trace()
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def get_stats(self) -> Dict:
+        """Per-pool limit / active / waiting / completed / wait times."""
+        stats = {}
+        for name, p in self.pools.items():
+            with p.cond:
+                started = p.completed + p.active
+                stats[name] = {
+                    'limit': p.limit,
+                    'active': p.active,
+                    'waiting': len(p.queue),
+                    'completed': p.completed,
+                    'cancelled': p.cancelled,
+                    'avg_wait_ms': round(p.total_wait_ms / started, 1) if started else 0,
+                    'max_wait_ms': p.max_wait_ms,
+                }
+        return stats
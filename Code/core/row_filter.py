@@ -0,0 +1,134 @@
+"""
+Row Filter - FYP Version
+Filter results as row positions over the immutable base frame.
+apply_filters_to_dataframe() and get_cached_sales_subset() used to start
+with df.copy() (a full 30k-row deep copy) and cache whole filtered frames.
+Now:
+  - one boolean bitmap per (dimension, value), built once and cached
+  - compound filters = AND of the cached bitmaps
+    (state=Selangor & product=X & month=2024-06), cached as int32 positions
+  - view() materialises a frame (optionally only some columns) when a
+    handler needs one; total() sums straight off the column arrays
+Given a BitmapIndex built at load, bitmaps come from the index instead
+of being built lazily, and group_sum() aggregates over the positions.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .bitmap_index import BitmapIndex, FILTER_COLUMNS, as_period
+from .columnar_store import code_mask
+
+
+def filter_key(filters: Dict) -> str:
+    """Canonical cache key for a filter dict (empty values ignored, order-free)."""
+    parts = [f"{k}:{v}" for k, v in sorted(filters.items()) if v]
+    return "|".join(parts) if parts else "all_data"
+
+
+class RowFilter:
+    """Cached bitmaps and row positions over one base DataFrame."""
+
+    def __init__(self, df: pd.DataFrame, cache=None, namespace: str = "rows",
+                 index: Optional[BitmapIndex] = None):
+        """
+        Args:
+            df: Base frame (never modified or copied)
+            cache: CacheEngine / SimpleCache-like store (None = no caching)
+            namespace: Prefix for the bitmap / position namespaces in cache
+            index: Bitmap index over df (None = build bitmaps lazily)
+        """
+        self.df = df
+        self.cache = cache
+        self.index = index
+        self.bitmap_ns = f"{namespace}_bitmap"
+        self.rows_ns = f"{namespace}_rows"
+        self._all = np.arange(len(df), dtype=np.int32)
+
+    # ---- cache helpers ----
+    def _cached(self, namespace: str, key: str, build):
+        if self.cache is None:
+            return build()
+        value = self.cache.get(key, namespace=namespace)
+        if value is None:
+            value = build()
+            self.cache.set(key, value, namespace=namespace)
+        return value
+
+    # ---- bitmaps ----
+    def bitmap(self, key: str, value) -> Optional[np.ndarray]:
+        """Boolean row mask for one filter (None if the filter does not apply to this frame)."""
+        if key in FILTER_COLUMNS:
+            if FILTER_COLUMNS[key] not in self.df.columns:
+                return None
+        elif key not in ('month', 'month_range'):
+            return None
+        return self._cached(self.bitmap_ns, f"{key}={value}", lambda: self._build_bitmap(key, value))
+
+    def _build_bitmap(self, key: str, value) -> np.ndarray:
+        df = self.df
+        if key in FILTER_COLUMNS:
+            return code_mask(df[FILTER_COLUMNS[key]], value)
+        if key == 'month_range':
+            start, end = value
+            months = df['YearMonth']
+            return ((months >= start) & (months <= end)).to_numpy()
+        # month: YearMonth (Period), falling back to a DateStr substring match
+        if 'YearMonth' in df.columns:
+            try:
+                return (df['YearMonth'] == as_period(value)).to_numpy()
+            except Exception:
+                date_str = str(value).replace('-', '')
+                if len(date_str) == 6:  # 202406
+                    date_str = f"{date_str[:4]}-{date_str[4:]}"  # 2024-06
+        else:
+            date_str = value.strftime('%Y-%m') if hasattr(value, 'to_timestamp') else str(value)
+        if 'DateStr' not in df.columns:
+            return np.ones(len(df), dtype=bool)
+        return df['DateStr'].str.contains(date_str, na=False).to_numpy()
+
+    # ---- row positions ----
+    def positions(self, filters: Dict, cache_key: Optional[str] = None) -> np.ndarray:
+        """Sorted int32 row positions matching every filter (AND of bitmaps)."""
+        active = {k: v for k, v in (filters or {}).items() if v}
+        if not active:
+            return self._all
+        key = cache_key or filter_key(active)
+        return self._cached(self.rows_ns, key, lambda: self._intersect(active))
+
+    def _intersect(self, active: Dict) -> np.ndarray:
+        if self.index is not None:
+            return self.index.where(active).positions()
+        masks = [m for m in (self.bitmap(k, v) for k, v in active.items()) if m is not None]
+        if not masks:
+            return self._all
+        mask = masks[0] if len(masks) == 1 else np.logical_and.reduce(masks)
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def count(self, filters: Dict) -> int:
+        return len(self.positions(filters))
+
+    # ---- materialisation ----
+    def view(self, filters: Dict, columns: Optional[Iterable[str]] = None,
+             cache_key: Optional[str] = None) -> pd.DataFrame:
+        """Filtered frame (original index kept); only `columns` if given."""
+        pos = self.positions(filters, cache_key)
+        frame = self.df if columns is None else self.df[list(columns)]
+        return frame.iloc[pos]
+
+    def column(self, filters: Dict, col: str) -> np.ndarray:
+        """Values of one column for the matching rows, without building a frame."""
+        return self.df[col].to_numpy()[self.positions(filters)]
+
+    def total(self, filters: Dict, value_col: str) -> Tuple[float, int]:
+        """(sum of value_col, matching rows), NaN treated as 0 like pandas .sum()."""
+        values = self.column(filters, value_col)
+        return float(np.nansum(values)) if len(values) else 0.0, len(values)
+
+    def group_sum(self, filters: Dict, by: str, value_col: str) -> pd.Series:
+        """SUM(value_col) GROUP BY by for the matching rows, largest first."""
+        if self.index is not None and by in self.index:
+            return self.index.group_sum(self.positions(filters), by, value_col)
+        view = self.view(filters, [by, value_col])
+        return view.groupby(by, observed=True)[value_col].sum().sort_values(ascending=False)
@@ -0,0 +1,65 @@
+"""
+Row Serializer - FYP Version
+Column-wise builder for the [SALES] / [HR] row texts of the RAG corpus.
+Produces exactly the same strings as the original per-row f-strings over
+df.iterrows(), but reads each column once instead of building a Series
+per row.
+"""
+from typing import List, Sequence, Tuple
+
+import pandas as pd
+
+# (label, column) pairs in output order
+SALES_ROW_FIELDS = [
+    ('Date', 'DateStr'), ('State', 'State'), ('Branch', 'Branch'),
+    ('Product', 'Product'), ('Qty', 'Quantity'), ('UnitPrice', 'Unit Price'),
+    ('TotalSale', 'Total Sale'), ('Channel', 'Channel'), ('Payment', 'PaymentMethod'),
+    ('Employee', 'Employee'),
+]
+HR_ROW_FIELDS = [
+    ('EmpID', 'EmpID'), ('State', 'State'), ('Branch', 'Branch'),
+    ('Department', 'Department'), ('JobRole', 'JobRole'), ('Age', 'Age'),
+    ('AgeGroup', 'AgeGroup'), ('MonthlyIncome', 'MonthlyIncome'),
+    ('OverTime', 'OverTime'), ('Attrition', 'Attrition'), ('YearsAtCompany', 'YearsAtCompany'),
+]
+
+
+def _column_text(df: pd.DataFrame, col: str) -> List[str]:
+    """
+    str() of every value in a column, as iterrows + r.get(col, '') would give.
+
+    tolist() yields the same Python scalars iterrows puts in its row Series
+    for a mixed-dtype frame (int, float, str, NaN), so str() matches the
+    f-string output. Missing columns give '' like r.get(col, '').
+    """
+    if col not in df.columns:
+        return [''] * len(df)
+    return [str(v) for v in df[col].tolist()]
+
+
+def serialize_rows(df: pd.DataFrame, prefix: str, fields: Sequence[Tuple[str, str]]) -> List[str]:
+    """
+    Build one "<prefix> Label=value; Label=value; ..." text per row.
+
+    Args:
+        df: Sales or HR DataFrame
+        prefix: Row tag, e.g. "[SALES] "
+        fields: (label, column) pairs (SALES_ROW_FIELDS / HR_ROW_FIELDS)
+
+    Returns:
+        List of row texts in DataFrame order
+    """
+    template = prefix + "; ".join(f"{label}={{}}" for label, _ in fields)
+    columns = [_column_text(df, col) for _, col in fields]
+    return [template.format(*values) for values in zip(*columns)]
+
+
+def sales_row_texts(df_sales: pd.DataFrame) -> List[str]:
+    """[SALES] corpus texts for every transaction."""
+    return serialize_rows(df_sales, "[SALES] ", SALES_ROW_FIELDS)
+
+
+def hr_row_texts(df_hr: pd.DataFrame) -> List[str]:
+    """[HR] corpus texts for every employee."""
+    return serialize_rows(df_hr, "[HR] ", HR_ROW_FIELDS)
+
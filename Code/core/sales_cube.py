@@ -0,0 +1,153 @@
+"""
+Sales KPI Cube - FYP Version
+Pre-aggregated SUM(Total Sale), SUM(Quantity) and row counts grouped by
+YearMonth x State x Branch x Product x Employee x Channel.
+Built once at startup so KPI answers never scan the raw sales frame.
+Cells are selected through a BitmapIndex over the cell dimensions, so a
+month / range / filter slice is a few bitmap ANDs, not a mask scan.
+"""
+from typing import Dict, List, Optional, Tuple
+import time
+
+import pandas as pd
+
+from .bitmap_index import Bitmap, BitmapIndex
+
+
+class SalesCube:
+    """Month-partitioned aggregate cube over the sales transactions."""
+
+    DIMENSIONS = ['YearMonth', 'State', 'Branch', 'Product', 'Employee', 'Channel']
+    MEASURES = ['Total Sale', 'Quantity']
+    ROWS = 'Rows'
+
+    # Filter keyword -> cube column (same names used by extract_sales_filters)
+    FILTER_COLUMNS = {
+        'state': 'State',
+        'branch': 'Branch',
+        'product': 'Product',
+        'employee': 'Employee',
+        'channel': 'Channel',
+    }
+
+    def __init__(self, df_sales: pd.DataFrame):
+        """
+        Build cube from the loaded sales DataFrame.
+
+        Args:
+            df_sales: Sales data with YearMonth column already derived
+        """
+        start = time.perf_counter()
+
+        self.dimensions = [d for d in self.DIMENSIONS if d in df_sales.columns]
+        measures = [m for m in self.MEASURES if m in df_sales.columns]
+
+        agg = {m: (m, 'sum') for m in measures}
+        agg[self.ROWS] = (measures[0], 'size')
+        self._cells = (
+            df_sales.groupby(self.dimensions, observed=True, dropna=False, sort=True)
+            .agg(**agg)
+            .reset_index()
+        )
+
+        # One partition per month: single-month questions only touch their own cells
+        self._months: Dict[pd.Period, pd.DataFrame] = {
+            m: part.reset_index(drop=True)
+            for m, part in self._cells.groupby('YearMonth', observed=True, sort=True)
+        }
+        self.index = BitmapIndex(self._cells, self.dimensions)
+
+        self.source_rows = len(df_sales)
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    @property
+    def months(self) -> List[pd.Period]:
+        """Months available in the cube (sorted)."""
+        return list(self._months.keys())
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def slice(self, month: Optional[pd.Period] = None,
+              start: Optional[pd.Period] = None,
+              end: Optional[pd.Period] = None,
+              **filters) -> pd.DataFrame:
+        """
+        Get cube cells for one month or an inclusive month range.
+
+        Args:
+            month: Single month (takes priority over start/end)
+            start, end: Inclusive month range (either side may be open)
+            **filters: state/branch/product/employee/channel (None = no filter)
+
+        Returns:
+            DataFrame of cube cells (dimension columns + measures + Rows)
+        """
+        pos = self.select(month, start, end, **filters).positions()
+        return self._cells.iloc[pos].reset_index(drop=True)
+
+    def select(self, month: Optional[pd.Period] = None,
+               start: Optional[pd.Period] = None,
+               end: Optional[pd.Period] = None,
+               **filters) -> Bitmap:
+        """Bitmap of the cube cells in a slice (same arguments as slice())."""
+        if month is not None:
+            sel = self.index.eq('YearMonth', month)
+        elif start is not None or end is not None:
+            sel = self.index.between('YearMonth', start, end)
+        else:
+            sel = self.index.all()
+        for key, value in filters.items():
+            col = self.FILTER_COLUMNS.get(key, key)
+            if value and col in self.index:
+                sel = sel & self.index.eq(col, value)
+        return sel
+
+    @classmethod
+    def rows(cls, cells: pd.DataFrame) -> int:
+        """Number of raw transactions behind a set of cube cells."""
+        return int(cells[cls.ROWS].sum())
+
+    def total(self, value_col: str, **slice_args) -> Tuple[float, int]:
+        """
+        SUM(value_col) and row count for a slice.
+
+        Returns:
+            (total value, transactions)
+        """
+        pos = self.select(**slice_args).positions()
+        return self.index.sum(pos, value_col), int(self.index.sum(pos, self.ROWS))
+
+    def group_sum(self, dim: str, value_col: str, **slice_args) -> Tuple[pd.Series, int]:
+        """
+        SUM(value_col) GROUP BY dim for a slice, largest first.
+
+        Returns:
+            (sorted Series indexed by dim, transactions)
+        """
+        pos = self.select(**slice_args).positions()
+        return self.index.group_sum(pos, dim, value_col), int(self.index.sum(pos, self.ROWS))
+
+    def monthly(self, value_col: str) -> pd.Series:
+        """SUM(value_col) GROUP BY YearMonth across the whole dataset."""
+        return pd.Series(
+            {m: part[value_col].sum() for m, part in self._months.items()},
+            name=value_col,
+        ).rename_axis('YearMonth')
+
+    def monthly_rows(self) -> pd.Series:
+        """Transaction count per YearMonth."""
+        return pd.Series(
+            {m: int(part[self.ROWS].sum()) for m, part in self._months.items()},
+            name=self.ROWS,
+        ).rename_axis('YearMonth')
+
+    def get_stats(self) -> Dict[str, float]:
+        """Cube size statistics for thesis metrics."""
+        return {
+            'source_rows': self.source_rows,
+            'cells': len(self._cells),
+            'months': len(self._months),
+            'compression_ratio': round(self.source_rows / max(len(self._cells), 1), 2),
+            'build_ms': round(self.build_ms, 2),
+        }
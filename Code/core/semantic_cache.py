@@ -0,0 +1,130 @@
+"""
+Semantic Answer Cache - FYP Version
+Reuses LLM answers for near-identical questions ("annual leave
+entitlement" vs "how many days annual leave").
+A stored answer is returned when the new query embedding is within a
+cosine threshold of a cached query with the same route, model and
+corpus version. Entries expire by TTL and are evicted LRU.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+
+def corpus_version(chunks: Iterable[str]) -> str:
+    """Fingerprint of the RAG corpus (changes when any chunk changes)."""
+    h = hashlib.blake2b(digest_size=8)
+    for chunk in chunks:
+        h.update(chunk.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SemanticAnswerCache:
+    """LRU + TTL cache of (query vector -> answer) per route/model/corpus."""
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 500,
+                 ttl_seconds: int = 24 * 3600):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a hit (normalised vectors)
+            max_entries: LRU capacity across all routes/models
+            ttl_seconds: Entry lifetime
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _scope(route: str, model: str, version: str) -> Tuple[str, str, str]:
+        return (route, model, version)
+
+    def lookup(self, q_vec: np.ndarray, route: str, model: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Best cached answer for a query vector, or None.
+
+        Returns:
+            {'answer', 'query', 'similarity', 'age_s'} on a hit
+        """
+        scope = self._scope(route, model, version)
+        now = time.time()
+        q = np.asarray(q_vec, dtype=np.float32).ravel()
+
+        with self._lock:
+            expired = [eid for eid, e in self._entries.items() if now - e['timestamp'] > self.ttl]
+            for eid in expired:
+                del self._entries[eid]
+
+            candidates = [(eid, e) for eid, e in self._entries.items() if e['scope'] == scope]
+            if not candidates:
+                self._misses += 1
+                return None
+
+            sims = np.vstack([e['vector'] for _, e in candidates]) @ q
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                self._misses += 1
+                return None
+
+            eid, entry = candidates[best]
+            self._entries.move_to_end(eid)
+            self._hits += 1
+            return {
+                'answer': entry['answer'],
+                'query': entry['query'],
+                'similarity': float(sims[best]),
+                'age_s': round(now - entry['timestamp'], 1),
+            }
+
+    def store(self, q_vec: np.ndarray, query: str, answer: str,
+              route: str, model: str, version: str):
+        """Cache an answer (empty / error answers are ignored)."""
+        if not answer or answer.startswith(("❌", "⚠️", "Error")):
+            return
+        with self._lock:
+            self._entries[self._next_id] = {
+                'scope': self._scope(route, model, version),
+                'vector': np.asarray(q_vec, dtype=np.float32).ravel().copy(),
+                'query': query,
+                'answer': answer,
+                'timestamp': time.time(),
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, version: Optional[str] = None):
+        """Drop entries for a corpus version (None = everything)."""
+        with self._lock:
+            if version is None:
+                self._entries.clear()
+                return
+            for eid in [eid for eid, e in self._entries.items() if e['scope'][2] == version]:
+                del self._entries[eid]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics for thesis metrics."""
+        total = self._hits + self._misses
+        hit_rate = (self._hits / total * 100) if total > 0 else 0
+
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'total_requests': total,
+            'hit_rate_percent': round(hit_rate, 2),
+            'cache_size': len(self._entries),
+            'evictions': self._evictions,
+            'threshold': self.threshold,
+            'ttl_seconds': self.ttl,
+        }
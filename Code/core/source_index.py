@@ -0,0 +1,100 @@
+"""
+Source Index - FYP Version
+Per-source FAISS sub-indexes for the RAG corpus ([DOC:...], [SALES], [HR]).
+mode="docs" searches only the small docs index (always k doc chunks);
+mode="all" searches every sub-index and merges the hits by score.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Corpus tag -> source name (order = merge tie-break order)
+SOURCE_PREFIXES = [
+    ('[DOC:', 'docs'),
+    ('[SALES]', 'sales'),
+    ('[HR]', 'hr'),
+]
+
+# Router mode -> sub-indexes searched
+MODE_SOURCES = {
+    'docs': ['docs'],
+    'sales': ['sales'],
+    'hr': ['hr'],
+    'all': ['docs', 'sales', 'hr', 'other'],
+}
+
+
+def source_of(text: str) -> str:
+    """Source name of a corpus chunk ('other' if untagged)."""
+    for prefix, source in SOURCE_PREFIXES:
+        if text.startswith(prefix):
+            return source
+    return 'other'
+
+
+def flat_ip_index(vectors: np.ndarray, name: str = "rag"):
+    """Exact inner-product index (cosine on normalised vectors)."""
+    import faiss
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    return index
+
+
+class SourceIndex:
+    """One FAISS index per corpus source with a mode-aware search."""
+
+    def __init__(self, texts: Sequence[str], vectors: np.ndarray,
+                 make_index: Optional[Callable[[np.ndarray, str], object]] = None):
+        """
+        Split the corpus by source and build a sub-index for each.
+
+        Args:
+            texts: RAG chunks (summaries), aligned with vectors
+            vectors: float32 embeddings, one row per text
+            make_index: (vectors, source name) -> FAISS index
+                (default: flat_ip_index; see core.ann_index.index_factory)
+        """
+        make_index = make_index or flat_ip_index
+        rows: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            rows.setdefault(source_of(text), []).append(i)
+
+        self.texts: Dict[str, List[str]] = {}
+        self.indexes: Dict[str, object] = {}
+        for source, ids in rows.items():
+            self.texts[source] = [texts[i] for i in ids]
+            self.indexes[source] = make_index(np.ascontiguousarray(vectors[ids]), source)
+
+    @property
+    def ntotal(self) -> int:
+        """Total vectors across all sub-indexes."""
+        return sum(int(ix.ntotal) for ix in self.indexes.values())
+
+    def sizes(self) -> Dict[str, int]:
+        """Vectors per source (for startup logging)."""
+        return {source: int(ix.ntotal) for source, ix in self.indexes.items()}
+
+    def search(self, q_emb: np.ndarray, k: int, mode: str = "all") -> List[Tuple[float, str]]:
+        """
+        Top-k chunks for a query embedding.
+
+        Args:
+            q_emb: Query embedding, shape (1, dim), normalised like the corpus
+            k: Number of chunks to return (fewer only if the sources hold fewer)
+            mode: "docs" / "sales" / "hr" / "all"
+
+        Returns:
+            [(score, text)] best first
+        """
+        hits: List[Tuple[float, str]] = []
+        for source in MODE_SOURCES.get(mode, MODE_SOURCES['all']):
+            index = self.indexes.get(source)
+            if index is None or index.ntotal == 0:
+                continue
+            scores, idx = index.search(q_emb, min(k, int(index.ntotal)))
+            texts = self.texts[source]
+            hits.extend((float(s), texts[i]) for s, i in zip(scores[0], idx[0]) if i != -1)
+
+        # Merge by score (stable: a single source keeps FAISS order)
+        hits.sort(key=lambda h: h[0], reverse=True)
+        return hits[:k]
@@ -0,0 +1,82 @@
+"""
+Stream Events - FYP Version
+Typed events for streaming answers from the generator to the UI.
+The generators used to yield the whole answer so far for every token
+(out += token; yield out.strip()) and to send progress as text markers
+("_HEARTBEAT_n|elapsed_", "_LLM_WAIT_n_") that the UI string-matched.
+Now:
+  - delta: only the new token(s)
+  - heartbeat: out-of-band progress (phase queue / retrieval / llm)
+  - status: a note for the status badge
+  - final: the complete answer (cache hit, error text, or end of stream)
+AnswerBuffer keeps deltas in a list and joins them only when the UI
+flushes (once per tick), so an answer is no longer copied once per token.
+"""
+from typing import Iterable, NamedTuple
+
+DELTA = "delta"
+HEARTBEAT = "heartbeat"
+STATUS = "status"
+FINAL = "final"
+
+
+class StreamEvent(NamedTuple):
+    kind: str
+    text: str = ""        # delta: new text, final: full answer, status: note
+    phase: str = ""       # heartbeat / status: "queue", "retrieval" or "llm"
+    count: int = 0        # heartbeat number (queue: requests ahead)
+    elapsed: float = 0.0  # seconds spent in this phase
+
+
+def delta(text: str) -> StreamEvent:
+    return StreamEvent(DELTA, text)
+
+
+def heartbeat(phase: str, count: int = 0, elapsed: float = 0.0) -> StreamEvent:
+    return StreamEvent(HEARTBEAT, "", phase, count, elapsed)
+
+
+def status(note: str, phase: str = "") -> StreamEvent:
+    return StreamEvent(STATUS, note, phase)
+
+
+def final(text: str) -> StreamEvent:
+    return StreamEvent(FINAL, text)
+
+
+class AnswerBuffer:
+    """Streamed answer as a list of parts; joined lazily on read."""
+
+    def __init__(self):
+        self._parts = []
+        self.deltas = 0
+        self.finished = False
+
+    def feed(self, event: StreamEvent) -> bool:
+        """Apply a delta / final event. Returns True if the text changed."""
+        if event.kind == DELTA and event.text:
+            self._parts.append(event.text)
+            self.deltas += 1
+            return True
+        if event.kind == FINAL:
+            self._parts = [event.text]
+            self.finished = True
+            return True
+        return False
+
+    def text(self) -> str:
+        """The answer so far (parts are collapsed, so re-reads are cheap)."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def __bool__(self) -> bool:
+        return any(self._parts)
+
+
+def collect_text(events: Iterable[StreamEvent]) -> str:
+    """Drain a stream and return the answer (for tests / batch evaluation)."""
+    buffer = AnswerBuffer()
+    for event in events:
+        buffer.feed(event)
+    return buffer.text()
@@ -0,0 +1,70 @@
+"""
+Migrate storage/chats/*.json into the SQLite chat store (storage/chats.db)
+Imports every JSON thread (title, starred, timestamps, messages, tool
+traces), then reloads each one from the database and checks it matches
+the file. The JSON files are left in place.
+
+Usage:
+    python migrate_chats_to_sqlite.py [--chats-dir storage/chats] [--db storage/chats.db] [--overwrite]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.chat_store import ChatStore
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORAGE_DIR = os.path.join(BASE_DIR, "storage")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate JSON chats to SQLite")
+    parser.add_argument("--chats-dir", default=os.path.join(STORAGE_DIR, "chats"))
+    parser.add_argument("--db", default=os.path.join(STORAGE_DIR, "chats.db"))
+    parser.add_argument("--overwrite", action="store_true", help="Re-import chats already in the database")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🗄️  CHAT MIGRATION: JSON → SQLite")
+    print("=" * 80)
+    print(f"Source: {args.chats_dir}")
+    print(f"Target: {args.db}")
+
+    store = ChatStore(args.db)
+    start = time.perf_counter()
+    stats = store.import_json_dir(args.chats_dir, overwrite=args.overwrite)
+    elapsed = time.perf_counter() - start
+
+    # Verify: every JSON thread reloads identically
+    mismatched = []
+    for fname in sorted(os.listdir(args.chats_dir)):
+        if not fname.endswith(".json") or fname in stats["failed"]:
+            continue
+        with open(os.path.join(args.chats_dir, fname), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        chat = store.load_chat(data.get("chat_id") or fname[:-5])
+        expected = {**data, "starred": bool(data.get("starred", False))}
+        if chat is None or any(chat.get(k) != expected.get(k) for k in
+                               ("title", "starred", "created_at", "updated_at", "messages", "tool_traces")):
+            mismatched.append(fname)
+
+    print(f"Imported: {stats['imported']} | Skipped (already present): {stats['skipped']} | "
+          f"Failed: {len(stats['failed'])} | {elapsed * 1000:.0f} ms")
+    for fname in stats["failed"]:
+        print(f"   ⚠️ Could not read {fname}")
+    for fname in mismatched[:10]:
+        print(f"   ❌ {fname} differs after reload")
+    print(f"Chats in store: {store.count_chats()} | FTS5: {'yes' if store.fts else 'no (LIKE fallback)'}")
+    store.close()
+
+    ok = not mismatched and not stats["failed"]
+    print("✅ PASS: all chats migrated and verified" if ok else "❌ FAIL: see above")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,30 +2,48 @@ import os
 import re
 import glob
 import time
-import csv
 import subprocess
 import cv2
-import pytesseract
 import time
 import json
 import uuid
-import pickle
-import threading
-from datetime import datetime
+from contextlib import closing
 
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# OCR engine / Ollama client / embedder are shared handles from core.model_registry
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
-import faiss
 import gradio as gr
-import ollama
 import pandas as pd
 import torch
-from sentence_transformers import SentenceTransformer
 
 # FYP: Query validation imports
 from query.time_classifier import TimeClassifier
 from query.validator import DataValidator
-from core.simple_cache import SimpleCache
+from query.time_parser import resolve_month, month_pair, month_range, named_month_range
+from core.cache_engine import CacheEngine
+from core.sales_cube import SalesCube
+from core.columnar_store import code_mask, code_contains, SALES_DIMENSIONS, HR_DIMENSIONS
+from core.bitmap_index import BitmapIndex
+from core.row_filter import RowFilter
+from core.ground_truth_store import GroundTruthStore
+from core.query_plan import QueryEngine, total_plan, breakdown_plan, comparison_plan, percentage_plan
+from core.data_snapshot import StartupTimer, load_csv_snapshot, prepare_sales_frame, prepare_hr_frame, snapshot_fingerprint
+from core.entity_gazetteer import EntityGazetteer
+from core.row_serializer import sales_row_texts, hr_row_texts
+from core.embedding_store import EmbeddingStore
+from core.source_index import SourceIndex
+from core.ann_index import index_factory
+from core.embedding_service import get_embedding_service
+from core.model_registry import MODELS, ocr_engine
+from core.llm_client import llm_client
+from core import stream_events as ev
+from core.semantic_cache import SemanticAnswerCache, corpus_version
+from core.interaction_log import InteractionLog
+from core.chat_store import ChatStore
+from core.request_scheduler import RequestScheduler, CancelToken, RequestCancelled
+from core.keyword_automaton import KeywordAutomaton, compile_patterns, match_keywords
+
+STARTUP = StartupTimer()
 
 # NEW v8.4: Hybrid execution for analytical queries (regression fix)
 # from query.complexity_detector import detect_query_complexity, is_comparison_query, extract_comparison_entities
@@ -35,9 +53,11 @@ from core.simple_cache import SimpleCache
 # from query.llm_router import create_llm_router
 
 # =========================
-# Global Stop Flag for Robust Cancellation
+# Request Scheduler: per-request cancellation + KPI/LLM concurrency pools
 # =========================
-GLOBAL_STOP_REQUESTED = threading.Event()
+# Stop cancels only the caller's own request (token keyed by Gradio session);
+# KPI answers get their own slots so they never wait behind LLM generations.
+SCHEDULER = RequestScheduler({'kpi': 8, 'llm': 2})
 
 # =========================
 # FYP2: Feature Flags for Research Experiments
@@ -59,15 +79,18 @@ ACTIVE_ROUTER = None  # Set by automated_tester_csv.py with --router flag
 # =========================
 HYBRID_EXECUTOR = None  # Will be initialized on first use with handler functions
 
-def request_stop():
-    """Request cancellation of current query"""
-    GLOBAL_STOP_REQUESTED.set()
-    print("🛑🛑🛑 STOP REQUESTED via global flag 🛑🛑🛑")
+def _session_id(request) -> str:
+    return getattr(request, "session_hash", None) or "default"
+
+def request_stop(request: gr.Request = None):
+    """Request cancellation of this session's current query"""
+    SCHEDULER.cancel(_session_id(request))
+    print(f"🛑🛑🛑 STOP REQUESTED for session {_session_id(request)} 🛑🛑🛑")
     return gr.update(visible=True), gr.update(visible=False)  # Show submit, hide stop
 
-def reset_stop_flag():
-    """Reset cancellation flag for new query"""
-    GLOBAL_STOP_REQUESTED.clear()
+def reset_stop_flag(request: gr.Request = None):
+    """Give this session a fresh cancellation token for its new query"""
+    SCHEDULER.start_request(_session_id(request))
     return gr.update(visible=False), gr.update(visible=True)  # Hide submit, show stop
 
 # =========================
@@ -154,6 +177,9 @@ def get_installed_ollama_models(default=("llama3:latest",)):
     except Exception:
         return list(default)
 
+# Every LLM call (generation, retries, preload) shares one pooled async Ollama client
+LLM = llm_client()
+
 def preload_ollama_model(model_name: str, keep_alive: str = "5m") -> bool:
     """
     Pre-load Ollama model into memory to avoid cold-start delays.
@@ -167,13 +193,8 @@ def preload_ollama_model(model_name: str, keep_alive: str = "5m") -> bool:
         print(f"📥 Pre-loading Ollama model: {model_name}...")
         start = time.time()
         
-        # Send minimal test request to load model
-        ollama.chat(
-            model=model_name,
-            messages=[{"role": "user", "content": "test"}],
-            options={"num_ctx": 512, "num_predict": 1, "num_gpu": 0},
-            keep_alive=keep_alive
-        )
+        # Empty-prompt request: Ollama loads the model without generating anything
+        LLM.preload(model_name, keep_alive=keep_alive)
         
         elapsed = time.time() - start
         print(f"✅ Model {model_name} loaded successfully in {elapsed:.1f}s")
@@ -188,7 +209,8 @@ def preload_ollama_model(model_name: str, keep_alive: str = "5m") -> bool:
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 ensure_dir(LOG_DIR)
-LOG_FILE = os.path.join(LOG_DIR, "chat_logs.csv")
+# Rotated chat_logs-*.jsonl(.gz) segments, written by a background thread
+INTERACTION_LOG = InteractionLog(LOG_DIR)
 
 # Storage directories
 STORAGE_DIR = os.path.join(BASE_DIR, "storage")
@@ -198,13 +220,19 @@ ensure_dir(STORAGE_DIR)
 ensure_dir(CHATS_DIR)
 ensure_dir(MEMORY_DIR)
 
+# Chat threads live in one SQLite file; the old one-JSON-per-chat files
+# are imported on first start (or with migrate_chats_to_sqlite.py)
+CHAT_DB = os.path.join(STORAGE_DIR, "chats.db")
+CHAT_STORE = ChatStore(CHAT_DB)
+if CHAT_STORE.count_chats() == 0 and any(f.endswith(".json") for f in os.listdir(CHATS_DIR)):
+    _migrated = CHAT_STORE.import_json_dir(CHATS_DIR)
+    print(f"🗄️ Migrated {_migrated['imported']} JSON chats into {CHAT_DB}")
+
 def log_interaction(model: str, route: str, question: str, answer: str, latency_ms: int, chat_id: str = "", message_id: str = "", tool_trace_summary: str = ""):
-    new_file = not os.path.exists(LOG_FILE)
-    with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if new_file:
-            w.writerow(["timestamp", "model", "route", "latency_ms", "question", "answer", "chat_id", "message_id", "tool_trace_summary"])
-        w.writerow([time.strftime("%Y-%m-%d %H:%M:%S"), model, route, latency_ms, question, answer, chat_id, message_id, tool_trace_summary])
+    INTERACTION_LOG.log({
+        "model": model, "route": route, "latency_ms": latency_ms, "question": question, "answer": answer,
+        "chat_id": chat_id, "message_id": message_id, "tool_trace_summary": tool_trace_summary,
+    })
 
 # =========================
 # Chat Persistence (ChatGPT-like threads)
@@ -220,57 +248,17 @@ def title_from_first_message(msg: str, max_len: int = 40) -> str:
         return msg or "New Chat"
     return msg[:max_len] + "..."
 
-def load_chat_list():
-    """Load list of all saved chats sorted by timestamp"""
-    chats = []
-    for fname in os.listdir(CHATS_DIR):
-        if fname.endswith(".json"):
-            fpath = os.path.join(CHATS_DIR, fname)
-            try:
-                with open(fpath, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    chats.append({
-                        "chat_id": data.get("chat_id", fname[:-5]),
-                        "title": data.get("title", "Untitled"),
-                        "created_at": data.get("created_at", ""),
-                        "updated_at": data.get("updated_at", "")
-                    })
-            except:
-                pass
-    chats.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
-    return chats
+def load_chat_list(limit: int = None):
+    """Chat summaries (chat_id, title, created_at, updated_at), newest first"""
+    return CHAT_STORE.list_chats(limit=limit)
 
 def load_chat(chat_id: str):
     """Load chat by ID. Returns dict with title, messages, tool_traces"""
-    fpath = os.path.join(CHATS_DIR, f"{chat_id}.json")
-    if not os.path.exists(fpath):
-        return None
-    try:
-        with open(fpath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return None
+    return CHAT_STORE.load_chat(chat_id)
 
 def save_chat(chat_id: str, title: str, messages: list, tool_traces: list):
-    """Save chat to disk"""
-    fpath = os.path.join(CHATS_DIR, f"{chat_id}.json")
-    now = datetime.now().isoformat()
-    
-    # If new chat, set created_at
-    existing = load_chat(chat_id)
-    created_at = existing.get("created_at", now) if existing else now
-    
-    data = {
-        "chat_id": chat_id,
-        "title": title,
-        "created_at": created_at,
-        "updated_at": now,
-        "messages": messages,
-        "tool_traces": tool_traces
-    }
-    
-    with open(fpath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    """Save chat (only messages/traces not yet stored are written)"""
+    CHAT_STORE.save_chat(chat_id, title, messages, tool_traces)
 
 # =========================
 # Memory Persistence (ChatGPT-style memory)
@@ -382,43 +370,10 @@ def extract_numerical_claims(answer: str) -> dict:
 
 def compute_ground_truth(query: str, route: str, context: dict = None) -> dict:
     """
-    Compute ground truth from pandas DataFrames.
+    Ground truth for a KPI answer, looked up in the materialised store.
     Returns dict: {"total_sales": actual_value, ...}
     """
-    ground_truth = {}
-    
-    if route == "sales_kpi":
-        df = df_sales.copy()
-        
-        # Apply filters from context if available
-        if context:
-            if context.get('state'):
-                df = df[df['State'].str.contains(context['state'], case=False, na=False)]
-            if context.get('month'):
-                df = df[df['DateStr'].str.contains(context['month'], na=False)]
-            if context.get('product'):
-                df = df[df['Product'].str.contains(context['product'], case=False, na=False)]
-        
-        # Compute actual values
-        ground_truth["total_sales"] = df['Total Sale'].sum()
-        ground_truth["total_quantity"] = df['Quantity'].sum()
-        if len(df) > 0:
-            ground_truth["avg_price"] = df['Total Sale'].sum() / df['Quantity'].sum()
-    
-    elif route == "hr_kpi":
-        df = df_hr.copy()
-        
-        if context:
-            if context.get('state'):
-                df = df[df['State'].str.contains(context['state'], case=False, na=False)]
-            if context.get('department'):
-                df = df[df['Department'].str.contains(context['department'], case=False, na=False)]
-        
-        ground_truth["total_employees"] = len(df)
-        ground_truth["avg_income"] = df['MonthlyIncome'].mean() if len(df) > 0 else 0
-        ground_truth["attrition_rate"] = (df['Attrition'] == 'Yes').sum() / len(df) * 100 if len(df) > 0 else 0
-    
-    return ground_truth
+    return GROUND_TRUTH.lookup(route, context)
 
 
 def verify_answer_against_ground_truth(answer: str, query: str, route: str, context: dict = None) -> tuple:
@@ -577,7 +532,7 @@ def execute_top_products(params: dict) -> str:
         df = df[df['DateStr'].str.contains(params['month'], na=False)]
     
     # Calculate top products
-    top = df.groupby('Product')['Total Sale'].sum().sort_values(ascending=False).head(5)
+    top = df.groupby('Product', observed=True)['Total Sale'].sum().sort_values(ascending=False).head(5)
     
     answer = f"## Top 5 Products"
     if params.get('state'):
@@ -640,7 +595,7 @@ def execute_state_comparison(params: dict) -> str:
     if params.get('month'):
         df = df[df['DateStr'].str.contains(params['month'], na=False)]
     
-    state_sales = df.groupby('State')['Total Sale'].sum().sort_values(ascending=False)
+    state_sales = df.groupby('State', observed=True)['Total Sale'].sum().sort_values(ascending=False)
     
     answer = f"## State Comparison"
     if params.get('month'):
@@ -663,7 +618,7 @@ def execute_department_breakdown(params: dict) -> str:
     if params.get('state'):
         df = df[df['State'].str.contains(params['state'], case=False, na=False)]
     
-    dept_stats = df.groupby('Department').agg({
+    dept_stats = df.groupby('Department', observed=True).agg({
         'EmpID': 'count',
         'MonthlyIncome': 'mean',
         'Attrition': lambda x: (x == 'Yes').sum() / len(x) * 100
@@ -908,17 +863,14 @@ def extract_percentage_context(query: str) -> dict:
     
     # For PART: more specific filters (state, branch, product, etc.)
     if part_text:
-        # Extract state
-        for state in STATES:
-            if state.lower() in part_text:
-                part_filters['state'] = state
-                break
-        
-        # Extract product
-        for product in PRODUCTS:
-            if product.lower() in part_text:
-                part_filters['product'] = product
-                break
+        # Extract state / product
+        part_mentions = ENTITIES.find(part_text)
+        state = ENTITIES.first(part_mentions, "state")
+        if state:
+            part_filters['state'] = state
+        product = ENTITIES.first(part_mentions, "product")
+        if product:
+            part_filters['product'] = product
         
         # Extract time filter from entire query (not just part_text)
         month = extract_month_from_query(query)
@@ -987,23 +939,18 @@ def extract_comparison_context(query: str) -> dict:
             'dimensions': [str(two_months[0]), str(two_months[1])]
         }
     
-    # Check if comparing states
-    states_mentioned = [s for s in STATES if s.lower() in q]
-    if len(states_mentioned) >= 2 and ('vs' in q or 'versus' in q or 'compare' in q):
-        return {
-            'type': 'state',
-            'dimensions': states_mentioned[:2]
-        }
-    
-    # Check if comparing products
-    products_mentioned = [p for p in PRODUCTS if p.lower() in q]
-    if len(products_mentioned) >= 2 and ('vs' in q or 'versus' in q or 'compare' in q):
-        return {
-            'type': 'product',
-            'dimensions': products_mentioned[:2]
-        }
+    # Check if comparing states / products / branches (in the order mentioned)
+    mentions = ENTITIES.find(q)
+    is_comparison = 'vs' in q or 'versus' in q or 'compare' in q
+    for dim in ('state', 'product', 'branch'):
+        mentioned = ENTITIES.values(mentions, dim)
+        if len(mentioned) >= 2 and is_comparison:
+            return {
+                'type': dim,
+                'dimensions': mentioned[:2]
+            }
     
-    # Check if comparing branches (harder, need to look for "branch A vs branch B")
+    # Free-text branches (not exact branch names): "branch A vs branch B"
     import re
     branch_pattern = re.findall(r'([\w\s]+)\s+(?:vs|versus)\s+([\w\s]+)', q, re.IGNORECASE)
     if branch_pattern:
@@ -1104,65 +1051,11 @@ def parse_query_intent(query: str) -> QueryIntent:
 # Specialized Query Executors (v9)
 # =========================
 
-def apply_filters_to_dataframe(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
-    """
-    Apply filters to a dataframe based on filter dictionary.
-    
-    Args:
-        df: Source dataframe
-        filters: Dict like {'state': 'Selangor', 'month': '2024-06', 'product': 'Burger Classic'}
-    
-    Returns:
-        Filtered dataframe
-    """
-    result = df.copy()
-    
-    for key, value in filters.items():
-        if not value:
-            continue
-            
-        if key == 'state' and 'State' in result.columns:
-            result = result[result['State'] == value]
-        elif key == 'branch' and 'Branch' in result.columns:
-            result = result[result['Branch'] == value]
-        elif key == 'product' and 'Product' in result.columns:
-            result = result[result['Product'] == value]
-        elif key == 'employee' and 'Employee' in result.columns:
-            result = result[result['Employee'] == value]
-        elif key == 'channel' and 'Channel' in result.columns:
-            result = result[result['Channel'] == value]
-        elif key == 'month':
-            # Handle YearMonth (Period), DateStr (string), or int month values
-            if 'YearMonth' in result.columns:
-                try:
-                    # YearMonth column contains Period objects - compare directly
-                    if hasattr(value, 'to_timestamp'):  # pd.Period object
-                        # Direct Period to Period comparison
-                        result = result[result['YearMonth'] == value]
-                    elif isinstance(value, int):
-                        # Convert int 202406 to Period('2024-06')
-                        year = value // 100
-                        month = value % 100
-                        period_value = pd.Period(f"{year:04d}-{month:02d}", freq='M')
-                        result = result[result['YearMonth'] == period_value]
-                    else:
-                        # Convert string "2024-06" to Period
-                        period_value = pd.Period(str(value), freq='M')
-                        result = result[result['YearMonth'] == period_value]
-                except Exception as e:
-                    # If YearMonth filter fails, try DateStr
-                    if 'DateStr' in result.columns:
-                        date_str = str(value).replace('-', '')
-                        if len(date_str) == 6:  # 202406
-                            date_str = f"{date_str[:4]}-{date_str[4:]}"  # 2024-06
-                        result = result[result['DateStr'].str.contains(date_str, na=False)]
-            elif 'DateStr' in result.columns:
-                date_str = str(value)
-                if hasattr(value, 'to_timestamp'):  # pd.Period object
-                    date_str = value.strftime('%Y-%m')
-                result = result[result['DateStr'].str.contains(date_str, na=False)]
-    
-    return result
+def engine_for(df: pd.DataFrame) -> QueryEngine:
+    """Plan engine over df_sales (results cached); an uncached one for any other frame."""
+    if df is df_sales:
+        return SALES_PLANS
+    return QueryEngine(BitmapIndex(df, SALES_DIMENSIONS + ["YearMonth", "DateStr"]))
 
 
 def execute_percentage_query(intent: QueryIntent, df: pd.DataFrame, trace: 'ToolTrace' = None) -> dict:
@@ -1197,28 +1090,24 @@ def execute_percentage_query(intent: QueryIntent, df: pd.DataFrame, trace: 'Tool
     value_col = 'Total Sale' if intent.metric == 'revenue' else 'Quantity'
     metric_label = 'Sales' if intent.metric == 'revenue' else 'Quantity'
     
-    # Apply filters to get numerator
-    df_numerator = apply_filters_to_dataframe(df, part_filters)
-    numerator_value = float(df_numerator[value_col].sum())
-    
-    # Apply filters to get denominator
-    df_denominator = apply_filters_to_dataframe(df, whole_filters)
-    denominator_value = float(df_denominator[value_col].sum())
+    # One plan: filter on what part and whole share, then sum both sides in one pass
+    engine = engine_for(df)
+    result = engine.run(percentage_plan(part_filters, whole_filters, value_col))
+    numerator_value, numerator_rows = result['part']
+    denominator_value, denominator_rows = result['whole']
     
     # Safety check: if denominator is 0, something went wrong with filtering
-    if denominator_value == 0 or len(df_denominator) == 0:
+    if denominator_value == 0 or denominator_rows == 0:
         # Fall back to using all data as denominator (no filter except maybe month)
-        df_denominator = df.copy()
-        if whole_filters.get('month'):
-            df_denominator = apply_filters_to_dataframe(df_denominator, {'month': whole_filters['month']})
-        denominator_value = float(df_denominator[value_col].sum())
+        fallback = engine.run(total_plan({'month': whole_filters.get('month')}, value_col))
+        denominator_value, denominator_rows = fallback['total'], fallback['rows']
     
     # Calculate percentage
     percentage = (numerator_value / denominator_value * 100) if denominator_value > 0 else 0.0
     
     # Track in trace
     if trace:
-        trace.rows_used = len(df_numerator) + len(df_denominator)
+        trace.rows_used = numerator_rows + denominator_rows
         trace.filters = {**part_filters, 'calculation': 'percentage'}
     
     # Format the answer
@@ -1260,8 +1149,8 @@ def execute_percentage_query(intent: QueryIntent, df: pd.DataFrame, trace: 'Tool
 
 ### Evidence Used
 - Data Source: Structured Sales KPI
-- Numerator Rows: {len(df_numerator):,}
-- Denominator Rows: {len(df_denominator):,}
+- Numerator Rows: {numerator_rows:,}
+- Denominator Rows: {denominator_rows:,}
 - Filters Applied: {', '.join([f'{k}={v}' for k, v in part_filters.items() if v])}
 
 ### Next Actions
@@ -1312,46 +1201,14 @@ def execute_comparison_query(intent: QueryIntent, df: pd.DataFrame, trace: 'Tool
     labels = []
     row_counts = []
     
-    # Execute comparison based on type
-    if comparison_type == 'time':
-        # Compare two time periods
-        for month_val in dimensions:
-            month_filters = intent.filters.copy()
-            month_filters['month'] = str(month_val)
-            df_filtered = apply_filters_to_dataframe(df, month_filters)
-            values.append(float(df_filtered[value_col].sum()))
-            labels.append(str(month_val))
-            row_counts.append(len(df_filtered))
-    
-    elif comparison_type == 'state':
-        # Compare two states
-        for state_val in dimensions:
-            state_filters = intent.filters.copy()
-            state_filters['state'] = state_val
-            df_filtered = apply_filters_to_dataframe(df, state_filters)
-            values.append(float(df_filtered[value_col].sum()))
-            labels.append(state_val)
-            row_counts.append(len(df_filtered))
-    
-    elif comparison_type == 'product':
-        # Compare two products
-        for product_val in dimensions:
-            product_filters = intent.filters.copy()
-            product_filters['product'] = product_val
-            df_filtered = apply_filters_to_dataframe(df, product_filters)
-            values.append(float(df_filtered[value_col].sum()))
-            labels.append(product_val)
-            row_counts.append(len(df_filtered))
-    
-    elif comparison_type == 'branch':
-        # Compare two branches
-        for branch_val in dimensions:
-            branch_filters = intent.filters.copy()
-            branch_filters['branch'] = branch_val
-            df_filtered = apply_filters_to_dataframe(df, branch_filters)
-            values.append(float(df_filtered[value_col].sum()))
-            labels.append(branch_val)
-            row_counts.append(len(df_filtered))
+    # Execute comparison: one pass grouped by the compared dimension
+    # (time = month, state, product or branch) under the remaining filters
+    if comparison_type in ('time', 'state', 'product', 'branch'):
+        result = engine_for(df).run(comparison_plan(intent.filters, comparison_type, dimensions, value_col))
+        for dim_val, (_, value, row_count) in zip(dimensions, result['picked']):
+            values.append(value)
+            labels.append(str(dim_val) if comparison_type == 'time' else dim_val)
+            row_counts.append(row_count)
     
     # Calculate difference and percentage change
     if len(values) >= 2:
@@ -1431,9 +1288,6 @@ def execute_breakdown_query(intent: QueryIntent, df: pd.DataFrame, trace: 'ToolT
             'formatted_answer': "..."
         }
     """
-    # Apply base filters first
-    df_filtered = apply_filters_to_dataframe(df, intent.filters)
-    
     value_col = 'Total Sale' if intent.metric == 'revenue' else 'Quantity'
     metric_label = 'Sales (RM)' if intent.metric == 'revenue' else 'Quantity'
     
@@ -1447,12 +1301,9 @@ def execute_breakdown_query(intent: QueryIntent, df: pd.DataFrame, trace: 'ToolT
     groupby_col = groupby_map.get(intent.groupby, 'Product')
     
     # Check if column exists
-    if groupby_col not in df_filtered.columns:
+    if groupby_col not in df.columns:
         return {'type': 'breakdown', 'error': f'Column {groupby_col} not found', 'formatted_answer': f'❗ Cannot group by {intent.groupby}'}
     
-    # Group and aggregate
-    grouped = df_filtered.groupby(groupby_col)[value_col].sum().sort_values(ascending=False)
-    
     # Determine limit (top N)
     q_lower = intent.raw_query.lower()
     import re
@@ -1464,14 +1315,16 @@ def execute_breakdown_query(intent: QueryIntent, df: pd.DataFrame, trace: 'ToolT
     else:
         limit = 10  # default for breakdown without "top"
     
-    top_data = grouped.head(limit)
+    # Filter -> group -> aggregate -> rank as one plan
+    result = engine_for(df).run(breakdown_plan(intent.filters, groupby_col, value_col, limit))
+    grouped, top_data, rows_used = result['groups'], result['top'], result['rows']
     
     # Calculate totals and percentages
     total_value = float(grouped.sum())
     
     # Track in trace
     if trace:
-        trace.rows_used = len(df_filtered)
+        trace.rows_used = rows_used
         trace.filters = {**intent.filters, 'groupby': intent.groupby}
     
     # Format answer
@@ -1501,7 +1354,7 @@ def execute_breakdown_query(intent: QueryIntent, df: pd.DataFrame, trace: 'ToolT
 
 ### Evidence Used
 - Data Source: Structured Sales KPI
-- Rows Analyzed: {len(df_filtered):,}
+- Rows Analyzed: {rows_used:,}
 - Grouping Dimension: {intent.groupby.title()}
 - Filters: {', '.join([f'{k}={v}' for k, v in intent.filters.items() if v])}
 
@@ -1545,18 +1398,16 @@ def execute_total_query(intent: QueryIntent, df: pd.DataFrame, trace: 'ToolTrace
             'formatted_answer': "..."
         }
     """
-    # Apply filters
-    df_filtered = apply_filters_to_dataframe(df, intent.filters)
-    
     value_col = 'Total Sale' if intent.metric == 'revenue' else 'Quantity'
     metric_label = 'Total Sales (RM)' if intent.metric == 'revenue' else 'Total Quantity'
     
-    # Calculate total
-    total_value = float(df_filtered[value_col].sum())
+    # Calculate total (filter -> aggregate plan)
+    result = engine_for(df).run(total_plan(intent.filters, value_col))
+    total_value, rows_used = result['total'], result['rows']
     
     # Track in trace
     if trace:
-        trace.rows_used = len(df_filtered)
+        trace.rows_used = rows_used
         trace.filters = intent.filters
     
     # Extract time period for display
@@ -1571,7 +1422,7 @@ Value: RM {total_value:,.2f}
 
 ### Evidence Used
 - Data Source: Structured Sales KPI
-- Rows Analyzed: {len(df_filtered):,}
+- Rows Analyzed: {rows_used:,}
 - Filters Applied: {', '.join([f'{k}={v}' for k, v in intent.filters.items() if v])}
 
 ### Next Actions
@@ -1628,6 +1479,8 @@ class ToolTrace:
         self.ocr_text = ""
         self.ocr_char_count = 0
         self.latency_ms = 0
+        self.cache_hit = None  # semantic answer cache hit: {query, similarity, age_s}
+        self.queue = None  # scheduler slot: {pool, queue_depth, wait_ms}
         
     def to_dict(self):
         return {
@@ -1638,12 +1491,16 @@ class ToolTrace:
             "sources": self.sources,
             "ocr_text": self.ocr_text[:200],  # preview only
             "ocr_char_count": self.ocr_char_count,
-            "latency_ms": self.latency_ms
+            "latency_ms": self.latency_ms,
+            "cache_hit": self.cache_hit,
+            "queue": self.queue
         }
     
     def to_summary_string(self):
         """Short summary for logging"""
-        return f"{self.route}|{self.model}|rows={self.rows_used}|sources={len(self.sources)}|{self.latency_ms}ms"
+        cache = "|cache=hit" if self.cache_hit else ""
+        queue = f"|{self.queue['pool']}_wait={self.queue['wait_ms']}ms/depth={self.queue['queue_depth']}" if self.queue else ""
+        return f"{self.route}|{self.model}|rows={self.rows_used}|sources={len(self.sources)}|{self.latency_ms}ms{cache}{queue}"
     
     def to_display_html(self):
         """HTML panel for UI display"""
@@ -1671,6 +1528,15 @@ class ToolTrace:
                 preview = self.ocr_text[:200].replace("\n", " ")
                 lines.append(f'<div class="trace-row ocr-preview">{preview}...</div>')
         
+        if self.cache_hit:
+            lines.append(f'<div class="trace-row"><b>Cache:</b> ⚡ semantic hit '
+                         f'(similarity {self.cache_hit["similarity"]:.2f}, '
+                         f'cached query: "{self.cache_hit["query"][:60]}")</div>')
+        
+        if self.queue:
+            lines.append(f'<div class="trace-row"><b>Queue:</b> {self.queue["pool"]} pool, '
+                         f'{self.queue["queue_depth"]} ahead, waited {self.queue["wait_ms"]}ms</div>')
+        
         lines.append(f'<div class="trace-row"><b>Latency:</b> {self.latency_ms}ms</div>')
         lines.append('</div>')
         
@@ -1696,16 +1562,12 @@ if not os.path.exists(SALES_CSV):
 if not os.path.exists(HR_CSV):
     raise FileNotFoundError(f"HR CSV not found: {HR_CSV}")
 
-df_sales = pd.read_csv(SALES_CSV)
-df_hr = pd.read_csv(HR_CSV)
-
-# Normalize Sales dates
-df_sales["Date"] = pd.to_datetime(df_sales["Date"], errors="coerce")
-df_sales["DateStr"] = df_sales["Date"].dt.strftime("%Y-%m-%d")
-df_sales["YearMonth"] = df_sales["Date"].dt.to_period("M")
-
-for c in ["Quantity", "Unit Price", "Total Sale"]:
-    df_sales[c] = pd.to_numeric(df_sales[c], errors="coerce")
+# Typed column snapshot with derived columns (re-parsed from CSV only when the file changes)
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "storage", "snapshots")
+df_sales = load_csv_snapshot(SALES_CSV, prepare_sales_frame, SNAPSHOT_DIR)
+STARTUP.lap("Sales data")
+df_hr = load_csv_snapshot(HR_CSV, prepare_hr_frame, SNAPSHOT_DIR)
+STARTUP.lap("HR data")
 
 AVAILABLE_SALES_MONTHS = sorted(df_sales["YearMonth"].dropna().unique().tolist())
 LATEST_SALES_MONTH = max(AVAILABLE_SALES_MONTHS) if AVAILABLE_SALES_MONTHS else None
@@ -1713,9 +1575,10 @@ LATEST_SALES_MONTH = max(AVAILABLE_SALES_MONTHS) if AVAILABLE_SALES_MONTHS else
 # FYP: Initialize validation system
 time_classifier = TimeClassifier()
 data_validator = DataValidator(SALES_CSV)
-sales_cache = SimpleCache(ttl_seconds=3600)  # 1 hour cache
+# 1 hour TTL, LRU within a 256 MB budget (filtered row positions per filter combination)
+sales_cache = CacheEngine(ttl_seconds=3600, max_bytes=256 * 1024 * 1024, policy="lru")
 print(f"✅ Validation system initialized. Available months: {data_validator.get_available_months()}")
-print(f"✅ Cache system initialized. TTL: 1 hour")
+print(f"✅ Cache system initialized. TTL: 1 hour, budget: 256 MB (LRU)")
 
 # Metadata (Sales)
 STATES = sorted(df_sales["State"].dropna().unique().tolist()) if "State" in df_sales.columns else []
@@ -1724,6 +1587,12 @@ PRODUCTS = sorted(df_sales["Product"].dropna().unique().tolist())
 SALES_REPS = sorted(df_sales["Employee"].dropna().unique().tolist())
 CHANNELS = sorted(df_sales["Channel"].dropna().unique().tolist()) if "Channel" in df_sales.columns else []
 
+# Entity gazetteer: every dimension value (+ Malay aliases) in one automaton,
+# versioned by the sales/HR snapshots it was built from
+DATA_VERSION = f"{snapshot_fingerprint(SALES_CSV, SNAPSHOT_DIR)}|{snapshot_fingerprint(HR_CSV, SNAPSHOT_DIR)}"
+ENTITIES = EntityGazetteer.from_frames(df_sales, df_hr, version=DATA_VERSION)
+print(f"✅ Entity gazetteer: {ENTITIES.get_stats()['surfaces']} surface forms, {len(ENTITIES.vocab)} entity types")
+
 # Metadata (HR)
 HR_DEPTS = sorted(df_hr["Department"].dropna().unique().tolist()) if "Department" in df_hr.columns else []
 HR_AGEGROUPS = sorted(df_hr["AgeGroup"].dropna().unique().tolist()) if "AgeGroup" in df_hr.columns else []
@@ -1732,28 +1601,35 @@ HR_STATES = sorted(df_hr["State"].dropna().unique().tolist()) if "State" in df_h
 print("📄 Sales shape:", df_sales.shape, "| months:", AVAILABLE_SALES_MONTHS[0], "→", AVAILABLE_SALES_MONTHS[-1])
 print("📄 HR shape:", df_hr.shape)
 
+# Sales KPI cube: all sales KPIs are answered from pre-aggregated cells
+sales_cube = SalesCube(df_sales)
+print(f"✅ Sales KPI cube: {len(sales_cube):,} cells from {sales_cube.source_rows:,} rows ({sales_cube.build_ms:.0f} ms)")
+
+# Bitmap indexes: every dimension value -> packed row bitmap, shared by the
+# structured executors and ground-truth checks (filters are bitmap ANDs)
+SALES_INDEX = BitmapIndex(df_sales, SALES_DIMENSIONS + ["YearMonth", "DateStr"], label="Sales")
+HR_INDEX = BitmapIndex(df_hr, HR_DIMENSIONS, label="HR")
+# Ground truth for answer verification: every KPI filter combination precomputed,
+# saved per snapshot version (rebuilt when the sales/HR snapshots change)
+GROUND_TRUTH = GroundTruthStore.load_or_build(
+    SALES_INDEX, HR_INDEX, os.path.join(SNAPSHOT_DIR, "ground_truth.json"), DATA_VERSION,
+    seed_path=os.path.join(os.path.dirname(BASE_DIR), "ground_truth", "CALCULATED_GROUND_TRUTH.json"))
+_gt = GROUND_TRUTH.get_stats()
+_gt_source = "loaded" if _gt['loaded'] else f"built in {_gt['build_ms']:.0f} ms"
+print(f"✅ Ground truth store: {_gt['entries']['sales_kpi']} sales + {_gt['entries']['hr_kpi']} HR combinations ({_gt_source}), "
+      f"seed figures {_gt['seed_checked'] - _gt['seed_mismatches']}/{_gt['seed_checked']} match")
+# Filtered row positions over df_sales, cached in sales_cache (namespace sales_rows)
+SALES_ROWS = RowFilter(df_sales, cache=sales_cache, namespace="sales", index=SALES_INDEX)
+# QueryIntent plans over the sales index, results cached by normalised plan (namespace sales_plans)
+SALES_PLANS = QueryEngine(SALES_INDEX, cache=sales_cache, namespace="sales_plans")
+STARTUP.lap("Metadata + KPI cube")
+
 # =========================
 # 3) Build RAG corpus (Sales + HR rows + docs)
 # =========================
-sales_summaries = []
-for _, r in df_sales.iterrows():
-    sales_summaries.append(
-        "[SALES] "
-        f"Date={r.get('DateStr','')}; State={r.get('State','')}; Branch={r.get('Branch','')}; "
-        f"Product={r.get('Product','')}; Qty={r.get('Quantity','')}; UnitPrice={r.get('Unit Price','')}; "
-        f"TotalSale={r.get('Total Sale','')}; Channel={r.get('Channel','')}; Payment={r.get('PaymentMethod','')}; "
-        f"Employee={r.get('Employee','')}"
-    )
-
-hr_summaries = []
-for _, r in df_hr.iterrows():
-    hr_summaries.append(
-        "[HR] "
-        f"EmpID={r.get('EmpID','')}; State={r.get('State','')}; Branch={r.get('Branch','')}; "
-        f"Department={r.get('Department','')}; JobRole={r.get('JobRole','')}; Age={r.get('Age','')}; "
-        f"AgeGroup={r.get('AgeGroup','')}; MonthlyIncome={r.get('MonthlyIncome','')}; "
-        f"OverTime={r.get('OverTime','')}; Attrition={r.get('Attrition','')}; YearsAtCompany={r.get('YearsAtCompany','')}"
-    )
+# Column-wise row texts (same strings as the per-row iterrows f-strings)
+sales_summaries = sales_row_texts(df_sales)
+hr_summaries = hr_row_texts(df_hr)
 
 doc_chunks = []
 
@@ -1784,34 +1660,32 @@ if len(doc_chunks) > 0:
 summaries = sales_summaries + hr_summaries + doc_chunks
 print(f"📚 RAG corpus size: {len(summaries)} (Sales={len(sales_summaries)}, HR={len(hr_summaries)}, Docs={len(doc_chunks)})")
 
+# Semantic answer cache for LLM routes; corpus version in the key = stale answers never served after docs/data change
+SEMANTIC_CACHE_THRESHOLD = 0.92
+RAG_CORPUS_VERSION = corpus_version(summaries)
+ANSWER_CACHE = SemanticAnswerCache(threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=500, ttl_seconds=24 * 3600)
+STARTUP.lap("RAG corpus")
+
 # Embeddings + FAISS (with larger batch size for faster processing)
-embedder = SentenceTransformer("all-MiniLM-L6-v2", device=device)
-# Check for cached index first
+# Shared embedder (same instance as routers/evaluator; caches query vectors)
+embedder = get_embedding_service("all-MiniLM-L6-v2", device=device).load()
+STARTUP.lap("Embedder load")
+# Content-addressed embedding cache: only new/edited chunks are encoded
 CACHE_DIR = os.path.join(STORAGE_DIR, "cache")
 ensure_dir(CACHE_DIR)
-index_cache_path = os.path.join(CACHE_DIR, "faiss_index.bin")
-summaries_cache_path = os.path.join(CACHE_DIR, "summaries.pkl")
-
-if os.path.exists(index_cache_path) and os.path.exists(summaries_cache_path):
-    print("📦 Loading cached FAISS index...")
-    index = faiss.read_index(index_cache_path)
-    with open(summaries_cache_path, "rb") as f:
-        summaries = pickle.load(f)
-    print(f"✅ Loaded in <1 second! ({len(summaries)} embeddings)")
-else:
-    print("🔨 Building FAISS index (first time only)...")
-    emb = embedder.encode(summaries, convert_to_numpy=True, show_progress_bar=True, batch_size=128)
-    faiss.normalize_L2(emb)
-    index = faiss.IndexFlatIP(emb.shape[1])
-    index.add(emb)
-    print("✅ FAISS index vectors:", index.ntotal)
-    
-    # Save cache for next time
-    print("💾 Caching FAISS index for fast startup...")
-    faiss.write_index(index, index_cache_path)
-    with open(summaries_cache_path, "wb") as f:
-        pickle.dump(summaries, f)
-    print("✅ Cache saved!")
+embedding_store = EmbeddingStore(os.path.join(CACHE_DIR, "embeddings"), "all-MiniLM-L6-v2", normalize=True)
+emb = embedding_store.sync(
+    summaries,
+    lambda batch: embedder.encode(batch, convert_to_numpy=True, show_progress_bar=True, batch_size=128),
+)
+# One sub-index per source so docs questions never scan the 30k data rows
+# RAG_INDEX_TYPE: "flat" (exact) | "ivf" | "ivfpq" | "hnsw" (see benchmark_ann_index.py)
+RAG_INDEX_TYPE = "flat"
+index = SourceIndex(summaries, emb, make_index=index_factory(RAG_INDEX_TYPE, os.path.join(CACHE_DIR, "faiss")))
+print("✅ FAISS index vectors:", index.ntotal, index.sizes())
+STARTUP.lap("FAISS index")
+STARTUP.report()
+MODELS.report()
 
 # =========================
 # 4) Optional BLIP-2
@@ -1828,7 +1702,7 @@ def caption_image(image_path: str, trace: ToolTrace = None) -> str:
         gray = cv2.GaussianBlur(gray, (3, 3), 0)
         _, th = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-        text = pytesseract.image_to_string(th, config="--oem 3 --psm 6")
+        text = ocr_engine(TESSERACT_CMD).image_to_string(th, config="--oem 3 --psm 6")
         text = re.sub(r"[ \t]+", " ", text)
         text = re.sub(r"\n{2,}", "\n", text).strip()
 
@@ -1851,45 +1725,11 @@ def caption_image(image_path: str, trace: ToolTrace = None) -> str:
 # =========================
 # 5) Sales KPI engine (Malaysia version)
 # =========================
-MONTH_ALIASES = {
-    "jan": 1, "january": 1, "januari": 1,
-    "feb": 2, "february": 2, "februari": 2,
-    "mar": 3, "march": 3, "mac": 3,
-    "apr": 4, "april": 4,
-    "may": 5, "mei": 5,
-    "jun": 6, "june": 6,
-    "jul": 7, "july": 7, "julai": 7,
-    "aug": 8, "august": 8, "ogos": 8,
-    "sep": 9, "sept": 9, "september": 9,
-    "oct": 10, "october": 10, "okt": 10, "oktober": 10,
-    "nov": 11, "november": 11,
-    "dec": 12, "december": 12, "dis": 12, "disember": 12,
-}
-
+# Month/quarter/range extraction are views over query.time_parser.parse_time(),
+# which scans each query once and caches the result
 def extract_named_month_range(q: str):
-    s = (q or "").lower()
-
-    # year (optional). If missing, use latest dataset year
-    m_year = re.search(r"\b(20\d{2})\b", s)
-    year = int(m_year.group(1)) if m_year else int(str(LATEST_SALES_MONTH)[:4])
-
-    # find month words in text order
-    words = re.findall(r"[a-zA-Z]+", s)
-    months = []
-    for w in words:
-        w = w.lower()
-        if w in MONTH_ALIASES:
-            months.append(MONTH_ALIASES[w])
-
-    if len(months) >= 2:
-        m1, m2 = months[0], months[1]
-        p1 = pd.Period(f"{year:04d}-{m1:02d}", freq="M")
-        p2 = pd.Period(f"{year:04d}-{m2:02d}", freq="M")
-        start_m, end_m = (p1, p2) if p1 <= p2 else (p2, p1)
-        return start_m, end_m
-
-    return None
-
+    """First two month words, e.g. "Jan until Jun 2024" (year defaults to latest)."""
+    return named_month_range(q, LATEST_SALES_MONTH)
 
 
 def extract_month_from_query(q: str, previous_context: dict = None):
@@ -1897,56 +1737,10 @@ def extract_month_from_query(q: str, previous_context: dict = None):
     if LATEST_SALES_MONTH is None:
         return None
 
-    s = (q or "").lower()
-
-    # Current/latest month
-    if any(k in s for k in ["bulan ni", "bulan ini", "this month", "current month", "mtd"]):
-        return LATEST_SALES_MONTH
-    if any(k in s for k in ["bulan lepas", "last month", "previous month"]):
-        return LATEST_SALES_MONTH - 1
-
-    # Explicit yyyy-mm or yyyy/m format (highest priority)
-    m = re.search(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-    if m:
-        y = int(m.group(1))
-        mo = int(m.group(2))
-        return pd.Period(f"{y:04d}-{mo:02d}", freq="M")
-    
-    # NEW: Check for quarterly format (Q1, Q2, Q3, Q4)
-    # Returns middle month of quarter for single-month queries
-    quarter_match = re.search(r'\bq([1-4])\b', s)
-    if quarter_match:
-        quarter_num = int(quarter_match.group(1))
-        
-        # Extract year (default to latest available year)
-        year_match = re.search(r'\b(20\d{2})\b', s)
-        if year_match:
-            year = int(year_match.group(1))
-        else:
-            year = int(str(LATEST_SALES_MONTH)[:4])
-        
-        # Map quarter to middle month
-        # Q1 → February, Q2 → May, Q3 → August, Q4 → November
-        quarter_middle_months = {1: 2, 2: 5, 3: 8, 4: 11}
-        month_num = quarter_middle_months[quarter_num]
-        
-        return pd.Period(f"{year}-{month_num:02d}", freq="M")
-
-    # Natural language: "January 2024", "March", "Mac 2024"
-    # Extract year (if present)
-    year_match = re.search(r"\b(20\d{2})\b", s)
-    year = int(year_match.group(1)) if year_match else int(str(LATEST_SALES_MONTH)[:4])
-    
-    # Extract month name (prioritize longer matches first)
-    month_num = None
-    for month_name, num in sorted(MONTH_ALIASES.items(), key=lambda x: len(x[0]), reverse=True):
-        # Use word boundaries to avoid partial matches
-        if re.search(r"\b" + re.escape(month_name) + r"\b", s):
-            month_num = num
-            break
-    
-    if month_num is not None:
-        return pd.Period(f"{year:04d}-{month_num:02d}", freq="M")
+    # Relative month, yyyy-mm, Q1-Q4 (middle month), then month name
+    month = resolve_month(q, LATEST_SALES_MONTH)
+    if month is not None:
+        return month
 
     # NEW: Inherit from previous context if query doesn't specify month
     if previous_context and 'month' in previous_context:
@@ -1964,19 +1758,7 @@ def extract_month_from_query(q: str, previous_context: dict = None):
 
 def extract_two_months_from_query(q: str):
     """Return up to 2 explicit months found in query like 2024-03 vs 2024-05."""
-    s = (q or "").lower()
-    matches = re.findall(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-
-    months = []
-    for y, m in matches:
-        months.append(pd.Period(f"{int(y):04d}-{int(m):02d}", freq="M"))
-
-    uniq = []
-    for x in months:
-        if x not in uniq:
-            uniq.append(x)
-
-    return uniq[:2]
+    return month_pair(q)
 
 
 def detect_sales_metric(q: str) -> str:
@@ -2011,11 +1793,12 @@ def extract_sales_filters(q: str, conversation_history: list = None, previous_fi
         Tuple of (state, branch, product, employee, channel)
     """
     s = (q or "").lower()
-    state = next((x for x in STATES if x.lower() in s), None)
-    branch = next((x for x in sorted(BRANCHES, key=len, reverse=True) if x.lower() in s), None)
-    product = next((x for x in sorted(PRODUCTS, key=len, reverse=True) if x.lower() in s), None)
-    employee = next((x for x in SALES_REPS if x.lower() in s), None)
-    channel = next((x for x in CHANNELS if x.lower() in s), None)
+    mentions = ENTITIES.find(s)
+    state = ENTITIES.first(mentions, "state")
+    branch = ENTITIES.first(mentions, "branch")
+    product = ENTITIES.first(mentions, "product")
+    employee = ENTITIES.first(mentions, "employee")
+    channel = ENTITIES.first(mentions, "channel")
     
     # Check for special query patterns (e.g., "top performer", "best product")
     if product is None and any(k in s for k in ["top performer", "best", "winner", "#1", "first"]):
@@ -2074,100 +1857,27 @@ def extract_month_range_from_query(q: str):
       - Compare Q1 vs Q2
     Returns (start_period, end_period) or None
     """
-    s = (q or "").lower()
-    
-    # NEW: Handle quarterly comparisons (Q1 vs Q2)
-    quarter_matches = re.findall(r'\bq([1-4])\b', s)
-    if len(quarter_matches) >= 2:
-        # Extract year (default to latest)
-        year_match = re.search(r'\b(20\d{2})\b', s)
-        if year_match:
-            year = int(year_match.group(1))
-        else:
-            year = int(str(LATEST_SALES_MONTH)[:4]) if LATEST_SALES_MONTH else datetime.now().year
-        
-        # Map quarters to month ranges
-        # Q1: Jan-Mar, Q2: Apr-Jun, Q3: Jul-Sep, Q4: Oct-Dec
-        quarter_ranges = {
-            1: (1, 3),   # Q1
-            2: (4, 6),   # Q2
-            3: (7, 9),   # Q3
-            4: (10, 12)  # Q4
-        }
-        
-        q1_num = int(quarter_matches[0])
-        q2_num = int(quarter_matches[1])
-        
-        # Get start month from first quarter
-        start_month = quarter_ranges[q1_num][0]
-        # Get end month from second quarter
-        end_month = quarter_ranges[q2_num][1]
-        
-        p1 = pd.Period(f"{year}-{start_month:02d}", freq="M")
-        p2 = pd.Period(f"{year}-{end_month:02d}", freq="M")
-        
-        start_m, end_m = (p1, p2) if p1 <= p2 else (p2, p1)
-        return start_m, end_m
-    
-    # Existing logic for explicit date ranges
-    matches = re.findall(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-    if len(matches) >= 2:
-        p1 = pd.Period(f"{int(matches[0][0]):04d}-{int(matches[0][1]):02d}", freq="M")
-        p2 = pd.Period(f"{int(matches[1][0]):04d}-{int(matches[1][1]):02d}", freq="M")
-        start_m, end_m = (p1, p2) if p1 <= p2 else (p2, p1)
-        return start_m, end_m
-    
-    return None
+    return month_range(q, LATEST_SALES_MONTH)
 
 
-def get_cached_sales_subset(filters: dict, cache_key: str = None) -> pd.DataFrame:
+def get_cached_sales_subset(filters: dict, cache_key: str = None, columns: list = None) -> pd.DataFrame:
     """
     FYP: Get filtered sales data with caching.
-    Reduces memory usage by caching common filter combinations.
+    Caches the matching row positions (a few KB) instead of a DataFrame
+    copy per filter combination; compound filters intersect the cached
+    per-dimension bitmaps.
     
     Args:
         filters: Dictionary with state, branch, product, employee, channel, month_range
         cache_key: Optional explicit cache key (auto-generated if None)
+        columns: Optional subset of columns to materialise
     
     Returns:
         Filtered DataFrame
     """
-    # Generate cache key from filters
-    if cache_key is None:
-        key_parts = []
-        for k in ['state', 'branch', 'product', 'employee', 'channel']:
-            if filters.get(k):
-                key_parts.append(f"{k}:{filters[k]}")
-        if filters.get('month_range'):
-            key_parts.append(f"months:{filters['month_range']}")
-        cache_key = "|".join(key_parts) if key_parts else "all_data"
-    
-    # Try cache first
-    cached = sales_cache.get(cache_key)
-    if cached is not None:
-        print(f"✅ Cache HIT: {cache_key}")
-        return cached
-    
-    # Cache miss - compute and store
-    print(f"⚠️ Cache MISS: {cache_key}")
-    result = df_sales.copy()
-    
-    if filters.get('state'):
-        result = result[result['State'] == filters['state']]
-    if filters.get('branch'):
-        result = result[result['Branch'] == filters['branch']]
-    if filters.get('product'):
-        result = result[result['Product'] == filters['product']]
-    if filters.get('employee'):
-        result = result[result['Employee'] == filters['employee']]
-    if filters.get('channel') and 'Channel' in result.columns:
-        result = result[result['Channel'] == filters['channel']]
-    if filters.get('month_range'):
-        start, end = filters['month_range']
-        result = result[(result['YearMonth'] >= start) & (result['YearMonth'] <= end)]
-    
-    sales_cache.set(cache_key, result)
-    return result
+    keys = ['state', 'branch', 'product', 'employee', 'channel', 'month_range']
+    active = {k: filters[k] for k in keys if filters.get(k)}
+    return SALES_ROWS.view(active, columns, cache_key=cache_key)
 
 
 def show_cache_stats():
@@ -2185,6 +1895,10 @@ def show_cache_stats():
     print(f"  Hit Rate:          {stats['hit_rate_percent']}%")
     print(f"  Cache Size:        {stats['cache_size']} entries")
     print(f"  TTL:               {stats['ttl_seconds']} seconds ({stats['ttl_seconds']//60} min)")
+    print(f"  Memory:            {stats['bytes'] / 1e6:.1f} / {stats['max_bytes'] / 1e6:.0f} MB ({stats['policy'].upper()})")
+    print(f"  Evicted/Expired:   {stats['evictions']} / {stats['expirations']}")
+    for name, ns in stats['namespaces'].items():
+        print(f"  [{name}] {ns['entries']} entries, {ns['bytes'] / 1e6:.1f} MB, hit rate {ns['hit_rate_percent']}%")
     print("="*60 + "\n")
     return stats
 
@@ -2230,8 +1944,8 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
         is_lowest = any(k in s for k in ['lowest', 'worst', 'minimum', 'terendah', 'paling rendah'])
         
         # Group by month and calculate totals
-        monthly_sales = df_sales.groupby('YearMonth')['Total Sale'].sum().sort_values(ascending=is_lowest)
-        monthly_txns = df_sales.groupby('YearMonth').size()
+        monthly_sales = sales_cube.monthly('Total Sale').sort_values(ascending=is_lowest)
+        monthly_txns = sales_cube.monthly_rows()
         
         if len(monthly_sales) == 0:
             return "❌ No sales data available for month comparison."
@@ -2485,27 +2199,17 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
     if rng is not None and (is_top or "highest" in s or "most" in s):
         start_m, end_m = rng
 
-        mask = (df_sales["YearMonth"] >= start_m) & (df_sales["YearMonth"] <= end_m)
-        sub_range = df_sales[mask].copy()
-
         # Apply same filters (optional)
         state, branch, product, employee, channel = extract_sales_filters(q)
-        if state:
-            sub_range = sub_range[sub_range["State"] == state]
-        if branch:
-            sub_range = sub_range[sub_range["Branch"] == branch]
-        if product:
-            sub_range = sub_range[sub_range["Product"] == product]
-        if employee:
-            sub_range = sub_range[sub_range["Employee"] == employee]
-        if channel and "Channel" in sub_range.columns:
-            sub_range = sub_range[sub_range["Channel"] == channel]
+        sub_range = sales_cube.slice(start=start_m, end=end_m, state=state, branch=branch,
+                                     product=product, employee=employee, channel=channel)
+        range_rows = SalesCube.rows(sub_range)
 
-        if sub_range.empty:
+        if range_rows == 0:
             return f"❗ Tiada rekod sales untuk {start_m} → {end_m} dengan filter yang diberi."
 
         dim = detect_sales_dimension(q)  # default = Product
-        grp = sub_range.groupby(dim)[value_col].sum().sort_values(ascending=False)
+        grp = sub_range.groupby(dim, observed=True)[value_col].sum().sort_values(ascending=False)
 
         top_n = 5 if ("top 5" in s or "top5" in s) else 3
         top_df = grp.head(top_n).reset_index().rename(columns={value_col: metric_label})
@@ -2516,7 +2220,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             top_df[metric_label] = top_df[metric_label].astype(int)
         
         if trace:
-            trace.rows_used = len(sub_range)
+            trace.rows_used = range_rows
             trace.filters["period"] = f"{start_m} to {end_m}"
             trace.filters["dimension"] = dim
 
@@ -2532,7 +2236,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             "### Evidence Used",
             df_to_markdown_table(top_df),
             f"- Data Source: Structured Sales KPI",
-            f"- Rows Analyzed: {len(sub_range):,}",
+            f"- Rows Analyzed: {range_rows:,}",
             f"- Filters: {', '.join([f'{k}={v}' for k,v in trace.filters.items() if v and k not in ['metric', 'dimension', 'period']])}",
             "",
             "### Next Actions",
@@ -2552,24 +2256,15 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
         'month': str(month) if month else None
     }
     
-    sub = df_sales[df_sales["YearMonth"] == month].copy()
-
-    if state:
-        sub = sub[sub["State"] == state]
-    if branch:
-        sub = sub[sub["Branch"] == branch]
-    if product:
-        sub = sub[sub["Product"] == product]
-    if employee:
-        sub = sub[sub["Employee"] == employee]
-    if channel and "Channel" in sub.columns:
-        sub = sub[sub["Channel"] == channel]
+    filters = {"state": state, "branch": branch, "product": product, "employee": employee, "channel": channel}
+    sub = sales_cube.slice(month=month, **filters)
+    sub_rows = SalesCube.rows(sub)
 
-    if sub.empty:
+    if sub_rows == 0:
         return f"❗ Tiada rekod untuk {month} dengan filter yang diberi."
     
     if trace:
-        trace.rows_used = len(sub)
+        trace.rows_used = sub_rows
         trace.filters["month"] = str(month)
 
     # =========================
@@ -2583,19 +2278,12 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             # User wants to compare ACROSS states
             dim = "State"
             month_to_use = month if month else LATEST_SALES_MONTH
-            state_df = df_sales[df_sales["YearMonth"] == month_to_use].copy()
             
             # Apply non-state filters
-            if branch:
-                state_df = state_df[state_df["Branch"] == branch]
-            if product:
-                state_df = state_df[state_df["Product"] == product]
-            if employee:
-                state_df = state_df[state_df["Employee"] == employee]
-            if channel and "Channel" in state_df.columns:
-                state_df = state_df[state_df["Channel"] == channel]
-            
-            state_comparison = state_df.groupby("State")[value_col].sum().sort_values(ascending=False)
+            state_comparison, state_rows = sales_cube.group_sum(
+                "State", value_col, month=month_to_use,
+                branch=branch, product=product, employee=employee, channel=channel,
+            )
             comparison_df = state_comparison.reset_index().rename(columns={value_col: metric_label})
             
             if metric == "revenue":
@@ -2604,7 +2292,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
                 comparison_df[metric_label] = comparison_df[metric_label].astype(int)
             
             if trace:
-                trace.rows_used = len(state_df)
+                trace.rows_used = state_rows
                 trace.filters["comparison_type"] = "State"
             
             # EXECUTIVE FORMAT
@@ -2619,7 +2307,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
                 "### Evidence Used",
                 df_to_markdown_table(comparison_df),
                 f"- Data Source: Structured Sales KPI",
-                f"- Rows Analyzed: {len(state_df):,}",
+                f"- Rows Analyzed: {state_rows:,}",
                 "",
                 "### Key Insights",
                 f"- Best performing state: **{comparison_df.iloc[0]['State']}** ({comparison_df.iloc[0][metric_label]})",
@@ -2635,19 +2323,12 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
         if ("branch" in s or "cawangan" in s) and not extract_two_months_from_query(q):
             dim = "Branch"
             month_to_use = month if month else LATEST_SALES_MONTH
-            branch_df = df_sales[df_sales["YearMonth"] == month_to_use].copy()
             
             # Apply non-branch filters
-            if state:
-                branch_df = branch_df[branch_df["State"] == state]
-            if product:
-                branch_df = branch_df[branch_df["Product"] == product]
-            if employee:
-                branch_df = branch_df[branch_df["Employee"] == employee]
-            if channel and "Channel" in branch_df.columns:
-                branch_df = branch_df[branch_df["Channel"] == channel]
-            
-            branch_comparison = branch_df.groupby("Branch")[value_col].sum().sort_values(ascending=False)
+            branch_comparison, branch_rows = sales_cube.group_sum(
+                "Branch", value_col, month=month_to_use,
+                state=state, product=product, employee=employee, channel=channel,
+            )
             comparison_df = branch_comparison.head(10).reset_index().rename(columns={value_col: metric_label})  # Top 10 branches
             
             if metric == "revenue":
@@ -2656,7 +2337,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
                 comparison_df[metric_label] = comparison_df[metric_label].astype(int)
             
             if trace:
-                trace.rows_used = len(branch_df)
+                trace.rows_used = branch_rows
                 trace.filters["comparison_type"] = "Branch"
             
             # EXECUTIVE FORMAT
@@ -2671,7 +2352,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
                 "### Evidence Used",
                 df_to_markdown_table(comparison_df),
                 f"- Data Source: Structured Sales KPI",
-                f"- Rows Analyzed: {len(branch_df):,}",
+                f"- Rows Analyzed: {branch_rows:,}",
                 "",
                 "### Key Insights",
                 f"- Best performing branch: **{comparison_df.iloc[0]['Branch']}** ({comparison_df.iloc[0][metric_label]})",
@@ -2692,21 +2373,15 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             print(f"🔍 [v8.5.1] PRODUCT COMPARISON DETECTED: Query contains product/top N keywords")
             dim = "Product"
             month_to_use = month if month else LATEST_SALES_MONTH
-            product_df = df_sales[df_sales["YearMonth"] == month_to_use].copy()
             
             # Apply non-product filters
-            if state:
-                product_df = product_df[product_df["State"] == state]
-            if branch:
-                product_df = product_df[product_df["Branch"] == branch]
-            if employee:
-                product_df = product_df[product_df["Employee"] == employee]
-            if channel and "Channel" in product_df.columns:
-                product_df = product_df[product_df["Channel"] == channel]
+            product_comparison, product_rows = sales_cube.group_sum(
+                "Product", value_col, month=month_to_use,
+                state=state, branch=branch, employee=employee, channel=channel,
+            )
             
             # Get top N products
             top_n = 10 if "top 10" in s else 5 if "top 5" in s else 3
-            product_comparison = product_df.groupby("Product")[value_col].sum().sort_values(ascending=False)
             comparison_df = product_comparison.head(top_n).reset_index().rename(columns={value_col: metric_label})
             
             if metric == "revenue":
@@ -2715,7 +2390,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
                 comparison_df[metric_label] = comparison_df[metric_label].astype(int)
             
             if trace:
-                trace.rows_used = len(product_df)
+                trace.rows_used = product_rows
                 trace.filters["comparison_type"] = "Product"
             
             # EXECUTIVE FORMAT
@@ -2730,7 +2405,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
                 "### Evidence Used",
                 df_to_markdown_table(comparison_df),
                 f"- Data Source: Structured Sales KPI",
-                f"- Rows Analyzed: {len(product_df):,}",
+                f"- Rows Analyzed: {product_rows:,}",
                 "",
                 "### Key Insights",
                 f"- Best performing product: **{comparison_df.iloc[0]['Product']}** ({comparison_df.iloc[0][metric_label]})",
@@ -2751,34 +2426,14 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             cur_month = month
             prev_month = month - 1
 
-        cur_df = df_sales[df_sales["YearMonth"] == cur_month].copy()
-        prev_df = df_sales[df_sales["YearMonth"] == prev_month].copy()
-
         # Apply same filters
-        if state:
-            cur_df = cur_df[cur_df["State"] == state]
-            prev_df = prev_df[prev_df["State"] == state]
-        if branch:
-            cur_df = cur_df[cur_df["Branch"] == branch]
-            prev_df = prev_df[prev_df["Branch"] == branch]
-        if product:
-            cur_df = cur_df[cur_df["Product"] == product]
-            prev_df = prev_df[prev_df["Product"] == product]
-        if employee:
-            cur_df = cur_df[cur_df["Employee"] == employee]
-            prev_df = prev_df[prev_df["Employee"] == employee]
-        if channel and "Channel" in cur_df.columns:
-            cur_df = cur_df[cur_df["Channel"] == channel]
-        if channel and "Channel" in prev_df.columns:
-            prev_df = prev_df[prev_df["Channel"] == channel]
-
-        cur_val = float(cur_df[value_col].sum())
-        prev_val = float(prev_df[value_col].sum())
+        cur_val, cur_rows = sales_cube.total(value_col, month=cur_month, **filters)
+        prev_val, prev_rows = sales_cube.total(value_col, month=prev_month, **filters)
         diff = cur_val - prev_val
         pct = (diff / prev_val * 100) if prev_val != 0 else None
         
         if trace:
-            trace.rows_used = len(cur_df) + len(prev_df)
+            trace.rows_used = cur_rows + prev_rows
             trace.filters["comparison"] = f"{prev_month} vs {cur_month}"
 
         # FYP-GRADE RESPONSE FORMAT
@@ -2797,7 +2452,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             "**Evidence/Source:**",
             f"- KPI Facts: {cur_month} = {format_num(cur_val, decimals)}, {prev_month} = {format_num(prev_val, decimals)}",
             f"- Data Source: Sales CSV (MY_Retail_Sales_2024H1.csv)",
-            f"- Transactions: {cur_month} ({len(cur_df):,} rows), {prev_month} ({len(prev_df):,} rows)",
+            f"- Transactions: {cur_month} ({cur_rows:,} rows), {prev_month} ({prev_rows:,} rows)",
             f"- Calculation: Absolute difference and percentage change",
             "",
             "**Confidence:** High",
@@ -2817,7 +2472,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
     # =========================
     if is_top:
         dim = detect_sales_dimension(q)
-        grp = sub.groupby(dim)[value_col].sum().sort_values(ascending=False)
+        grp = sub.groupby(dim, observed=True)[value_col].sum().sort_values(ascending=False)
 
         top_n = 5 if ("top 5" in s or "top5" in s) else 3
         top_df = grp.head(top_n).reset_index().rename(columns={value_col: metric_label})
@@ -2858,7 +2513,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             "### Evidence Used",
             df_to_markdown_table(top_df),
             f"- Data Source: Structured Sales KPI",
-            f"- Rows Analyzed: {len(sub):,}",
+            f"- Rows Analyzed: {sub_rows:,}",
             "",
             "### Next Actions",
             f"- Analyze success factors of top {dim}",
@@ -2870,7 +2525,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
     # Default total (single month)
     # =========================
     # Validate dataframe before calculation
-    if sub.empty or value_col not in sub.columns:
+    if sub_rows == 0 or value_col not in sub.columns:
         return f"## ❌ No data available\n\n**Answer:** No {metric_label.lower()} data found for {month} with filters: {filter_text}\n\n**Recommendation:** Check filters or try a different time period."
     
     total_val = float(sub[value_col].sum())
@@ -2902,7 +2557,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
         f"- **{metric_label}:** {metric_value_str}",
         f"- Time period: {month}",
         f"- Scope: {filter_text}",
-        f"- Data completeness: {safe_format_number(len(sub), 0)} transactions analyzed",
+        f"- Data completeness: {safe_format_number(sub_rows, 0)} transactions analyzed",
         "",
         "**Evidence/Source:**",
         f"- KPI Facts: {metric_label} for {month} = {evidence_value_str}",
@@ -2912,7 +2567,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
         "",
         "**Confidence:** High",
         f"- Deterministic calculation from complete dataset",
-        f"- All {safe_format_number(len(sub), 0)} matching transactions included",
+        f"- All {safe_format_number(sub_rows, 0)} matching transactions included",
         f"- No estimation or inference required",
         "",
         "**Follow-up:**",
@@ -2945,7 +2600,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
         total_employees = len(df_hr)
         
         # Get breakdown by state
-        state_breakdown = df_hr.groupby("State")["EmpID"].count().sort_values(ascending=False)
+        state_breakdown = df_hr.groupby("State", observed=True)["EmpID"].count().sort_values(ascending=False)
         
         if trace:
             trace.rows_used = len(df_hr)
@@ -2978,7 +2633,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
     if "headcount" in s or "berapa orang" in s or "how many" in s:
         for d in HR_DEPTS:
             if d.lower() in s:
-                n = int((df_hr["Department"] == d).sum())
+                n = int(code_mask(df_hr["Department"], d).sum())
                 if trace:
                     trace.rows_used = len(df_hr)
                     trace.filters = {"department": d}
@@ -3005,7 +2660,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
 
         for st in HR_STATES:
             if st.lower() in s:
-                n = int((df_hr["State"] == st).sum())
+                n = int(code_mask(df_hr["State"], st).sum())
                 if trace:
                     trace.rows_used = len(df_hr)
                     trace.filters = {"state": st}
@@ -3017,25 +2672,25 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
 
     # Attrition analysis
     if "attrition" in s:
-        left = df_hr[df_hr["Attrition"].astype(str).str.lower() == "yes"].copy()
+        left = df_hr[code_mask(df_hr["Attrition"], "yes", ignore_case=True)].copy()
         if left.empty:
             return "## 📉 Attrition Analysis\n\n### Executive Summary\nNo attrition records found in current dataset.\n\n### Evidence Used\n- Data Source: Structured HR\n- Records Analyzed: {len(df_hr):,}"
 
         if "age" in s:
-            c = left.groupby("AgeGroup")["EmpID"].count().sort_values(ascending=False)
+            c = left.groupby("AgeGroup", observed=True)["EmpID"].count().sort_values(ascending=False)
             if trace:
                 trace.rows_used = len(left)
                 trace.filters = {"metric": "attrition_by_age"}
             return f"## 📉 Attrition Analysis by Age Group\n\n### Executive Summary\n**Highest Attrition:** {c.index[0]} ({int(c.iloc[0])} employees left)\n\n### Evidence Used\n- Data Source: Structured HR\n- Attrition Records: {len(left):,}\n- Total Employees: {len(df_hr):,}\n\n### Next Actions\n- Investigate reasons for age group-specific attrition\n- Develop retention programs\n- Review compensation and benefits"
 
         if "state" in s or "negeri" in s:
-            c = left.groupby("State")["EmpID"].count().sort_values(ascending=False)
+            c = left.groupby("State", observed=True)["EmpID"].count().sort_values(ascending=False)
             if trace:
                 trace.rows_used = len(left)
                 trace.filters = {"metric": "attrition_by_state"}
             return f"## 📉 Attrition Analysis by State\n\n### Executive Summary\n**Highest Attrition:** {c.index[0]} ({int(c.iloc[0])} employees left)\n\n### Evidence Used\n- Data Source: Structured HR\n- Attrition Records: {len(left):,}\n- Total Employees: {len(df_hr):,}\n\n### Next Actions\n- Compare regional factors\n- Review local management effectiveness\n- Assess market competitiveness"
 
-        c = left.groupby("Department")["EmpID"].count().sort_values(ascending=False)
+        c = left.groupby("Department", observed=True)["EmpID"].count().sort_values(ascending=False)
         if trace:
             trace.rows_used = len(left)
             trace.filters = {"metric": "attrition_by_department"}
@@ -3045,9 +2700,9 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
     if any(k in s for k in ["average income", "avg income", "gaji purata", "purata gaji", "average salary"]):
         for d in HR_DEPTS:
             if d.lower() in s:
-                avg = float(df_hr[df_hr["Department"] == d]["MonthlyIncome"].mean())
+                avg = float(df_hr[code_mask(df_hr["Department"], d)]["MonthlyIncome"].mean())
                 if trace:
-                    trace.rows_used = len(df_hr[df_hr["Department"] == d])
+                    trace.rows_used = len(df_hr[code_mask(df_hr["Department"], d)])
                     trace.filters = {"department": d, "metric": "avg_income"}
                 return f"## 💰 Average Income Analysis\n\n### Executive Summary\n**Department {d}:** RM {format_num(avg, 2)}\n\n### Evidence Used\n- Data Source: Structured HR\n- Records Analyzed: {trace.rows_used if trace else 'N/A'}\n\n### Next Actions\n- Benchmark against industry standards\n- Review compensation equity\n- Plan salary adjustments"
 
@@ -3060,7 +2715,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
     # FYP IMPROVEMENT: Role-based filtering (kitchen staff, managers, etc.)
     if any(k in s for k in ["kitchen", "chef", "cook", "kitchen staff"]):
         # Filter for kitchen-related roles
-        kitchen_staff = df_hr[df_hr["JobRole"].astype(str).str.contains("Kitchen|Chef|Cook", case=False, na=False)]
+        kitchen_staff = df_hr[code_contains(df_hr["JobRole"], "Kitchen|Chef|Cook")]
         
         if "salary" in s or "gaji" in s or "income" in s:
             if len(kitchen_staff) > 0:
@@ -3109,10 +2764,10 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
     
     # FYP IMPROVEMENT: Manager/Supervisor analysis
     if any(k in s for k in ["manager", "managers", "supervisor"]):
-        managers = df_hr[df_hr["JobRole"].astype(str).str.contains("Manager|Supervisor", case=False, na=False)]
+        managers = df_hr[code_contains(df_hr["JobRole"], "Manager|Supervisor")]
         
         if "left" in s or "attrition" in s or "resign" in s:
-            left_managers = managers[managers["Attrition"].astype(str).str.lower() == "yes"]
+            left_managers = managers[code_mask(managers["Attrition"], "yes", ignore_case=True)]
             if trace:
                 trace.rows_used = len(left_managers)
                 trace.filters = {"role": "manager", "metric": "attrition"}
@@ -3255,7 +2910,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
     # FYP IMPROVEMENT: Age distribution
     if any(k in s for k in ["age distribution", "age group", "workforce age"]):
         if "AgeGroup" in df_hr.columns:
-            age_dist = df_hr.groupby("AgeGroup")["EmpID"].count().sort_values(ascending=False)
+            age_dist = df_hr.groupby("AgeGroup", observed=True)["EmpID"].count().sort_values(ascending=False)
             age_str = "\n".join([f"- **{age}**: {int(count)} employees ({count/len(df_hr)*100:.1f}%)" for age, count in age_dist.items()])
             if trace:
                 trace.rows_used = len(df_hr)
@@ -3282,7 +2937,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
     # FYP IMPROVEMENT: Branch/Location ranking by headcount
     if any(k in s for k in ["most employees", "highest headcount", "largest branch", "branch with most"]):
         if "State" in df_hr.columns:
-            branch_counts = df_hr.groupby("State")["EmpID"].count().sort_values(ascending=False)
+            branch_counts = df_hr.groupby("State", observed=True)["EmpID"].count().sort_values(ascending=False)
             top_branch = branch_counts.index[0]
             top_count = int(branch_counts.iloc[0])
             
@@ -3394,11 +3049,11 @@ def answer_ceo_strategic(q: str, trace: ToolTrace = None) -> str:
         # But we can identify top-performing BRANCHES by revenue per staff
         
         # Calculate sales by state
-        sales_by_state = df_sales.groupby('State')['Total Sale'].sum().reset_index()
+        sales_by_state = df_sales.groupby('State', observed=True)['Total Sale'].sum().reset_index()
         sales_by_state.columns = ['State', 'Total_Sales']
         
         # Calculate employees by state
-        emp_by_state = df_hr.groupby('State')['EmpID'].count().reset_index()
+        emp_by_state = df_hr.groupby('State', observed=True)['EmpID'].count().reset_index()
         emp_by_state.columns = ['State', 'Employee_Count']
         
         # Merge
@@ -3475,11 +3130,11 @@ Ask: "Which branch has highest revenue per staff?" for branch-level insights
     # Query 3: Branch revenue per staff member ranking
     if any(phrase in s for phrase in ['revenue per staff', 'generates most revenue per staff', 'branch revenue per staff', 'productivity by branch']):
         # Calculate sales by state
-        sales_by_state = df_sales.groupby('State')['Total Sale'].sum().reset_index()
+        sales_by_state = df_sales.groupby('State', observed=True)['Total Sale'].sum().reset_index()
         sales_by_state.columns = ['State', 'Total_Sales']
         
         # Calculate employees by state
-        emp_by_state = df_hr.groupby('State')['EmpID'].count().reset_index()
+        emp_by_state = df_hr.groupby('State', observed=True)['EmpID'].count().reset_index()
         emp_by_state.columns = ['State', 'Employee_Count']
         
         # Merge
@@ -3541,25 +3196,13 @@ Ask: "Which branch has highest revenue per staff?" for branch-level insights
     return None
 
 def retrieve_context(query: str, k: int = 12, mode: str = "all", trace: ToolTrace = None) -> str:
-    q_emb = embedder.encode([query], convert_to_numpy=True)
-    faiss.normalize_L2(q_emb)
+    q_emb = embedder.encode_query(query)[None, :]
 
-    # Ambil lebih banyak awal supaya boleh filter (docs vs all)
-    # k0 minimum 60 (v8.8 optimization for better RAG coverage)
-    k0 = min(max(k * 5, 60), int(index.ntotal) if index is not None else 0)
-    if k0 <= 0:
+    if index is None or index.ntotal == 0:
         return ""
 
-    scores, idx = index.search(q_emb, k=k0)
-
-    # idx[0] is list of candidate indices
-    candidates = [summaries[i] for i in idx[0] if i != -1]
-
-    if mode == "docs":
-        candidates = [c for c in candidates if c.startswith("[DOC:")]
-
-    # limit final
-    candidates = candidates[:k]
+    # docs mode searches only the docs sub-index; "all" merges every source by score
+    candidates = [text for _, text in index.search(q_emb, k, mode=mode)]
     
     # Track sources in trace
     if trace:
@@ -4175,13 +3818,49 @@ def generate_ceo_followup_questions(query: str, answer: str, route: str, data_co
 
 
 # ✅ STREAMING VERSION (recommended for UX)
-def generate_answer_with_model_stream(model_name: str, query: str, mode: str = "all", trace: ToolTrace = None, conversation_history: list = None, query_type: str = "performance"):
+def generate_answer_with_model_stream(model_name: str, query: str, mode: str = "all", trace: ToolTrace = None, conversation_history: list = None, query_type: str = "performance", cancel: CancelToken = None):
+    """
+    Answer from the semantic cache, or wait for an LLM pool slot and stream a new answer.
+    Yields core.stream_events: delta tokens, heartbeats (queue / retrieval / llm) and a final answer.
+    """
+    cancel = cancel or CancelToken()
+    
+    # Semantic answer cache: only first-turn questions (follow-ups put the history into the prompt)
+    cache_key = (f"{trace.route if trace else 'rag'}|{mode}|{query_type}", model_name, RAG_CORPUS_VERSION)
+    q_vec = None
+    if not conversation_history:
+        q_vec = embedder.encode_query(query)
+        cached = ANSWER_CACHE.lookup(q_vec, *cache_key)
+        if cached:
+            print(f"⚡ Semantic cache hit ({cached['similarity']:.3f}): {cached['query'][:60]}")
+            if trace:
+                trace.cache_hit = {k: cached[k] for k in ("query", "similarity", "age_s")}
+            yield ev.final(cached["answer"])
+            return
+    
+    # Wait (FIFO) for one of the LLM slots; queue heartbeats keep the UI timer moving
+    ticket = SCHEDULER.enqueue("llm", cancel)
+    try:
+        while not SCHEDULER.acquire(ticket, timeout=0.3):
+            yield ev.heartbeat("queue", SCHEDULER.position(ticket), ticket.wait_ms / 1000)
+        if trace:
+            trace.queue = ticket.to_trace()
+        yield from _stream_llm_answer(model_name, query, mode, trace, conversation_history, query_type,
+                                      cancel, q_vec, cache_key)
+    except RequestCancelled:
+        print("🛑 Query cancelled while queued for an LLM slot")
+    finally:
+        SCHEDULER.release(ticket)
+
+
+def _stream_llm_answer(model_name: str, query: str, mode: str, trace: ToolTrace, conversation_history: list,
+                       query_type: str, stop: CancelToken, q_vec, cache_key):
     # ✅ FIX: Add heartbeat during long retrieval operation with proper cancellation
     import threading
     import time
     
     retrieval_done = threading.Event()
-    # Use global stop flag instead of local
+    # Per-request stop token (Stop in one session never cancels another)
     
     def retrieval_thread():
         """Background thread that does the actual retrieval"""
@@ -4199,27 +3878,26 @@ def generate_answer_with_model_stream(model_name: str, query: str, mode: str = "
     thread = threading.Thread(target=retrieval_thread, daemon=True)
     thread.start()
     
-    # Send heartbeat markers while retrieval is happening
+    # Send heartbeat events while retrieval is happening
     heartbeat_count = 0
     retrieval_start = time.time()
     
     try:
-        while not retrieval_done.is_set() and not GLOBAL_STOP_REQUESTED.is_set():
+        while not retrieval_done.is_set() and not stop.is_set():
             heartbeat_count += 1
             elapsed = time.time() - retrieval_start
             # Include elapsed time in heartbeat so timer can update
-            heartbeat_msg = f"_HEARTBEAT_{heartbeat_count}|{elapsed:.1f}_"
-            print(f"💓 Sending: {heartbeat_msg}")
-            yield heartbeat_msg
+            print(f"💓 Retrieval heartbeat {heartbeat_count} ({elapsed:.1f}s)")
+            yield ev.heartbeat("retrieval", heartbeat_count, elapsed)
             time.sleep(0.3)  # Send heartbeat every 0.3 seconds
     except GeneratorExit:
         # Generator was cancelled (stop button clicked)
-        GLOBAL_STOP_REQUESTED.set()
+        stop.set()
         print("🛑 Query cancelled by user (retrieval phase)")
         return
     
     # Check if cancelled
-    if GLOBAL_STOP_REQUESTED.is_set():
+    if stop.is_set():
         print("🛑 Stop flag detected, exiting (retrieval phase)")
         return
     
@@ -4228,7 +3906,7 @@ def generate_answer_with_model_stream(model_name: str, query: str, mode: str = "
     
     # Retrieval is done, continue with normal flow
     if context is None:
-        yield "Error: Context retrieval failed"
+        yield ev.final("Error: Context retrieval failed")
         return
     
     # Log conversation_history structure (GAP-004)
@@ -4247,157 +3925,88 @@ def generate_answer_with_model_stream(model_name: str, query: str, mode: str = "
     # Model fallback order (from largest to smallest)
     fallback_models = [model_name, 'mistral:latest', 'llama3:latest']
     
-    out = ""
+    answer = ev.AnswerBuffer()  # token list, joined once at the end
+    completed = False
+    messages = [{"role": "user", "content": prompt}]
+    options = {"num_ctx": 2048, "temperature": 0, "num_predict": 400, "num_gpu": 0}
+    MAX_WAIT_TIME = 90.0  # Maximum 90 seconds for the whole LLM response
+    max_retries = 2
     try:
         for attempt_model in fallback_models:
-            try:
-                # ✅ FIX: Add heartbeat during LLM generation to prevent UI freeze
-                import queue
-                token_queue = queue.Queue()
-                llm_done = threading.Event()
-                llm_error = None
-                
-                def llm_thread():
-                    """Background thread for LLM streaming with timeout protection"""
-                    nonlocal llm_error
-                    try:
-                        import socket
-                        # Set socket timeout for Ollama connection (60s max wait)
-                        original_timeout = socket.getdefaulttimeout()
-                        socket.setdefaulttimeout(60.0)
-                        
-                        try:
-                            for chunk in ollama.chat(
-                                model=attempt_model,
-                                messages=[{"role": "user", "content": prompt}],
-                                options={"num_ctx": 2048, "temperature": 0, "num_predict": 400, "num_gpu": 0},
-                                stream=True,
-                                keep_alive="5m",
-                            ):
-                                # Check global stop flag
-                                if GLOBAL_STOP_REQUESTED.is_set():
-                                    print("🛑 LLM thread: Global stop flag detected, exiting")
-                                    break
-                                token = chunk.get("message", {}).get("content", "")
-                                if token:
-                                    token_queue.put(("token", token))
-                        finally:
-                            # Restore original timeout
-                            socket.setdefaulttimeout(original_timeout)
-                    except socket.timeout:
-                        llm_error = TimeoutError("⏱️ LLM timeout after 60s - Ollama may be overloaded")
-                        print(f"❌ {llm_error}")
-                    except Exception as e:
-                        llm_error = e
-                    finally:
-                        llm_done.set()
-                
-                # Start LLM in background
-                llm_worker = threading.Thread(target=llm_thread, daemon=True)
-                llm_worker.start()
-                
-                # Send heartbeats while waiting for first token
+            retry = 0
+            while True:
                 llm_heartbeat_count = 0
                 llm_start = time.time()
                 first_token_received = False
-                MAX_WAIT_TIME = 90.0  # Maximum 90 seconds wait for LLM response
-                
                 try:
-                    while not llm_done.is_set() or not token_queue.empty():
-                        # Check timeout
-                        llm_elapsed = time.time() - llm_start
-                        if llm_elapsed > MAX_WAIT_TIME:
-                            print(f"❌ LLM timeout after {llm_elapsed:.1f}s - Force stopping")
-                            GLOBAL_STOP_REQUESTED.set()
-                            raise TimeoutError(f"LLM did not respond within {MAX_WAIT_TIME}s")
-                        
-                        # Check global stop flag
-                        if GLOBAL_STOP_REQUESTED.is_set():
-                            print("🛑 Main loop: Global stop flag detected, exiting LLM generation")
-                            return  # Exit generator immediately
-                        
-                        try:
-                            # Try to get token with timeout
-                            msg_type, data = token_queue.get(timeout=0.5)
-                            if msg_type == "token":
-                                first_token_received = True
-                                out += data
-                                yield out.strip()
-                        except queue.Empty:
-                            # No token yet, send heartbeat
-                            if not first_token_received:
-                                llm_heartbeat_count += 1
-                                print(f"🤖 LLM heartbeat {llm_heartbeat_count}: waiting {llm_elapsed:.1f}s for first token")
-                                yield f"_LLM_WAIT_{llm_heartbeat_count}_"
-                except GeneratorExit:
-                    # Stop button clicked during LLM processing
-                    GLOBAL_STOP_REQUESTED.set()
-                    print("🛑 GeneratorExit caught - setting global stop flag (LLM phase)")
-                    return
-                
-                # Check for errors
-                if llm_error:
-                    raise llm_error
-                
-                # If successful, break out of fallback loop
-                break
-            except Exception as e:
-                error_msg = str(e)
-                # Check if it's a memory/loading error (status 500)
-                if "status code: 500" in error_msg or "unable to allocate" in error_msg.lower() or "loading model" in error_msg.lower():
-                    print(f"⚠️ Memory/loading error with {attempt_model}: {error_msg}")
+                    # ✅ Pooled async client: per-call timeouts (no global socket timeout);
+                    # None arrives every 0.5s while waiting so the UI timer keeps moving
+                    with closing(LLM.stream_chat(attempt_model, messages, options, keep_alive="5m",
+                                                 first_token_timeout=60.0, idle_timeout=60.0,
+                                                 heartbeat=0.5, cancel=stop)) as tokens:
+                        for token in tokens:
+                            llm_elapsed = time.time() - llm_start
+                            if llm_elapsed > MAX_WAIT_TIME:
+                                print(f"❌ LLM timeout after {llm_elapsed:.1f}s - Force stopping")
+                                raise TimeoutError(f"LLM did not respond within {MAX_WAIT_TIME}s")
+                            
+                            # Check this request's stop token
+                            if stop.is_set():
+                                print("🛑 Main loop: stop token set, exiting LLM generation")
+                                return  # Exit generator immediately (closing the stream cancels the request)
+                            
+                            if token is None:
+                                # No token yet, send heartbeat
+                                if not first_token_received:
+                                    llm_heartbeat_count += 1
+                                    print(f"🤖 LLM heartbeat {llm_heartbeat_count}: waiting {llm_elapsed:.1f}s for first token")
+                                    yield ev.heartbeat("llm", llm_heartbeat_count, llm_elapsed)
+                                continue
+                            first_token_received = True
+                            event = ev.delta(token)
+                            answer.feed(event)
+                            yield event
                     
-                    # Try retry with delay before switching models
-                    max_retries = 2
-                    for retry in range(max_retries):
-                        print(f"🔄 Retry {retry+1}/{max_retries} for {attempt_model} after 2s delay...")
+                    if stop.is_set():
+                        return
+                    completed = True
+                    break
+                except Exception as e:
+                    error_msg = str(e)
+                    # Memory/loading error (status 500) before any output: retry, then a smaller model
+                    loading_error = not first_token_received and (
+                        "status code: 500" in error_msg or "unable to allocate" in error_msg.lower() or "loading model" in error_msg.lower())
+                    if loading_error and retry < max_retries:
+                        retry += 1
+                        print(f"⚠️ Memory/loading error with {attempt_model}: {error_msg}")
+                        print(f"🔄 Retry {retry}/{max_retries} for {attempt_model} after 2s delay...")
                         time.sleep(2)  # Wait for memory to clear
-                        try:
-                            # Try loading model first to ensure it's available
-                            print(f"📥 Pre-loading {attempt_model}...")
-                            ollama.chat(
-                                model=attempt_model,
-                                messages=[{"role": "user", "content": "test"}],
-                                options={"num_ctx": 512, "num_predict": 1},
-                                keep_alive="5m"
-                            )
-                            print(f"✅ Model {attempt_model} loaded successfully, retrying query...")
-                            # Model loaded, retry the actual query
-                            llm_error = None
-                            llm_done.clear()
-                            llm_worker = threading.Thread(target=llm_thread, daemon=True)
-                            llm_worker.start()
-                            # Wait for completion
-                            llm_worker.join(timeout=30)
-                            if llm_error:
-                                raise llm_error
-                            break  # Success, exit retry loop
-                        except Exception as retry_err:
-                            print(f"❌ Retry {retry+1} failed: {retry_err}")
-                            if retry == max_retries - 1:
-                                # Last retry failed, try next model
-                                if attempt_model != fallback_models[-1]:
-                                    print(f"🔄 Switching to smaller model: {fallback_models[fallback_models.index(attempt_model) + 1]}")
-                                    break
-                                else:
-                                    yield "❌ Error: Unable to load model after multiple retries. Please ensure Ollama is running and has sufficient memory."
-                                    return
-                    
-                    if attempt_model != fallback_models[-1]:
-                        continue  # Try next model
-                    else:
-                        # All models failed
-                        yield "❌ Error: All models failed to load. Please restart Ollama or free up system memory."
+                        # Load the model (empty prompt, no throwaway generation), then retry the query
+                        preload_ollama_model(attempt_model)
+                        continue
+                    if loading_error and attempt_model != fallback_models[-1]:
+                        print(f"🔄 Switching to smaller model: {fallback_models[fallback_models.index(attempt_model) + 1]}")
                         break
-                else:
-                    # Other error, yield and break
-                    yield f"❌ Error: {error_msg}"
-                    break
+                    if loading_error:
+                        # All models failed
+                        yield ev.final("❌ Error: All models failed to load. Please restart Ollama or free up system memory.")
+                    else:
+                        # Other error, yield and stop
+                        yield ev.final(f"❌ Error: {error_msg}")
+                    return
+            if completed:
+                break
     except GeneratorExit:
-        # Catch any remaining GeneratorExit at top level
-        GLOBAL_STOP_REQUESTED.set()
-        print("🛑 GeneratorExit caught at top level - setting global stop flag")
+        # Stop button clicked: closing the stream above cancels the Ollama request
+        stop.set()
+        print("🛑 GeneratorExit caught - setting stop token (LLM phase)")
         return
+    
+    if completed and not stop.is_set():
+        out = answer.text().strip()
+        yield ev.final(out)
+        if q_vec is not None:
+            ANSWER_CACHE.store(q_vec, query, out, *cache_key)
 
 
 # (Optional) NON-STREAMING version (kalau kau masih nak guna)
@@ -4412,13 +4021,13 @@ def generate_answer_with_model(model_name: str, query: str, mode: str = "all", t
         max_retries = 2
         for retry in range(max_retries):
             try:
-                resp = ollama.chat(
-                    model=attempt_model,
-                    messages=[{"role": "user", "content": prompt}],
+                return LLM.chat(
+                    attempt_model,
+                    [{"role": "user", "content": prompt}],
                     options={"num_ctx": 2048, "temperature": 0, "num_predict": 400, "num_gpu": 0},
                     keep_alive="5m",
+                    timeout=120.0,
                 )
-                return resp["message"]["content"].strip()
             except Exception as e:
                 error_msg = str(e)
                 # Check if it's a memory/loading error (status 500)
@@ -4429,18 +4038,8 @@ def generate_answer_with_model(model_name: str, query: str, mode: str = "all", t
                         # Try again after delay
                         print(f"🔄 Waiting 2s before retry...")
                         time.sleep(2)
-                        # Try pre-loading model
-                        try:
-                            print(f"📥 Pre-loading {attempt_model}...")
-                            ollama.chat(
-                                model=attempt_model,
-                                messages=[{"role": "user", "content": "test"}],
-                                options={"num_ctx": 512, "num_predict": 1},
-                                keep_alive="5m"
-                            )
-                            print(f"✅ Model loaded, retrying...")
-                        except:
-                            pass
+                        # Load the model (empty prompt, no throwaway generation)
+                        preload_ollama_model(attempt_model)
                         continue  # Retry same model
                     elif attempt_model != fallback_models[-1]:
                         # Move to next model
@@ -4541,6 +4140,15 @@ ANALYTICAL_PATTERNS = {
     ]
 }
 
+# Compiled once at import: one automaton for all keyword classes (single
+# pass per query) and one alternation regex per query-type class
+ROUTING_KEYWORDS = KeywordAutomaton({
+    'docs': HR_POLICY_KEYWORDS + DOC_KEYWORDS,
+    'hr': HR_KEYWORDS,
+    'sales': SALES_KEYWORDS,
+})
+ANALYTICAL_REGEX = {name: compile_patterns(patterns) for name, patterns in ANALYTICAL_PATTERNS.items()}
+
 
 def detect_query_type(text: str) -> str:
     """
@@ -4555,25 +4163,11 @@ def detect_query_type(text: str) -> str:
     """
     text_lower = (text or "").lower().strip()
     
-    # Check strategic patterns
-    for pattern in ANALYTICAL_PATTERNS['strategic']:
-        if re.search(pattern, text_lower):
-            return 'STRATEGIC'
-    
-    # Check trend patterns
-    for pattern in ANALYTICAL_PATTERNS['trend']:
-        if re.search(pattern, text_lower):
-            return 'ANALYTICAL_TREND'
-    
-    # Check distribution patterns
-    for pattern in ANALYTICAL_PATTERNS['distribution']:
-        if re.search(pattern, text_lower):
-            return 'ANALYTICAL_DIST'
-    
-    # Check ambiguous patterns
-    for pattern in ANALYTICAL_PATTERNS['ambiguous']:
-        if re.search(pattern, text_lower):
-            return 'AMBIGUOUS'
+    # Checked in priority order
+    for name, query_type in (('strategic', 'STRATEGIC'), ('trend', 'ANALYTICAL_TREND'),
+                             ('distribution', 'ANALYTICAL_DIST'), ('ambiguous', 'AMBIGUOUS')):
+        if ANALYTICAL_REGEX[name].search(text_lower):
+            return query_type
     
     return 'FACTUAL'
 
@@ -4593,18 +4187,9 @@ def keyword_match(keywords: list, text: str) -> tuple:
         - Multi-word phrases (containing spaces): Use substring matching
         - Single words: Use word boundary regex to prevent false positives
           (e.g., "age" won't match "percentage" or "average")
+        - Compiled once per keyword list (core.keyword_automaton)
     """
-    matched_keywords = []
-    for k in keywords:
-        if ' ' in k:
-            # Multi-word phrase: use substring matching
-            if k in text:
-                matched_keywords.append(k)
-        else:
-            # Single word: use word boundary to prevent substring matches
-            if re.search(rf'\b{re.escape(k)}\b', text):
-                matched_keywords.append(k)
-    return (len(matched_keywords) > 0, matched_keywords)
+    return match_keywords(keywords, text)
 
 
 # NEW v8.5: Infer domain for analytical queries based on content
@@ -4783,14 +4368,13 @@ def detect_intent(text: str, has_image: bool, conversation_history: list = None)
                     break
             
             if last_user_msg:
-                matched_hr, _ = keyword_match(HR_KEYWORDS, last_user_msg)
-                if matched_hr:
+                last_matches = ROUTING_KEYWORDS.scan(last_user_msg)
+                if last_matches['hr']:
                     route = "hr_kpi"
                     print(f"🔀 ROUTE: '{text[:50]}...' → {route} (ambiguous, inherited from HR context)")
                     return route
                 
-                matched_sales, _ = keyword_match(SALES_KEYWORDS, last_user_msg)
-                if matched_sales:
+                if last_matches['sales']:
                     route = "sales_kpi"
                     print(f"🔀 ROUTE: '{text[:50]}...' → {route} (ambiguous, inherited from sales context)")
                     return route
@@ -4800,9 +4384,12 @@ def detect_intent(text: str, has_image: bool, conversation_history: list = None)
         print(f"🔀 ROUTE: '{text[:50]}...' → {route} (ambiguous query, needs clarification)")
         return route
 
+    # Every keyword class in one pass over the query
+    matches = ROUTING_KEYWORDS.scan(s)
+
     # Policy / SOP should go to docs
-    matched, matched_keywords = keyword_match(HR_POLICY_KEYWORDS + DOC_KEYWORDS, s)
-    if matched:
+    matched_keywords = matches['docs']
+    if matched_keywords:
         route = "rag_docs"
         print(f"🔀 ROUTE: '{text[:50]}...' → {route} (matched: {matched_keywords[:3]})")
         return route
@@ -4837,15 +4424,15 @@ def detect_intent(text: str, has_image: bool, conversation_history: list = None)
             return route
 
     # HR KPI keywords (with word-boundary matching)
-    matched, matched_keywords = keyword_match(HR_KEYWORDS, s)
-    if matched:
+    matched_keywords = matches['hr']
+    if matched_keywords:
         route = "hr_kpi"
         print(f"🔀 ROUTE: '{text[:50]}...' → {route} (matched: {matched_keywords[:3]})")
         return route
 
     # Sales KPI keywords (with word-boundary matching)
-    matched, matched_keywords = keyword_match(SALES_KEYWORDS, s)
-    if matched:
+    matched_keywords = matches['sales']
+    if matched_keywords:
         route = "sales_kpi"
         print(f"🔀 ROUTE: '{text[:50]}...' → {route} (matched: {matched_keywords[:3]})")
         return route
@@ -4861,14 +4448,13 @@ def detect_intent(text: str, has_image: bool, conversation_history: list = None)
         
         if last_user_msg:
             # If previous query was HR-related, stay in HR domain
-            matched_hr, _ = keyword_match(HR_KEYWORDS, last_user_msg)
-            if matched_hr:
+            last_matches = ROUTING_KEYWORDS.scan(last_user_msg)
+            if last_matches['hr']:
                 route = "hr_kpi"
                 print(f"🔀 ROUTE: '{text[:50]}...' → {route} (inherited from previous HR query)")
                 return route
             # If previous query was sales-related, stay in sales domain
-            matched_sales, _ = keyword_match(SALES_KEYWORDS, last_user_msg)
-            if matched_sales:
+            if last_matches['sales']:
                 route = "sales_kpi"
                 print(f"🔀 ROUTE: '{text[:50]}...' → {route} (inherited from previous sales query)")
                 return route
@@ -4907,8 +4493,9 @@ def build_followup_list(followups: list) -> tuple:
     return (followups, None)
 
 
-def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat_id: str = "", conversation_history: list = None):
+def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat_id: str = "", conversation_history: list = None, cancel: CancelToken = None):
     start = time.perf_counter()
+    cancel = cancel or CancelToken()
     route = "rag_docs"
     final_answer = ""
     trace = None
@@ -4950,11 +4537,13 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         Yields (status_html, answer_md, tool_trace_html, followup_list).
         Returns final answer markdown.
         
-        ✅ FIX: Handle heartbeat markers with embedded elapsed time
+        ✅ FIX: Heartbeats arrive as out-of-band events (core.stream_events), not text markers
         ✅ FIX: Use start_time to calculate consistent elapsed time for ALL updates
+        ✅ Tokens go into a list buffer; the answer is joined once per tick, not per token
         """
-        out = ""
+        answer = ev.AnswerBuffer()
         last = time.perf_counter()
+        dirty = False
         retrieving = False
         heartbeat_count = 0
         
@@ -4968,30 +4557,28 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         # show prefix immediately
         yield (render_status(route_name, model_name, note="Starting...", elapsed_time=get_elapsed()), prefix_md, "", [])
 
-        for partial in stream_gen:
-            # Check for heartbeat marker with format "_HEARTBEAT_N|elapsed_"
-            if partial.startswith("_HEARTBEAT_") and partial.endswith("_"):
-                retrieving = True
-                heartbeat_count += 1
-                # Use overall elapsed time from query start for consistent timer
+        for event in stream_gen:
+            if event.kind == ev.HEARTBEAT:
                 current_elapsed = get_elapsed()
-                print(f"⏱️ Heartbeat {heartbeat_count}: elapsed={current_elapsed:.1f}s")
-                # Pass elapsed time to render_status for accurate timer display
-                status_html = render_status(route_name, model_name, note=f"Searching... ({heartbeat_count})", elapsed_time=current_elapsed)
-                # Modify prefix to force Gradio UI update
-                prefix_with_marker = prefix_md + f"<!-- h{heartbeat_count} -->"
-                yield (status_html, prefix_with_marker, "", [])
+                if event.phase == "retrieval":
+                    retrieving = True
+                    heartbeat_count += 1
+                    print(f"⏱️ Heartbeat {heartbeat_count}: elapsed={current_elapsed:.1f}s")
+                    note = f"Searching... ({heartbeat_count})"
+                elif event.phase == "queue":
+                    note = f"Queued ({event.count} ahead)"
+                else:
+                    # LLM is starting up, keep updating timer
+                    print(f"🤖 LLM wait: elapsed={current_elapsed:.1f}s")
+                    note = "Generating..."
+                # Pass elapsed time to render_status for accurate timer display;
+                # the comment in the answer forces Gradio to repaint
+                status_html = render_status(route_name, model_name, note=note, elapsed_time=current_elapsed)
+                yield (status_html, prefix_md + f"<!-- {event.phase}{event.count} -->", "", [])
                 continue
             
-            # Check for LLM wait marker
-            if partial.startswith("_LLM_WAIT_") and partial.endswith("_"):
-                # LLM is starting up, keep updating timer
-                current_elapsed = get_elapsed()
-                print(f"🤖 LLM wait: elapsed={current_elapsed:.1f}s")
-                status_html = render_status(route_name, model_name, note="Generating...", elapsed_time=current_elapsed)
-                # Force UI update with marker
-                prefix_with_marker = prefix_md + f"<!-- llm{partial} -->"
-                yield (status_html, prefix_with_marker, "", [])
+            if event.kind == ev.STATUS:
+                yield (render_status(route_name, model_name, note=event.text, elapsed_time=get_elapsed()), prefix_md + answer.text().strip(), "", [])
                 continue
             
             # If we were retrieving, now we have real content
@@ -5001,12 +4588,14 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
                 # Update status to "Generating" with consistent elapsed time
                 yield (render_status(route_name, model_name, note="Generating...", elapsed_time=get_elapsed()), prefix_md, "", [])
             
-            out = partial
+            dirty = answer.feed(event) or dirty
             now = time.perf_counter()
-            if (now - last) >= tick:
+            if dirty and (now - last) >= tick:
                 last = now
-                yield (render_status(route_name, model_name, note="Processing", elapsed_time=get_elapsed()), prefix_md + out, "", [])
+                dirty = False
+                yield (render_status(route_name, model_name, note="Processing", elapsed_time=get_elapsed()), prefix_md + answer.text().strip(), "", [])
 
+        out = answer.text().strip()
         final_md = (prefix_md + out).strip()
         
         # Add verification for KPI routes
@@ -5052,7 +4641,7 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         #         ollama_client=ollama,
         #         answer_sales_fn=answer_sales_ceo_kpi,
         #         answer_hr_fn=answer_hr,
-        #         answer_rag_fn=lambda q, h: list(generate_answer_with_model_stream(model_name, q, mode="docs", trace=ToolTrace("rag_docs", model_name), conversation_history=h))[-1] if h is not None else "",
+        #         answer_rag_fn=lambda q, h: ev.collect_text(generate_answer_with_model_stream(model_name, q, mode="docs", trace=ToolTrace("rag_docs", model_name), conversation_history=h)) if h is not None else "",
         #         df_sales=df_sales,  # Pass DataFrames for metrics calculation (v8.5)
         #         df_hr=df_hr
         #     )
@@ -5102,7 +4691,7 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         #     try:
         #         while not execution_done.is_set():
         #             # Check global stop flag
-        #             if GLOBAL_STOP_REQUESTED.is_set():
+        #             if cancel.is_set():
         #                 print("🛑 Hybrid execution: Stop requested")
         #                 break
         #             
@@ -5132,7 +4721,7 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         #             raise RuntimeError("No result from hybrid executor")
         #             
         #     except GeneratorExit:
-        #         GLOBAL_STOP_REQUESTED.set()
+        #         cancel.set()
         #         print("🛑 GeneratorExit: Stop button clicked during hybrid execution")
         #         return
         #     except Exception as e:
@@ -5172,7 +4761,7 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
             route = "visual"
             trace = ToolTrace(route, model_name)
             prefix = "## 📷 Visual Analysis\n\n"
-            gen = generate_answer_with_model_stream(model_name, user_input, mode="all", trace=trace, conversation_history=conversation_history, query_type=query_type)
+            gen = generate_answer_with_model_stream(model_name, user_input, mode="all", trace=trace, conversation_history=conversation_history, query_type=query_type, cancel=cancel)
 
             final_answer = yield from stream_with_throttle(prefix, gen, route_name=route, tick=0.2, query=user_input, start_time=start)
             
@@ -5193,14 +4782,15 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         if intent == "hr_kpi":
             route = "hr_kpi"
             trace = ToolTrace(route, "N/A")
-            hr_ans = answer_hr(user_input, trace=trace)
+            with SCHEDULER.slot("kpi", cancel, trace):
+                hr_ans = answer_hr(user_input, trace=trace)
 
             # If HR returns None (policy-like), fallback to docs RAG
             if hr_ans is None:
                 route = "rag_docs"
                 trace = ToolTrace(route, model_name)
                 prefix = "## 📄 Document Analysis\n\n"
-                gen = generate_answer_with_model_stream(model_name, user_input, mode="docs", trace=trace, conversation_history=conversation_history, query_type=query_type)
+                gen = generate_answer_with_model_stream(model_name, user_input, mode="docs", trace=trace, conversation_history=conversation_history, query_type=query_type, cancel=cancel)
 
                 final_answer = yield from stream_with_throttle(prefix, gen, route_name=route, tick=0.2, query=user_input, start_time=start)
                 
@@ -5232,7 +4822,8 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         if intent == "ceo_strategic":
             route = "ceo_strategic"
             trace = ToolTrace(route, "N/A")
-            ans = answer_ceo_strategic(user_input, trace=trace)
+            with SCHEDULER.slot("kpi", cancel, trace):
+                ans = answer_ceo_strategic(user_input, trace=trace)
             
             if ans is None:
                 # Fallback to rag_docs if ceo_strategic handler doesn't recognize query
@@ -5240,7 +4831,7 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
                 route = "rag_docs"
                 trace = ToolTrace(route, model_name)
                 prefix = "## 📄 Document Analysis\n\n"
-                gen = generate_answer_with_model_stream(model_name, user_input, mode="docs", trace=trace, conversation_history=conversation_history, query_type=query_type)
+                gen = generate_answer_with_model_stream(model_name, user_input, mode="docs", trace=trace, conversation_history=conversation_history, query_type=query_type, cancel=cancel)
                 final_answer = yield from stream_with_throttle(prefix, gen, route_name=route, tick=0.2, query=user_input, start_time=start)
                 
                 # Apply v8.8 executive format enforcement
@@ -5269,7 +4860,8 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         if intent == "sales_kpi":
             route = "sales_kpi"
             trace = ToolTrace(route, "N/A")
-            ans = answer_sales_ceo_kpi(user_input, trace=trace)
+            with SCHEDULER.slot("kpi", cancel, trace):
+                ans = answer_sales_ceo_kpi(user_input, trace=trace)
             if ans is None:
                 ans = "Error: sales_kpi returned None (check answer_sales_ceo_kpi return paths)."
 
@@ -5298,7 +4890,7 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         route = "rag_docs"
         trace = ToolTrace(route, model_name)
         prefix = "## 📄 Document Analysis\n\n"
-        gen = generate_answer_with_model_stream(model_name, user_input, mode="docs", trace=trace, conversation_history=conversation_history, query_type=query_type)
+        gen = generate_answer_with_model_stream(model_name, user_input, mode="docs", trace=trace, conversation_history=conversation_history, query_type=query_type, cancel=cancel)
 
         final_answer = yield from stream_with_throttle(prefix, gen, route_name=route, tick=0.2, query=user_input, start_time=start)
         
@@ -5315,6 +4907,11 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         yield (render_status(route, model_name, note="Done"), final_answer, trace.to_display_html(), followup_choices)
         return
 
+    except RequestCancelled:
+        print(f"🛑 Query cancelled before it got a {SCHEDULER.pool_for(route)} slot")
+        yield (render_status(route, model_name, note="Stopped"), "", "", [])
+        return
+
     except Exception as e:
         final_answer = f"Error: {e}"
         if not trace:
@@ -5330,7 +4927,7 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
 # =========================
 import time
 
-def multimodal_query(text_input, image_input, model_name, chat_id, conversation_history=None):
+def multimodal_query(text_input, image_input, model_name, chat_id, conversation_history=None, cancel=None):
     start = time.perf_counter()
 
     def elapsed_s():
@@ -5384,7 +4981,7 @@ def multimodal_query(text_input, image_input, model_name, chat_id, conversation_
     )
 
     # Stream from rag_query_ui (which yields (status_html, answer_md, tool_trace_html, followup_list))
-    for status_html, answer_md, trace_html, followup_list in rag_query_ui(query, model_name, has_image=has_image, chat_id=chat_id, conversation_history=conversation_history):
+    for status_html, answer_md, trace_html, followup_list in rag_query_ui(query, model_name, has_image=has_image, chat_id=chat_id, conversation_history=conversation_history, cancel=cancel):
         # ensure time badge always updates even if status_html empty
         if not status_html:
             status_html = (
@@ -5778,7 +5375,7 @@ if __name__ == "__main__":
                 
                 return "\n".join(parts)
             
-            def on_submit(text, image, model_name, chat_id, messages, traces):
+            def on_submit(text, image, model_name, chat_id, messages, traces, request: gr.Request = None):
                 """Handle submit with conversation history"""
                 # Check if this is a deterministic follow-up
                 if text in FOLLOWUP_HANDLERS:
@@ -5812,6 +5409,7 @@ if __name__ == "__main__":
                             
                             status_html = '<div class=\"badges\"><span class=\"badge deterministic\">✓ Deterministic</span><span class=\"badge time\">⏳ <0.1s</span></div>'
                             yield (status_html, deterministic_answer, "", gr.Radio(choices=new_followups, value=None), chat_id, messages, traces, format_chat_history(messages))
+                            SCHEDULER.finish_request(_session_id(request))
                             return
                 
                 # Normal flow: Stream first (fast), save later
@@ -5822,12 +5420,18 @@ if __name__ == "__main__":
                 # Convert messages to conversation history for LLM
                 conversation_history = messages.copy() if messages else []
                 
+                # This session's token (fresh from reset_stop_flag); Stop only cancels this request
+                cancel = SCHEDULER.token(_session_id(request))
+                
                 # Fast streaming with conversation context (now returns 4 values)
-                for status, answer, trace, followups in multimodal_query(text, image, model_name, chat_id, conversation_history):
-                    final_answer = answer
-                    final_trace = trace
-                    final_followups = followups
-                    yield (status, answer, trace, gr.Radio(choices=followups, value=None), chat_id, messages, traces, format_chat_history(messages))
+                try:
+                    for status, answer, trace, followups in multimodal_query(text, image, model_name, chat_id, conversation_history, cancel=cancel):
+                        final_answer = answer
+                        final_trace = trace
+                        final_followups = followups
+                        yield (status, answer, trace, gr.Radio(choices=followups, value=None), chat_id, messages, traces, format_chat_history(messages))
+                finally:
+                    SCHEDULER.finish_request(_session_id(request), cancel)
                 
                 # Save after streaming completes
                 from datetime import datetime
@@ -5853,8 +5457,7 @@ if __name__ == "__main__":
                 if len(messages) == 2:
                     chat_title = title_from_first_message(text)
                 else:
-                    existing = load_chat(chat_id)
-                    chat_title = existing.get("title", "Untitled") if existing else "Chat"
+                    chat_title = CHAT_STORE.get_title(chat_id) or "Chat"
                 
                 # Background save
                 try:
@@ -5873,12 +5476,12 @@ if __name__ == "__main__":
             
             def refresh_chat_list():
                 """Refresh the chat list display"""
-                chats = load_chat_list()
+                chats = load_chat_list(limit=10)  # Show last 10 chats
                 if not chats:
                     return "<div class='chat-list'>No saved chats yet.</div>"
                 
                 html_parts = ["<div class='chat-list'>"]
-                for chat in chats[:10]:  # Show last 10 chats
+                for chat in chats:
                     title = chat['title'][:40] + "..." if len(chat['title']) > 40 else chat['title']
                     html_parts.append(f"""
                     <div class='chat-item' onclick='alert("Chat saved! ID: {chat['chat_id']}\\nTitle: {chat['title']}\\nClick New Chat to start fresh.")'>
@@ -5922,7 +5525,7 @@ if __name__ == "__main__":
                 outputs=[submit, stop],
             )
             
-            # Stop button sets global flag and restores UI
+            # Stop button cancels this session's request and restores UI
             stop.click(
                 fn=request_stop,
                 inputs=[],
@@ -5959,7 +5562,8 @@ if __name__ == "__main__":
                 outputs=[chat_list_display]
             )
 
-            gr.Markdown(f"**Logs:** `logs/chat_logs.csv` | **Chats:** `storage/chats/` | **Memory:** `storage/memory/user_profile.json`")
+            gr.Markdown(f"**Logs:** `logs/chat_logs-*.jsonl.gz` | **Chats:** `storage/chats.db` | **Memory:** `storage/memory/user_profile.json`")
 
-    demo.queue().launch(inbrowser=True, debug=True, show_error=True)
+    # Enough workers for both pools; the scheduler decides who runs (KPI vs LLM slots)
+    demo.queue(default_concurrency_limit=SCHEDULER.max_concurrency).launch(inbrowser=True, debug=True, show_error=True)
 
@@ -2,22 +2,35 @@ import os
 import re
 import glob
 import time
-import csv
 import subprocess
-import pickle
-from pathlib import Path
 import cv2
-import pytesseract
 import time
 
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# OCR engine / Ollama client / embedder are shared handles from core.model_registry
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
-import faiss
 import gradio as gr
-import ollama
 import pandas as pd
 import torch
-from sentence_transformers import SentenceTransformer
+
+from query.time_parser import resolve_month, month_pair, month_range, named_month_range
+from core.sales_cube import SalesCube
+from core.columnar_store import code_mask
+from core.data_snapshot import StartupTimer, load_csv_snapshot, prepare_sales_frame, prepare_hr_frame, snapshot_fingerprint
+from core.entity_gazetteer import EntityGazetteer
+from core.row_serializer import sales_row_texts, hr_row_texts
+from core.embedding_store import EmbeddingStore
+from core.source_index import SourceIndex
+from core.ann_index import index_factory
+from core.embedding_service import get_embedding_service
+from core.model_registry import MODELS, ocr_engine
+from core.llm_client import llm_client
+from core import stream_events as ev
+from core.semantic_cache import SemanticAnswerCache, corpus_version
+from core.interaction_log import InteractionLog
+from core.request_scheduler import RequestScheduler
+
+STARTUP = StartupTimer()
 
 # Import fuzzy matching and query normalization
 import sys
@@ -85,15 +98,18 @@ def get_installed_ollama_models(default=("llava:13b",)):
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 ensure_dir(LOG_DIR)
-LOG_FILE = os.path.join(LOG_DIR, "chat_logs.csv")
+# Rotated chat_logs-*.jsonl(.gz) segments, written by a background thread
+INTERACTION_LOG = InteractionLog(LOG_DIR)
+
+# Separate slots for KPI answers and LLM generations (KPI never waits behind the LLM)
+SCHEDULER = RequestScheduler({'kpi': 8, 'llm': 2})
+
+# Pooled async Ollama client shared by every LLM call
+LLM = llm_client()
 
 def log_interaction(model: str, route: str, question: str, answer: str, latency_ms: int):
-    new_file = not os.path.exists(LOG_FILE)
-    with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if new_file:
-            w.writerow(["timestamp", "model", "route", "latency_ms", "question", "answer"])
-        w.writerow([time.strftime("%Y-%m-%d %H:%M:%S"), model, route, latency_ms, question, answer])
+    INTERACTION_LOG.log({"model": model, "route": route, "latency_ms": latency_ms,
+                         "question": question, "answer": answer})
 
 # =========================
 # 1) Device
@@ -115,16 +131,12 @@ if not os.path.exists(SALES_CSV):
 if not os.path.exists(HR_CSV):
     raise FileNotFoundError(f"HR CSV not found: {HR_CSV}")
 
-df_sales = pd.read_csv(SALES_CSV)
-df_hr = pd.read_csv(HR_CSV)
-
-# Normalize Sales dates
-df_sales["Date"] = pd.to_datetime(df_sales["Date"], errors="coerce")
-df_sales["DateStr"] = df_sales["Date"].dt.strftime("%Y-%m-%d")
-df_sales["YearMonth"] = df_sales["Date"].dt.to_period("M")
-
-for c in ["Quantity", "Unit Price", "Total Sale"]:
-    df_sales[c] = pd.to_numeric(df_sales[c], errors="coerce")
+# Typed column snapshot with derived columns (re-parsed from CSV only when the file changes)
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "storage", "snapshots")
+df_sales = load_csv_snapshot(SALES_CSV, prepare_sales_frame, SNAPSHOT_DIR)
+STARTUP.lap("Sales data")
+df_hr = load_csv_snapshot(HR_CSV, prepare_hr_frame, SNAPSHOT_DIR)
+STARTUP.lap("HR data")
 
 AVAILABLE_SALES_MONTHS = sorted(df_sales["YearMonth"].dropna().unique().tolist())
 LATEST_SALES_MONTH = max(AVAILABLE_SALES_MONTHS) if AVAILABLE_SALES_MONTHS else None
@@ -136,6 +148,12 @@ PRODUCTS = sorted(df_sales["Product"].dropna().unique().tolist())
 SALES_REPS = sorted(df_sales["Employee"].dropna().unique().tolist())
 CHANNELS = sorted(df_sales["Channel"].dropna().unique().tolist()) if "Channel" in df_sales.columns else []
 
+# Entity gazetteer: every dimension value (+ Malay aliases) in one automaton,
+# versioned by the sales/HR snapshots it was built from
+DATA_VERSION = f"{snapshot_fingerprint(SALES_CSV, SNAPSHOT_DIR)}|{snapshot_fingerprint(HR_CSV, SNAPSHOT_DIR)}"
+ENTITIES = EntityGazetteer.from_frames(df_sales, df_hr, version=DATA_VERSION)
+print(f"✅ Entity gazetteer: {ENTITIES.get_stats()['surfaces']} surface forms, {len(ENTITIES.vocab)} entity types")
+
 # Metadata (HR)
 HR_DEPTS = sorted(df_hr["Department"].dropna().unique().tolist()) if "Department" in df_hr.columns else []
 HR_AGEGROUPS = sorted(df_hr["AgeGroup"].dropna().unique().tolist()) if "AgeGroup" in df_hr.columns else []
@@ -144,28 +162,17 @@ HR_STATES = sorted(df_hr["State"].dropna().unique().tolist()) if "State" in df_h
 print("📄 Sales shape:", df_sales.shape, "| months:", AVAILABLE_SALES_MONTHS[0], "→", AVAILABLE_SALES_MONTHS[-1])
 print("📄 HR shape:", df_hr.shape)
 
+# Sales KPI cube: all sales KPIs are answered from pre-aggregated cells
+sales_cube = SalesCube(df_sales)
+print(f"✅ Sales KPI cube: {len(sales_cube):,} cells from {sales_cube.source_rows:,} rows ({sales_cube.build_ms:.0f} ms)")
+STARTUP.lap("Metadata + KPI cube")
+
 # =========================
 # 3) Build RAG corpus (Sales + HR rows + docs)
 # =========================
-sales_summaries = []
-for _, r in df_sales.iterrows():
-    sales_summaries.append(
-        "[SALES] "
-        f"Date={r.get('DateStr','')}; State={r.get('State','')}; Branch={r.get('Branch','')}; "
-        f"Product={r.get('Product','')}; Qty={r.get('Quantity','')}; UnitPrice={r.get('Unit Price','')}; "
-        f"TotalSale={r.get('Total Sale','')}; Channel={r.get('Channel','')}; Payment={r.get('PaymentMethod','')}; "
-        f"Employee={r.get('Employee','')}"
-    )
-
-hr_summaries = []
-for _, r in df_hr.iterrows():
-    hr_summaries.append(
-        "[HR] "
-        f"EmpID={r.get('EmpID','')}; State={r.get('State','')}; Branch={r.get('Branch','')}; "
-        f"Department={r.get('Department','')}; JobRole={r.get('JobRole','')}; Age={r.get('Age','')}; "
-        f"AgeGroup={r.get('AgeGroup','')}; MonthlyIncome={r.get('MonthlyIncome','')}; "
-        f"OverTime={r.get('OverTime','')}; Attrition={r.get('Attrition','')}; YearsAtCompany={r.get('YearsAtCompany','')}"
-    )
+# Column-wise row texts (same strings as the per-row iterrows f-strings)
+sales_summaries = sales_row_texts(df_sales)
+hr_summaries = hr_row_texts(df_hr)
 
 doc_chunks = []
 
@@ -196,42 +203,33 @@ if len(doc_chunks) > 0:
 summaries = sales_summaries + hr_summaries + doc_chunks
 print(f"📚 RAG corpus size: {len(summaries)} (Sales={len(sales_summaries)}, HR={len(hr_summaries)}, Docs={len(doc_chunks)})")
 
-# Embeddings + FAISS with caching
-cache_file = Path(__file__).parent / "faiss_cache.pkl"
-index_file = Path(__file__).parent / "faiss_index.bin"
-
-# Check if cache exists and is valid
-cache_valid = False
-if cache_file.exists() and index_file.exists():
-    try:
-        with open(cache_file, 'rb') as f:
-            cached_summaries = pickle.load(f)
-        if cached_summaries == summaries:
-            print("✅ Loading cached FAISS index (fast startup)...")
-            embedder = SentenceTransformer("all-MiniLM-L6-v2", device=device)
-            index = faiss.read_index(str(index_file))
-            cache_valid = True
-            print(f"✅ FAISS index loaded from cache: {index.ntotal} vectors")
-    except Exception as e:
-        print(f"⚠️  Cache load failed: {e}, rebuilding...")
-
-if not cache_valid:
-    print("🔨 Building FAISS index (first run or data changed, will cache for next time)...")
-    embedder = SentenceTransformer("all-MiniLM-L6-v2", device=device)
-    emb = embedder.encode(summaries, convert_to_numpy=True, show_progress_bar=True)
-    faiss.normalize_L2(emb)
-    index = faiss.IndexFlatIP(emb.shape[1])
-    index.add(emb)
-    print(f"✅ FAISS index built: {index.ntotal} vectors")
-    
-    # Save cache
-    try:
-        with open(cache_file, 'wb') as f:
-            pickle.dump(summaries, f)
-        faiss.write_index(index, str(index_file))
-        print(f"💾 Cached FAISS index for fast startup next time")
-    except Exception as e:
-        print(f"⚠️  Cache save failed: {e}")
+# Semantic answer cache for LLM routes; corpus version in the key = stale answers never served after docs/data change
+SEMANTIC_CACHE_THRESHOLD = 0.92
+RAG_CORPUS_VERSION = corpus_version(summaries)
+ANSWER_CACHE = SemanticAnswerCache(threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=500, ttl_seconds=24 * 3600)
+STARTUP.lap("RAG corpus")
+
+# Embeddings + FAISS with a content-addressed cache (only new/edited chunks are encoded)
+# Shared embedder (same instance as routers/evaluator; caches query vectors)
+embedder = get_embedding_service("all-MiniLM-L6-v2", device=device).load()
+embedding_store = EmbeddingStore(
+    os.path.join(BASE_DIR, "storage", "cache", "embeddings"), "all-MiniLM-L6-v2", normalize=True
+)
+emb = embedding_store.sync(
+    summaries,
+    lambda batch: embedder.encode(batch, convert_to_numpy=True, show_progress_bar=True),
+)
+# One sub-index per source so docs questions never scan the 30k data rows
+# RAG_INDEX_TYPE: "flat" (exact) | "ivf" | "ivfpq" | "hnsw" (see benchmark_ann_index.py)
+RAG_INDEX_TYPE = "flat"
+index = SourceIndex(
+    summaries, emb,
+    make_index=index_factory(RAG_INDEX_TYPE, os.path.join(BASE_DIR, "storage", "cache", "faiss")),
+)
+print(f"✅ FAISS index built: {index.ntotal} vectors {index.sizes()}")
+STARTUP.lap("Embedder + FAISS index")
+STARTUP.report()
+MODELS.report()
 
 # =========================
 # 4) Optional BLIP-2
@@ -248,7 +246,7 @@ def caption_image(image_path: str) -> str:
         gray = cv2.GaussianBlur(gray, (3, 3), 0)
         _, th = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-        text = pytesseract.image_to_string(th, config="--oem 3 --psm 6")
+        text = ocr_engine(TESSERACT_CMD).image_to_string(th, config="--oem 3 --psm 6")
         text = re.sub(r"[ \t]+", " ", text)
         text = re.sub(r"\n{2,}", "\n", text).strip()
 
@@ -262,104 +260,26 @@ def caption_image(image_path: str) -> str:
 # =========================
 # 5) Sales KPI engine (Malaysia version)
 # =========================
-MONTH_ALIASES = {
-    "jan": 1, "january": 1, "januari": 1,
-    "feb": 2, "february": 2, "februari": 2,
-    "mar": 3, "march": 3, "mac": 3,
-    "apr": 4, "april": 4,
-    "may": 5, "mei": 5,
-    "jun": 6, "june": 6,
-    "jul": 7, "july": 7, "julai": 7,
-    "aug": 8, "august": 8, "ogos": 8,
-    "sep": 9, "sept": 9, "september": 9,
-    "oct": 10, "october": 10, "okt": 10, "oktober": 10,
-    "nov": 11, "november": 11,
-    "dec": 12, "december": 12, "dis": 12, "disember": 12,
-}
-
+# Month extraction is a view over query.time_parser.parse_time(), which
+# scans each query once and caches the result
 def extract_named_month_range(q: str):
-    s = (q or "").lower()
-
-    # year (optional). If missing, use latest dataset year
-    m_year = re.search(r"\b(20\d{2})\b", s)
-    year = int(m_year.group(1)) if m_year else int(str(LATEST_SALES_MONTH)[:4])
-
-    # find month words in text order
-    words = re.findall(r"[a-zA-Z]+", s)
-    months = []
-    for w in words:
-        w = w.lower()
-        if w in MONTH_ALIASES:
-            months.append(MONTH_ALIASES[w])
-
-    if len(months) >= 2:
-        m1, m2 = months[0], months[1]
-        p1 = pd.Period(f"{year:04d}-{m1:02d}", freq="M")
-        p2 = pd.Period(f"{year:04d}-{m2:02d}", freq="M")
-        start_m, end_m = (p1, p2) if p1 <= p2 else (p2, p1)
-        return start_m, end_m
-
-    return None
-
+    return named_month_range(q, LATEST_SALES_MONTH)
 
 
 def extract_month_from_query(q: str):
     if LATEST_SALES_MONTH is None:
         return None
 
-    s = (q or "").lower()
-
-    if any(k in s for k in ["bulan ni", "bulan ini", "this month", "current month", "mtd"]):
-        return LATEST_SALES_MONTH
-    if any(k in s for k in ["bulan lepas", "last month", "previous month"]):
-        return LATEST_SALES_MONTH - 1
-
-    # explicit yyyy-mm or yyyy/m
-    m = re.search(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-    if m:
-        y = int(m.group(1))
-        mo = int(m.group(2))
-        return pd.Period(f"{y:04d}-{mo:02d}", freq="M")
-
-    # text month (mac 2024 / march 2024)
-    tokens = re.findall(r"[a-zA-Z]+|\d{4}", s)
-    year = None
-    for t in tokens:
-        if re.fullmatch(r"20\d{2}", t):
-            year = int(t)
-            break
-
-    month_num = None
-    for t in tokens:
-        t2 = t.lower()
-        if t2 in MONTH_ALIASES:
-            month_num = MONTH_ALIASES[t2]
-            break
-
-    if month_num is not None:
-        if year is None:
-            year = int(str(LATEST_SALES_MONTH)[:4])
-        return pd.Period(f"{year:04d}-{month_num:02d}", freq="M")
+    # relative month, yyyy-mm, then first month word (mac 2024 / march 2024)
+    month = resolve_month(q, LATEST_SALES_MONTH, quarters=False, longest_name=False)
 
     # fallback latest
-    return LATEST_SALES_MONTH
+    return month if month is not None else LATEST_SALES_MONTH
 
 
 def extract_two_months_from_query(q: str):
     """Return up to 2 explicit months found in query like 2024-03 vs 2024-05."""
-    s = (q or "").lower()
-    matches = re.findall(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-
-    months = []
-    for y, m in matches:
-        months.append(pd.Period(f"{int(y):04d}-{int(m):02d}", freq="M"))
-
-    uniq = []
-    for x in months:
-        if x not in uniq:
-            uniq.append(x)
-
-    return uniq[:2]
+    return month_pair(q)
 
 
 def detect_sales_metric(q: str) -> str:
@@ -383,11 +303,12 @@ def detect_sales_dimension(q: str) -> str:
 
 def extract_sales_filters(q: str):
     s = (q or "").lower()
-    state = next((x for x in STATES if x.lower() in s), None)
-    branch = next((x for x in sorted(BRANCHES, key=len, reverse=True) if x.lower() in s), None)
-    product = next((x for x in sorted(PRODUCTS, key=len, reverse=True) if x.lower() in s), None)
-    employee = next((x for x in SALES_REPS if x.lower() in s), None)
-    channel = next((x for x in CHANNELS if x.lower() in s), None)
+    mentions = ENTITIES.find(s)
+    state = ENTITIES.first(mentions, "state")
+    branch = ENTITIES.first(mentions, "branch")
+    product = ENTITIES.first(mentions, "product")
+    employee = ENTITIES.first(mentions, "employee")
+    channel = ENTITIES.first(mentions, "channel")
     return state, branch, product, employee, channel
 
 
@@ -398,14 +319,7 @@ def extract_month_range_from_query(q: str):
       - 2024-01 to 2024-06
     Returns (start_period, end_period) or None
     """
-    s = (q or "").lower()
-    matches = re.findall(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-    if len(matches) >= 2:
-        p1 = pd.Period(f"{int(matches[0][0]):04d}-{int(matches[0][1]):02d}", freq="M")
-        p2 = pd.Period(f"{int(matches[1][0]):04d}-{int(matches[1][1]):02d}", freq="M")
-        start_m, end_m = (p1, p2) if p1 <= p2 else (p2, p1)
-        return start_m, end_m
-    return None
+    return month_range(q, LATEST_SALES_MONTH, quarters=False)
 
 
 def answer_sales_ceo_kpi(q: str):
@@ -439,27 +353,17 @@ def answer_sales_ceo_kpi(q: str):
     if rng is not None and (is_top or "highest" in s or "most" in s):
         start_m, end_m = rng
 
-        mask = (df_sales["YearMonth"] >= start_m) & (df_sales["YearMonth"] <= end_m)
-        sub_range = df_sales[mask].copy()
-
         # Apply same filters (optional)
         state, branch, product, employee, channel = extract_sales_filters(q)
-        if state:
-            sub_range = sub_range[sub_range["State"] == state]
-        if branch:
-            sub_range = sub_range[sub_range["Branch"] == branch]
-        if product:
-            sub_range = sub_range[sub_range["Product"] == product]
-        if employee:
-            sub_range = sub_range[sub_range["Employee"] == employee]
-        if channel and "Channel" in sub_range.columns:
-            sub_range = sub_range[sub_range["Channel"] == channel]
-
-        if sub_range.empty:
+        sub_range = sales_cube.slice(start=start_m, end=end_m, state=state, branch=branch,
+                                     product=product, employee=employee, channel=channel)
+        range_rows = SalesCube.rows(sub_range)
+
+        if range_rows == 0:
             return f"❗ Tiada rekod sales untuk {start_m} → {end_m} dengan filter yang diberi."
 
         dim = detect_sales_dimension(q)  # default = Product
-        grp = sub_range.groupby(dim)[value_col].sum().sort_values(ascending=False)
+        grp = sub_range.groupby(dim, observed=True)[value_col].sum().sort_values(ascending=False)
 
         top_n = 5 if ("top 5" in s or "top5" in s) else 3
         top_df = grp.head(top_n).reset_index().rename(columns={value_col: metric_label})
@@ -476,27 +380,18 @@ def answer_sales_ceo_kpi(q: str):
             "",
             df_to_markdown_table(top_df),
             "",
-            f"Rows used: {len(sub_range):,}",
+            f"Rows used: {range_rows:,}",
         ])
 
     # =========================================================
     # Normal single-month logic starts here
     # =========================================================
     month = extract_month_from_query(q)
-    sub = df_sales[df_sales["YearMonth"] == month].copy()
-
-    if state:
-        sub = sub[sub["State"] == state]
-    if branch:
-        sub = sub[sub["Branch"] == branch]
-    if product:
-        sub = sub[sub["Product"] == product]
-    if employee:
-        sub = sub[sub["Employee"] == employee]
-    if channel and "Channel" in sub.columns:
-        sub = sub[sub["Channel"] == channel]
-
-    if sub.empty:
+    filters = {"state": state, "branch": branch, "product": product, "employee": employee, "channel": channel}
+    sub = sales_cube.slice(month=month, **filters)
+    sub_rows = SalesCube.rows(sub)
+
+    if sub_rows == 0:
         return f"❗ Tiada rekod untuk {month} dengan filter yang diberi."
 
     # =========================
@@ -511,29 +406,9 @@ def answer_sales_ceo_kpi(q: str):
             cur_month = month
             prev_month = month - 1
 
-        cur_df = df_sales[df_sales["YearMonth"] == cur_month].copy()
-        prev_df = df_sales[df_sales["YearMonth"] == prev_month].copy()
-
         # Apply same filters
-        if state:
-            cur_df = cur_df[cur_df["State"] == state]
-            prev_df = prev_df[prev_df["State"] == state]
-        if branch:
-            cur_df = cur_df[cur_df["Branch"] == branch]
-            prev_df = prev_df[prev_df["Branch"] == branch]
-        if product:
-            cur_df = cur_df[cur_df["Product"] == product]
-            prev_df = prev_df[prev_df["Product"] == product]
-        if employee:
-            cur_df = cur_df[cur_df["Employee"] == employee]
-            prev_df = prev_df[prev_df["Employee"] == employee]
-        if channel and "Channel" in cur_df.columns:
-            cur_df = cur_df[cur_df["Channel"] == channel]
-        if channel and "Channel" in prev_df.columns:
-            prev_df = prev_df[prev_df["Channel"] == channel]
-
-        cur_val = float(cur_df[value_col].sum())
-        prev_val = float(prev_df[value_col].sum())
+        cur_val, cur_rows = sales_cube.total(value_col, month=cur_month, **filters)
+        prev_val, prev_rows = sales_cube.total(value_col, month=prev_month, **filters)
         diff = cur_val - prev_val
         pct = (diff / prev_val * 100) if prev_val != 0 else None
 
@@ -547,7 +422,7 @@ def answer_sales_ceo_kpi(q: str):
             lines.append(f"- Change: **{format_num(diff, decimals)}** (previous=0)")
         else:
             lines.append(f"- Change: **{format_num(diff, decimals)}** ({pct:+.2f}%)")
-        lines.append(f"- Rows used (current month): {len(cur_df):,}")
+        lines.append(f"- Rows used (current month): {cur_rows:,}")
         lines.append(f"- Dataset months available: {AVAILABLE_SALES_MONTHS[0]} → {AVAILABLE_SALES_MONTHS[-1]}")
         lines.append(f"- Note: 'bulan ni' = latest month in dataset (**{LATEST_SALES_MONTH}**) untuk demo offline.")
         return "\n".join(lines)
@@ -557,7 +432,7 @@ def answer_sales_ceo_kpi(q: str):
     # =========================
     if is_top:
         dim = detect_sales_dimension(q)
-        grp = sub.groupby(dim)[value_col].sum().sort_values(ascending=False)
+        grp = sub.groupby(dim, observed=True)[value_col].sum().sort_values(ascending=False)
 
         top_n = 5 if ("top 5" in s or "top5" in s) else 3
         top_df = grp.head(top_n).reset_index().rename(columns={value_col: metric_label})
@@ -582,7 +457,7 @@ def answer_sales_ceo_kpi(q: str):
             "📊 **Performance Insights:**",
             f"- Top {top_n} contribute **{concentration:.1f}%** of total {metric}",
             f"- Total {dim} analyzed: **{len(grp)}**",
-            f"- Transactions included: **{len(sub):,}**",
+            f"- Transactions included: **{sub_rows:,}**",
             "",
             f"💡 **Strategic Note:** High concentration indicates strong performers; consider replicating their success factors across other {dim}.",
         ])
@@ -593,7 +468,7 @@ def answer_sales_ceo_kpi(q: str):
     total_val = float(sub[value_col].sum())
     
     # Calculate context metrics for executive insights
-    all_months_data = df_sales.groupby("YearMonth")[value_col].sum()
+    all_months_data = sales_cube.monthly(value_col)
     avg_monthly = float(all_months_data.mean())
     max_monthly = float(all_months_data.max())
     max_month = all_months_data.idxmax()
@@ -615,7 +490,7 @@ def answer_sales_ceo_kpi(q: str):
         f"- vs Average: **{vs_avg_pct:+.1f}%** {'📈 Above average' if vs_avg_pct > 0 else '📉 Below average' if vs_avg_pct < 0 else '➡️ On par'}",
         "",
         "📋 **Data Quality:**",
-        f"- Transactions analyzed: **{len(sub):,}**",
+        f"- Transactions analyzed: **{sub_rows:,}**",
         f"- Dataset coverage: **{AVAILABLE_SALES_MONTHS[0]}** to **{AVAILABLE_SALES_MONTHS[-1]}** (6 months)",
         f"- Note: 'bulan ni' refers to latest available month (**{LATEST_SALES_MONTH}**) in offline demo.",
     ]
@@ -642,10 +517,10 @@ def answer_hr(q: str) -> str:
     if "headcount" in s or "berapa orang" in s or "how many" in s:
         for d in HR_DEPTS:
             if d.lower() in s:
-                n = int((df_hr["Department"] == d).sum())
+                n = int(code_mask(df_hr["Department"], d).sum())
                 total = len(df_hr)
                 pct = (n / total * 100) if total > 0 else 0
-                dept_counts = df_hr.groupby("Department")["EmpID"].count().sort_values(ascending=False)
+                dept_counts = df_hr.groupby("Department", observed=True)["EmpID"].count().sort_values(ascending=False)
                 rank = list(dept_counts.index).index(d) + 1
                 return "\n".join([
                     "✅ **Source: structured HR**",
@@ -660,10 +535,10 @@ def answer_hr(q: str) -> str:
 
         for st in HR_STATES:
             if st.lower() in s:
-                n = int((df_hr["State"] == st).sum())
+                n = int(code_mask(df_hr["State"], st).sum())
                 total = len(df_hr)
                 pct = (n / total * 100) if total > 0 else 0
-                state_counts = df_hr.groupby("State")["EmpID"].count().sort_values(ascending=False)
+                state_counts = df_hr.groupby("State", observed=True)["EmpID"].count().sort_values(ascending=False)
                 rank = list(state_counts.index).index(st) + 1
                 return "\n".join([
                     "✅ **Source: structured HR**",
@@ -693,7 +568,7 @@ def answer_hr(q: str) -> str:
 
     # Attrition analysis
     if "attrition" in s:
-        left = df_hr[df_hr["Attrition"].astype(str).str.lower() == "yes"].copy()
+        left = df_hr[code_mask(df_hr["Attrition"], "yes", ignore_case=True)].copy()
         if left.empty:
             return "\n".join([
                 "✅ **Source: structured HR**",
@@ -710,7 +585,7 @@ def answer_hr(q: str) -> str:
         attrition_rate = (attrition_count / total * 100) if total > 0 else 0
 
         if "age" in s:
-            c = left.groupby("AgeGroup")["EmpID"].count().sort_values(ascending=False)
+            c = left.groupby("AgeGroup", observed=True)["EmpID"].count().sort_values(ascending=False)
             top_group = c.index[0]
             top_count = int(c.iloc[0])
             group_pct = (top_count / attrition_count * 100) if attrition_count > 0 else 0
@@ -725,7 +600,7 @@ def answer_hr(q: str) -> str:
             ])
 
         if "state" in s or "negeri" in s:
-            c = left.groupby("State")["EmpID"].count().sort_values(ascending=False)
+            c = left.groupby("State", observed=True)["EmpID"].count().sort_values(ascending=False)
             top_state = c.index[0]
             top_count = int(c.iloc[0])
             state_pct = (top_count / attrition_count * 100) if attrition_count > 0 else 0
@@ -739,7 +614,7 @@ def answer_hr(q: str) -> str:
                 "💡 **HR Insight:** Geographic attrition patterns may indicate regional compensation competitiveness or work environment factors.",
             ])
 
-        c = left.groupby("Department")["EmpID"].count().sort_values(ascending=False)
+        c = left.groupby("Department", observed=True)["EmpID"].count().sort_values(ascending=False)
         top_dept = c.index[0]
         top_count = int(c.iloc[0])
         dept_pct = (top_count / attrition_count * 100) if attrition_count > 0 else 0
@@ -757,7 +632,7 @@ def answer_hr(q: str) -> str:
     if any(k in s for k in ["average income", "avg income", "gaji purata", "purata gaji", "average salary"]):
         for d in HR_DEPTS:
             if d.lower() in s:
-                dept_data = df_hr[df_hr["Department"] == d]["MonthlyIncome"]
+                dept_data = df_hr[code_mask(df_hr["Department"], d)]["MonthlyIncome"]
                 avg = float(dept_data.mean())
                 overall_avg = float(df_hr["MonthlyIncome"].mean())
                 dept_count = len(dept_data)
@@ -796,27 +671,15 @@ def answer_hr(q: str) -> str:
 # =========================
 
 def retrieve_context(query: str, k: int = 12, mode: str = "all") -> str:
-    q_emb = embedder.encode([query], convert_to_numpy=True)
-    faiss.normalize_L2(q_emb)
-
-    # v8.8 Phase 2: Increased k0 for better docs coverage
-    # For docs-only mode, retrieve more candidates (minimum 60 vs previous 40)
-    # This ensures comprehensive policy/procedure retrieval
-    k0 = min(max(k * 5, 60), int(index.ntotal) if index is not None else 0)
-    if k0 <= 0:
-        return ""
-
-    scores, idx = index.search(q_emb, k=k0)
+    q_emb = embedder.encode_query(query)[None, :]
 
-    # idx[0] is list of candidate indices
-    candidates = [summaries[i] for i in idx[0] if i != -1]
-
-    if mode == "docs":
-        candidates = [c for c in candidates if c.startswith("[DOC:")]
+    if index is None or index.ntotal == 0:
+        return ""
 
     # v8.8 Phase 2: Increased final k for docs mode to ensure comprehensive answers
     final_k = 18 if mode == "docs" else k
-    candidates = candidates[:final_k]
+    # docs mode searches only the docs sub-index; "all" merges every source by score
+    candidates = [text for _, text in index.search(q_emb, final_k, mode=mode)]
     return "\n".join(candidates)
 
 
@@ -858,21 +721,31 @@ Example: [if available in data]"
 
 # ✅ STREAMING VERSION (recommended for UX)
 def generate_answer_with_model_stream(model_name: str, query: str, mode: str = "all"):
-    context = retrieve_context(query, k=12, mode=mode)
-    prompt = _build_prompt(context, query)
+    # Semantic answer cache: near-identical questions reuse the stored answer
+    q_vec = embedder.encode_query(query)
+    cached = ANSWER_CACHE.lookup(q_vec, mode, model_name, RAG_CORPUS_VERSION)
+    if cached:
+        print(f"⚡ Semantic cache hit ({cached['similarity']:.3f}): {cached['query'][:60]}")
+        yield ev.final(cached["answer"])
+        return
 
-    out = ""
-    for chunk in ollama.chat(
-        model=model_name,
-        messages=[{"role": "user", "content": prompt}],
-        options={"num_ctx": 4096, "temperature": 0, "num_predict": 500},
-        stream=True,
-    ):
-        # Ollama streaming biasanya bagi token dekat chunk["message"]["content"]
-        token = chunk.get("message", {}).get("content", "")
-        if token:
-            out += token
-            yield out.strip()
+    answer = ev.AnswerBuffer()
+    with SCHEDULER.slot("llm"):
+        context = retrieve_context(query, k=12, mode=mode)
+        prompt = _build_prompt(context, query)
+
+        for token in LLM.stream_chat(
+            model_name,
+            [{"role": "user", "content": prompt}],
+            options={"num_ctx": 4096, "temperature": 0, "num_predict": 500},
+        ):
+            event = ev.delta(token)
+            answer.feed(event)
+            yield event
+
+    out = answer.text().strip()
+    yield ev.final(out)
+    ANSWER_CACHE.store(q_vec, query, out, mode, model_name, RAG_CORPUS_VERSION)
 
 
 # (Optional) NON-STREAMING version (kalau kau masih nak guna)
@@ -880,12 +753,11 @@ def generate_answer_with_model(model_name: str, query: str, mode: str = "all") -
     context = retrieve_context(query, k=12, mode=mode)
     prompt = _build_prompt(context, query)
 
-    resp = ollama.chat(
-        model=model_name,
-        messages=[{"role": "user", "content": prompt}],
+    return LLM.chat(
+        model_name,
+        [{"role": "user", "content": prompt}],
         options={"num_ctx": 4096, "temperature": 0, "num_predict": 500},
     )
-    return resp["message"]["content"].strip()
 
 # =========================
 # 8) Router with logging + latency
@@ -1175,21 +1047,24 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False):
         Stream answer with UI updates at most every `tick` seconds.
         Yields (status_html, answer_md).
         Returns final answer markdown.
+        Tokens (core.stream_events) go into a list buffer joined once per tick.
         """
-        out = ""
+        answer = ev.AnswerBuffer()
         last = time.perf_counter()
+        dirty = False
 
         # show prefix immediately
         yield (render_status(route_name, model_name, note="Processing"), prefix_md)
 
-        for partial in stream_gen:
-            out = partial
+        for event in stream_gen:
+            dirty = answer.feed(event) or dirty
             now = time.perf_counter()
-            if (now - last) >= tick:
+            if dirty and (now - last) >= tick:
                 last = now
-                yield (render_status(route_name, model_name, note="Processing"), prefix_md + out)
+                dirty = False
+                yield (render_status(route_name, model_name, note="Processing"), prefix_md + answer.text().strip())
 
-        final_md = (prefix_md + out).strip()
+        final_md = (prefix_md + answer.text().strip()).strip()
         yield (render_status(route_name, model_name, note="Done"), final_md)
         return final_md
 
@@ -1226,7 +1101,8 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False):
         # 2) HR KPI path (structured HR.csv)
         if intent == "hr_kpi":
             route = "hr_kpi"
-            hr_ans = answer_hr(user_input)
+            with SCHEDULER.slot("kpi"):
+                hr_ans = answer_hr(user_input)
 
             # If HR returns None (policy-like), fallback to docs RAG
             if hr_ans is None:
@@ -1257,7 +1133,8 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False):
         # 3) Sales KPI path (structured Sales.csv)
         if intent == "sales_kpi":
             route = "sales_kpi"
-            ans = answer_sales_ceo_kpi(user_input)
+            with SCHEDULER.slot("kpi"):
+                ans = answer_sales_ceo_kpi(user_input)
             if ans is None:
                 ans = "Error: sales_kpi returned None (check answer_sales_ceo_kpi return paths)."
 
@@ -1578,7 +1455,7 @@ if __name__ == "__main__":
             clear.click(fn=lambda: ("", ""), inputs=[], outputs=[status_md, answer_md])
             clear.click(fn=lambda: ("", None, default_model), inputs=[], outputs=[txt, img, model])
 
-            gr.Markdown("Logs saved to: `logs/chat_logs.csv`")
+            gr.Markdown("Logs saved to: `logs/chat_logs-*.jsonl.gz`")
 
-    demo.queue().launch(inbrowser=True, debug=True, show_error=True)
+    demo.queue(default_concurrency_limit=SCHEDULER.max_concurrency).launch(inbrowser=True, debug=True, show_error=True)
 
@@ -2,23 +2,36 @@ import os
 import re
 import glob
 import time
-import csv
 import subprocess
 import cv2
-import pytesseract
 import json
 import uuid
 from datetime import datetime, timedelta
-from collections import defaultdict
 
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# OCR engine / Ollama client / embedder are shared handles from core.model_registry
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 import faiss
 import gradio as gr
-import ollama
 import pandas as pd
 import torch
-from sentence_transformers import SentenceTransformer
+
+from query.time_parser import parse_time, month_period, month_pair, month_range, named_month_range
+from core.sales_cube import SalesCube
+from core.columnar_store import code_mask
+from core.data_snapshot import StartupTimer, load_csv_snapshot, prepare_sales_frame, prepare_hr_frame, snapshot_fingerprint
+from core.entity_gazetteer import EntityGazetteer
+from core.embedding_service import get_embedding_service
+from core.model_registry import MODELS, ocr_engine
+from core.llm_client import llm_client
+from core import stream_events as ev
+from core.semantic_cache import SemanticAnswerCache, corpus_version
+from core.interaction_log import InteractionLog
+from core.chat_store import ChatStore
+from core.metrics import MetricsRegistry
+from core.request_scheduler import RequestScheduler
+
+STARTUP = StartupTimer()
 
 try:
     import tabulate  # noqa: F401
@@ -63,7 +76,8 @@ def get_installed_ollama_models(default=("llama3:latest",)):
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 ensure_dir(LOG_DIR)
-LOG_FILE = os.path.join(LOG_DIR, "chat_logs.csv")
+# Rotated chat_logs-*.jsonl(.gz) segments, written by a background thread
+INTERACTION_LOG = InteractionLog(LOG_DIR)
 
 STORAGE_DIR = os.path.join(BASE_DIR, "storage")
 CHATS_DIR = os.path.join(STORAGE_DIR, "chats")
@@ -73,13 +87,19 @@ ensure_dir(STORAGE_DIR)
 ensure_dir(CHATS_DIR)
 ensure_dir(MEMORY_DIR)
 
+# Chat threads live in one SQLite file; the old one-JSON-per-chat files
+# are imported on first start (or with migrate_chats_to_sqlite.py)
+CHAT_DB = os.path.join(STORAGE_DIR, "chats.db")
+CHAT_STORE = ChatStore(CHAT_DB)
+if CHAT_STORE.count_chats() == 0 and any(f.endswith(".json") for f in os.listdir(CHATS_DIR)):
+    _migrated = CHAT_STORE.import_json_dir(CHATS_DIR)
+    print(f"🗄️ Migrated {_migrated['imported']} JSON chats into {CHAT_DB}")
+
 def log_interaction(model: str, route: str, question: str, answer: str, latency_ms: int, chat_id: str = "", message_id: str = "", tool_trace_summary: str = ""):
-    new_file = not os.path.exists(LOG_FILE)
-    with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if new_file:
-            w.writerow(["timestamp", "model", "route", "latency_ms", "question", "answer", "chat_id", "message_id", "tool_trace_summary"])
-        w.writerow([time.strftime("%Y-%m-%d %H:%M:%S"), model, route, latency_ms, question, answer, chat_id, message_id, tool_trace_summary])
+    INTERACTION_LOG.log({
+        "model": model, "route": route, "latency_ms": latency_ms, "question": question, "answer": answer,
+        "chat_id": chat_id, "message_id": message_id, "tool_trace_summary": tool_trace_summary,
+    })
 
 # =========================
 # Chat Persistence (Enhanced)
@@ -93,65 +113,28 @@ def title_from_first_message(msg: str, max_len: int = 50) -> str:
         return msg or "New Chat"
     return msg[:max_len] + "..."
 
-def load_chat_list():
-    """Load all chats sorted by update time"""
-    chats = []
-    for fname in os.listdir(CHATS_DIR):
-        if fname.endswith(".json"):
-            try:
-                with open(os.path.join(CHATS_DIR, fname), "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    chats.append(data)
-            except:
-                pass
-    chats.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
-    return chats
+def load_chat_list(limit: int = None):
+    """Chat summaries sorted by update time"""
+    return CHAT_STORE.list_chats(limit=limit)
 
 def load_chat(chat_id: str):
-    path = os.path.join(CHATS_DIR, f"{chat_id}.json")
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return None
-    return None
-
-def save_chat(chat_id: str, title: str, messages: list, tool_traces: list, starred: bool = False):
-    """Save chat with metadata"""
-    path = os.path.join(CHATS_DIR, f"{chat_id}.json")
-    existing = load_chat(chat_id) if os.path.exists(path) else None
-    
-    data = {
-        "chat_id": chat_id,
-        "title": title,
-        "starred": starred if starred else (existing.get("starred", False) if existing else False),
-        "created_at": existing.get("created_at") if existing else datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat(),
-        "messages": messages,
-        "tool_traces": tool_traces
-    }
-    
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    return CHAT_STORE.load_chat(chat_id)
+
+def save_chat(chat_id: str, title: str, messages: list, tool_traces: list, starred: bool = None):
+    """Save chat with metadata (only new messages/traces are written; starred=None keeps the flag)"""
+    CHAT_STORE.save_chat(chat_id, title, messages, tool_traces, starred=starred)
 
 def delete_chat(chat_id: str):
     """Delete a chat permanently"""
-    path = os.path.join(CHATS_DIR, f"{chat_id}.json")
-    if os.path.exists(path):
-        os.remove(path)
+    CHAT_STORE.delete_chat(chat_id)
 
 def rename_chat(chat_id: str, new_title: str):
     """Rename a chat"""
-    chat = load_chat(chat_id)
-    if chat:
-        save_chat(chat_id, new_title, chat["messages"], chat["tool_traces"], chat.get("starred", False))
+    CHAT_STORE.rename_chat(chat_id, new_title)
 
 def toggle_star(chat_id: str):
     """Toggle starred status"""
-    chat = load_chat(chat_id)
-    if chat:
-        save_chat(chat_id, chat["title"], chat["messages"], chat["tool_traces"], not chat.get("starred", False))
+    CHAT_STORE.toggle_star(chat_id)
 
 def export_chat_markdown(chat_id: str) -> str:
     """Export chat to markdown format"""
@@ -181,24 +164,9 @@ def export_chat_markdown(chat_id: str) -> str:
     
     return "\n".join(lines)
 
-def search_chats(query: str):
-    """Search chats by title or content"""
-    query_lower = query.lower()
-    results = []
-    
-    for chat in load_chat_list():
-        # Search in title
-        if query_lower in chat.get("title", "").lower():
-            results.append(chat)
-            continue
-        
-        # Search in messages
-        for msg in chat.get("messages", []):
-            if query_lower in msg.get("content", "").lower():
-                results.append(chat)
-                break
-    
-    return results
+def search_chats(query: str, limit: int = 20):
+    """Search chats by title or content (FTS index)"""
+    return CHAT_STORE.search(query, limit=limit)
 
 # =========================
 # Memory System (Enhanced)
@@ -280,44 +248,27 @@ USER_MEMORY = load_memory()
 # =========================
 # Usage Statistics
 # =========================
-def load_stats():
-    if os.path.exists(STATS_FILE):
-        try:
-            with open(STATS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            pass
-    
-    return {
-        "total_queries": 0,
-        "total_chats": 0,
-        "route_counts": defaultdict(int),
-        "model_counts": defaultdict(int),
-        "avg_latency_ms": 0,
-        "total_latency_ms": 0
-    }
+# Counters and latency histograms live in memory; usage_stats.json is a
+# periodic snapshot (also written at exit)
+METRICS = MetricsRegistry(STATS_FILE)
+
+# Separate slots for KPI answers and LLM generations (KPI never waits behind the LLM)
+SCHEDULER = RequestScheduler({'kpi': 8, 'llm': 2})
 
-def save_stats(stats: dict):
-    with open(STATS_FILE, "w", encoding="utf-8") as f:
-        json.dump(stats, f, indent=2)
+# Pooled async Ollama client shared by every LLM call
+LLM = llm_client()
 
 def update_stats(route: str, model: str, latency_ms: int):
-    stats = load_stats()
-    stats["total_queries"] += 1
-    stats["route_counts"][route] = stats["route_counts"].get(route, 0) + 1
-    stats["model_counts"][model] = stats["model_counts"].get(model, 0) + 1
-    stats["total_latency_ms"] += latency_ms
-    stats["avg_latency_ms"] = stats["total_latency_ms"] / stats["total_queries"]
-    save_stats(stats)
+    METRICS.record_query(route, model, latency_ms)
 
 def get_stats_summary() -> str:
-    stats = load_stats()
+    stats = METRICS.snapshot()
     
     lines = [
         "## 📊 Usage Statistics",
         "",
         f"**Total Queries:** {stats['total_queries']:,}",
-        f"**Total Chats:** {len(load_chat_list()):,}",
+        f"**Total Chats:** {CHAT_STORE.count_chats():,}",
         f"**Avg Response Time:** {stats.get('avg_latency_ms', 0):.0f}ms",
         "",
         "### Route Distribution",
@@ -332,6 +283,14 @@ def get_stats_summary() -> str:
     for model, count in sorted(stats.get("model_counts", {}).items(), key=lambda x: x[1], reverse=True):
         lines.append(f"- **{model}**: {count:,}")
     
+    for by, heading in (("route", "Latency by Route"), ("model", "Latency by Model")):
+        rows = METRICS.latency_table(by)
+        if not rows:
+            continue
+        lines += ["", f"### {heading}", "", "| | Queries | p50 | p95 | p99 |", "|---|---:|---:|---:|---:|"]
+        for r in rows:
+            lines.append(f"| **{r['name']}** | {r['count']:,} | {r['p50_ms']:.0f}ms | {r['p95_ms']:.0f}ms | {r['p99_ms']:.0f}ms |")
+    
     return "\n".join(lines)
 
 # =========================
@@ -347,6 +306,8 @@ class ToolTrace:
         self.ocr_text = ""
         self.ocr_char_count = 0
         self.latency_ms = 0
+        self.cache_hit = None  # semantic answer cache hit: {query, similarity, age_s}
+        self.queue = None  # scheduler slot: {pool, queue_depth, wait_ms}
     
     def to_dict(self):
         return {
@@ -356,11 +317,15 @@ class ToolTrace:
             "rows_used": self.rows_used,
             "sources": self.sources,
             "ocr_char_count": self.ocr_char_count,
-            "latency_ms": self.latency_ms
+            "latency_ms": self.latency_ms,
+            "cache_hit": self.cache_hit,
+            "queue": self.queue
         }
     
     def to_summary_string(self):
-        return f"{self.route}|{self.model}|rows={self.rows_used}|sources={len(self.sources)}|{self.latency_ms}ms"
+        cache = "|cache=hit" if self.cache_hit else ""
+        queue = f"|{self.queue['pool']}_wait={self.queue['wait_ms']}ms/depth={self.queue['queue_depth']}" if self.queue else ""
+        return f"{self.route}|{self.model}|rows={self.rows_used}|sources={len(self.sources)}|{self.latency_ms}ms{cache}{queue}"
     
     def to_display_html(self):
         lines = ['<div class="tool-trace">']
@@ -389,6 +354,14 @@ class ToolTrace:
             quality = "✅ Good" if self.ocr_char_count > 100 else ("⚠️ Moderate" if self.ocr_char_count > 10 else "⚠️ Low")
             lines.append(f'<p><strong>OCR Quality:</strong> {quality} ({self.ocr_char_count} chars)</p>')
         
+        if self.cache_hit:
+            lines.append(f'<p><strong>Cache:</strong> ⚡ semantic hit (similarity {self.cache_hit["similarity"]:.2f}, '
+                         f'cached query: <em>{self.cache_hit["query"][:60]}</em>)</p>')
+        
+        if self.queue:
+            lines.append(f'<p><strong>Queue:</strong> {self.queue["pool"]} pool, '
+                         f'{self.queue["queue_depth"]} ahead, waited {self.queue["wait_ms"]}ms</p>')
+        
         lines.append(f'<p><strong>Latency:</strong> {self.latency_ms}ms</p>')
         lines.append('</div>')
         
@@ -411,15 +384,12 @@ if not os.path.exists(SALES_CSV):
 if not os.path.exists(HR_CSV):
     raise FileNotFoundError(f"HR CSV not found: {HR_CSV}")
 
-df_sales = pd.read_csv(SALES_CSV)
-df_hr = pd.read_csv(HR_CSV)
-
-df_sales["Date"] = pd.to_datetime(df_sales["Date"], errors="coerce")
-df_sales["DateStr"] = df_sales["Date"].dt.strftime("%Y-%m-%d")
-df_sales["YearMonth"] = df_sales["Date"].dt.to_period("M")
-
-for c in ["Quantity", "Unit Price", "Total Sale"]:
-    df_sales[c] = pd.to_numeric(df_sales[c], errors="coerce")
+# Typed column snapshot with derived columns (re-parsed from CSV only when the file changes)
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "storage", "snapshots")
+df_sales = load_csv_snapshot(SALES_CSV, prepare_sales_frame, SNAPSHOT_DIR)
+STARTUP.lap("Sales data")
+df_hr = load_csv_snapshot(HR_CSV, prepare_hr_frame, SNAPSHOT_DIR)
+STARTUP.lap("HR data")
 
 AVAILABLE_SALES_MONTHS = sorted(df_sales["YearMonth"].dropna().unique().tolist())
 LATEST_SALES_MONTH = max(AVAILABLE_SALES_MONTHS) if AVAILABLE_SALES_MONTHS else None
@@ -430,6 +400,12 @@ PRODUCTS = sorted(df_sales["Product"].dropna().unique().tolist())
 SALES_REPS = sorted(df_sales["Employee"].dropna().unique().tolist())
 CHANNELS = sorted(df_sales["Channel"].dropna().unique().tolist()) if "Channel" in df_sales.columns else []
 
+# Entity gazetteer: every dimension value (+ Malay aliases) in one automaton,
+# versioned by the sales/HR snapshots it was built from
+DATA_VERSION = f"{snapshot_fingerprint(SALES_CSV, SNAPSHOT_DIR)}|{snapshot_fingerprint(HR_CSV, SNAPSHOT_DIR)}"
+ENTITIES = EntityGazetteer.from_frames(df_sales, df_hr, version=DATA_VERSION)
+print(f"✅ Entity gazetteer: {ENTITIES.get_stats()['surfaces']} surface forms, {len(ENTITIES.vocab)} entity types")
+
 HR_DEPTS = sorted(df_hr["Department"].dropna().unique().tolist()) if "Department" in df_hr.columns else []
 HR_AGEGROUPS = sorted(df_hr["AgeGroup"].dropna().unique().tolist()) if "AgeGroup" in df_hr.columns else []
 HR_STATES = sorted(df_hr["State"].dropna().unique().tolist()) if "State" in df_hr.columns else []
@@ -437,6 +413,11 @@ HR_STATES = sorted(df_hr["State"].dropna().unique().tolist()) if "State" in df_h
 print("📄 Sales shape:", df_sales.shape, "| months:", AVAILABLE_SALES_MONTHS[0], "→", AVAILABLE_SALES_MONTHS[-1])
 print("📄 HR shape:", df_hr.shape)
 
+# Sales KPI cube: all sales KPIs are answered from pre-aggregated cells
+sales_cube = SalesCube(df_sales)
+print(f"✅ Sales KPI cube: {len(sales_cube):,} cells from {sales_cube.source_rows:,} rows ({sales_cube.build_ms:.0f} ms)")
+STARTUP.lap("Metadata + KPI cube")
+
 # =========================
 # Build RAG corpus
 # =========================
@@ -457,8 +438,15 @@ for fpath in glob.glob(os.path.join(DOCS_DIR, "*.txt")):
 
 print(f"✅ Loaded {len(doc_txts)} doc chunks")
 
-embedder = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2", device=device)
+# Semantic answer cache for LLM routes; corpus version in the key = stale answers never served after docs change
+SEMANTIC_CACHE_THRESHOLD = 0.92
+RAG_CORPUS_VERSION = corpus_version(doc_txts)
+ANSWER_CACHE = SemanticAnswerCache(threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=500, ttl_seconds=24 * 3600)
+STARTUP.lap("RAG corpus")
+
+embedder = get_embedding_service("all-MiniLM-L6-v2", device=device).load()
 emb_dim = 384
+STARTUP.lap("Embedder load")
 
 print("🔄 Building FAISS index...")
 doc_embs = embedder.encode(doc_txts, batch_size=32, show_progress_bar=True, convert_to_numpy=True)
@@ -467,6 +455,9 @@ index = faiss.IndexFlatL2(emb_dim)
 index.add(doc_embs)
 
 print("✅ FAISS index built with", index.ntotal, "vectors")
+STARTUP.lap("FAISS index")
+STARTUP.report()
+MODELS.report()
 
 # =========================
 # Context Preservation System
@@ -521,53 +512,23 @@ def extract_context_from_answer(answer: str, query: str) -> dict:
 # KPI Functions (Complete implementation from v8.2)
 # =========================
 
-# Sales helper functions
+# Sales helper functions (views over query.time_parser.parse_time, cached per query)
 def extract_month_from_query(q: str, previous_context: dict = None):
-    s = (q or "").lower()
-    
     # Check for explicit month-year patterns
-    match = re.search(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-    if match:
-        year, month = int(match.group(1)), int(match.group(2))
-        return pd.Period(f"{year}-{month:02d}", freq="M")
+    iso = parse_time(q).iso_months
+    if iso:
+        return month_period(*iso[0])
     
     # Default to latest month
     return LATEST_SALES_MONTH
 
 def extract_two_months_from_query(q: str):
-    s = (q or "").lower()
-    matches = re.findall(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-    if len(matches) >= 2:
-        p1 = pd.Period(f"{int(matches[0][0])}-{int(matches[0][1]):02d}", freq="M")
-        p2 = pd.Period(f"{int(matches[1][0])}-{int(matches[1][1]):02d}", freq="M")
-        return [p1, p2]
-    return []
+    months = month_pair(q, unique=False)
+    return months if len(months) >= 2 else []
 
 def extract_named_month_range(q: str):
     """Extract month range like 'Jan until Jun 2024'"""
-    s = (q or "").lower()
-    months_map = {
-        "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
-        "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
-    }
-    
-    found_months = []
-    year = None
-    
-    for month_name, month_num in months_map.items():
-        if month_name in s:
-            found_months.append(month_num)
-    
-    year_match = re.search(r"\b20\d{2}\b", s)
-    if year_match:
-        year = int(year_match.group())
-    
-    if len(found_months) >= 2 and year:
-        start_m = min(found_months)
-        end_m = max(found_months)
-        return (pd.Period(f"{year}-{start_m:02d}", freq="M"), pd.Period(f"{year}-{end_m:02d}", freq="M"))
-    
-    return None
+    return named_month_range(q, LATEST_SALES_MONTH)
 
 def detect_sales_metric(q: str) -> str:
     s = (q or "").lower()
@@ -589,22 +550,16 @@ def detect_sales_dimension(q: str) -> str:
 
 def extract_sales_filters(q: str):
     s = (q or "").lower()
-    state = next((x for x in STATES if x.lower() in s), None)
-    branch = next((x for x in sorted(BRANCHES, key=len, reverse=True) if x.lower() in s), None)
-    product = next((x for x in sorted(PRODUCTS, key=len, reverse=True) if x.lower() in s), None)
-    employee = next((x for x in SALES_REPS if x.lower() in s), None)
-    channel = next((x for x in CHANNELS if x.lower() in s), None)
+    mentions = ENTITIES.find(s)
+    state = ENTITIES.first(mentions, "state")
+    branch = ENTITIES.first(mentions, "branch")
+    product = ENTITIES.first(mentions, "product")
+    employee = ENTITIES.first(mentions, "employee")
+    channel = ENTITIES.first(mentions, "channel")
     return state, branch, product, employee, channel
 
 def extract_month_range_from_query(q: str):
-    s = (q or "").lower()
-    matches = re.findall(r"\b(20\d{2})[-/](0?[1-9]|1[0-2])\b", s)
-    if len(matches) >= 2:
-        p1 = pd.Period(f"{int(matches[0][0]):04d}-{int(matches[0][1]):02d}", freq="M")
-        p2 = pd.Period(f"{int(matches[1][0]):04d}-{int(matches[1][1]):02d}", freq="M")
-        start_m, end_m = (p1, p2) if p1 <= p2 else (p2, p1)
-        return start_m, end_m
-    return None
+    return month_range(q, LATEST_SALES_MONTH, quarters=False)
 
 def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
     """Complete Sales KPI with all features"""
@@ -630,25 +585,15 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
     
     if rng is not None and (is_top or "highest" in s or "most" in s):
         start_m, end_m = rng
-        mask = (df_sales["YearMonth"] >= start_m) & (df_sales["YearMonth"] <= end_m)
-        sub_range = df_sales[mask].copy()
-
-        if state:
-            sub_range = sub_range[sub_range["State"] == state]
-        if branch:
-            sub_range = sub_range[sub_range["Branch"] == branch]
-        if product:
-            sub_range = sub_range[sub_range["Product"] == product]
-        if employee:
-            sub_range = sub_range[sub_range["Employee"] == employee]
-        if channel and "Channel" in sub_range.columns:
-            sub_range = sub_range[sub_range["Channel"] == channel]
-
-        if sub_range.empty:
+        sub_range = sales_cube.slice(start=start_m, end=end_m, state=state, branch=branch,
+                                     product=product, employee=employee, channel=channel)
+        range_rows = SalesCube.rows(sub_range)
+
+        if range_rows == 0:
             return f"❗ No records for {start_m} → {end_m} with given filters."
 
         dim = detect_sales_dimension(q)
-        grp = sub_range.groupby(dim)[value_col].sum().sort_values(ascending=False)
+        grp = sub_range.groupby(dim, observed=True)[value_col].sum().sort_values(ascending=False)
 
         top_n = 5 if ("top 5" in s or "top5" in s) else 3
         top_df = grp.head(top_n).reset_index().rename(columns={value_col: metric_label})
@@ -659,7 +604,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             top_df[metric_label] = top_df[metric_label].astype(int)
         
         if trace:
-            trace.rows_used = len(sub_range)
+            trace.rows_used = range_rows
             trace.filters["period"] = f"{start_m} to {end_m}"
             trace.filters["dimension"] = dim
 
@@ -674,7 +619,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             "### Evidence Used",
             df_to_markdown_table(top_df),
             f"- Data Source: Structured Sales KPI",
-            f"- Rows Analyzed: {len(sub_range):,}",
+            f"- Rows Analyzed: {range_rows:,}",
             "",
             "### Next Actions",
             f"- Deep-dive into top-performing {dim}",
@@ -684,24 +629,15 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
 
     # Single month logic
     month = extract_month_from_query(q)
-    sub = df_sales[df_sales["YearMonth"] == month].copy()
-
-    if state:
-        sub = sub[sub["State"] == state]
-    if branch:
-        sub = sub[sub["Branch"] == branch]
-    if product:
-        sub = sub[sub["Product"] == product]
-    if employee:
-        sub = sub[sub["Employee"] == employee]
-    if channel and "Channel" in sub.columns:
-        sub = sub[sub["Channel"] == channel]
-
-    if sub.empty:
+    filters = {"state": state, "branch": branch, "product": product, "employee": employee, "channel": channel}
+    sub = sales_cube.slice(month=month, **filters)
+    sub_rows = SalesCube.rows(sub)
+
+    if sub_rows == 0:
         return f"❗ No records for {month} with given filters."
     
     if trace:
-        trace.rows_used = len(sub)
+        trace.rows_used = sub_rows
         trace.filters["month"] = str(month)
 
     # Compare
@@ -714,33 +650,13 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             cur_month = month
             prev_month = month - 1
 
-        cur_df = df_sales[df_sales["YearMonth"] == cur_month].copy()
-        prev_df = df_sales[df_sales["YearMonth"] == prev_month].copy()
-
-        if state:
-            cur_df = cur_df[cur_df["State"] == state]
-            prev_df = prev_df[prev_df["State"] == state]
-        if branch:
-            cur_df = cur_df[cur_df["Branch"] == branch]
-            prev_df = prev_df[prev_df["Branch"] == branch]
-        if product:
-            cur_df = cur_df[cur_df["Product"] == product]
-            prev_df = prev_df[prev_df["Product"] == product]
-        if employee:
-            cur_df = cur_df[cur_df["Employee"] == employee]
-            prev_df = prev_df[prev_df["Employee"] == employee]
-        if channel and "Channel" in cur_df.columns:
-            cur_df = cur_df[cur_df["Channel"] == channel]
-        if channel and "Channel" in prev_df.columns:
-            prev_df = prev_df[prev_df["Channel"] == channel]
-
-        cur_val = float(cur_df[value_col].sum())
-        prev_val = float(prev_df[value_col].sum())
+        cur_val, cur_rows = sales_cube.total(value_col, month=cur_month, **filters)
+        prev_val, prev_rows = sales_cube.total(value_col, month=prev_month, **filters)
         diff = cur_val - prev_val
         pct = (diff / prev_val * 100) if prev_val != 0 else None
         
         if trace:
-            trace.rows_used = len(cur_df) + len(prev_df)
+            trace.rows_used = cur_rows + prev_rows
             trace.filters["comparison"] = f"{prev_month} vs {cur_month}"
 
         lines = [
@@ -760,8 +676,8 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             "",
             "### Evidence Used",
             f"- Data Source: Structured Sales KPI",
-            f"- Current Period Rows: {len(cur_df):,}",
-            f"- Previous Period Rows: {len(prev_df):,}",
+            f"- Current Period Rows: {cur_rows:,}",
+            f"- Previous Period Rows: {prev_rows:,}",
             "",
             "### Next Actions",
             "- Investigate drivers of change",
@@ -774,7 +690,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
     # Top-N
     if is_top:
         dim = detect_sales_dimension(q)
-        grp = sub.groupby(dim)[value_col].sum().sort_values(ascending=False)
+        grp = sub.groupby(dim, observed=True)[value_col].sum().sort_values(ascending=False)
 
         top_n = 5 if ("top 5" in s or "top5" in s) else 3
         top_df = grp.head(top_n).reset_index().rename(columns={value_col: metric_label})
@@ -798,7 +714,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
             "### Evidence Used",
             df_to_markdown_table(top_df),
             f"- Data Source: Structured Sales KPI",
-            f"- Rows Analyzed: {len(sub):,}",
+            f"- Rows Analyzed: {sub_rows:,}",
             "",
             "### Next Actions",
             f"- Analyze success factors of top {dim}",
@@ -819,7 +735,7 @@ def answer_sales_ceo_kpi(q: str, trace: ToolTrace = None):
         "",
         "### Evidence Used",
         f"- Data Source: Structured Sales KPI",
-        f"- Rows Analyzed: {len(sub):,}",
+        f"- Rows Analyzed: {sub_rows:,}",
         "",
         "### Next Actions",
         "- Compare with previous periods",
@@ -840,7 +756,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
     if "headcount" in s or "berapa orang" in s or "how many" in s:
         for d in HR_DEPTS:
             if d.lower() in s:
-                n = int((df_hr["Department"] == d).sum())
+                n = int(code_mask(df_hr["Department"], d).sum())
                 if trace:
                     trace.rows_used = len(df_hr)
                     trace.filters = {"department": d}
@@ -848,7 +764,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
 
         for st in HR_STATES:
             if st.lower() in s:
-                n = int((df_hr["State"] == st).sum())
+                n = int(code_mask(df_hr["State"], st).sum())
                 if trace:
                     trace.rows_used = len(df_hr)
                     trace.filters = {"state": st}
@@ -860,7 +776,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
 
     # Attrition
     if "attrition" in s:
-        left = df_hr[df_hr["Attrition"].astype(str).str.lower() == "yes"].copy()
+        left = df_hr[code_mask(df_hr["Attrition"], "yes", ignore_case=True)].copy()
         if left.empty:
             return "## 📉 Attrition Analysis\n\n### Executive Summary\nNo attrition records found in current dataset.\n\n### Evidence Used\n- Data Source: Structured HR"
 
@@ -877,7 +793,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
     # Income
     if "income" in s or "salary" in s or "gaji" in s:
         if "department" in s:
-            grp = df_hr.groupby("Department")["MonthlyIncome"].mean().sort_values(ascending=False)
+            grp = df_hr.groupby("Department", observed=True)["MonthlyIncome"].mean().sort_values(ascending=False)
             top_df = grp.reset_index().rename(columns={"MonthlyIncome": "Avg Monthly Income (RM)"})
             top_df["Avg Monthly Income (RM)"] = top_df["Avg Monthly Income (RM)"].map(lambda x: f"RM {format_num(float(x), 2)}")
 
@@ -896,7 +812,7 @@ def answer_hr(q: str, trace: ToolTrace = None) -> str:
 # RAG Functions (Enhanced with conversation history)
 # =========================
 def retrieve_context(query: str, k: int = 5, mode: str = "docs", trace: ToolTrace = None):
-    q_vec = embedder.encode([query], convert_to_numpy=True)
+    q_vec = embedder.encode_query(query)[None, :]
     D, I = index.search(q_vec, k)
     results = []
     
@@ -929,22 +845,49 @@ def _build_prompt_with_history(context: list[str], query: str, memory: dict, con
     return "\n".join(parts)
 
 def generate_answer_with_model_stream(model: str, query: str, mode: str, trace: ToolTrace = None, conversation_history: list = None):
-    context = retrieve_context(query, k=5, mode=mode, trace=trace)
-    prompt = _build_prompt_with_history(context, query, USER_MEMORY, conversation_history)
-    
-    try:
-        stream = ollama.chat(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            stream=True
-        )
+    # Semantic answer cache: only first-turn questions (follow-ups put the history into the prompt)
+    q_vec = None
+    if not conversation_history:
+        q_vec = embedder.encode_query(query)
+        cached = ANSWER_CACHE.lookup(q_vec, mode, model, RAG_CORPUS_VERSION)
+        if cached:
+            if trace:
+                trace.cache_hit = {k: cached[k] for k in ("query", "similarity", "age_s")}
+            yield ev.final(cached["answer"])
+            return
+    
+    answer = ev.AnswerBuffer()
+    with SCHEDULER.slot("llm", trace=trace):
+        context = retrieve_context(query, k=5, mode=mode, trace=trace)
+        prompt = _build_prompt_with_history(context, query, USER_MEMORY, conversation_history)
         
-        for chunk in stream:
-            txt = chunk.get("message", {}).get("content", "")
-            if txt:
-                yield txt
-    except Exception as e:
-        yield f"\n\n⚠️ LLM Error: {e}"
+        try:
+            for txt in LLM.stream_chat(model, [{"role": "user", "content": prompt}]):
+                event = ev.delta(txt)
+                answer.feed(event)
+                yield event
+        except Exception as e:
+            yield ev.delta(f"\n\n⚠️ LLM Error: {e}")
+            return
+    
+    if q_vec is not None:
+        ANSWER_CACHE.store(q_vec, query, answer.text(), mode, model, RAG_CORPUS_VERSION)
+
+def stream_to_ui(events, trace: ToolTrace, tick: float = 0.2):
+    """
+    Yield (answer_so_far, trace_html, []) at most once per tick; returns the answer.
+    Tokens collect in a list buffer and the trace panel is rendered once, not per token.
+    """
+    answer = ev.AnswerBuffer()
+    trace_html = None
+    last = 0.0
+    for event in events:
+        if answer.feed(event) and time.perf_counter() - last >= tick:
+            last = time.perf_counter()
+            if trace_html is None:
+                trace_html = trace.to_display_html()  # sources are known once tokens flow
+            yield (answer.text(), trace_html, [])
+    return answer.text()
 
 def caption_image(img_path: str, trace: ToolTrace = None) -> str:
     try:
@@ -953,7 +896,7 @@ def caption_image(img_path: str, trace: ToolTrace = None) -> str:
             return ""
         
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        text = pytesseract.image_to_string(gray, config='--psm 6').strip()
+        text = ocr_engine(TESSERACT_CMD).image_to_string(gray, config='--psm 6').strip()
         
         if trace:
             trace.ocr_text = text
@@ -1032,7 +975,8 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
     
     # KPI routes (deterministic)
     if route == "sales_kpi":
-        final_answer = answer_sales_ceo_kpi(user_input, trace)
+        with SCHEDULER.slot("kpi", trace=trace):
+            final_answer = answer_sales_ceo_kpi(user_input, trace)
         trace.latency_ms = elapsed_ms()
         
         # Generate follow-ups
@@ -1041,7 +985,8 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
         yield (final_answer, trace.to_display_html(), followups)
         
     elif route == "hr_kpi":
-        final_answer = answer_hr(user_input, trace)
+        with SCHEDULER.slot("kpi", trace=trace):
+            final_answer = answer_hr(user_input, trace)
         trace.latency_ms = elapsed_ms()
         
         followups = generate_followup_questions(user_input, final_answer, route)
@@ -1050,12 +995,8 @@ def rag_query_ui(user_input: str, model_name: str, has_image: bool = False, chat
     
     # RAG route (streaming with history)
     elif route == "rag_docs":
-        accumulated = ""
-        for chunk in generate_answer_with_model_stream(model_name, user_input, "docs", trace, conversation_history):
-            accumulated += chunk
-            yield (accumulated, trace.to_display_html(), [])
-        
-        final_answer = accumulated
+        final_answer = yield from stream_to_ui(
+            generate_answer_with_model_stream(model_name, user_input, "docs", trace, conversation_history), trace)
         trace.latency_ms = elapsed_ms()
         
         followups = generate_followup_questions(user_input, final_answer, route)
@@ -1078,10 +1019,8 @@ def multimodal_query(text: str, image, model: str, chat_id: str, conversation_hi
         combined_query = f"{text}\n\nExtracted from image:\n{ocr_text}" if ocr_text else text
         
         # Stream answer with history
-        accumulated = ""
-        for chunk in generate_answer_with_model_stream(model, combined_query, "visual", trace, conversation_history):
-            accumulated += chunk
-            yield (accumulated, trace.to_display_html(), [])
+        accumulated = yield from stream_to_ui(
+            generate_answer_with_model_stream(model, combined_query, "visual", trace, conversation_history), trace)
         
         trace.latency_ms = int((time.perf_counter() - start) * 1000)
         
@@ -1234,8 +1173,7 @@ with gr.Blocks(css=custom_css, title="🧠 CEO Bot - ChatGPT Style") as demo:
         if len(messages) == 2:
             chat_title = title_from_first_message(text)
         else:
-            existing = load_chat(chat_id)
-            chat_title = existing.get("title", "Chat") if existing else "Chat"
+            chat_title = CHAT_STORE.get_title(chat_id) or "Chat"
         
         # Save
         try:
@@ -1256,15 +1194,14 @@ with gr.Blocks(css=custom_css, title="🧠 CEO Bot - ChatGPT Style") as demo:
     def on_new_chat(messages, traces, chat_id):
         """Save current and start new"""
         if messages:
-            existing = load_chat(chat_id)
-            title = existing.get("title", "Chat") if existing else "Chat"
+            title = CHAT_STORE.get_title(chat_id) or "Chat"
             save_chat(chat_id, title, messages, traces)
         
         new_id = generate_chat_id()
         return ("", "", "", new_id, [], [], refresh_chat_list())
     
     def refresh_chat_list():
-        chats = load_chat_list()[:20]
+        chats = load_chat_list(limit=20)
         if not chats:
             return "No chats yet."
         
@@ -1314,12 +1251,12 @@ with gr.Blocks(css=custom_css, title="🧠 CEO Bot - ChatGPT Style") as demo:
         if not query.strip():
             return refresh_chat_list()
         
-        results = search_chats(query)
+        results = search_chats(query, limit=10)
         if not results:
             return f"No results for: {query}"
         
         lines = [f"**Search results for:** {query}", ""]
-        for chat in results[:10]:
+        for chat in results:
             star = "⭐ " if chat.get("starred") else ""
             title = chat.get("title", "Untitled")[:40]
             chat_id = chat.get("chat_id", "")
@@ -1426,4 +1363,6 @@ with gr.Blocks(css=custom_css, title="🧠 CEO Bot - ChatGPT Style") as demo:
     demo.load(refresh_chat_list, outputs=chat_list_md)
 
 print("✅ Launching CEO Bot - ChatGPT Full Experience...")
+# Enough workers for both pools; the scheduler decides who runs (KPI vs LLM slots)
+demo.queue(default_concurrency_limit=SCHEDULER.max_concurrency)
 demo.launch(server_name="127.0.0.1", server_port=7860, share=False)
@@ -3,5 +3,7 @@ Query validation module initialization.
 """
 from .time_classifier import TimeClassifier
 from .validator import DataValidator
+from .fuzzy_index import FuzzyIndex
+from .time_parser import parse_time
 
-__all__ = ['TimeClassifier', 'DataValidator']
+__all__ = ['TimeClassifier', 'DataValidator', 'FuzzyIndex', 'parse_time']
@@ -0,0 +1,86 @@
+"""
+Fuzzy Keyword Index - FYP Version
+Precomputed index for DataValidator's typo-tolerant keyword matching.
+Gives the same answers as SequenceMatcher(None, word, keyword).ratio()
+against every keyword, but only scores keywords that can still reach
+the threshold:
+  1. length buckets: ratio <= 2*min(len)/(len_a + len_b)
+  2. character counts: ratio <= 2*common_chars/(len_a + len_b)
+     (the bound difflib's quick_ratio() uses)
+Both are upper bounds, so no true match is ever filtered out.
+"""
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, List, Sequence, Tuple
+
+
+class FuzzyIndex:
+    """Length-bucketed keyword index with exact SequenceMatcher scoring."""
+
+    def __init__(self, keywords: Sequence[str], cache_size: int = 4096):
+        """
+        Args:
+            keywords: Targets (matched case-insensitively; list order is kept
+                for first-match semantics)
+            cache_size: Max memoised (word, threshold) lookups
+        """
+        self.keywords: List[str] = list(dict.fromkeys(k.lower() for k in keywords))
+        self._counts = [Counter(k) for k in self.keywords]
+        self._by_length: Dict[int, List[int]] = {}
+        for kid, k in enumerate(self.keywords):
+            self._by_length.setdefault(len(k), []).append(kid)
+        self.cache_size = cache_size
+        self._cache: Dict[Tuple[str, float], List[Tuple[str, float]]] = {}
+        self.scored = 0      # full ratio() computations
+        self.lookups = 0
+
+    def matches(self, word: str, threshold: float) -> List[Tuple[str, float]]:
+        """
+        All keywords with ratio >= threshold, in keyword-list order.
+
+        Returns:
+            [(keyword, ratio)]
+        """
+        word = word.lower()
+        key = (word, threshold)
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+        self.lookups += 1
+
+        lw = len(word)
+        word_counts = None
+        candidates = []
+        for length, ids in self._by_length.items():
+            total = lw + length
+            if total and 2.0 * min(lw, length) / total < threshold:
+                continue
+            if word_counts is None:
+                word_counts = Counter(word)
+            for kid in ids:
+                common = sum(min(n, self._counts[kid][c]) for c, n in word_counts.items())
+                if total and 2.0 * common / total < threshold:
+                    continue
+                candidates.append(kid)
+
+        result = []
+        for kid in sorted(candidates):
+            self.scored += 1
+            ratio = SequenceMatcher(None, word, self.keywords[kid]).ratio()
+            if ratio >= threshold:
+                result.append((self.keywords[kid], ratio))
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def first(self, word: str, threshold: float):
+        """Earliest keyword (list order) with ratio >= threshold, or None."""
+        hits = self.matches(word, threshold)
+        return hits[0][0] if hits else None
+
+    def best(self, word: str, threshold: float):
+        """(keyword, ratio) with the highest ratio >= threshold, or None (ties: list order)."""
+        hits = self.matches(word, threshold)
+        return max(hits, key=lambda h: h[1]) if hits else None
@@ -6,6 +6,11 @@ Simplified for academic research (50 lines).
 import re
 from typing import Dict, List, Optional
 
+try:
+    from .time_parser import timeframe_text
+except ImportError:
+    from time_parser import timeframe_text
+
 class TimeClassifier:
     """Classifies queries by time sensitivity."""
     
@@ -31,7 +36,7 @@ class TimeClassifier:
         r'(products?|states?|branches?) (in|available)',
     ]
     
-    # Month patterns
+    # Month patterns (reference; matched by time_parser in one pass)
     MONTH_PATTERNS = [
         r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\b',
         r'\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\b',
@@ -100,9 +105,5 @@ class TimeClassifier:
         }
     
     def _extract_timeframe(self, query: str) -> Optional[str]:
-        """Extract explicit timeframe from query."""
-        for pattern in self.MONTH_PATTERNS:
-            match = re.search(pattern, query, re.IGNORECASE)
-            if match:
-                return match.group(0)
-        return None
+        """Extract explicit timeframe from query (first MONTH_PATTERNS hit)."""
+        return timeframe_text(query)
@@ -0,0 +1,261 @@
+"""
+Time Expression Parser - FYP Version
+Single-pass parser for the time expressions in a query.
+A sales question used to be scanned by five separate regex passes
+(extract_month_from_query, extract_two_months_from_query,
+extract_month_range_from_query, extract_named_month_range and
+TimeClassifier). parse_time() tokenises the query once and returns every
+expression with its span; the result is cached per query string and the
+old extractors are thin views over it:
+  - yyyy-mm / yyyy/m dates, bare 20xx years
+  - month names (English, abbreviations, Malay)
+  - quarters (Q1-Q4) and half years (H1/H2)
+  - relative months ("bulan ni", "this month", "bulan lepas", "last month")
+"""
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+import re
+
+import pandas as pd
+
+MONTH_ALIASES = {
+    "jan": 1, "january": 1, "januari": 1,
+    "feb": 2, "february": 2, "februari": 2,
+    "mar": 3, "march": 3, "mac": 3,
+    "apr": 4, "april": 4,
+    "may": 5, "mei": 5,
+    "jun": 6, "june": 6,
+    "jul": 7, "july": 7, "julai": 7,
+    "aug": 8, "august": 8, "ogos": 8,
+    "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "okt": 10, "oktober": 10,
+    "nov": 11, "november": 11,
+    "dec": 12, "december": 12, "dis": 12, "disember": 12,
+}
+
+# Tie-break for longest-name matching: alias length, then dict order
+_ALIAS_RANK = {name: (-len(name), i) for i, name in enumerate(MONTH_ALIASES)}
+
+ENGLISH_MONTHS = (
+    "january", "february", "march", "april", "may", "june", "july",
+    "august", "september", "october", "november", "december",
+)
+MONTH_ABBREVIATIONS = (
+    "jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec",
+)
+
+CURRENT_MONTH_PHRASES = ["bulan ni", "bulan ini", "this month", "current month", "mtd"]
+LAST_MONTH_PHRASES = ["bulan lepas", "last month", "previous month"]
+
+# Q1: Jan-Mar ... Q4: Oct-Dec; single-month questions use the middle month
+QUARTER_MONTHS = {1: (1, 3), 2: (4, 6), 3: (7, 9), 4: (10, 12)}
+QUARTER_MIDDLE_MONTH = {1: 2, 2: 5, 3: 8, 4: 11}
+
+_TOKEN_RE = re.compile(
+    r"(?P<date>\b\d{4}[-/]\d{1,2}\b)"
+    r"|(?P<year>\b20\d{2}\b)"
+    r"|(?P<quarter>\bq[1-4]\b)"
+    r"|(?P<half>\bh[12]\b)"
+    r"|(?P<word>[a-z]+)"
+)
+_YEAR_RE = re.compile(r"20\d{2}")
+_MONTH_NUM_RE = re.compile(r"0?[1-9]|1[0-2]")
+
+
+def _is_word(ch: str) -> bool:
+    """Same character class as regex \\w."""
+    return ch.isalnum() or ch == '_'
+
+
+class TimeSpan(NamedTuple):
+    """One time expression (start/end index the lowercased query)."""
+    kind: str      # 'date', 'year', 'month', 'quarter', 'half', 'relative'
+    value: object  # (year, month) | year | month | quarter | half | 'this_month'/'last_month'
+    start: int
+    end: int
+    text: str
+    bounded: bool = True  # month names: standalone word (not inside "jan2024")
+
+
+class TimeExpressions(NamedTuple):
+    """Everything parse_time() found, each list in text order."""
+    text: str
+    relative: Optional[TimeSpan]
+    dates: Tuple[TimeSpan, ...]
+    years: Tuple[int, ...]
+    months: Tuple[TimeSpan, ...]
+    quarters: Tuple[TimeSpan, ...]
+    halves: Tuple[TimeSpan, ...]
+
+    @property
+    def iso_months(self) -> List[Tuple[int, int]]:
+        """(year, month) of every valid 20xx-mm date."""
+        return [d.value for d in self.dates if d.value is not None]
+
+    @property
+    def year(self) -> Optional[int]:
+        """First 20xx year mentioned (standalone or inside a date)."""
+        return self.years[0] if self.years else None
+
+    def month_names(self, bounded_only: bool = False) -> List[int]:
+        """Month numbers of the month words, in text order."""
+        return [m.value for m in self.months if m.bounded or not bounded_only]
+
+    def longest_month_name(self) -> Optional[int]:
+        """Month of the longest standalone month word ("september" beats "sep")."""
+        names = [m.text for m in self.months if m.bounded]
+        return MONTH_ALIASES[min(names, key=_ALIAS_RANK.__getitem__)] if names else None
+
+    def expressions(self) -> List[TimeSpan]:
+        """All expressions ordered by position."""
+        spans = list(self.dates) + list(self.months) + list(self.quarters) + list(self.halves)
+        if self.relative is not None:
+            spans.append(self.relative)
+        return sorted(spans, key=lambda t: t.start)
+
+
+def _relative(s: str) -> Optional[TimeSpan]:
+    for value, phrases in (("this_month", CURRENT_MONTH_PHRASES), ("last_month", LAST_MONTH_PHRASES)):
+        for phrase in phrases:
+            pos = s.find(phrase)
+            if pos >= 0:
+                return TimeSpan("relative", value, pos, pos + len(phrase), phrase)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse(s: str) -> TimeExpressions:
+    dates, years, months, quarters, halves = [], [], [], [], []
+    n = len(s)
+    for m in _TOKEN_RE.finditer(s):
+        kind, text = m.lastgroup, m.group()
+        start, end = m.span()
+        if kind == "word":
+            num = MONTH_ALIASES.get(text)
+            if num is not None:
+                bounded = not (start > 0 and _is_word(s[start - 1])) and not (end < n and _is_word(s[end]))
+                months.append(TimeSpan("month", num, start, end, text, bounded))
+        elif kind == "date":
+            y, mo = text[:4], text[5:]
+            valid = _YEAR_RE.fullmatch(y) is not None
+            if valid:
+                years.append(int(y))
+            value = (int(y), int(mo)) if valid and _MONTH_NUM_RE.fullmatch(mo) else None
+            dates.append(TimeSpan("date", value, start, end, text))
+        elif kind == "year":
+            years.append(int(text))
+        elif kind == "quarter":
+            quarters.append(TimeSpan("quarter", int(text[1]), start, end, text))
+        else:
+            halves.append(TimeSpan("half", int(text[1]), start, end, text))
+    return TimeExpressions(s, _relative(s), tuple(dates), tuple(years),
+                           tuple(months), tuple(quarters), tuple(halves))
+
+
+def parse_time(q: str) -> TimeExpressions:
+    """
+    Parse every time expression in a query (one pass, cached per query).
+
+    Args:
+        q: Raw query (lowercased here)
+    """
+    return _parse((q or "").lower())
+
+
+def month_period(year: int, month: int) -> pd.Period:
+    return pd.Period(f"{year:04d}-{month:02d}", freq="M")
+
+
+def _ordered(p1: pd.Period, p2: pd.Period) -> Tuple[pd.Period, pd.Period]:
+    return (p1, p2) if p1 <= p2 else (p2, p1)
+
+
+# =========================
+# Views (what the launcher extractors return)
+# =========================
+def resolve_month(q: str, latest: pd.Period, quarters: bool = True,
+                  longest_name: bool = True) -> Optional[pd.Period]:
+    """
+    Single month named by the query, or None if it names none.
+
+    Priority: relative month, first yyyy-mm, first quarter (middle month),
+    month name. Missing years default to the latest data year.
+
+    Args:
+        latest: Latest month in the data (anchor for relative months)
+        quarters: Resolve "Q2" to its middle month
+        longest_name: Longest standalone month word wins; False = first
+            month word in text order
+    """
+    t = parse_time(q)
+    if t.relative is not None:
+        return latest if t.relative.value == "this_month" else latest - 1
+    if t.iso_months:
+        return month_period(*t.iso_months[0])
+
+    year = t.year if t.year is not None else latest.year
+    if quarters and t.quarters:
+        return month_period(year, QUARTER_MIDDLE_MONTH[t.quarters[0].value])
+    if longest_name:
+        month = t.longest_month_name()
+    else:
+        names = t.month_names()
+        month = names[0] if names else None
+    return month_period(year, month) if month is not None else None
+
+
+def month_pair(q: str, unique: bool = True) -> List[pd.Period]:
+    """Up to two explicit yyyy-mm months ("2024-03 vs 2024-05")."""
+    months = [month_period(y, m) for y, m in parse_time(q).iso_months]
+    if unique:
+        months = list(dict.fromkeys(months))
+    return months[:2]
+
+
+def month_range(q: str, latest: Optional[pd.Period], quarters: bool = True):
+    """
+    (start, end) for "Q1 vs Q2 2024" (first quarter's start to second
+    quarter's end) or "2024-01 to 2024-06"; None otherwise.
+    """
+    t = parse_time(q)
+    if quarters and len(t.quarters) >= 2:
+        if t.year is not None:
+            year = t.year
+        else:
+            year = latest.year if latest is not None else pd.Timestamp.now().year
+        start = QUARTER_MONTHS[t.quarters[0].value][0]
+        end = QUARTER_MONTHS[t.quarters[1].value][1]
+        return _ordered(month_period(year, start), month_period(year, end))
+
+    iso = t.iso_months
+    if len(iso) >= 2:
+        return _ordered(month_period(*iso[0]), month_period(*iso[1]))
+    return None
+
+
+def named_month_range(q: str, latest: Optional[pd.Period]):
+    """(start, end) from the first two month words ("Jan until Jun 2024"), or None."""
+    t = parse_time(q)
+    names = t.month_names()
+    if len(names) < 2:
+        return None
+    year = t.year if t.year is not None else (latest.year if latest is not None else None)
+    if year is None:
+        return None
+    return _ordered(month_period(year, names[0]), month_period(year, names[1]))
+
+
+def timeframe_text(q: str) -> Optional[str]:
+    """
+    Surface text of the explicit timeframe, checked in TimeClassifier
+    order: full month name, abbreviation, yyyy-mm, H1/H2, Q1-Q4.
+    """
+    t = parse_time(q)
+    for names in (ENGLISH_MONTHS, MONTH_ABBREVIATIONS):
+        for m in t.months:
+            if m.bounded and m.text in names:
+                return m.text
+    for spans in (t.dates, t.halves, t.quarters):
+        if spans:
+            return spans[0].text
+    return None
@@ -7,10 +7,65 @@ import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime
 from difflib import SequenceMatcher
+from functools import lru_cache
+
+try:
+    from .fuzzy_index import FuzzyIndex
+except ImportError:  # imported as a top-level module (query/ on sys.path)
+    from fuzzy_index import FuzzyIndex
+
+
+@lru_cache(maxsize=256)
+def _keyword_index(keywords: tuple) -> FuzzyIndex:
+    """FuzzyIndex per distinct keyword list (built on first use)."""
+    return FuzzyIndex(keywords)
+
 
 class DataValidator:
     """Validates data availability for queries."""
     
+    # Common typo corrections (English)
+    TYPO_MAP = {
+        "salse": "sales",
+        "headcont": "headcount",
+        "stat": "state",
+        "stats": "state",
+        "employe": "employee",
+        "employes": "employees",
+        "reveune": "revenue",
+        "revenu": "revenue",
+        "atrittion": "attrition",
+        "departement": "department",
+        "brach": "branch",
+        "produk": "product",
+        "jualan": "sales",
+        "pekerja": "employee",
+        "kakitangan": "staff",
+    }
+
+    # Malay-to-English keyword mapping
+    MALAY_MAP = {
+        "bulan": "month",
+        "tahun": "year",
+        "negeri": "state",
+        "cawangan": "branch",
+        "jabatan": "department",
+        "gaji": "salary",
+        "pendapatan": "income",
+        "umur": "age",
+        "produk": "product",
+        "jualan": "sales",
+        "hasil": "revenue",
+        "pekerja": "employee",
+        "kakitangan": "staff",
+        "terbaik": "best",
+        "tertinggi": "highest",
+        "terendah": "lowest",
+    }
+
+    # Built once: normalize_query fuzzy-matches every unknown word against it
+    TYPO_INDEX = FuzzyIndex(list(TYPO_MAP))
+    
     def __init__(self, sales_csv_path: str):
         """Initialize with sales data path."""
         self.sales_csv_path = sales_csv_path
@@ -183,16 +238,13 @@ class DataValidator:
         Returns:
             bool: True if any keyword matches
         """
-        query_words = query.lower().split()
-        for keyword in keywords:
-            # Exact match first
-            if keyword.lower() in query.lower():
-                return True
-            # Fuzzy match
-            for word in query_words:
-                if DataValidator.fuzzy_match(word, keyword, threshold):
-                    return True
-        return False
+        query_lower = query.lower()
+        # Exact match first
+        if any(keyword.lower() in query_lower for keyword in keywords):
+            return True
+        # Fuzzy match (indexed: only keywords that can reach threshold are scored)
+        index = _keyword_index(tuple(keywords))
+        return any(index.matches(word, threshold) for word in query_lower.split())
     
     @staticmethod
     def normalize_query(query: str) -> str:
@@ -210,45 +262,6 @@ class DataValidator:
             'headcont by stat' → 'headcount by state'
             'produk terbaik' → 'product best'
         """
-        # Common typo corrections (English)
-        typo_map = {
-            "salse": "sales",
-            "headcont": "headcount",
-            "stat": "state",
-            "stats": "state",
-            "employe": "employee",
-            "employes": "employees",
-            "reveune": "revenue",
-            "revenu": "revenue",
-            "atrittion": "attrition",
-            "departement": "department",
-            "brach": "branch",
-            "produk": "product",
-            "jualan": "sales",
-            "pekerja": "employee",
-            "kakitangan": "staff",
-        }
-        
-        # Malay-to-English keyword mapping
-        malay_map = {
-            "bulan": "month",
-            "tahun": "year",
-            "negeri": "state",
-            "cawangan": "branch",
-            "jabatan": "department",
-            "gaji": "salary",
-            "pendapatan": "income",
-            "umur": "age",
-            "produk": "product",
-            "jualan": "sales",
-            "hasil": "revenue",
-            "pekerja": "employee",
-            "kakitangan": "staff",
-            "terbaik": "best",
-            "tertinggi": "highest",
-            "terendah": "lowest",
-        }
-        
         words = query.split()
         corrected = []
         
@@ -257,24 +270,17 @@ class DataValidator:
             original_word = word
             
             # Check exact match in typo map
-            if word_lower in typo_map:
-                corrected.append(typo_map[word_lower])
+            if word_lower in DataValidator.TYPO_MAP:
+                corrected.append(DataValidator.TYPO_MAP[word_lower])
                 continue
             
             # Check exact match in Malay map
-            if word_lower in malay_map:
-                corrected.append(malay_map[word_lower])
+            if word_lower in DataValidator.MALAY_MAP:
+                corrected.append(DataValidator.MALAY_MAP[word_lower])
                 continue
             
-            # Fuzzy match against typo corrections
-            matched = False
-            for typo, correction in typo_map.items():
-                if DataValidator.fuzzy_match(word_lower, typo, threshold=0.85):
-                    corrected.append(correction)
-                    matched = True
-                    break
-            
-            if not matched:
-                corrected.append(original_word)
+            # Fuzzy match against typo corrections (first in TYPO_MAP order)
+            typo = DataValidator.TYPO_INDEX.first(word_lower, threshold=0.85)
+            corrected.append(DataValidator.TYPO_MAP[typo] if typo else original_word)
         
         return " ".join(corrected)
@@ -23,8 +23,8 @@ This should be the WINNER - balances accuracy, speed, and cost.
 from typing import Optional, List, Set
 import re
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import torch
+from core.embedding_service import get_embedding_service
+from core.keyword_automaton import KeywordAutomaton
 
 
 class HybridRouter:
@@ -53,6 +53,13 @@ class HybridRouter:
         'goal', 'goals', 'objective', 'objectives'
     ]
     
+    # All three classes matched in one pass (compiled once at import)
+    KEYWORD_AUTOMATON = KeywordAutomaton({
+        'hr': HR_KEYWORDS,
+        'sales': SALES_KEYWORDS,
+        'docs': DOC_KEYWORDS,
+    })
+    
     # Semantic domain examples (from routing_semantic.py)
     DOMAIN_EXAMPLES = {
         'hr_kpi': [
@@ -86,8 +93,7 @@ class HybridRouter:
         print("🔄 Initializing HybridRouter...")
         
         # Initialize semantic embedder (for fallback)
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2", device=device)
+        self.embedder = get_embedding_service("all-MiniLM-L6-v2")
         
         # Pre-compute domain embeddings for semantic fallback
         self.domain_embeddings = {}
@@ -122,24 +128,11 @@ class HybridRouter:
         Returns:
             (intent, confidence_score, matched_keywords)
         """
-        text_lower = text.lower()
-        
-        # Count keyword matches per domain
-        hr_matches = set()
-        sales_matches = set()
-        doc_matches = set()
-        
-        for kw in self.HR_KEYWORDS:
-            if self.keyword_match(text, kw):
-                hr_matches.add(kw)
-        
-        for kw in self.SALES_KEYWORDS:
-            if self.keyword_match(text, kw):
-                sales_matches.add(kw)
-        
-        for kw in self.DOC_KEYWORDS:
-            if self.keyword_match(text, kw):
-                doc_matches.add(kw)
+        # Keyword matches per domain (single pass)
+        matches = self.KEYWORD_AUTOMATON.scan(text.lower())
+        hr_matches = set(matches['hr'])
+        sales_matches = set(matches['sales'])
+        doc_matches = set(matches['docs'])
         
         # Priority-based routing (from original detect_intent)
         # Priority 1: HR KPIs
@@ -165,8 +158,7 @@ class HybridRouter:
             (intent, similarity_score)
         """
         # Embed query
-        query_embedding = self.embedder.encode(text, convert_to_numpy=True)
-        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        query_embedding = self.embedder.encode_query(text)  # shared, cached, normalised
         
         # Calculate similarities
         similarities = {}
@@ -19,15 +19,15 @@ Trade-off Analysis:
 """
 
 from typing import Optional, List
-import requests
-import json
 import re
 
+from core.llm_client import llm_client
+
 
 class LLMRouter:
     """LLM-based routing using Ollama mistral for classification"""
     
-    OLLAMA_URL = "http://localhost:11434/api/generate"
+    OLLAMA_HOST = "http://localhost:11434"
     MODEL = "mistral:latest"
     
     CLASSIFICATION_PROMPT = """You are a query classifier for a retail company chatbot.
@@ -46,14 +46,13 @@ CATEGORY:"""
     def __init__(self):
         """Initialize LLM router"""
         print("🔄 Initializing LLMRouter...")
+        # Shared pooled client (keep-alive connection reused by every classification)
+        self.llm = llm_client(self.OLLAMA_HOST)
         
         # Test Ollama connection
         try:
-            response = requests.get("http://localhost:11434/api/tags", timeout=2)
-            if response.status_code == 200:
-                print("✅ LLMRouter ready (Ollama connected)")
-            else:
-                print("⚠️ LLMRouter: Ollama connection issue")
+            self.llm.list_models(timeout=2)
+            print("✅ LLMRouter ready (Ollama connected)")
         except Exception as e:
             print(f"⚠️ LLMRouter: Ollama not accessible ({e})")
     
@@ -81,27 +80,12 @@ CATEGORY:"""
         prompt = self.CLASSIFICATION_PROMPT.format(query=text)
         
         try:
-            # Call Ollama API
-            payload = {
-                "model": self.MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "temperature": 0,  # Deterministic
-                "max_tokens": 10   # Just need one word
-            }
-            
-            response = requests.post(
-                self.OLLAMA_URL,
-                json=payload,
+            # Call Ollama API (deterministic, just need one word)
+            llm_response = self.llm.generate(
+                self.MODEL, prompt,
+                options={"temperature": 0, "num_predict": 10},
                 timeout=30
-            )
-            
-            if response.status_code != 200:
-                print(f"⚠️ LLM routing failed: HTTP {response.status_code}")
-                return 'rag_docs'
-            
-            result = response.json()
-            llm_response = result.get('response', '').strip().lower()
+            ).lower()
             
             # Parse LLM response
             if 'hr_kpi' in llm_response or 'hr' in llm_response:
@@ -119,7 +103,7 @@ CATEGORY:"""
                 else:
                     return 'rag_docs'
         
-        except requests.Timeout:
+        except TimeoutError:
             print("⚠️ LLM routing timeout (30s)")
             return 'rag_docs'
         
@@ -147,27 +131,20 @@ Format: CATEGORY: <category>
 REASON: <one sentence>"""
         
         try:
-            payload = {
-                "model": self.MODEL,
-                "prompt": explain_prompt,
-                "stream": False,
-                "temperature": 0,
-                "max_tokens": 50
-            }
+            llm_response = self.llm.generate(
+                self.MODEL, explain_prompt,
+                options={"temperature": 0, "num_predict": 50},
+                timeout=30
+            )
+            
+            # Parse response
+            category_match = re.search(r'CATEGORY:\s*(\w+)', llm_response, re.IGNORECASE)
+            reason_match = re.search(r'REASON:\s*(.+)', llm_response, re.IGNORECASE)
             
-            response = requests.post(self.OLLAMA_URL, json=payload, timeout=30)
-            if response.status_code == 200:
-                result = response.json()
-                llm_response = result.get('response', '')
-                
-                # Parse response
-                category_match = re.search(r'CATEGORY:\s*(\w+)', llm_response, re.IGNORECASE)
-                reason_match = re.search(r'REASON:\s*(.+)', llm_response, re.IGNORECASE)
-                
-                return {
-                    'category': category_match.group(1) if category_match else 'unknown',
-                    'explanation': reason_match.group(1).strip() if reason_match else llm_response[:100]
-                }
+            return {
+                'category': category_match.group(1) if category_match else 'unknown',
+                'explanation': reason_match.group(1).strip() if reason_match else llm_response[:100]
+            }
         
         except Exception as e:
             return {'category': 'error', 'explanation': str(e)}
@@ -16,8 +16,7 @@ Expected Performance:
 
 from typing import Optional, List
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import torch
+from core.embedding_service import get_embedding_service
 
 
 class SemanticRouter:
@@ -63,9 +62,8 @@ class SemanticRouter:
         """Initialize semantic router with embedder and domain embeddings"""
         print("🔄 Initializing SemanticRouter...")
         
-        # Use same embedder as RAG for consistency
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2", device=device)
+        # Same shared embedder instance as RAG retrieval (one model per process)
+        self.embedder = get_embedding_service("all-MiniLM-L6-v2")
         
         # Pre-compute domain embeddings (average of example embeddings)
         self.domain_embeddings = {}
@@ -100,8 +98,7 @@ class SemanticRouter:
             return 'rag_docs'
         
         # Embed query
-        query_embedding = self.embedder.encode(text, convert_to_numpy=True)
-        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        query_embedding = self.embedder.encode_query(text)  # shared, cached, normalised
         
         # Calculate cosine similarity to each domain
         similarities = {}
@@ -129,8 +126,7 @@ class SemanticRouter:
         Returns:
             Dict mapping domain -> similarity score
         """
-        query_embedding = self.embedder.encode(text, convert_to_numpy=True)
-        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        query_embedding = self.embedder.encode_query(text)  # shared, cached, normalised
         
         similarities = {}
         for domain, domain_emb in self.domain_embeddings.items():
@@ -0,0 +1,117 @@
+"""
+Tests for the ANN index factory
+IVF sizing (_default_nlist / _pq_m) and the vector fingerprint are pure
+functions; the build / persist / reload path needs FAISS and is skipped
+when it is not installed.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core import ann_index
+from core.ann_index import MIN_TRAIN_POINTS, _default_nlist, _pq_m, vectors_fingerprint
+
+
+def unit_vectors(n: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    v = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def test_default_nlist():
+    assert _default_nlist(1) == 1 and _default_nlist(38) == 1
+    # small corpora: capped by >= 39 training points per list
+    assert _default_nlist(1000) == 1000 // 39 == 25
+    # large corpora: ~4 * sqrt(n)
+    assert _default_nlist(1_000_000) == 4000
+    for n in (1, 100, 1000, 5000, 30000, 10**6):
+        nlist = _default_nlist(n)
+        assert 1 <= nlist and (nlist == 1 or n // nlist >= 39), n
+
+
+def test_pq_m_divides_dim():
+    assert _pq_m(384, 48) == 48
+    assert _pq_m(100, 48) == 25
+    assert _pq_m(7, 48) == 7
+    assert _pq_m(13, 4) == 1
+    for dim in (16, 100, 384, 768):
+        for wanted in (8, 48, 64):
+            m = _pq_m(dim, wanted)
+            assert dim % m == 0 and m <= wanted
+
+
+def test_vectors_fingerprint():
+    v = unit_vectors(50)
+    assert vectors_fingerprint(v) == vectors_fingerprint(v.copy())
+    assert vectors_fingerprint(np.asfortranarray(v)) == vectors_fingerprint(v)
+    changed = v.copy()
+    changed[3, 0] += 1e-3
+    assert vectors_fingerprint(changed) != vectors_fingerprint(v)
+    # same bytes, different shape
+    assert vectors_fingerprint(v.reshape(25, 32)) != vectors_fingerprint(v)
+
+
+def test_ivf_persist_reload_and_rebuild():
+    faiss = pytest.importorskip("faiss")
+    cache_dir = tempfile.mkdtemp()
+    builds = []
+    real_build = ann_index.build_index
+
+    def counting_build(vectors, kind="flat", **params):
+        builds.append(len(vectors))
+        return real_build(vectors, kind, **params)
+
+    ann_index.build_index = counting_build
+    try:
+        vectors = unit_vectors(MIN_TRAIN_POINTS['ivf'] + 200)
+        make_index = ann_index.index_factory("ivf", cache_dir, nprobe=8)
+        first = make_index(vectors, "sales")
+        assert isinstance(first, faiss.IndexIVFFlat) and first.ntotal == len(vectors)
+        meta_path = os.path.join(cache_dir, "sales.ivf.json")
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        assert meta['fingerprint'] == vectors_fingerprint(vectors)
+        assert os.path.exists(os.path.join(cache_dir, "sales.ivf.faiss"))
+
+        # unchanged vectors: reloaded, search params restored, no retraining
+        reloaded = make_index(vectors, "sales")
+        assert len(builds) == 1 and reloaded.ntotal == first.ntotal and reloaded.nprobe == 8
+        q = vectors[:5]
+        assert np.array_equal(first.search(q, 3)[1], reloaded.search(q, 3)[1])
+
+        # changed vector set: rebuilt and the sidecar updated
+        changed = unit_vectors(len(vectors), seed=1)
+        make_index(changed, "sales")
+        assert len(builds) == 2
+        with open(meta_path, encoding="utf-8") as f:
+            assert json.load(f)['fingerprint'] == vectors_fingerprint(changed)
+
+        # below MIN_TRAIN_POINTS IVF falls back to exact search
+        small = ann_index.build_index(unit_vectors(MIN_TRAIN_POINTS['ivf'] - 1), "ivf")
+        assert isinstance(small, faiss.IndexFlatIP)
+    finally:
+        ann_index.build_index = real_build
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("ANN INDEX TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except pytest.skip.Exception as e:
+                print(f"  ⏭️ SKIP | {name} | {e}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
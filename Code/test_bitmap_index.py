@@ -0,0 +1,115 @@
+"""
+Tests for the bitmap inverted index
+Packed-bitmap AND / OR / NOT, filter dicts and NumPy aggregations must
+select and sum exactly what the boolean-mask scans over df_sales /
+df_hr did (executors, KPI cube and compute_ground_truth).
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.bitmap_index import Bitmap, BitmapIndex
+from core.columnar_store import SALES_DIMENSIONS, HR_DIMENSIONS
+from core.data_snapshot import prepare_sales_frame, prepare_hr_frame
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+_FRAMES = {}
+
+
+def frames():
+    if not _FRAMES:
+        _FRAMES['sales'] = prepare_sales_frame(pd.read_csv(DATA_DIR / "MY_Retail_Sales_2024H1.csv"))
+        _FRAMES['hr'] = prepare_hr_frame(pd.read_csv(DATA_DIR / "MY_Retail_HR_Employees.csv"))
+    return _FRAMES['sales'], _FRAMES['hr']
+
+
+def sales_index():
+    df, _ = frames()
+    return df, BitmapIndex(df, SALES_DIMENSIONS + ["YearMonth", "DateStr"])
+
+
+def test_bitmap_ops_match_boolean_masks():
+    rng = np.random.default_rng(7)
+    for size in (1, 8, 13, 1001):
+        a, b = rng.random(size) < 0.4, rng.random(size) < 0.6
+        ba, bb = Bitmap.from_mask(a), Bitmap.from_mask(b)
+        assert ((ba & bb).mask() == (a & b)).all()
+        assert ((ba | bb).mask() == (a | b)).all()
+        assert ((ba ^ bb).mask() == (a ^ b)).all()
+        assert ((~ba).mask() == ~a).all() and (~ba).count() == int((~a).sum())
+        assert (ba.positions() == np.flatnonzero(a)).all()
+    assert Bitmap.full(13).count() == 13 and Bitmap.empty(13).count() == 0
+
+
+def test_expressions_match_mask_scans():
+    df, idx = sales_index()
+    state, product, channel = df['State'].iloc[0], df['Product'].iloc[0], df['Channel'].iloc[0]
+    june = pd.Period('2024-06', freq='M')
+    sel = (idx.eq('State', state) | idx.eq('Product', product)) & ~idx.eq('Channel', channel) & idx.eq('YearMonth', '2024-06')
+    expected = ((df['State'] == state) | (df['Product'] == product)) & (df['Channel'] != channel) & (df['YearMonth'] == june)
+    assert (sel.mask() == expected.to_numpy()).all()
+
+    where = idx.where({'state': state, 'month': 202406, 'branch': None, 'department': 'HR'})
+    assert where.count() == int(((df['State'] == state) & (df['YearMonth'] == june)).sum())
+    months = idx.where({'month_range': (pd.Period('2024-02', freq='M'), pd.Period('2024-04', freq='M'))})
+    assert months.count() == int(df['YearMonth'].between(pd.Period('2024-02', freq='M'), pd.Period('2024-04', freq='M')).sum())
+    assert idx.where({'product': [product, 'Nope']}).count() == int((df['Product'] == product).sum())
+    assert idx.eq('State', 'Atlantis').count() == 0 and idx.where({}).count() == len(df)
+
+
+def test_aggregations_match_pandas():
+    df, idx = sales_index()
+    state = df['State'].iloc[0]
+    sel = idx.where({'state': state, 'month': '2024-06'})
+    sub = df[(df['State'] == state) & (df['YearMonth'] == pd.Period('2024-06', freq='M'))]
+    assert abs(idx.sum(sel, 'Total Sale') - sub['Total Sale'].sum()) < 1e-6
+    assert abs(idx.mean(sel, 'Quantity') - sub['Quantity'].mean()) < 1e-9
+    for by in ('Product', 'Branch', 'YearMonth'):
+        for col in ('Total Sale', 'Quantity'):
+            grp = idx.group_sum(sel, by, col)
+            expected = sub.groupby(by, observed=True)[col].sum().sort_values(ascending=False)
+            assert list(grp.index) == list(expected.index), (by, col)
+            assert np.allclose(grp.to_numpy(), expected.to_numpy())
+
+
+def test_ground_truth_filters_match_str_contains():
+    df, idx = sales_index()
+    _, hr = frames()
+    hidx = BitmapIndex(hr, HR_DIMENSIONS)
+    # compute_ground_truth: case-insensitive substring on State / Product, DateStr month prefix
+    for state, month, product in [("selangor", "2024-06", None), ("pen", None, "burger"), (None, "2024-0", None)]:
+        sel, sub = idx.all(), df
+        if state:
+            sel = sel & idx.contains('State', state)
+            sub = sub[sub['State'].str.contains(state, case=False, na=False)]
+        if month:
+            sel = sel & idx.contains('DateStr', month, case=True)
+            sub = sub[sub['DateStr'].str.contains(month, na=False)]
+        if product:
+            sel = sel & idx.contains('Product', product)
+            sub = sub[sub['Product'].str.contains(product, case=False, na=False)]
+        assert sel.count() == len(sub) and abs(idx.sum(sel, 'Total Sale') - sub['Total Sale'].sum()) < 1e-6
+    sel = hidx.contains('Department', 'sales')
+    sub = hr[hr['Department'].str.contains('sales', case=False, na=False)]
+    assert sel.count() == len(sub)
+    assert (sel & hidx.eq('Attrition', 'Yes')).count() == int((sub['Attrition'] == 'Yes').sum())
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("BITMAP INDEX TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
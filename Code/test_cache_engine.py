@@ -0,0 +1,126 @@
+"""
+Tests for the bounded cache engine
+Byte-budget LRU, LFU, background TTL sweep, namespace stats and
+concurrent access. SimpleCache callers (get/set/get_stats/invalidate)
+must keep working unchanged.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.cache_engine import CacheEngine, estimate_size
+
+
+def frame(rows, text="Selangor"):
+    return pd.DataFrame({"State": [text] * rows, "Total Sale": np.arange(rows, dtype=float)})
+
+
+def test_simple_cache_api():
+    cache = CacheEngine(ttl_seconds=3600, sweep_interval=0)
+    assert cache.get("all_data") is None
+    cache.set("all_data", {"rows": 10})
+    assert cache.get("all_data") == {"rows": 10}
+    cache.invalidate("all_data")
+    assert cache.get("all_data") is None
+    stats = cache.get_stats()
+    for key in ("hits", "misses", "total_requests", "hit_rate_percent", "cache_size", "ttl_seconds"):
+        assert key in stats
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['cache_size'] == 0
+
+
+def test_dataframe_size_uses_deep_memory():
+    df = frame(1000)
+    assert estimate_size(df) == df.memory_usage(deep=True).sum()
+    # Object strings count, so deep size is far above the shallow one
+    assert estimate_size(df) > df.memory_usage().sum() * 2
+
+
+def test_lru_byte_budget():
+    size = estimate_size(frame(500))
+    cache = CacheEngine(max_bytes=size * 3, policy="lru", sweep_interval=0)
+    for key in "abc":
+        cache.set(key, frame(500))
+    cache.get("a")  # 'b' is now least recently used
+    cache.set("d", frame(500))
+    assert cache.get("b") is None and cache.get("a") is not None
+    stats = cache.get_stats()
+    assert stats['bytes'] <= size * 3 and stats['evictions'] == 1
+    # An entry larger than the whole budget is refused, not cached
+    assert cache.set("huge", frame(5000)) is False
+    assert cache.get_stats()['rejected'] == 1 and cache.get_stats()['cache_size'] == 3
+    # Overwriting a key with an oversized value drops the old value too
+    assert cache.set("a", frame(5000)) is False
+    assert cache.get("a") is None and cache.get_stats()['cache_size'] == 2
+    assert cache.get_stats()['bytes'] == size * 2
+
+
+def test_lfu_keeps_frequent_entries():
+    cache = CacheEngine(max_entries=2, policy="lfu", sweep_interval=0)
+    cache.set("hot", 1)
+    for _ in range(3):
+        cache.get("hot")
+    cache.set("cold", 2)
+    cache.set("new", 3)
+    assert cache.get("hot") == 1 and cache.get("cold") is None and cache.get("new") == 3
+
+
+def test_background_sweep_and_namespaces():
+    cache = CacheEngine(ttl_seconds=0.1, sweep_interval=0.05)
+    cache.set("state:Selangor", frame(100), namespace="sales_subset")
+    cache.set("q1", "answer", namespace="answers")
+    cache.get("q1", namespace="answers")
+    time.sleep(0.4)
+    cache.close()
+    stats = cache.get_stats()
+    assert stats['cache_size'] == 0 and stats['bytes'] == 0 and stats['expirations'] == 2
+    assert stats['namespaces']['answers']['hits'] == 1
+    assert stats['namespaces']['sales_subset']['expirations'] == 1
+    # Same key in two namespaces are separate entries
+    keep = CacheEngine(sweep_interval=0)
+    keep.set("k", 1, namespace="a")
+    keep.set("k", 2, namespace="b")
+    keep.clear(namespace="a")
+    assert keep.get("k", namespace="a") is None and keep.get("k", namespace="b") == 2
+
+
+def test_concurrent_access_keeps_accounting():
+    size = estimate_size(frame(50))
+    cache = CacheEngine(max_bytes=size * 10, sweep_interval=0)
+
+    def worker(n):
+        for i in range(200):
+            key = f"{n}:{i % 15}"
+            if cache.get(key) is None:
+                cache.set(key, frame(50))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.get_stats()
+    assert stats['total_requests'] == 1600
+    assert stats['bytes'] <= size * 10 and stats['cache_size'] == 10
+    assert stats['bytes'] == sum(ns['bytes'] for ns in stats['namespaces'].values())
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("CACHE ENGINE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,108 @@
+"""
+Quick Unit Test for the SQLite Chat Store
+Threads round-trip in the old JSON layout, saves only append what is
+new (and rewrite a regenerated tail), listing is paged by update time,
+and search finds titles and message content.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.chat_store import ChatStore
+
+CHATS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "chats")
+
+
+def _msg(role, content, ts):
+    return {"role": role, "content": content, "timestamp": f"2026-01-16T10:{ts:02d}:00"}
+
+
+def _store(d):
+    return ChatStore(os.path.join(d, "chats.db"))
+
+
+def test_roundtrip_and_incremental_save():
+    with tempfile.TemporaryDirectory() as d:
+        store = _store(d)
+        messages = [_msg("user", "sales bulan ni?", 1), _msg("assistant", "RM 99,852.83", 2)]
+        traces = [{"timestamp": "t1", "trace_html": "<div>sales_kpi</div>", "route": "sales_kpi"}]
+        store.save_chat("c1", "Sales", messages, traces)
+        created = store.load_chat("c1")["created_at"]
+
+        messages += [_msg("user", "headcount?", 3), _msg("assistant", "820 staff", 4)]
+        store.save_chat("c1", "Sales", messages, traces)
+        chat = store.load_chat("c1")
+        assert chat["messages"] == messages and chat["tool_traces"] == traces
+        assert chat["created_at"] == created and chat["starred"] is False
+
+        # Regenerated answer replaces the stored tail
+        messages[-1] = _msg("assistant", "821 staff", 5)
+        store.save_chat("c1", "Sales", messages, traces)
+        assert store.load_chat("c1")["messages"][-1]["content"] == "821 staff"
+        assert [c["title"] for c in store.search("821")] == ["Sales"]
+        assert store.search("820") == []
+        store.close()
+
+
+def test_listing_star_rename_delete():
+    with tempfile.TemporaryDirectory() as d:
+        store = _store(d)
+        for i in range(5):
+            store.save_chat(f"c{i}", f"Chat {i}", [_msg("user", f"q{i}", i)], [],
+                            updated_at=f"2026-01-1{i}T00:00:00")
+        assert [c["chat_id"] for c in store.list_chats(limit=2)] == ["c4", "c3"]
+        assert [c["chat_id"] for c in store.list_chats(limit=2, offset=2)] == ["c2", "c1"]
+
+        store.toggle_star("c1")
+        store.save_chat("c1", "Chat 1", [_msg("user", "q1", 1)], [])
+        assert store.load_chat("c1")["starred"] is True
+        store.toggle_star("c1")
+        assert store.load_chat("c1")["starred"] is False
+
+        store.rename_chat("c2", "Renamed")
+        assert store.get_title("c2") == "Renamed"
+        store.delete_chat("c3")
+        assert store.load_chat("c3") is None and store.count_chats() == 4
+        assert store.search("q3") == []
+        store.close()
+
+
+def test_search_title_and_content():
+    with tempfile.TemporaryDirectory() as d:
+        store = _store(d)
+        store.save_chat("a", "Annual leave", [_msg("user", "How many days of leave?", 1)], [])
+        store.save_chat("b", "Sales", [_msg("assistant", "Revenue in Selangor grew", 1)], [])
+        assert [c["chat_id"] for c in store.search("annual")] == ["a"]
+        assert [c["chat_id"] for c in store.search("selang")] == ["b"]  # prefix match
+        assert [c["chat_id"] for c in store.search('revenue "selangor')] == ["b"]
+        assert store.search("   ") == []
+        store.close()
+
+
+def test_import_json_dir():
+    with tempfile.TemporaryDirectory() as d:
+        store = _store(d)
+        stats = store.import_json_dir(CHATS_DIR)
+        n = len([f for f in os.listdir(CHATS_DIR) if f.endswith(".json")])
+        assert stats["imported"] == n and not stats["failed"]
+        assert store.import_json_dir(CHATS_DIR)["skipped"] == n
+        store.close()
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("CHAT STORE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
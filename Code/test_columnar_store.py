@@ -0,0 +1,83 @@
+"""
+Quick Unit Test for Dictionary-Encoded Dimension Columns
+Tests that code_mask()/code_contains() on categorical columns select exactly
+the same rows as the original string comparisons on the raw CSV columns.
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.columnar_store import (
+    SALES_DIMENSIONS, HR_DIMENSIONS, encode_dimensions, code_mask, code_contains, dimension_vocabulary,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+SALES_CSV = DATA_DIR / "MY_Retail_Sales_2024H1.csv"
+HR_CSV = DATA_DIR / "MY_Retail_HR_Employees.csv"
+
+
+def _load():
+    raw_sales, raw_hr = pd.read_csv(SALES_CSV), pd.read_csv(HR_CSV)
+    sales, hr = raw_sales.copy(), raw_hr.copy()
+    encode_dimensions(sales, SALES_DIMENSIONS)
+    encode_dimensions(hr, HR_DIMENSIONS)
+    return raw_sales, raw_hr, sales, hr
+
+
+def test_memory_reduced():
+    sales = pd.read_csv(SALES_CSV)
+    report = encode_dimensions(sales, SALES_DIMENSIONS)
+    assert report['after_mb'] < report['before_mb']
+    assert set(report['columns']) == set(SALES_DIMENSIONS)
+
+
+def test_equality_masks_match_string_compare():
+    raw_sales, raw_hr, sales, hr = _load()
+    for col in ['State', 'Branch', 'Product', 'Employee', 'Channel']:
+        for value in raw_sales[col].dropna().unique():
+            assert (code_mask(sales[col], value) == (raw_sales[col] == value).to_numpy()).all(), (col, value)
+    for col in ['Department', 'State', 'AgeGroup']:
+        for value in raw_hr[col].dropna().unique():
+            assert (code_mask(hr[col], value) == (raw_hr[col] == value).to_numpy()).all(), (col, value)
+
+
+def test_unknown_value_matches_nothing():
+    _, _, sales, _ = _load()
+    assert code_mask(sales['State'], 'Atlantis').sum() == 0
+
+
+def test_case_insensitive_and_contains():
+    _, raw_hr, _, hr = _load()
+    expected = (raw_hr['Attrition'].astype(str).str.lower() == 'yes').to_numpy()
+    assert (code_mask(hr['Attrition'], 'yes', ignore_case=True) == expected).all()
+
+    for pattern in ["Kitchen|Chef|Cook", "Manager|Supervisor"]:
+        expected = raw_hr['JobRole'].astype(str).str.contains(pattern, case=False, na=False).to_numpy()
+        assert (code_contains(hr['JobRole'], pattern) == expected).all(), pattern
+
+
+def test_vocabulary_order_matches_legacy_sort():
+    raw_sales, _, sales, _ = _load()
+    branches = sorted(raw_sales['Branch'].dropna().unique().tolist())
+    legacy = sorted(branches, key=len, reverse=True)
+    assert [v for _, v in dimension_vocabulary(sales['Branch'], longest_first=True)] == legacy
+    assert [v for _, v in dimension_vocabulary(sales['State'])] == sorted(raw_sales['State'].dropna().unique())
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("DICTIONARY-ENCODED DIMENSION TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
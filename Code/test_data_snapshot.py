@@ -0,0 +1,119 @@
+"""
+Tests for the typed column snapshot
+load_csv_snapshot must rebuild when the CSV content changes, reuse the
+snapshot when the CSV is only touched (mtime changed, same SHA-256), and
+rebuild when the manifest is corrupt. snapshot_fingerprint (DATA_VERSION
+for the gazetteer, semantic cache and ground-truth store) must follow
+the content, not the mtime.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.data_snapshot import MANIFEST, load_csv_snapshot, snapshot_fingerprint
+
+ROWS = "Date,State,Product,Quantity,Total Sale\n"
+
+
+def write_csv(path: str, body: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(ROWS + body)
+
+
+def counting_prepare(calls: list):
+    def prepare(df: pd.DataFrame) -> pd.DataFrame:
+        calls.append(len(df))
+        df["State"] = df["State"].astype("category")
+        return df
+    return prepare
+
+
+def setup():
+    root = tempfile.mkdtemp()
+    csv_path = os.path.join(root, "Sales.csv")
+    write_csv(csv_path, "2024-06-01,Selangor,Fries,2,11.8\n2024-06-02,Penang,Fries,1,5.9\n")
+    return csv_path, os.path.join(root, "snapshots"), []
+
+
+def bump_mtime(path: str):
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+
+
+def test_unchanged_csv_loads_snapshot():
+    csv_path, snap_dir, calls = setup()
+    first = load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)
+    again = load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)
+    assert calls == [2]
+    assert again["Total Sale"].tolist() == first["Total Sale"].tolist()
+    assert isinstance(again["State"].dtype, pd.CategoricalDtype)
+
+
+def test_edited_csv_rebuilds():
+    csv_path, snap_dir, calls = setup()
+    load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)
+    before = snapshot_fingerprint(csv_path, snap_dir)
+    # same size, different content
+    write_csv(csv_path, "2024-06-01,Selangor,Fries,2,11.8\n2024-06-02,Penang,Fries,1,5.8\n")
+    bump_mtime(csv_path)
+    df = load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)
+    assert calls == [2, 2] and df["Total Sale"].tolist() == [11.8, 5.8]
+    assert snapshot_fingerprint(csv_path, snap_dir) != before
+    # extra row (size changes)
+    write_csv(csv_path, "2024-06-01,Selangor,Fries,2,11.8\n2024-06-02,Penang,Fries,1,5.8\n"
+                        "2024-06-03,Johor,Fries,1,5.9\n")
+    assert len(load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)) == 3
+    assert calls == [2, 2, 3]
+
+
+def test_touched_csv_reuses_snapshot():
+    csv_path, snap_dir, calls = setup()
+    load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)
+    before = snapshot_fingerprint(csv_path, snap_dir)
+    bump_mtime(csv_path)
+    load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)
+    assert calls == [2]
+    assert snapshot_fingerprint(csv_path, snap_dir) == before
+    # the refreshed mtime is recorded, so the next start skips hashing
+    with open(os.path.join(snap_dir, "Sales", MANIFEST), encoding="utf-8") as f:
+        assert json.load(f)["source"]["mtime"] == os.stat(csv_path).st_mtime
+
+
+def test_corrupt_manifest_rebuilds():
+    csv_path, snap_dir, calls = setup()
+    manifest = os.path.join(snap_dir, "Sales", MANIFEST)
+    load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)
+    for broken in ('{"snapshot_version": 1, "col', '[]', '{"snapshot_version": 1}'):
+        with open(manifest, "w", encoding="utf-8") as f:
+            f.write(broken)
+        assert snapshot_fingerprint(csv_path, snap_dir) is None
+        df = load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)
+        assert len(df) == 2
+    assert calls == [2, 2, 2, 2]
+    # a missing column file is caught on load and rebuilt too
+    os.remove(os.path.join(snap_dir, "Sales", "c0.npy"))
+    assert len(load_csv_snapshot(csv_path, counting_prepare(calls), snap_dir)) == 2
+    assert calls == [2, 2, 2, 2, 2]
+    assert snapshot_fingerprint(csv_path, snap_dir) is not None
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("DATA SNAPSHOT TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,91 @@
+"""
+Tests for the shared embedding service
+The LRU query-vector cache must encode each query once, count hits /
+misses / evictions, evict least recently used first and return
+L2-normalised copies. A stub encoder stands in for SentenceTransformer.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.embedding_service import EmbeddingService, get_embedding_service
+
+
+class StubEncoder:
+    """SentenceTransformer.encode stand-in: unnormalised vector from the text."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[len(t), 3.0, 4.0] for t in texts], dtype=np.float64)
+
+
+def service(cache_size: int = 3):
+    svc = EmbeddingService("stub-model", device="cpu", cache_size=cache_size)
+    svc._model = StubEncoder()
+    return svc
+
+
+def test_hits_and_misses():
+    svc = service()
+    svc.encode_query("sales june")
+    svc.encode_query("sales june")
+    svc.encode_query("hr headcount")
+    assert svc.model.encoded == ["sales june", "hr headcount"]
+    stats = svc.get_stats()
+    assert (stats['hits'], stats['misses'], stats['total_requests']) == (1, 2, 3)
+    assert stats['hit_rate_percent'] == 33.33 and stats['cache_size'] == 2
+
+
+def test_lru_eviction_order():
+    svc = service(cache_size=3)
+    for q in ("a", "b", "c"):
+        svc.encode_query(q)
+    svc.encode_query("a")        # a becomes most recent: b is now least recent
+    svc.encode_query("d")        # evicts b
+    assert list(svc._cache) == ["c", "a", "d"]
+    assert svc.get_stats()['evictions'] == 1
+    svc.encode_query("b")        # re-encoded, evicts c
+    assert svc.model.encoded == ["a", "b", "c", "d", "b"]
+    assert list(svc._cache) == ["a", "d", "b"] and svc.get_stats()['evictions'] == 2
+
+
+def test_vectors_normalised_and_copied():
+    svc = service()
+    vec = svc.encode_query("abc")
+    assert vec.dtype == np.float32
+    assert abs(np.linalg.norm(vec) - 1.0) < 1e-6
+    assert np.allclose(vec, np.array([3, 3, 4]) / np.sqrt(34))
+    vec[:] = 0                   # callers may modify the returned vector
+    assert np.allclose(svc.encode_query("abc"), np.array([3, 3, 4]) / np.sqrt(34))
+    batch = svc.encode_queries(["abc", "abcd"])
+    assert batch.shape == (2, 3) and np.allclose(np.linalg.norm(batch, axis=1), 1.0)
+    svc.clear()
+    assert svc.get_stats()['cache_size'] == 0 and svc.get_stats()['hits'] == 2
+
+
+def test_one_service_per_model():
+    a = get_embedding_service("all-MiniLM-L6-v2")
+    assert get_embedding_service("sentence-transformers/all-MiniLM-L6-v2") is a
+    assert get_embedding_service("other-model") is not a
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("EMBEDDING SERVICE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,117 @@
+"""
+Quick Unit Test for the Content-Addressed Embedding Store
+Uses a deterministic hashing encoder in place of all-MiniLM-L6-v2 and counts
+how many chunks each sync() re-encodes.
+"""
+import hashlib
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.embedding_store import EmbeddingStore
+
+DOCS_DIR = Path(__file__).parent.parent / "docs"
+
+
+class CountingEncoder:
+    """Deterministic 8-dim text -> vector function that records batch sizes."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.encoded = 0
+
+    def __call__(self, texts):
+        self.encoded += len(texts)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, t in enumerate(texts):
+            digest = hashlib.sha256(t.encode("utf-8")).digest()
+            out[i] = np.frombuffer(digest[:self.dim], dtype=np.uint8) + 1.0
+        return out
+
+
+def _doc_chunks():
+    """Doc chunks split the same way as the launchers' RAG corpus."""
+    chunks = []
+    for fp in sorted(DOCS_DIR.glob("*.txt")):
+        text = fp.read_text(encoding="utf-8", errors="ignore").strip()
+        parts = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+        chunks += [f"[DOC:{fp.name}] {p}" for p in parts]
+    return chunks
+
+
+def test_second_start_encodes_nothing():
+    store_dir = tempfile.mkdtemp()
+    texts = [f"[SALES] row {i}" for i in range(2000)] + _doc_chunks()
+    enc = CountingEncoder()
+    first = EmbeddingStore(store_dir, "test-model").sync(texts, enc)
+    assert enc.encoded == len(texts)
+
+    enc2 = CountingEncoder()
+    second = EmbeddingStore(store_dir, "test-model").sync(texts, enc2)
+    assert enc2.encoded == 0
+    assert np.array_equal(first, second)
+    assert np.allclose(np.linalg.norm(second, axis=1), 1.0, atol=1e-5)
+
+
+def test_edit_one_doc_paragraph_reencodes_one_chunk():
+    store_dir = tempfile.mkdtemp()
+    texts = [f"[SALES] row {i}" for i in range(2000)] + _doc_chunks()
+    EmbeddingStore(store_dir, "test-model").sync(texts, CountingEncoder())
+
+    edited = list(texts)
+    i = next(i for i, t in enumerate(edited) if t.startswith("[DOC:HR_Policy_MY.txt]"))
+    edited[i] = edited[i] + " (updated)"
+    enc = CountingEncoder()
+    store = EmbeddingStore(store_dir, "test-model")
+    vectors = store.sync(edited, enc)
+
+    assert enc.encoded == 1
+    assert store.last_sync['dropped'] == 1
+    assert len(store) == len(edited)
+    assert np.array_equal(vectors[i], store.sync([edited[i]], enc)[0])
+
+
+def test_deleted_chunks_dropped_and_rows_aligned():
+    store_dir = tempfile.mkdtemp()
+    texts = [f"chunk {i}" for i in range(100)]
+    full = EmbeddingStore(store_dir, "test-model").sync(texts, CountingEncoder())
+
+    kept = texts[::2] + ["chunk 0"]  # duplicate text -> same vector
+    store = EmbeddingStore(store_dir, "test-model")
+    vectors = store.sync(kept, CountingEncoder())
+    assert store.last_sync['dropped'] == 50
+    assert len(store) == 50 and vectors.shape == (51, full.shape[1])
+    assert np.array_equal(vectors[:50], full[::2])
+    assert np.array_equal(vectors[50], full[0])
+
+
+def test_model_change_invalidates_store():
+    store_dir = tempfile.mkdtemp()
+    texts = [f"chunk {i}" for i in range(10)]
+    EmbeddingStore(store_dir, "model-a").sync(texts, CountingEncoder())
+    enc = CountingEncoder(dim=4)
+    vectors = EmbeddingStore(store_dir, "model-b").sync(texts, enc)
+    assert enc.encoded == 10 and vectors.shape == (10, 4)
+    assert os.path.exists(os.path.join(store_dir, "manifest.json"))
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("EMBEDDING STORE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,101 @@
+"""
+Quick Unit Test for the Entity Gazetteer
+Uses the real sales/HR CSVs: single-entity filters must match the old
+`next(x for x in VALUES if x.lower() in s)` scans on the question bank,
+and multi-entity / alias / span behaviour is checked on fixed queries.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.columnar_store import dimension_vocabulary
+from core.data_snapshot import prepare_sales_frame, prepare_hr_frame
+from core.entity_gazetteer import EntityGazetteer
+from benchmark_keyword_routing import load_questions
+
+DATA_DIR = os.path.join(Path(__file__).parent.parent, "data")
+df_sales = prepare_sales_frame(pd.read_csv(os.path.join(DATA_DIR, "MY_Retail_Sales_2024H1.csv")))
+df_hr = prepare_hr_frame(pd.read_csv(os.path.join(DATA_DIR, "MY_Retail_HR_Employees.csv")))
+ENTITIES = EntityGazetteer.from_frames(df_sales, df_hr)
+DATASET_ONLY = EntityGazetteer.from_frames(df_sales, df_hr, aliases=None)
+
+
+def legacy_filters(q):
+    s = (q or "").lower()
+    vocab = [
+        dimension_vocabulary(df_sales["State"]),
+        dimension_vocabulary(df_sales["Branch"], longest_first=True),
+        dimension_vocabulary(df_sales["Product"], longest_first=True),
+        dimension_vocabulary(df_sales["Employee"]),
+        dimension_vocabulary(df_sales["Channel"]),
+    ]
+    return tuple(next((x for low, x in v if low in s), None) for v in vocab)
+
+
+def gazetteer_filters(q, gazetteer=ENTITIES):
+    mentions = gazetteer.find(q)
+    return tuple(gazetteer.first(mentions, t) for t in ("state", "branch", "product", "employee", "channel"))
+
+
+def test_filters_match_legacy_scan():
+    # Dataset values only: aliases ("KL", "pulau pinang") are new matches by design
+    queries = load_questions() + [
+        "sales Johor Bahru Branch 2 delivery 2024-03", "SalesRep_07 dine-in fries",
+        "Kuala Lumpur vs Selangor", "cheese burger takeaway in sabah",
+    ]
+    for q in queries:
+        assert gazetteer_filters(q, DATASET_ONLY) == legacy_filters(q), q
+
+
+def test_multiple_mentions_and_spans():
+    q = "Compare Selangor vs Penang for Beef Burger"
+    mentions = ENTITIES.find(q)
+    assert ENTITIES.values(mentions, "state") == ["Selangor", "Penang"]
+    m = [x for x in mentions if x.type == "product"][0]
+    assert (m.value, q.lower()[m.start:m.end]) == ("Beef Burger", "beef burger")
+    # Branch and the state inside it are both reported (different types)
+    types = {(x.type, x.value) for x in ENTITIES.find("johor bahru branch 1")}
+    assert ("branch", "Johor Bahru Branch 1") in types and ("state", "Johor") in types
+
+
+def test_aliases_and_word_boundaries():
+    state, _, product, _, _ = gazetteer_filters("jualan burger ayam di pulau pinang")
+    assert (state, product) == ("Penang", "Chicken Burger")
+    assert ENTITIES.values(ENTITIES.find("sales in KL"), "state") == ["Kuala Lumpur"]
+    assert ENTITIES.values(ENTITIES.find("klang valley"), "state") == []
+    # "it" inside "with" is not the IT department
+    assert ENTITIES.values(ENTITIES.find("staff with overtime"), "department") == []
+    assert ENTITIES.values(ENTITIES.find("headcount in IT"), "department") == ["IT"]
+
+
+def test_rebuilt_from_new_snapshot():
+    g = EntityGazetteer.from_frames(df_sales, df_hr, version="v1")
+    extra = df_sales.head(1).copy()
+    extra["State"] = "Melaka"
+    fresh = EntityGazetteer.from_frames(pd.concat([df_sales, extra]), df_hr, version="v2")
+    assert g.version == "v1" and "Melaka" not in g.vocab["state"]
+    assert fresh.version == "v2" and "Melaka" in fresh.vocab["state"]
+    assert fresh.values(fresh.find("sales in melaka"), "state") == ["Melaka"]
+    # without a snapshot version the vocabulary hash versions the gazetteer
+    unversioned = EntityGazetteer.from_frames(df_sales, df_hr)
+    assert unversioned.version == EntityGazetteer.from_frames(df_sales, df_hr).version != "v1"
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("ENTITY GAZETTEER TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
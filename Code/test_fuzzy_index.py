@@ -0,0 +1,82 @@
+"""
+Equivalence Test for the Fuzzy Keyword Index
+FuzzyIndex / DataValidator must give exactly the results of the
+original brute-force SequenceMatcher loops (every word x every keyword).
+"""
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from query.fuzzy_index import FuzzyIndex
+from query.router import QueryRouter
+from query.validator import DataValidator
+from benchmark_keyword_routing import load_questions
+from benchmark_fuzzy_index import legacy_contains, legacy_normalize
+
+THRESHOLDS = (0.7, 0.75, 0.85)
+KEYWORD_LISTS = [QueryRouter.HR_KEYWORDS, QueryRouter.SALES_KEYWORDS, QueryRouter.POLICY_KEYWORDS,
+                 list(DataValidator.TYPO_MAP)]
+
+
+def typo_variants(word):
+    """Deletions, transpositions and doubled letters of a keyword."""
+    out = {word[:i] + word[i + 1:] for i in range(len(word))}
+    out |= {word[:i] + word[i + 1] + word[i] + word[i + 2:] for i in range(len(word) - 1)}
+    out |= {word[:i] + word[i] + word[i:] for i in range(len(word))}
+    return out
+
+
+def _words():
+    words = {w for q in load_questions() for w in q.lower().split()}
+    for keywords in KEYWORD_LISTS:
+        for k in keywords:
+            words |= typo_variants(k)
+    return sorted(words)
+
+
+def test_matches_equal_brute_force():
+    words = _words()
+    for keywords in KEYWORD_LISTS:
+        index = FuzzyIndex(keywords)
+        for t in THRESHOLDS:
+            for w in words:
+                expected = [(k, r) for k in keywords
+                            for r in [SequenceMatcher(None, w, k).ratio()] if r >= t]
+                assert index.matches(w, t) == expected, (w, t)
+    assert index.scored < len(words) * len(THRESHOLDS) * len(keywords)
+
+
+def test_validator_equals_legacy():
+    queries = load_questions() + ["salse bulan 2024-06", "headcont by stat", "revnue by brnch",
+                                  "atrition rate", "employes by departmnt", "polisy cuti"]
+    for q in queries:
+        assert DataValidator.normalize_query(q) == legacy_normalize(q), q
+        for keywords in KEYWORD_LISTS:
+            for t in THRESHOLDS:
+                assert DataValidator.contains_fuzzy_keyword(q.lower(), keywords, t) == \
+                    legacy_contains(q.lower(), keywords, t), (q, t)
+
+
+def test_first_and_best():
+    index = FuzzyIndex(["stat", "stats", "state"])
+    assert index.first("statt", 0.8) == "stat"
+    assert index.best("statse", 0.8)[0] == "stats"
+    assert index.best("xyz", 0.7) is None
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("FUZZY INDEX EQUIVALENCE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,110 @@
+"""
+Tests for the materialised ground-truth store
+Dictionary lookups must return what compute_ground_truth computed from
+the data (substring filters over df_sales / df_hr), the saved table must
+be reused only for the same snapshot version, and the seed figures in
+ground_truth/CALCULATED_GROUND_TRUTH.json must agree with the table.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.bitmap_index import BitmapIndex
+from core.columnar_store import SALES_DIMENSIONS, HR_DIMENSIONS
+from core.data_snapshot import prepare_sales_frame, prepare_hr_frame
+from core.ground_truth_store import GroundTruthStore
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+SEED = Path(__file__).parent.parent / "ground_truth" / "CALCULATED_GROUND_TRUTH.json"
+_INDEXES = {}
+
+
+def indexes():
+    if not _INDEXES:
+        df_sales = prepare_sales_frame(pd.read_csv(DATA_DIR / "MY_Retail_Sales_2024H1.csv"))
+        df_hr = prepare_hr_frame(pd.read_csv(DATA_DIR / "MY_Retail_HR_Employees.csv"))
+        _INDEXES['frames'] = (df_sales, df_hr)
+        _INDEXES['sales'] = BitmapIndex(df_sales, SALES_DIMENSIONS + ["YearMonth", "DateStr"])
+        _INDEXES['hr'] = BitmapIndex(df_hr, HR_DIMENSIONS)
+    return _INDEXES['sales'], _INDEXES['hr']
+
+
+def close(a: dict, b: dict) -> bool:
+    return a.keys() == b.keys() and all(abs(a[k] - b[k]) <= 1e-6 * max(1.0, abs(b[k])) for k in a)
+
+
+def pandas_sales_truth(context: dict) -> dict:
+    """compute_ground_truth as it was: str.contains filters on a frame copy."""
+    df = _INDEXES['frames'][0].copy()
+    if context.get('state'):
+        df = df[df['State'].str.contains(context['state'], case=False, na=False)]
+    if context.get('month'):
+        df = df[df['DateStr'].str.contains(context['month'], na=False)]
+    if context.get('product'):
+        df = df[df['Product'].str.contains(context['product'], case=False, na=False)]
+    truth = {"total_sales": float(df['Total Sale'].sum()), "total_quantity": float(df['Quantity'].sum())}
+    if len(df) > 0:
+        truth["avg_price"] = truth["total_sales"] / truth["total_quantity"]
+    return truth
+
+
+def test_lookups_match_pandas_ground_truth():
+    store = GroundTruthStore(*indexes())
+    contexts = [{}, {'state': 'selangor'}, {'state': 'Penang', 'month': '2024-06'},
+                {'month': '2024-03', 'product': 'fries', 'state': 'Johor'}, {'product': 'burger'},
+                {'state': 'Perak'}, {'month': '2024-0'}]
+    for ctx in contexts:
+        assert close(store.lookup('sales_kpi', ctx), pandas_sales_truth(ctx)), ctx
+    df_hr = _INDEXES['frames'][1]
+    for ctx in [{}, {'department': 'sales'}, {'state': 'johor', 'department': 'HR'}]:
+        sub = df_hr
+        for key, col in (('state', 'State'), ('department', 'Department')):
+            if ctx.get(key):
+                sub = sub[sub[col].str.contains(ctx[key], case=False, na=False)]
+        expected = {"total_employees": len(sub), "avg_income": float(sub['MonthlyIncome'].mean()),
+                    "attrition_rate": (sub['Attrition'] == 'Yes').sum() / len(sub) * 100}
+        assert close(store.lookup('hr_kpi', ctx), expected), ctx
+    assert store.lookup('rag_docs', {}) == {}
+    # single-valued contexts are table hits; "burger" / "Perak" / "2024-0" are computed once
+    store.lookup('sales_kpi', {'product': 'burger'})
+    assert store.get_stats()['computed'] == 3
+
+
+def test_saved_table_reused_per_snapshot_version():
+    sales, hr = indexes()
+    path = os.path.join(tempfile.mkdtemp(), "ground_truth.json")
+    built = GroundTruthStore.load_or_build(sales, hr, path, "sha-a")
+    assert not built.loaded and os.path.exists(path)
+    loaded = GroundTruthStore.load_or_build(sales, hr, path, "sha-a")
+    assert loaded.loaded and loaded.table == built.table
+    changed = GroundTruthStore.load_or_build(sales, hr, path, "sha-b")
+    assert not changed.loaded and changed.version == "sha-b"
+    assert GroundTruthStore.load_or_build(sales, hr, path, "sha-b").loaded
+
+
+def test_seed_figures_match_table():
+    store = GroundTruthStore(*indexes())
+    assert store.check_seed(str(SEED)) > 20
+    assert store.seed_mismatches == []
+    assert store.check_seed(str(SEED) + ".missing") == 0
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("GROUND TRUTH STORE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,80 @@
+"""
+Quick Unit Test for the Interaction Log
+Records written through the background writer come back from the reader
+in order, segments rotate by size and are gzip-compressed, and close()
+flushes whatever is still queued.
+"""
+import csv
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.interaction_log import InteractionLog, iter_frames, iter_records, segment_paths
+
+
+def _record(i: int) -> dict:
+    return {"timestamp": f"2024-06-{1 + i % 28:02d} 10:00:00", "model": "qwen", "route": "sales_kpi",
+            "latency_ms": i, "question": f"sales bulan ni {i}", "answer": "✅ RM 99,852.83 " + "x" * 200}
+
+
+def test_roundtrip_and_flush():
+    with tempfile.TemporaryDirectory() as d:
+        log = InteractionLog(d, flush_interval=0.05)
+        for i in range(50):
+            assert log.log(_record(i))
+        assert log.flush()
+        assert [r["latency_ms"] for r in iter_records(d)] == list(range(50))
+        log.close()
+        assert not log.log(_record(99))
+        assert log.get_stats()["written"] == 50
+
+
+def test_size_rotation_compresses_segments():
+    with tempfile.TemporaryDirectory() as d:
+        log = InteractionLog(d, max_bytes=2000, batch_size=4, flush_interval=0.05)
+        for i in range(40):
+            log.log(_record(i))
+        log.close()
+        paths = segment_paths(d)
+        assert len(paths) > 1 and all(p.endswith(".jsonl.gz") for p in paths)
+        assert [r["latency_ms"] for r in iter_records(d)] == list(range(40))
+
+
+def test_reader_filters_and_frames():
+    with tempfile.TemporaryDirectory() as d:
+        legacy = os.path.join(d, "chat_logs.csv")
+        with open(legacy, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["timestamp", "model", "route", "latency_ms", "question", "answer"])
+            w.writerow(["2024-05-31 09:00:00", "N/A", "sales_kpi", "6", "old", "RM 1"])
+        log = InteractionLog(d)
+        for i in range(30):
+            log.log(_record(i))
+        log.close()
+
+        june_3_to_5 = list(iter_records(d, since="2024-06-03", until="2024-06-05", fields=["latency_ms"]))
+        assert june_3_to_5 == [{"latency_ms": i} for i in (2, 3, 4)]
+        assert next(iter_records(d, legacy_csv=legacy))["question"] == "old"
+
+        frames = list(iter_frames(d, chunk_rows=8, fields=["route", "latency_ms"]))
+        assert [len(f) for f in frames] == [8, 8, 8, 6]
+        assert list(frames[0].columns) == ["route", "latency_ms"]
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("INTERACTION LOG TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
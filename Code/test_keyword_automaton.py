@@ -0,0 +1,78 @@
+"""
+Quick Unit Test for the Keyword Automaton
+Checks KeywordAutomaton.scan() against the original per-keyword regex
+loop (keyword_match) on word-boundary edge cases.
+"""
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.keyword_automaton import KeywordAutomaton, compile_patterns, match_keywords
+
+
+def legacy_keyword_match(keywords, text):
+    matched = []
+    for k in keywords:
+        if ' ' in k:
+            if k in text:
+                matched.append(k)
+        elif re.search(rf'\b{re.escape(k)}\b', text):
+            matched.append(k)
+    return (len(matched) > 0, matched)
+
+
+HR = ["hr", "staff", "kitchen staff", "kitchen", "age", "age group", "more than", "over", "5+ years"]
+SALES = ["sales", "top", "vs", "more", "mom", "price", "unit price"]
+DOCS = ["policy", "leave", "annual leave", "hr"]  # "hr" repeated across classes
+
+TEXTS = [
+    "average age of kitchen staff",        # "age" must not hit "average"
+    "percentage of sales by state",        # ... nor "percentage"
+    "staff with more than 5+ years",       # phrase containing "+"
+    "top 5 products vs last month",
+    "hr.", "(hr)", "hr_policy", "hr2024", "staff?", "age-group split",
+    "momentum of unit prices",             # "mom" inside "momentum" is not a word
+    "annual leave policy for hr",
+    "over over overtime",                  # repeated keyword reported once
+    "", "   ", "sales",
+]
+
+
+def test_scan_matches_legacy_loop():
+    automaton = KeywordAutomaton({'hr': HR, 'sales': SALES, 'docs': DOCS})
+    for text in TEXTS:
+        hits = automaton.scan(text)
+        for name, kws in automaton.classes.items():
+            assert hits[name] == legacy_keyword_match(kws, text)[1], (text, name, hits[name])
+
+
+def test_duplicates_in_concatenated_lists():
+    # keyword_match(HR_POLICY_KEYWORDS + DOC_KEYWORDS, s) reports shared keywords twice
+    combined = DOCS + ["policy", "sop"]
+    assert match_keywords(combined, "leave policy") == legacy_keyword_match(combined, "leave policy")
+    assert match_keywords(combined, "leave policy")[1] == ["policy", "leave", "policy"]
+
+
+def test_compiled_patterns_equivalent():
+    patterns = [r'\b(why|how to)\b', r'^\s*staff\s*$', r'\b(by category|by type)\b']
+    regex = compile_patterns(patterns)
+    for text in ["why is it low", "staff", " staff ", "staff count", "sales by type", "whyever"]:
+        assert bool(regex.search(text)) == any(re.search(p, text) for p in patterns), text
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("KEYWORD AUTOMATON TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
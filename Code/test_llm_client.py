@@ -0,0 +1,146 @@
+"""
+Tests for the pooled LLM client
+Sync bridges over the async client: streaming, heartbeats, per-call
+timeouts, cancellation and closing a stream early. The Ollama
+AsyncClient is replaced by a scripted in-process one, so no server is
+needed.
+"""
+import asyncio
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.llm_client import LLMClient
+from core.request_scheduler import CancelToken
+
+
+class ScriptedOllama:
+    """AsyncClient stand-in: streams TOKENS with the given delays."""
+
+    TOKENS = ["Revenue ", "rose ", "12%."]
+
+    def __init__(self, first_delay=0.0, token_delay=0.01):
+        self.first_delay = first_delay
+        self.token_delay = token_delay
+        self.open_streams = 0
+        self.generate_calls = []
+
+    async def chat(self, model, messages, options=None, keep_alive=None, stream=False):
+        if not stream:
+            return {"message": {"content": "".join(self.TOKENS) + "\n"}}
+
+        async def chunks():
+            self.open_streams += 1
+            try:
+                await asyncio.sleep(self.first_delay)
+                for token in self.TOKENS:
+                    await asyncio.sleep(self.token_delay)
+                    yield {"message": {"content": token}}
+                yield {"message": {"content": ""}, "done": True}
+            finally:
+                self.open_streams -= 1
+        return chunks()
+
+    async def generate(self, model, prompt, options=None, keep_alive=None):
+        self.generate_calls.append((model, prompt, keep_alive))
+        return {"response": " sales_kpi "}
+
+
+def make_client(**script):
+    fake = ScriptedOllama(**script)
+    client = LLMClient()
+    client._client = lambda: fake
+    return client, fake
+
+
+def test_stream_and_calls():
+    client, fake = make_client()
+    assert "".join(client.stream_chat("m", [])) == "Revenue rose 12%."
+    assert client.chat("m", []) == "Revenue rose 12%."
+    assert client.generate("m", "classify") == "sales_kpi"
+    # Preload is an empty prompt: loads the model without generating
+    assert client.preload("m", keep_alive="5m") is True
+    assert fake.generate_calls[-1] == ("m", "", "5m")
+    stats = client.get_stats()
+    assert stats['streams'] == 1 and stats['calls'] == 2 and stats['preloads'] == 1
+    # All calls share one loop thread (no thread per request)
+    runner = client._runner
+    list(client.stream_chat("m", []))
+    assert client._runner is runner
+
+
+def test_heartbeat_while_waiting_for_first_token():
+    client, _ = make_client(first_delay=0.35)
+    items = list(client.stream_chat("m", [], heartbeat=0.1))
+    assert items[0] is None and items.count(None) >= 2
+    assert "".join(t for t in items if t) == "Revenue rose 12%."
+
+
+def test_per_call_timeout_leaves_socket_default_alone():
+    client, _ = make_client(first_delay=1.0)
+    before = socket.getdefaulttimeout()
+    start = time.perf_counter()
+    try:
+        list(client.stream_chat("m", [], first_token_timeout=0.1))
+        assert False, "expected TimeoutError"
+    except TimeoutError as e:
+        assert "first token" in str(e)
+    assert time.perf_counter() - start < 0.8
+    assert socket.getdefaulttimeout() == before
+    assert client.get_stats()['timeouts'] == 1
+
+
+def test_close_and_cancel_stop_the_stream():
+    client, fake = make_client(token_delay=0.05)
+    stream = client.stream_chat("m", [])
+    assert next(stream) == "Revenue "
+    stream.close()  # GeneratorExit from the UI
+    time.sleep(0.2)
+    assert fake.open_streams == 0
+
+    token = CancelToken()
+    received = []
+    for t in client.stream_chat("m", [], cancel=token):
+        received.append(t)
+        token.set()
+    assert received == ["Revenue "]
+    time.sleep(0.2)
+    assert fake.open_streams == 0
+
+
+def test_concurrent_streams():
+    client, _ = make_client(token_delay=0.05)
+    results = []
+
+    def run():
+        results.append("".join(client.stream_chat("m", [])))
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Interleaved on one loop: six streams take about as long as one
+    assert results == ["Revenue rose 12%."] * 6
+    assert time.perf_counter() - start < 0.6
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("LLM CLIENT TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
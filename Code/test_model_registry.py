@@ -0,0 +1,99 @@
+"""
+Tests for the process-wide model registry
+Concurrent MODELS.get(name, loader) calls must run the loader exactly
+once and hand every caller the same object; get_stats must report load
+time, weight size and request counts.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.model_registry import ModelRegistry, param_mb
+
+
+class FakeParam:
+    def __init__(self, n: int):
+        self.n = n
+
+    def numel(self):
+        return self.n
+
+    def element_size(self):
+        return 4
+
+
+class FakeModel:
+    """torch-like handle: 2 parameter tensors, 1 MB of float32 weights."""
+
+    def parameters(self):
+        return [FakeParam(131072), FakeParam(131072)]
+
+
+def counting_loader(calls: list, delay: float = 0.05):
+    def load():
+        calls.append(threading.get_ident())
+        time.sleep(delay)  # keep the load window open for the other threads
+        return FakeModel()
+    return load
+
+
+def test_concurrent_get_loads_once():
+    registry = ModelRegistry()
+    calls, results = [], []
+    threads = 16
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        results.append(registry.get("embedder:test", counting_loader(calls)))
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    assert len(calls) == 1
+    assert len(results) == threads and all(r is results[0] for r in results)
+    assert registry.get_stats()["embedder:test"]["requests"] == threads
+
+
+def test_stats():
+    registry = ModelRegistry()
+    calls = []
+    registry.register("ocr:test", counting_loader(calls, delay=0))
+    stats = registry.get_stats()["ocr:test"]
+    assert stats == {'loaded': False, 'load_ms': None, 'rss_delta_mb': None, 'weights_mb': None, 'requests': 0}
+
+    model = registry.get("ocr:test")
+    # a second loader under the same name is ignored (first registration wins)
+    assert registry.get("ocr:test", counting_loader(calls, delay=0)) is model
+    stats = registry.get_stats()["ocr:test"]
+    assert len(calls) == 1 and stats['loaded'] and stats['requests'] == 2
+    assert stats['load_ms'] is not None and stats['load_ms'] >= 0
+    assert stats['weights_mb'] == 1.0
+    assert param_mb(object()) is None
+
+    try:
+        registry.get("missing")
+        assert False, "unregistered name should raise"
+    except KeyError:
+        pass
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("MODEL REGISTRY TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,122 @@
+"""
+Tests for the QueryIntent plan engine
+Plans must give the same numbers as the old executors (one filtered copy
+per total / compared value / part-whole side), normalise equal questions
+to equal plans, and serve repeats from the plan cache.
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.bitmap_index import BitmapIndex
+from core.cache_engine import CacheEngine
+from core.columnar_store import SALES_DIMENSIONS
+from core.data_snapshot import prepare_sales_frame
+from core.query_plan import (QueryEngine, breakdown_plan, comparison_plan,
+                             normalise, percentage_plan, total_plan)
+from benchmark_row_filter import legacy_apply_filters
+
+SALES_CSV = Path(__file__).parent.parent / "data" / "MY_Retail_Sales_2024H1.csv"
+_ENGINE = {}
+
+
+def engine():
+    if not _ENGINE:
+        df = prepare_sales_frame(pd.read_csv(SALES_CSV))
+        _ENGINE['df'] = df
+        _ENGINE['index'] = BitmapIndex(df, SALES_DIMENSIONS + ["YearMonth", "DateStr"])
+    return _ENGINE['df'], QueryEngine(_ENGINE['index'], cache=CacheEngine(sweep_interval=0))
+
+
+def legacy_total(df, filters, col='Total Sale'):
+    sub = legacy_apply_filters(df, filters)
+    return float(sub[col].sum()), len(sub)
+
+
+def close(a, b):
+    return abs(a[0] - b[0]) < 1e-6 and a[1] == b[1]
+
+
+def test_normalised_plans_are_equal():
+    june = pd.Period('2024-06', freq='M')
+    a = total_plan({'month': '2024-06', 'state': 'Selangor', 'product': None}, 'Total Sale')
+    b = total_plan({'state': 'Selangor', 'month': june}, 'Total Sale')
+    c = total_plan({'state': 'Selangor', 'month': 202406}, 'Total Sale')
+    assert a == b == c and hash(a) == hash(c)
+    assert normalise({'product': ['B', 'A']}) == (('product', ('A', 'B')),)
+
+
+def test_total_and_percentage_match_legacy():
+    df, eng = engine()
+    state, product = df['State'].iloc[0], df['Product'].iloc[0]
+    for filters in [{'month': '2024-06'}, {'state': state, 'month': '2024-03'},
+                    {'state': state, 'product': product}, {}]:
+        res = eng.run(total_plan(filters, 'Quantity'))
+        assert close((res['total'], res['rows']), legacy_total(df, filters, 'Quantity')), filters
+
+    part, whole = {'state': state, 'month': '2024-06'}, {'month': '2024-06'}
+    plan = percentage_plan(part, whole, 'Total Sale')
+    # Shared month filter is the base; only state is left for the numerator
+    assert plan.filter == (('month', pd.Period('2024-06', freq='M')),) and plan.part == (('state', state),)
+    res = eng.run(plan)
+    assert close(res['part'], legacy_total(df, part)) and close(res['whole'], legacy_total(df, whole))
+    # Disjoint part / whole still works (each side filtered over the common base)
+    res = eng.run(percentage_plan({'product': product}, {'state': state}, 'Total Sale'))
+    assert close(res['part'], legacy_total(df, {'product': product}))
+    assert close(res['whole'], legacy_total(df, {'state': state}))
+
+
+def test_comparison_is_one_grouped_pass():
+    df, eng = engine()
+    states = df['State'].cat.categories[:2].tolist()
+    res = eng.run(comparison_plan({'month': '2024-06', 'state': 'ignored'}, 'state', states, 'Total Sale'))
+    for state, (_, value, rows) in zip(states, res['picked']):
+        assert close((value, rows), legacy_total(df, {'month': '2024-06', 'state': state}))
+    res = eng.run(comparison_plan({'month': '2024-01'}, 'time', ['2024-06', '2024-05'], 'Total Sale'))
+    for month, (_, value, rows) in zip(['2024-06', '2024-05'], res['picked']):
+        assert close((value, rows), legacy_total(df, {'month': month}))
+    missing = eng.run(comparison_plan({}, 'product', ['Nope'], 'Total Sale'))['picked']
+    assert missing == [('Nope', 0.0, 0)]
+
+
+def test_breakdown_and_plan_cache():
+    df, eng = engine()
+    state = df['State'].iloc[0]
+    plan = breakdown_plan({'state': state, 'month': '2024-06'}, 'Product', 'Total Sale', 3)
+    res = eng.run(plan)
+    sub = legacy_apply_filters(df, {'state': state, 'month': '2024-06'})
+    expected = sub.groupby('Product', observed=True)['Total Sale'].sum().sort_values(ascending=False)
+    assert list(res['groups'].index) == list(expected.index) and res['rows'] == len(sub)
+    assert list(res['top'].index) == list(expected.index[:3])
+    executed = eng.executed
+    again = eng.run(breakdown_plan({'month': pd.Period('2024-06', freq='M'), 'state': state}, 'Product', 'Total Sale', 3))
+    assert again is res and eng.executed == executed
+    assert eng.get_stats()['cached_plans']['hits'] == 1
+
+
+def test_absent_value_selects_no_rows():
+    # -1 is both "not in the data" and the NaN code: an unknown value must not match NaN rows
+    df = pd.DataFrame({'State': ['A', 'A', None, 'B'], 'Total Sale': [1.0, 2.0, 4.0, 8.0]})
+    eng = QueryEngine(BitmapIndex(df, ['State']))
+    res = eng.run(percentage_plan({'state': 'Nope'}, {}, 'Total Sale'))
+    assert res['part'] == (0.0, 0) and res['whole'] == (15.0, 4)
+    assert eng.run(percentage_plan({'state': 'A'}, {}, 'Total Sale'))['part'] == (3.0, 2)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("QUERY PLAN TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
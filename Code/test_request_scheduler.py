@@ -0,0 +1,159 @@
+"""
+Tests for the Request Scheduler
+Per-session cancellation, KPI/LLM pool isolation, FIFO order and the
+queue info recorded for ToolTrace.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.request_scheduler import RequestScheduler, CancelToken, RequestCancelled
+
+
+class _Trace:
+    queue = None
+
+
+def test_stop_only_cancels_own_session():
+    sched = RequestScheduler()
+    a = sched.start_request("session-a")
+    b = sched.start_request("session-b")
+    assert sched.cancel("session-a")
+    assert a.is_set() and not b.is_set()
+    assert sched.token("session-b") is b
+    # A new request gets a fresh token; the stopped one stays stopped
+    a2 = sched.start_request("session-a")
+    assert not a2.is_set() and a.is_set()
+    assert sched.cancel("unknown") is False
+
+
+def test_finished_requests_release_their_tokens():
+    sched = RequestScheduler()
+    first = sched.start_request("s1")
+    second = sched.start_request("s1")
+    sched.finish_request("s1", first)     # superseded: the newer token stays
+    assert sched.token("s1") is second
+    sched.finish_request("s1", second)
+    assert sched._tokens == {} and sched.cancel("s1") is False
+    for i in range(100):
+        sched.finish_request(f"user-{i}", sched.start_request(f"user-{i}"))
+    assert sched._tokens == {}
+
+
+def test_kpi_not_blocked_by_busy_llm_pool():
+    sched = RequestScheduler({'kpi': 2, 'llm': 1})
+    release = threading.Event()
+
+    def llm_job():
+        with sched.slot("llm"):
+            release.wait(5)
+
+    worker = threading.Thread(target=llm_job)
+    worker.start()
+    while sched.get_stats()['llm']['active'] == 0:
+        time.sleep(0.01)
+
+    # A second LLM request queues behind the first...
+    queued = sched.enqueue("llm")
+    assert queued.depth == 1
+    assert sched.acquire(queued, timeout=0.05) is False
+    assert sched.position(queued) == 1
+
+    # ...while a KPI request runs immediately and records its queue info
+    trace = _Trace()
+    with sched.slot("kpi", trace=trace):
+        pass
+    assert trace.queue['pool'] == 'kpi' and trace.queue['queue_depth'] == 0
+    assert trace.queue['wait_ms'] < 50
+
+    release.set()
+    worker.join()
+    assert sched.acquire(queued, timeout=1.0) is True
+    sched.release(queued)
+    sched.release(queued)  # idempotent
+    stats = sched.get_stats()
+    assert stats['llm']['active'] == 0 and stats['llm']['completed'] == 2
+    assert stats['kpi']['completed'] == 1
+
+
+def test_cancel_while_queued():
+    sched = RequestScheduler({'llm': 1}, poll_interval=0.01)
+    holder = sched.enqueue("llm")
+    assert sched.acquire(holder)
+
+    token = sched.start_request("s1")
+    errors = []
+
+    def waiter():
+        try:
+            with sched.slot("llm", token):
+                pass
+        except RequestCancelled as e:
+            errors.append(e)
+
+    t = threading.Thread(target=waiter)
+    t.start()
+    time.sleep(0.05)
+    sched.cancel("s1")
+    t.join(1.0)
+    assert not t.is_alive() and len(errors) == 1
+    assert sched.get_stats()['llm']['waiting'] == 0
+    assert sched.get_stats()['llm']['cancelled'] == 1
+    sched.release(holder)
+
+
+def test_fifo_order():
+    sched = RequestScheduler({'llm': 1}, poll_interval=0.01)
+    first = sched.enqueue("llm")
+    assert sched.acquire(first)
+    order = []
+    tickets = [sched.enqueue("llm") for _ in range(4)]
+
+    def run(ticket, i):
+        sched.acquire(ticket)
+        order.append(i)
+        sched.release(ticket)
+
+    # Start them in reverse: the queue, not thread start order, decides
+    threads = [threading.Thread(target=run, args=(t, i)) for i, t in enumerate(tickets)][::-1]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    sched.release(first)
+    for t in threads:
+        t.join(2.0)
+    assert order == [0, 1, 2, 3]
+    assert [t.depth for t in tickets] == [1, 2, 3, 4]
+
+
+def test_cancel_token_event_api():
+    token = CancelToken()
+    assert not token.is_set() and token.wait(0.01) is False
+    token.check()
+    token.set("timeout")
+    token.cancel("stop")
+    assert token.is_set() and token.reason == "timeout"
+    try:
+        token.check()
+        assert False, "check() should raise once set"
+    except RequestCancelled as e:
+        assert str(e) == "timeout"
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("REQUEST SCHEDULER TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,92 @@
+"""
+Tests for cached row positions over the sales frame
+RowFilter views / totals must select exactly the rows the old
+apply_filters_to_dataframe (df.copy() + chained masks) did, for single,
+compound and month filters, while caching bitmaps instead of frames.
+"""
+import sys
+from itertools import product
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.cache_engine import CacheEngine
+from core.data_snapshot import prepare_sales_frame
+from core.row_filter import RowFilter, filter_key
+from benchmark_row_filter import legacy_apply_filters
+
+SALES_CSV = Path(__file__).parent.parent / "data" / "MY_Retail_Sales_2024H1.csv"
+_SALES = None
+
+
+def sales():
+    global _SALES
+    if _SALES is None:
+        _SALES = prepare_sales_frame(pd.read_csv(SALES_CSV))
+    return _SALES
+
+
+def test_compound_filters_match_legacy():
+    df = sales()
+    rows = RowFilter(df, cache=CacheEngine(sweep_interval=0))
+    states = df['State'].cat.categories[:3].tolist()
+    products = df['Product'].cat.categories[:3].tolist()
+    months = ['2024-01', '2024-06', None]
+    for state, prod, month in product(states + [None], products + [None], months):
+        filters = {'state': state, 'product': prod, 'month': month}
+        expected = legacy_apply_filters(df, filters)
+        view = rows.view(filters)
+        assert view.index.equals(expected.index), filters
+        total, n = rows.total(filters, 'Total Sale')
+        assert n == len(expected) and abs(total - expected['Total Sale'].sum()) < 1e-6, filters
+
+
+def test_month_forms_and_ranges():
+    df = sales()
+    rows = RowFilter(df)
+    june = rows.positions({'month': '2024-06'})
+    assert (rows.positions({'month': pd.Period('2024-06', freq='M')}) == june).all()
+    assert (rows.positions({'month': 202406}) == june).all()
+    start, end = pd.Period('2024-02', freq='M'), pd.Period('2024-04', freq='M')
+    expected = df[(df['YearMonth'] >= start) & (df['YearMonth'] <= end)]
+    assert rows.count({'month_range': (start, end)}) == len(expected)
+    # Unknown keys and empty values are ignored, as before
+    assert rows.count({'department': 'HR', 'state': None}) == len(df)
+
+
+def test_views_do_not_copy_or_touch_base():
+    df = sales()
+    cache = CacheEngine(sweep_interval=0)
+    rows = RowFilter(df, cache=cache, namespace="sales")
+    state = df['State'].iloc[0]
+    view = rows.view({'state': state}, ['State', 'Total Sale'])
+    assert list(view.columns) == ['State', 'Total Sale']
+    view['Total Sale'] = 0  # caller mutations never reach the base frame
+    assert df['Total Sale'].sum() > 0
+    rows.view({'state': state, 'month': '2024-06'})
+    stats = cache.get_stats()['namespaces']
+    # One bitmap per (dimension, value); compound results are positions only
+    assert stats['sales_bitmap']['entries'] == 2 and stats['sales_rows']['entries'] == 2
+    assert stats['sales_rows']['hits'] == 0
+    rows.positions({'month': '2024-06', 'state': state})  # key is order-free
+    assert cache.get_stats()['namespaces']['sales_rows']['hits'] == 1
+    assert stats['sales_rows']['bytes'] < df.memory_usage(deep=True).sum() / 50
+    assert filter_key({}) == "all_data"
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("ROW FILTER TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
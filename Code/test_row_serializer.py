@@ -0,0 +1,63 @@
+"""
+Quick Unit Test for the Column-wise RAG Row Serializer
+Tests that sales_row_texts()/hr_row_texts() return exactly the strings the
+original iterrows f-string loop produced (raw CSV, encoded frames, NaNs and
+missing columns).
+"""
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.data_snapshot import prepare_sales_frame, prepare_hr_frame
+from core.row_serializer import sales_row_texts, hr_row_texts
+from benchmark_row_serializer import SALES_CSV, HR_CSV, legacy_sales_texts, legacy_hr_texts
+
+
+def _prepared():
+    with redirect_stdout(StringIO()):
+        return prepare_sales_frame(pd.read_csv(SALES_CSV)), prepare_hr_frame(pd.read_csv(HR_CSV))
+
+
+def test_prepared_frames_identical():
+    sales, hr = _prepared()
+    assert sales_row_texts(sales) == legacy_sales_texts(sales)
+    assert hr_row_texts(hr) == legacy_hr_texts(hr)
+
+
+def test_raw_csv_frames_identical():
+    sales, hr = pd.read_csv(SALES_CSV).head(500), pd.read_csv(HR_CSV)
+    assert hr_row_texts(hr) == legacy_hr_texts(hr)
+    # Raw sales has no DateStr column -> "Date=" like r.get('DateStr', '')
+    assert sales_row_texts(sales) == legacy_sales_texts(sales)
+
+
+def test_missing_values_identical():
+    sales, hr = _prepared()
+    sales, hr = sales.head(50).copy(), hr.head(50).copy()
+    sales.loc[sales.index[::7], 'Total Sale'] = np.nan
+    sales.loc[sales.index[::5], 'Channel'] = np.nan
+    hr.loc[hr.index[::3], 'Age'] = np.nan
+    assert sales_row_texts(sales) == legacy_sales_texts(sales)
+    assert hr_row_texts(hr) == legacy_hr_texts(hr)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("RAG ROW SERIALIZER TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
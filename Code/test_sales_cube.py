@@ -0,0 +1,122 @@
+"""
+Tests for the sales KPI cube
+slice / total / group_sum / monthly / monthly_rows answered from cube
+cells through the bitmap index must equal direct pandas filters and
+groupbys over df_sales, for single months, month ranges and filter
+combinations.
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.data_snapshot import prepare_sales_frame
+from core.sales_cube import SalesCube
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+_CACHE = {}
+
+
+def M(s: str) -> pd.Period:
+    return pd.Period(s, freq='M')
+
+
+SLICES = [
+    {},
+    {'month': M('2024-06')},
+    {'month': M('2024-03'), 'state': 'Selangor'},
+    {'start': M('2024-02'), 'end': M('2024-04')},
+    {'start': M('2024-05')},
+    {'end': M('2024-02'), 'product': 'Fries', 'channel': 'Delivery'},
+    {'month': M('2024-06'), 'state': 'Penang', 'branch': 'George Town Branch 1', 'employee': 'SalesRep_03'},
+    {'month': M('2024-06'), 'state': 'Nowhere'},
+    {'month': M('2023-12')},
+]
+
+
+def cube():
+    if not _CACHE:
+        df = prepare_sales_frame(pd.read_csv(DATA_DIR / "MY_Retail_Sales_2024H1.csv"))
+        _CACHE['df'], _CACHE['cube'] = df, SalesCube(df)
+    return _CACHE['df'], _CACHE['cube']
+
+
+def pandas_slice(df, month=None, start=None, end=None, **filters):
+    mask = pd.Series(True, index=df.index)
+    if month is not None:
+        mask &= df['YearMonth'] == month
+    else:
+        if start is not None:
+            mask &= df['YearMonth'] >= start
+        if end is not None:
+            mask &= df['YearMonth'] <= end
+    for key, value in filters.items():
+        mask &= df[SalesCube.FILTER_COLUMNS[key]] == value
+    return df[mask]
+
+
+def close(a, b) -> bool:
+    return abs(a - b) <= 1e-6 * max(1.0, abs(b))
+
+
+def test_slice_matches_pandas():
+    df, c = cube()
+    for args in SLICES:
+        cells, raw = c.slice(**args), pandas_slice(df, **args)
+        assert SalesCube.rows(cells) == len(raw), args
+        assert close(cells['Total Sale'].sum(), raw['Total Sale'].sum()), args
+        assert close(cells['Quantity'].sum(), raw['Quantity'].sum()), args
+        expected = raw.groupby(c.dimensions, observed=True, dropna=False).size()
+        assert len(cells) == len(expected), args
+
+
+def test_total_matches_pandas():
+    df, c = cube()
+    for args in SLICES:
+        raw = pandas_slice(df, **args)
+        for col in ('Total Sale', 'Quantity'):
+            value, rows = c.total(col, **args)
+            assert rows == len(raw) and close(value, raw[col].sum()), (args, col)
+
+
+def test_group_sum_matches_pandas():
+    df, c = cube()
+    for args in SLICES:
+        raw = pandas_slice(df, **args)
+        for dim in ('State', 'Product', 'Channel', 'YearMonth'):
+            grp, rows = c.group_sum(dim, 'Total Sale', **args)
+            expected = raw.groupby(dim, observed=True)['Total Sale'].sum()
+            assert rows == len(raw), (args, dim)
+            assert set(grp.index) == set(expected.index), (args, dim)
+            assert all(close(grp[k], expected[k]) for k in expected.index), (args, dim)
+            assert list(grp) == sorted(grp, reverse=True), (args, dim)
+
+
+def test_monthly_matches_pandas():
+    df, c = cube()
+    assert c.months == sorted(df['YearMonth'].dropna().unique().tolist())
+    rows = df.groupby('YearMonth').size()
+    sales = df.groupby('YearMonth')['Total Sale'].sum()
+    assert c.monthly_rows().to_dict() == rows.to_dict()
+    monthly = c.monthly('Total Sale')
+    assert list(monthly.index) == list(sales.index)
+    assert all(close(monthly[m], sales[m]) for m in sales.index)
+    assert c.get_stats()['source_rows'] == len(df) == int(c.monthly_rows().sum())
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("SALES CUBE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
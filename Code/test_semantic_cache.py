@@ -0,0 +1,81 @@
+"""
+Quick Unit Test for the Semantic Answer Cache
+Uses fixed unit vectors so similarity is known exactly: hit above the
+threshold, miss below it, no sharing across route/model/corpus version,
+TTL expiry and LRU eviction.
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.semantic_cache import SemanticAnswerCache, corpus_version
+
+
+def _unit(angle_deg: float) -> np.ndarray:
+    """2-D unit vector; cosine between _unit(0) and _unit(a) is cos(a)."""
+    a = np.radians(angle_deg)
+    return np.array([np.cos(a), np.sin(a)], dtype=np.float32)
+
+
+def test_hit_within_threshold():
+    cache = SemanticAnswerCache(threshold=0.92)
+    cache.store(_unit(0), "annual leave entitlement", "14 days", "rag_docs", "qwen", "v1")
+    hit = cache.lookup(_unit(10), "rag_docs", "qwen", "v1")  # cos 10° = 0.985
+    assert hit and hit['answer'] == "14 days" and hit['query'] == "annual leave entitlement"
+    assert cache.lookup(_unit(30), "rag_docs", "qwen", "v1") is None  # cos 30° = 0.866
+
+
+def test_scope_isolated_by_route_model_and_version():
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.store(_unit(0), "q", "a", "rag_docs", "qwen", "v1")
+    assert cache.lookup(_unit(0), "visual", "qwen", "v1") is None
+    assert cache.lookup(_unit(0), "rag_docs", "llama3", "v1") is None
+    assert cache.lookup(_unit(0), "rag_docs", "qwen", "v2") is None
+    cache.invalidate("v1")
+    assert cache.lookup(_unit(0), "rag_docs", "qwen", "v1") is None
+
+
+def test_ttl_and_lru_eviction():
+    cache = SemanticAnswerCache(threshold=0.99, max_entries=2, ttl_seconds=1)
+    cache.store(_unit(0), "a", "A", "r", "m", "v")
+    cache.store(_unit(45), "b", "B", "r", "m", "v")
+    assert cache.lookup(_unit(0), "r", "m", "v")['answer'] == "A"  # a is now most recent
+    cache.store(_unit(90), "c", "C", "r", "m", "v")                # evicts b
+    assert cache.lookup(_unit(45), "r", "m", "v") is None
+    assert cache.get_stats()['evictions'] == 1
+
+    time.sleep(1.1)
+    assert cache.lookup(_unit(0), "r", "m", "v") is None
+    assert cache.get_stats()['cache_size'] == 0
+
+
+def test_errors_not_cached_and_version_changes():
+    cache = SemanticAnswerCache()
+    cache.store(_unit(0), "q", "❌ Error: model failed", "r", "m", "v")
+    cache.store(_unit(0), "q", "", "r", "m", "v")
+    assert cache.get_stats()['cache_size'] == 0
+
+    docs = ["[DOC:HR_Policy_MY.txt] Annual leave is 14 days.", "[DOC:SOP.txt] Close at 10pm."]
+    edited = [docs[0].replace("14", "16"), docs[1]]
+    assert corpus_version(docs) == corpus_version(list(docs))
+    assert corpus_version(docs) != corpus_version(edited)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("SEMANTIC ANSWER CACHE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
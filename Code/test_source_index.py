@@ -0,0 +1,139 @@
+"""
+Tests for the per-source RAG sub-indexes
+SourceIndex.search must route each router mode to its sub-indexes, clamp
+k to each sub-index size, merge hits by score and return exactly k chunks
+(fewer only when the searched sources hold fewer). FAISS is replaced by a
+NumPy inner-product index through the make_index hook.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core.source_index import SourceIndex, source_of
+
+
+class FakeIndex:
+    """IndexFlatIP stand-in: exact inner product, records every k asked for."""
+
+    def __init__(self, vectors: np.ndarray, name: str):
+        self.vectors = vectors
+        self.name = name
+        self.asked = []
+
+    @property
+    def ntotal(self) -> int:
+        return len(self.vectors)
+
+    def search(self, q: np.ndarray, k: int):
+        assert k <= self.ntotal, f"{self.name}: k={k} > ntotal={self.ntotal}"
+        self.asked.append(k)
+        scores = self.vectors @ q[0]
+        order = np.argsort(-scores, kind="stable")[:k]
+        return scores[order][None, :], order[None, :]
+
+
+def corpus(dim: int = 8, seed: int = 3):
+    """3 docs, 10 sales, 6 hr and 2 untagged chunks with random unit vectors."""
+    texts = ([f"[DOC:policy.pdf] chunk {i}" for i in range(3)]
+             + [f"[SALES] row {i}" for i in range(10)]
+             + [f"[HR] employee {i}" for i in range(6)]
+             + [f"note {i}" for i in range(2)])
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(len(texts), dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return texts, vectors
+
+
+def build():
+    texts, vectors = corpus()
+    built = {}
+
+    def make_index(v, name):
+        built[name] = FakeIndex(v, name)
+        return built[name]
+
+    return SourceIndex(texts, vectors, make_index=make_index), built, texts, vectors
+
+
+def brute_force(texts, vectors, q, sources, k):
+    scores = vectors @ q[0]
+    ranked = sorted(((float(scores[i]), t) for i, t in enumerate(texts) if source_of(t) in sources),
+                    key=lambda h: h[0], reverse=True)
+    return ranked[:k]
+
+
+def test_split_by_source():
+    index, built, _, _ = build()
+    assert index.sizes() == {'docs': 3, 'sales': 10, 'hr': 6, 'other': 2}
+    assert index.ntotal == 21
+    assert all(source_of(t) == 'docs' for t in index.texts['docs'])
+
+
+def test_mode_routing_and_k_clamp():
+    index, built, _, _ = build()
+    q = np.ones((1, 8), dtype=np.float32) / np.sqrt(8)
+    for mode, searched in [('docs', ['docs']), ('sales', ['sales']), ('hr', ['hr'])]:
+        for fake in built.values():
+            fake.asked.clear()
+        hits = index.search(q, 5, mode=mode)
+        assert [n for n, f in built.items() if f.asked] == searched, mode
+        assert all(source_of(t) == searched[0] for _, t in hits)
+    # docs holds 3: asked for min(5, 3) and returns only 3
+    assert built['docs'].asked == [] and len(index.search(q, 5, mode='docs')) == 3
+    assert built['docs'].asked == [3]
+    # unknown modes search everything
+    for fake in built.values():
+        fake.asked.clear()
+    index.search(q, 4, mode='unknown')
+    assert sorted(n for n, f in built.items() if f.asked) == ['docs', 'hr', 'other', 'sales']
+
+
+def test_merge_returns_exactly_k_best():
+    index, _, texts, vectors = build()
+    rng = np.random.default_rng(11)
+    sources = {'docs': {'docs'}, 'sales': {'sales'}, 'hr': {'hr'}, 'all': {'docs', 'sales', 'hr', 'other'}}
+    for _ in range(10):
+        q = rng.normal(size=(1, 8)).astype(np.float32)
+        q /= np.linalg.norm(q)
+        for mode, srcs in sources.items():
+            for k in (1, 3, 7):
+                hits = index.search(q, k, mode=mode)
+                expected = brute_force(texts, vectors, q, srcs, k)
+                assert len(hits) == min(k, len(expected)), (mode, k)
+                assert [t for _, t in hits] == [t for _, t in expected], (mode, k)
+                assert all(abs(a - b) < 1e-5 for (a, _), (b, _) in zip(hits, expected))
+    # k larger than the whole corpus returns every chunk once
+    assert len(index.search(q, 50, mode='all')) == 21
+
+
+def test_missing_ids_dropped():
+    texts, vectors = corpus()
+
+    class Padded(FakeIndex):
+        def search(self, q, k):  # FAISS pads with -1 when fewer hits exist
+            scores, ids = super().search(q, k)
+            ids[0, -1] = -1
+            return scores, ids
+
+    index = SourceIndex(texts, vectors, make_index=Padded)
+    hits = index.search(np.ones((1, 8), dtype=np.float32), 3, mode='hr')
+    assert len(hits) == 2
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("SOURCE INDEX TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
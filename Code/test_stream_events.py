@@ -0,0 +1,58 @@
+"""
+Tests for the typed streaming events
+Deltas accumulate in the list buffer, final replaces the answer, and
+heartbeats never leak into the answer text.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from core import stream_events as ev
+
+
+def test_buffer_accumulates_deltas():
+    answer = ev.AnswerBuffer()
+    assert not answer and answer.text() == ""
+    for token in ["Total ", "revenue ", "RM 1.2M"]:
+        assert answer.feed(ev.delta(token))
+    assert answer.text() == "Total revenue RM 1.2M"
+    assert answer.text() == "Total revenue RM 1.2M"  # collapsed, same result
+    assert answer.deltas == 3 and not answer.finished
+    assert answer.feed(ev.delta(" (H1)"))
+    assert answer.text() == "Total revenue RM 1.2M (H1)"
+
+
+def test_out_of_band_events_do_not_touch_text():
+    answer = ev.AnswerBuffer()
+    answer.feed(ev.delta("Hello"))
+    assert answer.feed(ev.heartbeat("retrieval", 3, 0.9)) is False
+    assert answer.feed(ev.status("Generating...")) is False
+    assert answer.feed(ev.delta("")) is False
+    assert answer.text() == "Hello"
+    hb = ev.heartbeat("queue", 2, 1.5)
+    assert (hb.kind, hb.phase, hb.count, hb.elapsed) == (ev.HEARTBEAT, "queue", 2, 1.5)
+
+
+def test_final_replaces_answer():
+    events = [ev.heartbeat("llm", 1), ev.delta("partial "), ev.final("❌ Error: model not found")]
+    assert ev.collect_text(events) == "❌ Error: model not found"
+    answer = ev.AnswerBuffer()
+    answer.feed(ev.final("cached answer"))
+    assert answer.finished and answer.text() == "cached answer"
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("STREAM EVENT TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
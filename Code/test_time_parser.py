@@ -0,0 +1,67 @@
+"""
+Equivalence Test for the Time Expression Parser
+The parse_time() views must return exactly what the original regex
+extractors returned (month, month pair, range, named range, timeframe).
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+from query import time_parser
+from query.time_classifier import TimeClassifier
+from query.time_parser import parse_time, resolve_month, month_range, named_month_range
+from benchmark_keyword_routing import load_questions
+from benchmark_time_parser import LATEST, PROBES, legacy_all, legacy_timeframe, parsed_all
+
+
+def test_views_equal_legacy():
+    for q in load_questions() + PROBES:
+        assert parsed_all(q) == legacy_all(q), q
+
+
+def test_time_classifier_timeframe():
+    classifier = TimeClassifier()
+    for q in load_questions() + PROBES:
+        assert classifier._extract_timeframe(q.lower()) == legacy_timeframe(q), q
+    assert classifier.classify("Revenue for H1 2024")['explicit_timeframe'] == "h1"
+
+
+def test_spans_and_kinds():
+    t = parse_time("Sales Q1 vs Q2 2024, bulan lepas, jan2024")
+    kinds = [(e.kind, e.value) for e in t.expressions()]
+    assert kinds == [('quarter', 1), ('quarter', 2), ('relative', 'last_month'), ('month', 1)]
+    assert t.year == 2024
+    assert t.months[0].bounded is False and t.month_names(bounded_only=True) == []
+    q1 = t.quarters[0]
+    assert t.text[q1.start:q1.end] == "q1"
+
+    assert resolve_month("revenue september 2023", LATEST) == pd.Period("2023-09", freq="M")
+    assert resolve_month("headcount by department", LATEST) is None
+    assert month_range("Q1 vs Q2", None)[0].month == 1
+    assert named_month_range("jan to jun", None) is None
+
+
+def test_parse_is_cached():
+    time_parser._parse.cache_clear()
+    first = parse_time("Sales 2024-03 vs 2024-05")
+    assert parse_time("sales 2024-03 VS 2024-05") is first
+    assert time_parser._parse.cache_info().hits == 1
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("TIME PARSER EQUIVALENCE TESTS")
+    print("=" * 80)
+    failed = 0
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  ✅ PASS | {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  ❌ FAIL | {name} | {e}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
@@ -11,9 +11,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from query.time_classifier import TimeClassifier
 from query.validator import DataValidator
-from core.simple_cache import SimpleCache
+from core.cache_engine import CacheEngine
 import pandas as pd
 import json
+import time
 from datetime import datetime
 
 
@@ -25,7 +26,8 @@ class FYPEvaluator:
         self.sales_csv_path = sales_csv_path
         self.classifier = TimeClassifier()
         self.validator = DataValidator(sales_csv_path)
-        self.cache = SimpleCache(ttl_seconds=3600)
+        self.cache = CacheEngine(ttl_seconds=3600, sweep_interval=0)
+        self._sales_df = None
         self.results = []
     
     def run_all_tests(self):
@@ -204,6 +206,77 @@ class FYPEvaluator:
             'passed': hit_rate_ok,
             'stats': stats
         })
+        
+        self._test_cache_eviction()
+    
+    def _test_cache_eviction(self):
+        """Test byte-budget LRU / LFU eviction and TTL sweeping with real DataFrame subsets."""
+        states = ['Selangor', 'Penang', 'Johor', 'Kedah', 'Sabah']
+        subsets = {s: self._load_subset({'state': s}) for s in states}
+        sizes = {s: int(df.memory_usage(deep=True).sum()) for s, df in subsets.items()}
+        # Budget fits the three largest subsets but not all five
+        budget = sum(sorted(sizes.values())[-3:])
+        
+        # TC-CACHE-02: LRU evicts the least recently used subset to stay under budget
+        lru = CacheEngine(ttl_seconds=3600, max_bytes=budget, policy='lru', sweep_interval=0)
+        for s in states:
+            lru.set(f"state:{s}", subsets[s], namespace='sales_subset')
+            lru.get(f"state:{states[0]}", namespace='sales_subset')  # keep the first one hot
+        stats = lru.get_stats()
+        lru_ok = (stats['bytes'] <= budget and stats['evictions'] > 0
+                  and lru.get(f"state:{states[0]}", namespace='sales_subset') is not None
+                  and lru.get(f"state:{states[1]}", namespace='sales_subset') is None)
+        print(f"     LRU: {stats['cache_size']} entries, {stats['bytes'] / 1e6:.2f}/{budget / 1e6:.2f} MB, "
+              f"{stats['evictions']} evicted {'✅' if lru_ok else '❌'}")
+        self.results.append({
+            'test_id': 'TC-CACHE-02',
+            'category': 'cache_performance',
+            'policy': 'lru',
+            'max_bytes': budget,
+            'passed': lru_ok,
+            'stats': stats
+        })
+        
+        # TC-CACHE-03: LFU keeps the frequently used subset even when it is not the most recent
+        lfu = CacheEngine(ttl_seconds=3600, max_entries=2, policy='lfu', sweep_interval=0)
+        lfu.set('hot', subsets[states[0]])
+        for _ in range(3):
+            lfu.get('hot')
+        lfu.set('cold', subsets[states[1]])
+        lfu.set('new', subsets[states[2]])  # evicts 'cold' (0 hits), not 'hot'
+        lfu_ok = lfu.get('hot') is not None and lfu.get('cold') is None and lfu.get_stats()['evictions'] == 1
+        print(f"     LFU: hot kept, cold evicted {'✅' if lfu_ok else '❌'}")
+        self.results.append({
+            'test_id': 'TC-CACHE-03',
+            'category': 'cache_performance',
+            'policy': 'lfu',
+            'passed': lfu_ok,
+            'stats': lfu.get_stats()
+        })
+        
+        # TC-CACHE-04: background sweep drops expired entries without a get()
+        ttl = CacheEngine(ttl_seconds=0.1, sweep_interval=0.05)
+        ttl.set('state:Selangor', subsets['Selangor'], namespace='sales_subset')
+        time.sleep(0.4)
+        ttl.close()
+        stats = ttl.get_stats()
+        ttl_ok = stats['cache_size'] == 0 and stats['bytes'] == 0 and stats['expirations'] == 1
+        print(f"     TTL sweep: {stats['expirations']} expired, {stats['cache_size']} left {'✅' if ttl_ok else '❌'}\n")
+        self.results.append({
+            'test_id': 'TC-CACHE-04',
+            'category': 'cache_performance',
+            'passed': ttl_ok,
+            'stats': stats
+        })
+    
+    def _load_subset(self, filters: dict) -> pd.DataFrame:
+        """Filtered copy of the sales data, as get_cached_sales_subset() caches it."""
+        if self._sales_df is None:
+            self._sales_df = pd.read_csv(self.sales_csv_path)
+        df = self._sales_df
+        if filters.get('state'):
+            df = df[df['State'] == filters['state']]
+        return df.copy()
     
     def _make_cache_key(self, filters: dict) -> str:
         """Generate cache key from filters."""